@@ -19,6 +19,7 @@ from .business_directory_import import (
 from .models import (
     AIConfiguration,
     AIUsageEvent,
+    AIUsageMonthlyRollup,
     AdminAuditLog,
     BusinessDirectoryListing,
     DeletedEmailBlocklist,
@@ -29,6 +30,7 @@ from .models import (
     UserReport,
     user_can_access_admin,
 )
+from .response_cache import REFERENCE_GALLERY_TAG, profile_tag, purge_tags_on_commit
 
 User = get_user_model()
 
@@ -489,16 +491,25 @@ class UserAdmin(StaffRolePermissionMixin, DjangoUserAdmin):
             profile_ids.append(profile.id)
         return Profile.objects.filter(id__in=profile_ids)
 
+    def _update_profiles(self, queryset, **values):
+        # Bulk updates skip save() and its signals: bump updated_at (the
+        # profile ETag) and purge cached public responses by hand.
+        user_ids = list(queryset.values_list("id", flat=True))
+        self._profiles_for_users(queryset).update(updated_at=timezone.now(), **values)
+        purge_tags_on_commit(REFERENCE_GALLERY_TAG, *(profile_tag(user_id) for user_id in user_ids))
+
     @admin.action(description="Freeze selected accounts")
     def freeze_accounts(self, request, queryset):
-        self._profiles_for_users(queryset).update(
+        self._update_profiles(
+            queryset,
             is_frozen=True,
             frozen_at=timezone.now(),
         )
 
     @admin.action(description="Unfreeze selected accounts")
     def unfreeze_accounts(self, request, queryset):
-        self._profiles_for_users(queryset).update(
+        self._update_profiles(
+            queryset,
             is_frozen=False,
             frozen_at=None,
             frozen_reason="",
@@ -506,13 +517,15 @@ class UserAdmin(StaffRolePermissionMixin, DjangoUserAdmin):
 
     @admin.action(description="Convert selected accounts to Contractor")
     def make_contractors(self, request, queryset):
-        self._profiles_for_users(queryset).update(
+        self._update_profiles(
+            queryset,
             profile_type=Profile.ProfileType.CONTRACTOR,
         )
 
     @admin.action(description="Convert selected accounts to Homeowner")
     def make_homeowners(self, request, queryset):
-        self._profiles_for_users(queryset).update(
+        self._update_profiles(
+            queryset,
             profile_type=Profile.ProfileType.HOMEOWNER,
         )
 
@@ -912,3 +925,44 @@ class AIUsageEventAdmin(admin.ModelAdmin):
         "request_day",
         "created_at",
     )
+
+
+@admin.register(AIUsageMonthlyRollup)
+class AIUsageMonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        "month",
+        "user",
+        "feature",
+        "model_name",
+        "success_count",
+        "cached_count",
+        "error_count",
+        "input_tokens",
+        "output_tokens",
+        "provider_cost_usd",
+        "user_charge_usd",
+    )
+    list_filter = ("month", "feature", "model_name")
+    search_fields = ("user__username", "user__email", "model_name")
+    list_select_related = ("user",)
+    date_hierarchy = "month"
+    readonly_fields = (
+        "user",
+        "month",
+        "feature",
+        "model_name",
+        "success_count",
+        "cached_count",
+        "error_count",
+        "input_tokens",
+        "output_tokens",
+        "provider_cost_usd",
+        "user_charge_usd",
+        "updated_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,11 +1,24 @@
+import asyncio
 import base64
+import hashlib
 import json
+import logging
 import mimetypes
+import os
+import threading
+import time
 import uuid
-from urllib import error, request
+from collections import OrderedDict
 
+import httpx
+from asgiref.sync import sync_to_async
 from django.conf import settings
 
+from . import metrics
+from .profiling import external_call
+
+logger = logging.getLogger(__name__)
+
 
 FEATURE_MODEL_MAP = {
     "project_summary": "primary",
@@ -20,10 +33,394 @@ FEATURE_MODEL_MAP = {
 }
 
 
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER_SECONDS = 30
+
+_http_client = None
+_http_client_pid = None
+_http_client_lock = threading.Lock()
+_async_http_client = None
+_async_http_client_owner = None
+_async_http_client_enabled = False
+
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
 class AIServiceError(Exception):
     pass
 
 
+def get_ai_http_client():
+    """
+    Shared per-process HTTP client for the AI provider.
+
+    Connections are pooled and kept alive between calls so repeat requests skip
+    DNS and the TLS handshake. The client is rebuilt after a fork so gunicorn
+    workers never share sockets with the master process.
+    """
+    global _http_client, _http_client_pid
+
+    pid = os.getpid()
+    if _http_client is not None and _http_client_pid == pid:
+        return _http_client
+
+    with _http_client_lock:
+        if _http_client is None or _http_client_pid != pid:
+            _http_client = httpx.Client(limits=_pool_limits())
+            _http_client_pid = pid
+    return _http_client
+
+
+def enable_async_http_client():
+    """
+    Let async views use a pooled ``httpx.AsyncClient``.
+
+    Called from the ASGI lifespan startup (backend/asgi.py), when one event
+    loop serves the worker for its whole life. Without it every async call
+    goes through the sync client, because under WSGI each request gets a
+    throwaway loop from async_to_sync and an async client can't outlive it.
+    """
+    global _async_http_client_enabled
+    _async_http_client_enabled = True
+
+
+def get_ai_async_http_client():
+    """
+    Shared ``httpx.AsyncClient`` for the worker's event loop, or None.
+
+    None means no ASGI lifespan owns the process; callers fall back to
+    get_ai_http_client() so the keep-alive pool is still used.
+    """
+    global _async_http_client, _async_http_client_owner
+
+    if not _async_http_client_enabled:
+        return None
+    owner = (os.getpid(), asyncio.get_running_loop())
+    with _http_client_lock:
+        if _async_http_client is None or _async_http_client_owner != owner:
+            stale = (_async_http_client, _async_http_client_owner)
+            _async_http_client = httpx.AsyncClient(limits=_pool_limits())
+            _async_http_client_owner = owner
+        else:
+            stale = (None, None)
+    _close_async_client(*stale)
+    return _async_http_client
+
+
+def _close_async_client(client, owner):
+    """Close ``client`` on the loop that owns its sockets, if that loop is still alive."""
+    if client is None or owner[0] != os.getpid():
+        return
+    loop = owner[1]
+    if loop.is_closed():
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        loop.create_task(client.aclose())
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    elif running is None:
+        loop.run_until_complete(client.aclose())
+
+
+def _pool_limits():
+    return httpx.Limits(
+        max_connections=int(getattr(settings, "OPENAI_POOL_MAX_CONNECTIONS", 10)),
+        max_keepalive_connections=int(getattr(settings, "OPENAI_POOL_MAX_KEEPALIVE", 5)),
+        keepalive_expiry=float(getattr(settings, "OPENAI_POOL_KEEPALIVE_EXPIRY", 60)),
+    )
+
+
+def close_ai_http_client():
+    global _http_client, _http_client_pid, _async_http_client, _async_http_client_owner
+
+    with _http_client_lock:
+        if _http_client is not None and _http_client_pid == os.getpid():
+            _http_client.close()
+        _http_client = None
+        _http_client_pid = None
+        stale = (_async_http_client, _async_http_client_owner)
+        _async_http_client = None
+        _async_http_client_owner = None
+    _close_async_client(*stale)
+
+
+async def aclose_ai_http_client():
+    """Close the async client from its own loop; run at ASGI lifespan shutdown."""
+    global _async_http_client, _async_http_client_owner, _async_http_client_enabled
+
+    with _http_client_lock:
+        client, owner = _async_http_client, _async_http_client_owner
+        _async_http_client = None
+        _async_http_client_owner = None
+        _async_http_client_enabled = False
+    if client is not None and owner == (os.getpid(), asyncio.get_running_loop()):
+        await client.aclose()
+    else:
+        _close_async_client(client, owner)
+
+
+def _provider_url(path):
+    base_url = str(getattr(settings, "OPENAI_API_BASE_URL", "") or "https://api.openai.com/v1").rstrip("/")
+    return f"{base_url}/{path.lstrip('/')}"
+
+
+def _provider_timeout(read_timeout):
+    connect_timeout = float(getattr(settings, "OPENAI_CONNECT_TIMEOUT", 5))
+    return httpx.Timeout(read_timeout, connect=connect_timeout)
+
+
+def _provider_error_message(response):
+    raw = response.text
+    try:
+        parsed = json.loads(raw)
+        return (
+            parsed.get("error", {}).get("message")
+            or parsed.get("message")
+            or raw
+        )
+    except Exception:
+        return raw or f"AI provider returned HTTP {response.status_code}."
+
+
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0), MAX_RETRY_AFTER_SECONDS)
+        except ValueError:
+            pass
+    backoff = float(getattr(settings, "OPENAI_RETRY_BACKOFF_SECONDS", 0.5))
+    return backoff * (2 ** attempt)
+
+
+@external_call("ai")
+def _send_to_provider(path, **kwargs):
+    with metrics.AI_PROVIDER_SECONDS.time(endpoint=path, outcome="error") as labels:
+        response = _send_with_retries(path, **kwargs)
+        labels["outcome"] = "ok"
+        return response
+
+
+def _provider_request_parts(path, json_body, content, content_type, stream):
+    if json_body is not None:
+        content = json.dumps(json_body).encode("utf-8")
+    headers = {
+        "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
+        "Content-Type": content_type,
+    }
+    if stream:
+        headers["Accept"] = "text/event-stream"
+    return _provider_url(path), content, headers
+
+
+def _log_retry(path, attempt, response, delay):
+    logger.warning(
+        "Retrying AI provider request path=%s attempt=%s status=%s delay=%.2fs",
+        path,
+        attempt + 1,
+        getattr(response, "status_code", "connect_error"),
+        delay,
+    )
+
+
+def _send_with_retries(
+    path, *, read_timeout, json_body=None, content=None, content_type="application/json", stream=False
+):
+    url, content, headers = _provider_request_parts(path, json_body, content, content_type, stream)
+    max_retries = max(0, int(getattr(settings, "OPENAI_MAX_RETRIES", 2)))
+    client = get_ai_http_client()
+
+    attempt = 0
+    while True:
+        response = None
+        try:
+            request = client.build_request(
+                "POST",
+                url,
+                content=content,
+                headers=headers,
+                timeout=_provider_timeout(read_timeout),
+            )
+            response = client.send(request, stream=stream)
+            if stream and response.status_code >= 400:
+                response.read()
+                response.close()
+        except httpx.ConnectError as exc:
+            # Nothing reached the provider, so a retry cannot double-bill.
+            if attempt >= max_retries:
+                raise AIServiceError(str(exc))
+        except httpx.HTTPError as exc:
+            raise AIServiceError(str(exc))
+        else:
+            if response.status_code < 400:
+                return response
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                raise AIServiceError(_provider_error_message(response))
+
+        delay = _retry_delay(response, attempt)
+        _log_retry(path, attempt, response, delay)
+        if delay:
+            time.sleep(delay)
+        attempt += 1
+
+
+async def _asend_to_provider(path, *, client, **kwargs):
+    with external_call("ai"), metrics.AI_PROVIDER_SECONDS.time(endpoint=path, outcome="error") as labels:
+        response = await _asend_with_retries(path, client=client, **kwargs)
+        labels["outcome"] = "ok"
+        return response
+
+
+async def _asend_with_retries(
+    path, *, client, read_timeout, json_body=None, content=None, content_type="application/json"
+):
+    """_send_with_retries() on the event loop: the wait for the provider no longer holds a thread."""
+    url, content, headers = _provider_request_parts(path, json_body, content, content_type, False)
+    max_retries = max(0, int(getattr(settings, "OPENAI_MAX_RETRIES", 2)))
+
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = await client.post(url, content=content, headers=headers, timeout=_provider_timeout(read_timeout))
+        except httpx.ConnectError as exc:
+            if attempt >= max_retries:
+                raise AIServiceError(str(exc))
+        except httpx.HTTPError as exc:
+            raise AIServiceError(str(exc))
+        else:
+            if response.status_code < 400:
+                return response
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                raise AIServiceError(_provider_error_message(response))
+
+        delay = _retry_delay(response, attempt)
+        _log_retry(path, attempt, response, delay)
+        if delay:
+            await asyncio.sleep(delay)
+        attempt += 1
+
+
+def _provider_json(response):
+    try:
+        return response.json()
+    except ValueError as exc:
+        raise AIServiceError(f"AI provider returned invalid JSON: {exc}")
+
+
+def _post_to_provider(path, *, read_timeout, json_body=None, content=None, content_type="application/json"):
+    response = _send_to_provider(
+        path,
+        read_timeout=read_timeout,
+        json_body=json_body,
+        content=content,
+        content_type=content_type,
+    )
+    return _provider_json(response)
+
+
+async def _apost_to_provider(path, *, read_timeout, json_body=None, content=None, content_type="application/json"):
+    client = get_ai_async_http_client()
+    if client is None:
+        return await sync_to_async(_post_to_provider)(
+            path,
+            read_timeout=read_timeout,
+            json_body=json_body,
+            content=content,
+            content_type=content_type,
+        )
+    response = await _asend_to_provider(
+        path,
+        client=client,
+        read_timeout=read_timeout,
+        json_body=json_body,
+        content=content,
+        content_type=content_type,
+    )
+    return _provider_json(response)
+
+
+def _iter_sse_data(response):
+    data_lines = []
+    for line in response.iter_lines():
+        if not line:
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+def ai_response_cache_key(model, feature, *parts):
+    """
+    Content address for a generation request: the model, the feature and a
+    SHA-256 digest over the prompts and any image bytes.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(len(part or b"").to_bytes(8, "big"))
+        digest.update(part or b"")
+    return f"{model}:{feature}:{digest.hexdigest()}"
+
+
+def _cache_ttl_seconds():
+    return max(0, int(getattr(settings, "AI_RESPONSE_CACHE_TTL_SECONDS", 0) or 0))
+
+
+def get_cached_ai_response(cache_key):
+    ttl = _cache_ttl_seconds()
+    if not ttl:
+        return None
+    now = time.monotonic()
+    with _response_cache_lock:
+        entry = _response_cache.get(cache_key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if now - stored_at > ttl:
+            del _response_cache[cache_key]
+            return None
+        _response_cache.move_to_end(cache_key)
+    return {**result, "usage": {}, "cached": True, "cache_key": cache_key}
+
+
+def store_ai_response(cache_key, result):
+    if not _cache_ttl_seconds():
+        return
+    max_entries = max(0, int(getattr(settings, "AI_RESPONSE_CACHE_MAX_ENTRIES", 256) or 0))
+    if not max_entries:
+        return
+    entry = (time.monotonic(), {"text": result["text"], "model": result["model"]})
+    with _response_cache_lock:
+        _response_cache[cache_key] = entry
+        _response_cache.move_to_end(cache_key)
+        while len(_response_cache) > max_entries:
+            _response_cache.popitem(last=False)
+
+
+def evict_ai_response(cache_key):
+    """Drop a cached response, e.g. one the caller could not parse."""
+    if not cache_key:
+        return
+    with _response_cache_lock:
+        _response_cache.pop(cache_key, None)
+
+
+def clear_ai_response_cache():
+    with _response_cache_lock:
+        _response_cache.clear()
+
+
 def _extract_usage(payload):
     usage = payload.get("usage") or {}
     return {
@@ -56,12 +453,8 @@ def _extract_output_text(payload):
     raise AIServiceError("No text was returned by the AI provider.")
 
 
-def generate_text(*, feature, system_prompt, user_prompt):
-    if not settings.OPENAI_API_KEY:
-        raise AIServiceError("OPENAI_API_KEY is not configured.")
-
-    model = resolve_model_name(feature)
-    body = {
+def _text_request_body(model, system_prompt, user_prompt):
+    return {
         "model": model,
         "input": [
             {"role": "system", "content": [{"type": "input_text", "text": system_prompt}]},
@@ -69,49 +462,129 @@ def generate_text(*, feature, system_prompt, user_prompt):
         ],
     }
 
-    req = request.Request(
-        "https://api.openai.com/v1/responses",
-        data=json.dumps(body).encode("utf-8"),
-        headers={
-            "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
-    )
 
-    try:
-        with request.urlopen(req, timeout=30) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
-    except error.HTTPError as exc:
-        raw = exc.read().decode("utf-8", errors="replace")
-        try:
-            parsed = json.loads(raw)
-            message = (
-                parsed.get("error", {}).get("message")
-                or parsed.get("message")
-                or raw
-            )
-        except Exception:
-            message = raw or str(exc)
-        raise AIServiceError(message)
-    except Exception as exc:
-        raise AIServiceError(str(exc))
+def _generation_model_and_cache_key(feature, use_cache, *parts):
+    if not settings.OPENAI_API_KEY:
+        raise AIServiceError("OPENAI_API_KEY is not configured.")
+    model = resolve_model_name(feature)
+    cache_key = ai_response_cache_key(model, feature, *parts) if use_cache else ""
+    return model, cache_key
 
-    return {
+
+def _generation_result(payload, model, cache_key):
+    result = {
         "text": _extract_output_text(payload),
         "model": payload.get("model") or model,
         "usage": _extract_usage(payload),
+        "cached": False,
+        "cache_key": cache_key,
     }
+    if cache_key:
+        store_ai_response(cache_key, result)
+    return result
+
+
+def generate_text(*, feature, system_prompt, user_prompt, use_cache=False):
+    model, cache_key = _generation_model_and_cache_key(feature, use_cache, system_prompt, user_prompt)
+    cached = get_cached_ai_response(cache_key) if cache_key else None
+    if cached is not None:
+        return cached
+
+    payload = _post_to_provider(
+        "responses",
+        json_body=_text_request_body(model, system_prompt, user_prompt),
+        read_timeout=float(getattr(settings, "OPENAI_READ_TIMEOUT", 30)),
+    )
+    return _generation_result(payload, model, cache_key)
+
+
+async def agenerate_text(*, feature, system_prompt, user_prompt, use_cache=False):
+    """Async generate_text() for views running on the event loop."""
+    model, cache_key = _generation_model_and_cache_key(feature, use_cache, system_prompt, user_prompt)
+    cached = get_cached_ai_response(cache_key) if cache_key else None
+    if cached is not None:
+        return cached
+
+    payload = await _apost_to_provider(
+        "responses",
+        json_body=_text_request_body(model, system_prompt, user_prompt),
+        read_timeout=float(getattr(settings, "OPENAI_READ_TIMEOUT", 30)),
+    )
+    return _generation_result(payload, model, cache_key)
 
 
-def generate_text_with_image(*, feature, system_prompt, user_prompt, image_bytes, image_content_type):
+def stream_text(*, feature, system_prompt, user_prompt, use_cache=False):
+    """
+    Stream a text generation as the provider produces it.
+
+    Yields ``{"type": "delta", "text": ...}`` chunks, then a single
+    ``{"type": "completed", ...}`` item with the same keys generate_text returns.
+    """
     if not settings.OPENAI_API_KEY:
         raise AIServiceError("OPENAI_API_KEY is not configured.")
 
     model = resolve_model_name(feature)
+    cache_key = ai_response_cache_key(model, feature, system_prompt, user_prompt) if use_cache else ""
+    if cache_key:
+        cached = get_cached_ai_response(cache_key)
+        if cached is not None:
+            yield {"type": "delta", "text": cached["text"]}
+            yield {"type": "completed", **cached}
+            return
+
+    body = {**_text_request_body(model, system_prompt, user_prompt), "stream": True}
+    response = _send_to_provider(
+        "responses",
+        json_body=body,
+        read_timeout=float(getattr(settings, "OPENAI_READ_TIMEOUT", 30)),
+        stream=True,
+    )
+
+    chunks = []
+    completed = None
+    try:
+        for data in _iter_sse_data(response):
+            if data == "[DONE]":
+                break
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+            event_type = event.get("type")
+            if event_type == "response.output_text.delta":
+                delta = event.get("delta") or ""
+                if delta:
+                    chunks.append(delta)
+                    yield {"type": "delta", "text": delta}
+            elif event_type == "response.completed":
+                completed = event.get("response") or {}
+            elif event_type in ("error", "response.failed"):
+                error = event.get("error") or (event.get("response") or {}).get("error") or {}
+                raise AIServiceError(error.get("message") or "The AI provider stream failed.")
+    except httpx.HTTPError as exc:
+        raise AIServiceError(str(exc))
+    finally:
+        response.close()
+
+    if completed is None:
+        raise AIServiceError("The AI provider stream ended before the response completed.")
+
+    result = {
+        "text": "".join(chunks) or _extract_output_text(completed),
+        "model": completed.get("model") or model,
+        "usage": _extract_usage(completed),
+        "cached": False,
+        "cache_key": cache_key,
+    }
+    if cache_key:
+        store_ai_response(cache_key, result)
+    yield {"type": "completed", **result}
+
+
+def _image_request_body(model, system_prompt, user_prompt, image_bytes, image_content_type):
     image_data = base64.b64encode(image_bytes).decode("ascii")
     image_url = f"data:{image_content_type};base64,{image_data}"
-    body = {
+    return {
         "model": model,
         "input": [
             {"role": "system", "content": [{"type": "input_text", "text": system_prompt}]},
@@ -125,39 +598,41 @@ def generate_text_with_image(*, feature, system_prompt, user_prompt, image_bytes
         ],
     }
 
-    req = request.Request(
-        "https://api.openai.com/v1/responses",
-        data=json.dumps(body).encode("utf-8"),
-        headers={
-            "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
+
+def generate_text_with_image(
+    *, feature, system_prompt, user_prompt, image_bytes, image_content_type, use_cache=False
+):
+    model, cache_key = _generation_model_and_cache_key(
+        feature, use_cache, system_prompt, user_prompt, image_content_type, image_bytes
+    )
+    cached = get_cached_ai_response(cache_key) if cache_key else None
+    if cached is not None:
+        return cached
+
+    payload = _post_to_provider(
+        "responses",
+        json_body=_image_request_body(model, system_prompt, user_prompt, image_bytes, image_content_type),
+        read_timeout=float(getattr(settings, "OPENAI_VISION_READ_TIMEOUT", 45)),
     )
+    return _generation_result(payload, model, cache_key)
 
-    try:
-        with request.urlopen(req, timeout=45) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
-    except error.HTTPError as exc:
-        raw = exc.read().decode("utf-8", errors="replace")
-        try:
-            parsed = json.loads(raw)
-            message = (
-                parsed.get("error", {}).get("message")
-                or parsed.get("message")
-                or raw
-            )
-        except Exception:
-            message = raw or str(exc)
-        raise AIServiceError(message)
-    except Exception as exc:
-        raise AIServiceError(str(exc))
 
-    return {
-        "text": _extract_output_text(payload),
-        "model": payload.get("model") or model,
-        "usage": _extract_usage(payload),
-    }
+async def agenerate_text_with_image(
+    *, feature, system_prompt, user_prompt, image_bytes, image_content_type, use_cache=False
+):
+    model, cache_key = _generation_model_and_cache_key(
+        feature, use_cache, system_prompt, user_prompt, image_content_type, image_bytes
+    )
+    cached = get_cached_ai_response(cache_key) if cache_key else None
+    if cached is not None:
+        return cached
+
+    payload = await _apost_to_provider(
+        "responses",
+        json_body=_image_request_body(model, system_prompt, user_prompt, image_bytes, image_content_type),
+        read_timeout=float(getattr(settings, "OPENAI_VISION_READ_TIMEOUT", 45)),
+    )
+    return _generation_result(payload, model, cache_key)
 
 
 def _multipart_form_data(fields, files):
@@ -186,7 +661,7 @@ def _multipart_form_data(fields, files):
     return boundary, b"".join(chunks)
 
 
-def generate_image_from_image(*, feature, prompt, image_bytes, image_content_type, image_name="sketch.png"):
+def _image_edit_request(prompt, image_bytes, image_content_type, image_name):
     if not settings.OPENAI_API_KEY:
         raise AIServiceError("OPENAI_API_KEY is not configured.")
 
@@ -196,34 +671,24 @@ def generate_image_from_image(*, feature, prompt, image_bytes, image_content_typ
         {"model": model, "prompt": prompt},
         [("image[]", image_name or "sketch.png", content_type, image_bytes)],
     )
-    req = request.Request(
-        "https://api.openai.com/v1/images/edits",
-        data=body,
-        headers={
-            "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
-            "Content-Type": f"multipart/form-data; boundary={boundary}",
-        },
-        method="POST",
-    )
+    return model, {
+        "content": body,
+        "content_type": f"multipart/form-data; boundary={boundary}",
+        "read_timeout": float(getattr(settings, "OPENAI_IMAGE_READ_TIMEOUT", 90)),
+    }
+
+
+def generate_image_from_image(*, feature, prompt, image_bytes, image_content_type, image_name="sketch.png"):
+    model, request = _image_edit_request(prompt, image_bytes, image_content_type, image_name)
+    return _image_edit_result(_post_to_provider("images/edits", **request), model)
+
+
+async def agenerate_image_from_image(*, feature, prompt, image_bytes, image_content_type, image_name="sketch.png"):
+    model, request = _image_edit_request(prompt, image_bytes, image_content_type, image_name)
+    return _image_edit_result(await _apost_to_provider("images/edits", **request), model)
 
-    try:
-        with request.urlopen(req, timeout=90) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
-    except error.HTTPError as exc:
-        raw = exc.read().decode("utf-8", errors="replace")
-        try:
-            parsed = json.loads(raw)
-            message = (
-                parsed.get("error", {}).get("message")
-                or parsed.get("message")
-                or raw
-            )
-        except Exception:
-            message = raw or str(exc)
-        raise AIServiceError(message)
-    except Exception as exc:
-        raise AIServiceError(str(exc))
 
+def _image_edit_result(payload, model):
     image_base64 = None
     for item in payload.get("data") or []:
         if item.get("b64_json"):
@@ -7,9 +7,27 @@ class AccountsConfig(AppConfig):
 
     def ready(self):
         from django.contrib.auth import get_user_model
-        from django.db.models.signals import post_save
+        from django.db import transaction
+        from django.db.models.signals import post_delete, post_save
 
-        from .models import Profile
+        from .caching import invalidate_namespace
+        from .models import (
+            AIConfiguration,
+            AIUsageEvent,
+            BusinessDirectoryListing,
+            BusinessDirectoryListingLike,
+            HomeownerReferenceImage,
+            Profile,
+            ProfileLike,
+            add_event_to_monthly_rollup,
+        )
+        from .response_cache import (
+            DIRECTORY_TAG,
+            REFERENCE_GALLERY_TAG,
+            listing_tag,
+            profile_tag,
+            purge_tags_on_commit,
+        )
 
         User = get_user_model()
 
@@ -22,3 +40,69 @@ class AccountsConfig(AppConfig):
             sender=User,
             dispatch_uid="accounts.ensure_profile",
         )
+
+        def roll_up_ai_usage_event(sender, instance, created, raw=False, **kwargs):
+            if created and not raw:
+                add_event_to_monthly_rollup(instance)
+
+        post_save.connect(
+            roll_up_ai_usage_event,
+            sender=AIUsageEvent,
+            dispatch_uid="accounts.roll_up_ai_usage_event",
+        )
+
+        def invalidate_ai_configuration(sender, created=False, **kwargs):
+            # get_solo() creates the row from inside a cache load; nothing can
+            # be cached for a row that did not exist yet. Invalidate after
+            # commit: a request that reloads before then would re-cache the old
+            # row until the next bump.
+            if not created:
+                transaction.on_commit(lambda: invalidate_namespace(AIConfiguration.CACHE_NAMESPACE))
+
+        post_save.connect(
+            invalidate_ai_configuration,
+            sender=AIConfiguration,
+            dispatch_uid="accounts.invalidate_ai_configuration_on_save",
+        )
+        post_delete.connect(
+            invalidate_ai_configuration,
+            sender=AIConfiguration,
+            dispatch_uid="accounts.invalidate_ai_configuration_on_delete",
+        )
+
+        # Cached public responses are tagged with the rows they render; the
+        # collection tags cover rows that are new to a list.
+        def purge_profile(sender, instance, **kwargs):
+            tags = [profile_tag(instance.user_id)]
+            if instance.profile_type == Profile.ProfileType.HOMEOWNER:
+                tags.append(REFERENCE_GALLERY_TAG)
+            purge_tags_on_commit(*tags)
+
+        def purge_directory_listing(sender, instance, **kwargs):
+            tags = [listing_tag(instance.pk)]
+            if instance.is_published and not instance.is_removed:
+                tags.append(DIRECTORY_TAG)
+            purge_tags_on_commit(*tags)
+
+        def purge_directory_listing_like(sender, instance, **kwargs):
+            purge_tags_on_commit(listing_tag(instance.listing_id))
+
+        def purge_profile_like(sender, instance, **kwargs):
+            purge_tags_on_commit(profile_tag(instance.liked_user_id))
+
+        def purge_reference_image(sender, instance, **kwargs):
+            purge_tags_on_commit(profile_tag(instance.user_id), REFERENCE_GALLERY_TAG)
+
+        for model, receiver_fn in (
+            (Profile, purge_profile),
+            (BusinessDirectoryListing, purge_directory_listing),
+            (BusinessDirectoryListingLike, purge_directory_listing_like),
+            (ProfileLike, purge_profile_like),
+            (HomeownerReferenceImage, purge_reference_image),
+        ):
+            for signal, suffix in ((post_save, "save"), (post_delete, "delete")):
+                signal.connect(
+                    receiver_fn,
+                    sender=model,
+                    dispatch_uid=f"accounts.{receiver_fn.__name__}_on_{suffix}",
+                )
@@ -0,0 +1,121 @@
+# backend/accounts/async_views.py
+"""
+``async def`` handlers for DRF views and viewset actions.
+
+DRF 3.15 dispatches synchronously, so an ``async def post`` would hand back
+an un-awaited coroutine. ``AsyncAPIViewMixin`` runs the same steps as
+``APIView.dispatch`` on the event loop whenever the route's handlers are
+coroutines:
+
+- authentication, permissions and throttling (``initial``) run through
+  ``sync_to_async``, because they can touch the database;
+- the handler is awaited, so slow provider calls (AI, geocoding) no longer
+  hold a worker thread under ASGI;
+- exception handling and content negotiation are unchanged.
+
+Handlers must do their own ORM work through ``database_sync_to_async``.
+Sync handlers on the same class keep the stock dispatch. One route must not mix
+the two (for example GET sync and POST async on the same viewset URL).
+
+Under WSGI, Django runs async views through ``async_to_sync``, so the same
+views keep working behind sync gunicorn workers and in the test client.
+"""
+from functools import update_wrapper, wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+
+def release_connections():
+    """
+    Close idle non-persistent connections (CONN_MAX_AGE=0) outside transactions.
+
+    Django only closes them when the request finishes, so an async view
+    waiting 30-90 s on a provider would otherwise keep its connection (or its
+    pool slot, see backend/pooled_postgresql) for the whole wait.
+    """
+    for connection in connections.all(initialized_only=True):
+        if (
+            connection.connection is not None
+            and not connection.in_atomic_block
+            and not connection.settings_dict.get("CONN_MAX_AGE")
+        ):
+            connection.close()
+
+
+def database_sync_to_async(func):
+    """``sync_to_async(func)`` that hands the database connection back afterwards."""
+
+    @wraps(func)
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            release_connections()
+
+    return sync_to_async(run)
+
+
+def route_is_async(view_class, actions=None):
+    """True when every handler behind the route is a coroutine function."""
+    if not actions:
+        return view_class.view_is_async
+    flags = {iscoroutinefunction(getattr(view_class, name)) for name in set(actions.values())}
+    if len(flags) > 1:
+        raise ImproperlyConfigured(
+            f"{view_class.__name__} actions {sorted(set(actions.values()))} must either be all sync or all async."
+        )
+    return flags == {True}
+
+
+class AsyncAPIViewMixin:
+    @classmethod
+    def as_view(cls, *args, **initkwargs):
+        view = super().as_view(*args, **initkwargs)
+        actions = getattr(view, "actions", None)
+        if iscoroutinefunction(view) or not route_is_async(cls, actions):
+            return view
+
+        # ViewSetMixin.as_view() builds a plain function; mark the route as
+        # async so Django awaits it instead of calling it from a thread.
+        sync_view = view
+
+        async def view(request, *args, **kwargs):
+            return await sync_view(request, *args, **kwargs)
+
+        # Copies cls, actions, initkwargs and csrf_exempt for routing and middleware.
+        update_wrapper(view, sync_view)
+        return view
+
+    def dispatch(self, request, *args, **kwargs):
+        if route_is_async(type(self), getattr(self, "action_map", None)):
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await database_sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                # OPTIONS and 405s stay sync; metadata can touch the database.
+                response = await database_sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            # The exception handler rolls back the request's connections.
+            response = await sync_to_async(self.handle_exception)(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,96 @@
+# backend/accounts/caching.py
+"""
+Two-tier read-through cache for hot reference data.
+
+Values are looked up in the per-process ``default`` (local memory) cache,
+then in the ``shared`` cache that every gunicorn worker sees (file or
+database backed), and only then loaded from the source. Keys live in
+namespaces with a version number kept in the shared cache; invalidating a
+namespace bumps its version, so stale entries in every tier simply stop
+matching. Other processes notice a bump within CACHE_LOCAL_TIMEOUT seconds.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def local_cache():
+    return caches["default"]
+
+
+def shared_cache():
+    try:
+        return caches["shared"]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def _local_timeout():
+    return int(getattr(settings, "CACHE_LOCAL_TIMEOUT", 30))
+
+
+def _version_key(namespace):
+    return f"ns-version:{namespace}"
+
+
+def namespace_version(namespace):
+    key = _version_key(namespace)
+    version = local_cache().get(key)
+    if version is None:
+        try:
+            version = shared_cache().get(key)
+            if version is None:
+                version = 1
+                shared_cache().add(key, version, timeout=None)
+        except Exception:
+            logger.warning("Shared cache version read failed namespace=%s", namespace, exc_info=True)
+            version = 1
+        local_cache().set(key, version, timeout=_local_timeout())
+    return version
+
+
+def invalidate_namespace(namespace):
+    """Orphan every key in ``namespace`` across all processes."""
+    key = _version_key(namespace)
+    shared = shared_cache()
+    try:
+        version = shared.incr(key)
+    except ValueError:
+        version = 2
+        shared.set(key, version, timeout=None)
+    local_cache().set(key, version, timeout=_local_timeout())
+    return version
+
+
+def cached(namespace, key, loader, *, timeout=None):
+    """Return ``loader()`` through the local and shared tiers."""
+    timeout = int(getattr(settings, "CACHE_DEFAULT_TIMEOUT", 300)) if timeout is None else timeout
+    version = namespace_version(namespace)
+    full_key = f"{namespace}:{key}"
+
+    value = local_cache().get(full_key, _MISSING, version=version)
+    if value is not _MISSING:
+        return value
+
+    # A full disk or missing cache table should never fail the request.
+    try:
+        value = shared_cache().get(full_key, _MISSING, version=version)
+    except Exception:
+        logger.warning("Shared cache read failed key=%s", full_key, exc_info=True)
+        value = _MISSING
+    if value is _MISSING:
+        value = loader()
+        try:
+            shared_cache().set(full_key, value, timeout=timeout, version=version)
+        except Exception:
+            logger.warning("Shared cache write failed key=%s", full_key, exc_info=True)
+
+    local_timeout = min(timeout, _local_timeout()) if timeout else _local_timeout()
+    local_cache().set(full_key, value, timeout=local_timeout, version=version)
+    return value
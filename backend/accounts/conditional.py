@@ -0,0 +1,57 @@
+# backend/accounts/conditional.py
+"""
+Conditional GET (ETag / Last-Modified) for detail resources.
+
+Views derive validators from cheap change markers instead of the rendered
+body: the row's ``updated_at`` plus markers for the related rows the
+serializer renders (newest id and count of images, invites, messages ...)
+and the viewer, since most payloads carry per-user flags. ``not_modified``
+runs before serialization and returns the 304; ``set_validators`` stamps
+the full response. The weak ETag is authoritative; Last-Modified is the
+newest timestamp among the markers and only helps clients that lack an ETag.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+# Bump when a serializer changes shape so clients refetch after a deploy.
+ETAG_VERSION = 1
+
+
+def weak_etag(*markers):
+    digest = hashlib.sha256(repr((ETAG_VERSION, *markers)).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def latest_timestamp(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def viewer_marker(request):
+    user = getattr(request, "user", None)
+    return user.pk if getattr(user, "is_authenticated", False) else None
+
+
+def not_modified(request, etag, last_modified=None):
+    """Return a 304 (or 412) when the request's preconditions say so, else None."""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    # The body depends on who is asking; make shared caches stay out of it and
+    # browsers revalidate on every use.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Authorization",))
+    return response
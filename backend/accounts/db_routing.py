@@ -0,0 +1,138 @@
+# backend/accounts/db_routing.py
+"""
+Optional read replica (DATABASE_REPLICA_URL) for GET-heavy public views.
+
+Reads go to the replica only when all of these hold:
+
+- a "replica" database is configured;
+- the request is a GET/HEAD/OPTIONS;
+- the view sets ``read_from_replica = True`` (viewsets may list action
+  names instead, e.g. ``{"list", "retrieve"}``);
+- the client has not written within DATABASE_REPLICA_STICKY_SECONDS.
+  ``ReplicaRoutingMiddleware`` sets a short-lived cookie after every
+  request that wrote.
+
+Everything else reads from the primary. That includes code running in a
+transaction, requests that already wrote, and work outside a request
+(commands, background threads). Writes always go to the primary.
+
+Routing state lives in a context variable, so worker threads and async
+tasks started by a request don't inherit a replica decision.
+"""
+import contextvars
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = "replica"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Django's database cache backend; cache fills must not count as user writes.
+UNROUTED_APP_LABELS = {"django_cache"}
+
+_current = contextvars.ContextVar("db_routing", default=None)
+
+
+class RoutingState:
+    __slots__ = ("replica_allowed", "wrote")
+
+    def __init__(self):
+        self.replica_allowed = False
+        self.wrote = False
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def sticky_seconds():
+    return float(getattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 10))
+
+
+def pin_cookie_name():
+    return getattr(settings, "DATABASE_REPLICA_PIN_COOKIE", "db_primary_until")
+
+
+def pinned_to_primary(request):
+    """True while the client's last write is younger than the sticky window."""
+    try:
+        return float(request.COOKIES.get(pin_cookie_name(), 0)) > time.time()
+    except (TypeError, ValueError):
+        return False
+
+
+def view_reads_from_replica(view_func, method):
+    view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+    opted_in = getattr(view_class or view_func, "read_from_replica", False)
+    if isinstance(opted_in, (set, frozenset, list, tuple)):
+        actions = getattr(view_func, "actions", None) or {}
+        return (actions.get(method.lower()) or actions.get("get")) in opted_in
+    return bool(opted_in)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if (
+            state is None
+            or not state.replica_allowed
+            or state.wrote
+            or model._meta.app_label in UNROUTED_APP_LABELS
+            or not replica_configured()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None and model._meta.app_label not in UNROUTED_APP_LABELS:
+            # Anything read later in this request must see the write.
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica follows the primary's schema through replication.
+        if db == REPLICA_ALIAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState()
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        if state.wrote and replica_configured():
+            window = sticky_seconds()
+            response.set_cookie(
+                pin_cookie_name(),
+                f"{time.time() + window:.3f}",
+                max_age=max(int(window), 1),
+                httponly=True,
+                samesite="Lax",
+                secure=request.is_secure(),
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _current.get()
+        if state is not None:
+            state.replica_allowed = (
+                request.method in SAFE_METHODS
+                and replica_configured()
+                and view_reads_from_replica(view_func, request.method)
+                and not pinned_to_primary(request)
+            )
+        return None
@@ -4,6 +4,11 @@ from dataclasses import dataclass
 from urllib.parse import urlencode
 from urllib.request import urlopen
 
+import httpx
+
+from . import metrics
+from .profiling import external_call
+
 
 @dataclass(frozen=True)
 class GeocodeResult:
@@ -25,7 +30,7 @@ def get_google_maps_server_key():
     ).strip()
 
 
-def geocode_with_google_maps(query, *, api_key=None, timeout=10):
+def _geocode_url(query, api_key):
     query = (query or "").strip()
     if not query:
         raise GeocodingError("Location query is required.")
@@ -34,12 +39,35 @@ def geocode_with_google_maps(query, *, api_key=None, timeout=10):
     if not key:
         raise GeocodingError("GOOGLE_MAPS_API_KEY is not configured.")
 
-    url = "https://maps.googleapis.com/maps/api/geocode/json?" + urlencode(
-        {"address": query, "key": key}
-    )
-    with urlopen(url, timeout=timeout) as response:
-        payload = json.loads(response.read().decode("utf-8"))
+    base_url = os.environ.get("GOOGLE_MAPS_GEOCODE_URL") or "https://maps.googleapis.com/maps/api/geocode/json"
+    return f"{base_url}?" + urlencode({"address": query, "key": key})
+
+
+@external_call("geocoding")
+def geocode_with_google_maps(query, *, api_key=None, timeout=10):
+    url = _geocode_url(query, api_key)
+    with metrics.GEOCODING_SECONDS.time(outcome="error") as labels:
+        with urlopen(url, timeout=timeout) as response:
+            payload = json.loads(response.read().decode("utf-8"))
+        labels["outcome"] = str(payload.get("status") or "unknown").lower()
+    return _geocode_result(payload)
+
+
+async def ageocode_with_google_maps(query, *, api_key=None, timeout=10):
+    """geocode_with_google_maps() for async views; the lookup doesn't hold a thread."""
+    url = _geocode_url(query, api_key)
+    with external_call("geocoding"), metrics.GEOCODING_SECONDS.time(outcome="error") as labels:
+        try:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.get(url)
+            payload = response.json()
+        except (httpx.HTTPError, ValueError) as exc:
+            raise GeocodingError(f"Geocoding request failed: {exc}") from exc
+        labels["outcome"] = str(payload.get("status") or "unknown").lower()
+    return _geocode_result(payload)
+
 
+def _geocode_result(payload):
     status = payload.get("status")
     if status != "OK":
         message = payload.get("error_message") or status or "Unknown geocoding error"
@@ -0,0 +1,64 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+
+from portfolio.benchmarking import summarize
+
+
+class Command(BaseCommand):
+    help = (
+        "Time connection setup per request: a fresh connection every time versus the configured "
+        "persistent/pooled lifecycle. Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Database alias to benchmark.")
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        if alias not in connections:
+            raise CommandError(f"Unknown database alias {alias!r}.")
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        connection = connections[alias]
+
+        fresh = []
+        for _ in range(options["iterations"]):
+            started = time.perf_counter()
+            raw = connection.Database.connect(**connection.get_connection_params())
+            cursor = raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            raw.close()
+            fresh.append((time.perf_counter() - started) * 1000)
+
+        # What a request pays: Django's request_started/request_finished
+        # handlers close connections past CONN_MAX_AGE (or hand them back to
+        # the pool), then the first query connects or reuses one.
+        cycle = []
+        for _ in range(options["iterations"]):
+            started = time.perf_counter()
+            close_old_connections()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            close_old_connections()
+            cycle.append((time.perf_counter() - started) * 1000)
+
+        report = {
+            "database": alias,
+            "engine": connection.settings_dict["ENGINE"],
+            "pooled": bool(connection.settings_dict.get("POOL")),
+            "conn_max_age": connection.settings_dict.get("CONN_MAX_AGE"),
+            "conn_health_checks": connection.settings_dict.get("CONN_HEALTH_CHECKS"),
+            "iterations": options["iterations"],
+            "fresh_connection_ms": summarize(fresh),
+            "request_cycle_ms": summarize(cycle),
+        }
+        if report["pooled"]:
+            from backend.pooled_postgresql.base import pool_stats
+
+            report["pool"] = pool_stats().get(alias)
+        self.stdout.write(json.dumps(report, indent=2))
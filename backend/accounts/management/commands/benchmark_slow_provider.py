@@ -0,0 +1,269 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from portfolio.benchmarking import summarize
+
+# (name, gunicorn worker class, application). The same flags start.sh uses
+# for SERVER_MODE=wsgi and SERVER_MODE=asgi.
+MODES = (
+    ("wsgi", "sync", "backend.wsgi:application"),
+    ("asgi", "uvicorn_worker.UvicornWorker", "backend.asgi:application"),
+)
+BENCH_USERNAME = "bench-slow-provider"
+
+
+class SlowProvider:
+    """
+    Local stand-in for the OpenAI Responses API and the Google geocoder.
+
+    Every request sleeps ``delay`` seconds before answering, like a provider
+    under load; the server is threaded so the sleeps overlap.
+    """
+
+    def __init__(self, delay):
+        delay_s = delay
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(delay_s)
+                self._send(
+                    {
+                        "status": "OK",
+                        "results": [
+                            {
+                                "formatted_address": "Austin, TX, USA",
+                                "geometry": {"location": {"lat": 30.2672, "lng": -97.7431}},
+                                "address_components": [{"types": ["country"], "short_name": "US"}],
+                            }
+                        ],
+                    }
+                )
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                time.sleep(delay_s)
+                self._send({"model": "slow-provider", "output_text": "Benchmark reply.", "usage": {}})
+
+            def _send(self, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, process, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"gunicorn exited with status {process.returncode} before accepting requests.")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError(f"gunicorn did not start listening on port {port} within {timeout}s.")
+
+
+async def _fire(base_url, build_request, total, concurrency, timeout):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = Counter()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+
+        async def one(index):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(**build_request(index))
+                    statuses[str(response.status_code)] += 1
+                except httpx.HTTPError as exc:
+                    statuses[type(exc).__name__] += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(total)))
+        seconds = time.perf_counter() - started
+    return seconds, latencies, statuses
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure throughput of provider-bound endpoints under sync (WSGI) and uvicorn (ASGI) "
+        "gunicorn workers while a local fake provider answers slowly. Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoint",
+            choices=("directory", "ai-assist"),
+            default="directory",
+            help="directory: geocoded business directory search; ai-assist: POST /api/ai/assist/.",
+        )
+        parser.add_argument("--mode", choices=[name for name, _, _ in MODES], action="append")
+        parser.add_argument("--workers", type=int, default=2, help="gunicorn workers per server.")
+        parser.add_argument("--requests", type=int, default=40)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--provider-delay", type=float, default=1.0, help="Seconds the fake provider sleeps.")
+        parser.add_argument("--startup-timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        for name in ("workers", "requests", "concurrency"):
+            if options[name] < 1:
+                raise CommandError(f"--{name} must be at least 1.")
+        if options["provider_delay"] < 0:
+            raise CommandError("--provider-delay must not be negative.")
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            raise CommandError("The servers need a shared database; set USE_SQLITE with SQLITE_PATH or use Postgres.")
+
+        # httpx logs every request at INFO.
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        modes = [mode for mode in MODES if not options["mode"] or mode[0] in options["mode"]]
+        headers = {}
+        user = None
+        if options["endpoint"] == "ai-assist":
+            user = self._bench_user()
+            from portfolio.benchmarking import _access_token
+
+            headers["Authorization"] = f"Bearer {_access_token(user)}"
+
+        def build_request(index):
+            # Unique inputs so neither the response cache nor the AI cache answers.
+            if options["endpoint"] == "directory":
+                return {
+                    "method": "GET",
+                    "url": "/api/business-directory/",
+                    "params": {"origin_location": f"Benchmark {index}"},
+                    "headers": headers,
+                }
+            return {
+                "method": "POST",
+                "url": "/api/ai/assist/",
+                "json": {"feature": "project_summary", "notes": f"Benchmark request {index}."},
+                "headers": headers,
+            }
+
+        # Worst case for sync workers: every request queues behind a provider wait.
+        request_timeout = 30 + options["provider_delay"] * options["requests"]
+        report = {
+            "endpoint": options["endpoint"],
+            "workers": options["workers"],
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "provider_delay_s": options["provider_delay"],
+            "modes": {},
+        }
+        try:
+            with SlowProvider(options["provider_delay"]) as provider:
+                for name, worker_class, application in modes:
+                    port = _free_port()
+                    process = self._start_server(worker_class, application, port, provider.url, options)
+                    try:
+                        _wait_for_port(port, process, options["startup_timeout"])
+                        base_url = f"http://127.0.0.1:{port}"
+                        # Warm-up: imports and first connections aren't what's being measured.
+                        asyncio.run(_fire(base_url, build_request, options["workers"], options["workers"], request_timeout))
+                        seconds, latencies, statuses = asyncio.run(
+                            _fire(base_url, build_request, options["requests"], options["concurrency"], request_timeout)
+                        )
+                    finally:
+                        process.terminate()
+                        try:
+                            process.wait(timeout=10)
+                        except subprocess.TimeoutExpired:
+                            process.kill()
+                            process.wait()
+                    if statuses.get("403"):
+                        raise CommandError("The AI helper answered 403; check the AI configuration for project_summary.")
+                    report["modes"][name] = {
+                        "seconds": round(seconds, 3),
+                        "requests_per_second": round(options["requests"] / seconds, 2) if seconds else None,
+                        "latency_ms": summarize(latencies),
+                        "statuses": dict(sorted(statuses.items())),
+                    }
+        finally:
+            if user is not None:
+                user.delete()
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def _bench_user(self):
+        from django.contrib.auth import get_user_model
+
+        from accounts.models import Profile
+
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(username=BENCH_USERNAME, defaults={"email": "bench@example.com"})
+        profile, _ = Profile.objects.get_or_create(user=user)
+        profile.ai_daily_limit_override = 1_000_000
+        profile.save(update_fields=["ai_daily_limit_override"])
+        return user
+
+    def _start_server(self, worker_class, application, port, provider_url, options):
+        env = dict(os.environ)
+        env.update(
+            {
+                "OPENAI_API_BASE_URL": f"{provider_url}/v1",
+                "OPENAI_API_KEY": "benchmark",
+                "OPENAI_MAX_RETRIES": "0",
+                "OPENAI_READ_TIMEOUT": str(options["provider_delay"] + 30),
+                "GOOGLE_MAPS_API_KEY": "benchmark",
+                "GOOGLE_MAPS_GEOCODE_URL": f"{provider_url}/geocode",
+                "AI_ENABLED": "1",
+                "RESPONSE_CACHE_ENABLED": "0",
+            }
+        )
+        if env.get("DJANGO_ALLOWED_HOSTS"):
+            env["DJANGO_ALLOWED_HOSTS"] += ",127.0.0.1"
+        command = [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            application,
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(options["workers"]),
+            "--worker-class",
+            worker_class,
+            "--timeout",
+            str(int(options["provider_delay"] * options["requests"]) + 60),
+        ]
+        output = None if options["verbosity"] > 1 else subprocess.DEVNULL
+        return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env, stdout=output, stderr=output)
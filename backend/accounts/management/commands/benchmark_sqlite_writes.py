@@ -0,0 +1,121 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.tuned_sqlite.base import begin_statement, pragma_statements
+
+# (name, pragmas, transaction mode). "default" is what Django's stock
+# sqlite3 backend does: rollback journal, FULL sync, deferred transactions.
+MODES = (
+    ("default", {}, "DEFERRED"),
+    ("tuned", None, "DEFERRED"),
+    ("tuned_serialized", None, "IMMEDIATE"),
+)
+
+
+def _writer(path, pragmas, transaction_mode, transactions, busy_timeout_s, start, results):
+    # isolation_level=None: transactions are started explicitly, as Django does.
+    conn = sqlite3.connect(path, timeout=busy_timeout_s, isolation_level=None)
+    for statement in pragma_statements(pragmas):
+        conn.execute(statement)
+    committed = locked = 0
+    start.wait()
+    for i in range(transactions):
+        try:
+            # The shape of a like/favorite toggle or a message send: read, then write.
+            conn.execute(begin_statement(transaction_mode))
+            conn.execute("SELECT COUNT(*) FROM bench_likes WHERE item_id = ?", (i % 50,)).fetchone()
+            conn.execute("INSERT INTO bench_likes (item_id, worker) VALUES (?, ?)", (i % 50, os.getpid()))
+            conn.execute("COMMIT")
+            committed += 1
+        except sqlite3.OperationalError as exc:
+            if "locked" not in str(exc) and "busy" not in str(exc):
+                raise
+            locked += 1
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+    conn.close()
+    results.put((committed, locked))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent write throughput of stock SQLite settings against the tuned pragmas "
+        "(and BEGIN IMMEDIATE serialization) using separate writer processes. Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=4, help="Concurrent writer processes (like workers).")
+        parser.add_argument("--transactions", type=int, default=200, help="Write transactions per writer.")
+        parser.add_argument(
+            "--mode",
+            action="append",
+            default=[],
+            help=f"Mode to run; repeatable. One of: {', '.join(name for name, _, _ in MODES)}.",
+        )
+
+    def handle(self, *args, **options):
+        if options["writers"] < 1 or options["transactions"] < 1:
+            raise CommandError("--writers and --transactions must be at least 1.")
+        unknown = set(options["mode"]) - {name for name, _, _ in MODES}
+        if unknown:
+            raise CommandError(f"Unknown mode(s): {', '.join(sorted(unknown))}.")
+
+        tuned_pragmas = dict(getattr(settings, "SQLITE_PRAGMAS", {}))
+        busy_timeout_s = int(tuned_pragmas.get("busy_timeout") or 5000) / 1000
+        context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+        report = {"writers": options["writers"], "transactions_per_writer": options["transactions"], "modes": []}
+
+        for name, pragmas, transaction_mode in MODES:
+            if options["mode"] and name not in options["mode"]:
+                continue
+            pragmas = tuned_pragmas if pragmas is None else pragmas
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "bench.sqlite3")
+                setup = sqlite3.connect(path)
+                for statement in pragma_statements(pragmas):
+                    setup.execute(statement)
+                setup.execute(
+                    "CREATE TABLE bench_likes (id INTEGER PRIMARY KEY, item_id INTEGER NOT NULL, worker INTEGER)"
+                )
+                setup.execute("CREATE INDEX bench_likes_item ON bench_likes (item_id)")
+                setup.commit()
+                setup.close()
+
+                start = context.Event()
+                results = context.Queue()
+                workers = [
+                    context.Process(
+                        target=_writer,
+                        args=(path, pragmas, transaction_mode, options["transactions"], busy_timeout_s, start, results),
+                    )
+                    for _ in range(options["writers"])
+                ]
+                for worker in workers:
+                    worker.start()
+                started = time.perf_counter()
+                start.set()
+                outcomes = [results.get() for _ in workers]
+                elapsed = time.perf_counter() - started
+                for worker in workers:
+                    worker.join()
+
+            committed = sum(outcome[0] for outcome in outcomes)
+            report["modes"].append(
+                {
+                    "mode": name,
+                    "pragmas": pragmas,
+                    "transaction_mode": transaction_mode,
+                    "committed": committed,
+                    "locked_errors": sum(outcome[1] for outcome in outcomes),
+                    "seconds": round(elapsed, 3),
+                    "commits_per_second": round(committed / elapsed, 1) if elapsed else None,
+                }
+            )
+        self.stdout.write(json.dumps(report, indent=2))
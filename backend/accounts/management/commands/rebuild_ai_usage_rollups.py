@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from accounts.models import AIUsageEvent, AIUsageMonthlyRollup, aggregate_ai_usage_monthly_rollups
+
+
+def lock_rollup_table():
+    """
+    Block rollup increments until the current transaction ends.
+
+    record_ai_usage_event inserts the event and bumps its rollup in one
+    transaction, so once the rollup table is locked every event visible to
+    the aggregate has either been counted by us or is still waiting to bump
+    the freshly written rows. On SQLite the DELETE that follows starts the
+    write transaction, which serializes with event writers the same way.
+    """
+    if connection.vendor == "postgresql":
+        table = connection.ops.quote_name(AIUsageMonthlyRollup._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly AI usage rollup table from AIUsageEvent rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--month",
+            dest="months",
+            action="append",
+            default=[],
+            help="Only rebuild a month in YYYY-MM format. Can be passed multiple times.",
+        )
+
+    def handle(self, *args, **options):
+        months = []
+        for value in options["months"]:
+            try:
+                months.append(datetime.strptime(value, "%Y-%m").date())
+            except ValueError as exc:
+                raise CommandError(f"Invalid --month {value!r}; expected YYYY-MM.") from exc
+
+        events = AIUsageEvent.objects.all()
+        rollups = AIUsageMonthlyRollup.objects.all()
+        if months:
+            month_q = Q()
+            for month in months:
+                month_q |= Q(request_day__year=month.year, request_day__month=month.month)
+            events = events.filter(month_q)
+            rollups = rollups.filter(month__in=months)
+
+        # Aggregate inside the transaction, after concurrent event writers are
+        # shut out; an event recorded between the aggregate and the delete
+        # would otherwise be missing from the rebuilt rows.
+        with transaction.atomic():
+            lock_rollup_table()
+            deleted, _ = rollups.delete()
+            rows = aggregate_ai_usage_monthly_rollups(events, AIUsageMonthlyRollup)
+            AIUsageMonthlyRollup.objects.bulk_create(rows, batch_size=500)
+
+        scope = ", ".join(month.strftime("%Y-%m") for month in months) if months else "all months"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt AI usage rollups for {scope}: {len(rows)} rows written, {deleted} replaced."
+            )
+        )
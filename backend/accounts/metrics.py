@@ -0,0 +1,367 @@
+# backend/accounts/metrics.py
+"""
+In-process metrics (counters, gauges, histograms) in Prometheus text format.
+
+Each gunicorn worker keeps its own values in memory and writes a snapshot to
+``METRICS_DIR/metrics-<pid>.json`` at most every METRICS_FLUSH_SECONDS (and
+at exit). The ``/metrics`` endpoint flushes the serving worker, then merges
+every snapshot: counters and histograms are summed across all files so
+totals survive worker restarts, while gauges are summed over live workers
+only. Values that are cheaper to read at scrape time than to track (rows
+stuck in processing, queue depths) come from collectors registered with
+``register_collector``.
+
+start.sh clears METRICS_DIR on boot, as with any multiprocess exporter;
+counters then restart from zero, which Prometheus treats as a reset.
+"""
+import atexit
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics_enabled():
+    return bool(getattr(settings, "METRICS_ENABLED", True))
+
+
+def metrics_dir():
+    return getattr(settings, "METRICS_DIR", "") or os.path.join(tempfile.gettempdir(), "portfolio-metrics")
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def describe(self):
+        return {"type": self.type, "help": self.documentation, "labelnames": list(self.labelnames)}
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        self.registry.update(self, self._key(labels), lambda value: (value or 0) + amount)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        self.registry.update(self, self._key(labels), lambda _value: value)
+
+    def inc(self, amount=1, **labels):
+        self.registry.update(self, self._key(labels), lambda value: (value or 0) + amount)
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def describe(self):
+        return {**super().describe(), "buckets": list(self.buckets)}
+
+    def observe(self, value, **labels):
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+
+        def add(current):
+            # Per-bucket (non-cumulative) counts, then sum and count.
+            current = list(current or [0] * (len(self.buckets) + 3))
+            current[index] += 1
+            current[-2] += value
+            current[-1] += 1
+            return current
+
+        self.registry.update(self, self._key(labels), add)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the block's duration; ``labels`` may be filled in inside the block."""
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._dirty = False
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector):
+        """``collector()`` returns ``[(name, type, help, [(labels_dict, value), ...]), ...]``."""
+        if collector not in self.collectors:
+            self.collectors.append(collector)
+        return collector
+
+    def update(self, metric, key, change):
+        if not metrics_enabled():
+            return
+        with self._lock:
+            metric.values[key] = change(metric.values.get(key))
+            self._dirty = True
+        interval = float(getattr(settings, "METRICS_FLUSH_SECONDS", 5))
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {**metric.describe(), "samples": [[list(key), value] for key, value in metric.values.items()]}
+                for name, metric in self.metrics.items()
+            }
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._last_flush = time.monotonic()
+        directory = metrics_dir()
+        path = os.path.join(directory, f"metrics-{os.getpid()}.json")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump({"pid": os.getpid(), "metrics": self.snapshot()}, handle)
+            os.replace(temp_path, path)
+        except OSError:
+            self._dirty = True
+            logger.warning("Could not write metrics snapshot path=%s", path, exc_info=True)
+
+    def reset(self):
+        with self._lock:
+            for metric in self.metrics.values():
+                metric.values.clear()
+            self._dirty = True
+
+    def render(self):
+        """Merge every worker's snapshot and return the text exposition."""
+        self.flush()
+        merged = {}
+        own_pid = os.getpid()
+        for pid, metrics in _read_snapshots(metrics_dir()):
+            live = pid == own_pid or _pid_alive(pid)
+            for name, data in metrics.items():
+                if data["type"] == "gauge" and not live:
+                    continue
+                target = merged.setdefault(name, {**data, "samples": {}})
+                for labels, value in data["samples"]:
+                    key = tuple(labels)
+                    current = target["samples"].get(key)
+                    if isinstance(value, list):
+                        target["samples"][key] = [a + b for a, b in zip(current, value)] if current else list(value)
+                    else:
+                        target["samples"][key] = (current or 0) + value
+        # Metrics with no samples yet are still described so dashboards see them.
+        for name, metric in self.metrics.items():
+            merged.setdefault(name, {**metric.describe(), "samples": {}})
+
+        lines = []
+        for name in sorted(merged):
+            lines.extend(_render_metric(name, merged[name]))
+        for collector in self.collectors:
+            try:
+                collected = collector()
+            except Exception:
+                logger.warning("Metrics collector failed collector=%s", collector, exc_info=True)
+                continue
+            for name, metric_type, documentation, samples in collected:
+                lines.append(f"# HELP {name} {_escape_help(documentation)}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _read_snapshots(directory):
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    except FileNotFoundError:
+        return
+    for name in names:
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            logger.warning("Skipping unreadable metrics snapshot name=%s", name)
+            continue
+        yield int(data.get("pid") or 0), data.get("metrics") or {}
+
+
+def _pid_alive(pid):
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape_help(text):
+    return str(text).replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def _render_metric(name, data):
+    lines = [f"# HELP {name} {_escape_help(data['help'])}", f"# TYPE {name} {data['type']}"]
+    labelnames = data["labelnames"]
+    for key in sorted(data["samples"]):
+        labels = dict(zip(labelnames, key))
+        value = data["samples"][key]
+        if data["type"] != "histogram":
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            continue
+        cumulative = 0
+        for bound, count in zip([*data["buckets"], float("inf")], value[:-2]):
+            cumulative += count
+            bucket_labels = {**labels, "le": "+Inf" if math.isinf(bound) else _format_value(float(bound))}
+            lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(float(value[-2]))}")
+        lines.append(f"{name}_count{_format_labels(labels)} {value[-1]}")
+    return lines
+
+
+registry = Registry()
+counter = registry.counter
+gauge = registry.gauge
+histogram = registry.histogram
+register_collector = registry.register_collector
+atexit.register(registry.flush)
+
+
+# Shared instruments. Apps import these rather than defining their own names.
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds",
+    "Request wall time by route, method and status class.",
+    ("route", "method", "status"),
+)
+AI_PROVIDER_SECONDS = histogram(
+    "ai_provider_request_duration_seconds",
+    "AI provider round trips (including retries) by endpoint and outcome.",
+    ("endpoint", "outcome"),
+)
+GEOCODING_SECONDS = histogram(
+    "geocoding_request_duration_seconds",
+    "Google geocoding calls by outcome.",
+    ("outcome",),
+)
+EMAIL_MESSAGES = counter(
+    "email_messages_total",
+    "Outgoing email messages by outcome.",
+    ("outcome",),
+)
+UPLOADS = counter(
+    "media_uploads_total",
+    "Project media uploads by path (multipart, direct, chunked) and outcome.",
+    ("path", "outcome"),
+)
+UPLOAD_BYTES = counter(
+    "media_upload_bytes_total",
+    "Bytes received for project media uploads by path.",
+    ("path",),
+)
+IMAGE_CONVERSION_SECONDS = histogram(
+    "image_conversion_duration_seconds",
+    "WEBP conversion time by outcome.",
+    ("outcome",),
+)
+VIDEO_PROCESSING_SECONDS = histogram(
+    "video_processing_duration_seconds",
+    "ffmpeg transcode time by outcome.",
+    ("outcome",),
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 900, 1800),
+)
+VIDEO_JOBS_IN_FLIGHT = gauge(
+    "video_jobs_in_flight",
+    "Video jobs queued or running on this worker's pool.",
+)
+MESSAGES_SENT = counter(
+    "private_messages_sent_total",
+    "Private messages sent, by whether they carried attachments.",
+    ("with_attachments",),
+)
+BID_EVENTS = counter(
+    "bid_events_total",
+    "Bid submissions and status changes.",
+    ("event",),
+)
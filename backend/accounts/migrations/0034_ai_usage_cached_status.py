@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0033_ai_usage_cost_tracking'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aiusageevent',
+            name='status',
+            field=models.CharField(choices=[('success', 'Success'), ('rejected', 'Rejected'), ('error', 'Error'), ('cached', 'Cached')], default='success', max_length=20),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0034_ai_usage_cached_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIDailyUsageCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('success_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='aiusageevent',
+            index=models.Index(fields=['user', 'request_day', 'status'], name='ai_usage_user_day_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='aidailyusagecounter',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ai_daily_usage_counters', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='aidailyusagecounter',
+            constraint=models.UniqueConstraint(fields=('user', 'day'), name='unique_ai_daily_usage_counter'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:43
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_monthly_rollups(apps, schema_editor):
+    # A frozen copy of accounts.models.aggregate_ai_usage_monthly_rollups as of
+    # this migration, so later model changes can't break it.
+    AIUsageEvent = apps.get_model("accounts", "AIUsageEvent")
+    AIUsageMonthlyRollup = apps.get_model("accounts", "AIUsageMonthlyRollup")
+    success = Q(status="success")
+    rows = (
+        AIUsageEvent.objects.annotate(rollup_month=TruncMonth("request_day"))
+        .values("user_id", "rollup_month", "feature", "model_name")
+        .annotate(
+            n_success=Count("id", filter=success),
+            n_cached=Count("id", filter=Q(status="cached")),
+            n_error=Count("id", filter=Q(status="error")),
+            sum_input=Sum("input_tokens", filter=success, default=0),
+            sum_output=Sum("output_tokens", filter=success, default=0),
+            sum_provider=Sum("provider_cost_usd", filter=success, default=Decimal("0")),
+            sum_charge=Sum("user_charge_usd", filter=success, default=Decimal("0")),
+        )
+        .order_by()
+    )
+    AIUsageMonthlyRollup.objects.bulk_create(
+        [
+            AIUsageMonthlyRollup(
+                user_id=row["user_id"],
+                month=row["rollup_month"],
+                feature=row["feature"],
+                model_name=row["model_name"],
+                success_count=row["n_success"],
+                cached_count=row["n_cached"],
+                error_count=row["n_error"],
+                input_tokens=row["sum_input"],
+                output_tokens=row["sum_output"],
+                provider_cost_usd=row["sum_provider"],
+                user_charge_usd=row["sum_charge"],
+            )
+            for row in rows
+            if row["n_success"] or row["n_cached"] or row["n_error"]
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0035_ai_daily_usage_counter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIUsageMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the calendar month.')),
+                ('feature', models.CharField(choices=[('project_summary', 'Project summary'), ('project_checklist', 'Project checklist'), ('bid_proposal', 'Bid proposal'), ('profile_headline', 'Profile headline'), ('profile_blurb', 'Profile blurb'), ('profile_bio', 'Profile bio'), ('planner_analyze', 'Planner issue analysis'), ('planner_options', 'Planner solution paths'), ('planner_draft', 'Planner draft generation')], max_length=40)),
+                ('model_name', models.CharField(blank=True, default='', max_length=64)),
+                ('success_count', models.PositiveIntegerField(default=0)),
+                ('cached_count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('input_tokens', models.PositiveBigIntegerField(default=0)),
+                ('output_tokens', models.PositiveBigIntegerField(default=0)),
+                ('provider_cost_usd', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=14)),
+                ('user_charge_usd', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ai_usage_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-month', 'user_id', 'feature', 'model_name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='aiusagemonthlyrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'month', 'feature', 'model_name'), name='unique_ai_usage_monthly_rollup'),
+        ),
+        migrations.RunPython(backfill_monthly_rollups, migrations.RunPython.noop),
+    ]
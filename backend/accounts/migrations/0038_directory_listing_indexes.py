@@ -0,0 +1,21 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0037_profile_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='businessdirectorylisting',
+            index=models.Index(fields=['is_published', 'is_removed', 'country_code'], name='directory_visible_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessdirectorylisting',
+            index=models.Index(condition=models.Q(('is_published', True), ('is_removed', False)), fields=['business_name', 'id'], name='directory_visible_name_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:34
+
+import accounts.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0038_directory_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='homeownerreferenceimage',
+            name='image',
+            field=models.ImageField(db_index=True, upload_to=accounts.models.homeowner_reference_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='avatar',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to=accounts.models.logo_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='banner',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to=accounts.models.logo_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='logo',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to=accounts.models.logo_upload_path),
+        ),
+    ]
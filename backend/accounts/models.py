@@ -1,13 +1,17 @@
 # backend/accounts/models.py
 from decimal import Decimal, ROUND_HALF_UP
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 
+from .caching import cached
+
 
 User = get_user_model()
 
@@ -67,12 +71,12 @@ class Profile(models.Model):
     email_verified_at = models.DateTimeField(null=True, blank=True)
     
     # Media
-    logo = models.ImageField(upload_to=logo_upload_path, blank=True, null=True)
+    logo = models.ImageField(upload_to=logo_upload_path, blank=True, null=True, db_index=True)
 
     # Back-compat with old name if needed
-    avatar = models.ImageField(upload_to=logo_upload_path, blank=True, null=True)
+    avatar = models.ImageField(upload_to=logo_upload_path, blank=True, null=True, db_index=True)
 
-    banner = models.ImageField(upload_to=logo_upload_path, blank=True, null=True)
+    banner = models.ImageField(upload_to=logo_upload_path, blank=True, null=True, db_index=True)
 
     # Hero copy (public profile)
     hero_headline = models.CharField(max_length=120, blank=True, default="")
@@ -128,6 +132,7 @@ class Profile(models.Model):
     contractor_onboarding_dismissed_at = models.DateTimeField(null=True, blank=True)
     homeowner_onboarding_completed_at = models.DateTimeField(null=True, blank=True)
     homeowner_onboarding_dismissed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     @property
     def is_profile_complete(self):
@@ -247,6 +252,10 @@ class Profile(models.Model):
             self.verification_notes = ""
         elif self.has_verification_submission and not self.verification_submitted_at:
             self.verification_submitted_at = timezone.now()
+        # updated_at backs the public profile ETag, so partial saves bump it too.
+        update_fields = kwargs.get("update_fields")
+        if update_fields:
+            kwargs["update_fields"] = {*update_fields, "updated_at"}
         super().save(*args, **kwargs)
 
     def __str__(self) -> str:
@@ -312,7 +321,7 @@ class HomeownerReferenceImage(models.Model):
         on_delete=models.CASCADE,
         related_name="homeowner_reference_images",
     )
-    image = models.ImageField(upload_to=homeowner_reference_upload_path)
+    image = models.ImageField(upload_to=homeowner_reference_upload_path, db_index=True)
     caption = models.CharField(max_length=160, blank=True, default="")
     created_at = models.DateTimeField(default=timezone.now)
     order = models.PositiveIntegerField(default=0)
@@ -356,10 +365,16 @@ class AIConfiguration(models.Model):
         verbose_name = "AI configuration"
         verbose_name_plural = "AI configuration"
 
+    CACHE_NAMESPACE = "ai-configuration"
+
     @classmethod
     def get_solo(cls):
-        obj, _ = cls.objects.get_or_create(pk=1)
-        return obj
+        def load():
+            obj, _ = cls.objects.get_or_create(pk=1)
+            return obj
+
+        # Invalidated by the post_save/post_delete receivers in accounts.apps.
+        return cached(cls.CACHE_NAMESPACE, "solo", load)
 
     def save(self, *args, **kwargs):
         self.pk = 1
@@ -385,6 +400,7 @@ class AIUsageEvent(models.Model):
         SUCCESS = "success", "Success"
         REJECTED = "rejected", "Rejected"
         ERROR = "error", "Error"
+        CACHED = "cached", "Cached"
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -405,11 +421,76 @@ class AIUsageEvent(models.Model):
 
     class Meta:
         ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["user", "request_day", "status"], name="ai_usage_user_day_status_idx"),
+        ]
 
     def __str__(self):
         return f"AIUsageEvent<{self.user_id}:{self.feature}:{self.status}>"
 
 
+class AIUsageMonthlyRollup(models.Model):
+    """
+    Pre-aggregated AIUsageEvent totals per user, month, feature and model.
+
+    Token and cost sums only include successful events, matching how usage is
+    billed. Rebuild with ``manage.py rebuild_ai_usage_rollups``.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="ai_usage_rollups",
+    )
+    month = models.DateField(help_text="First day of the calendar month.")
+    feature = models.CharField(max_length=40, choices=AIUsageEvent.Feature.choices)
+    model_name = models.CharField(max_length=64, blank=True, default="")
+    success_count = models.PositiveIntegerField(default=0)
+    cached_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    input_tokens = models.PositiveBigIntegerField(default=0)
+    output_tokens = models.PositiveBigIntegerField(default=0)
+    provider_cost_usd = models.DecimalField(max_digits=14, decimal_places=6, default=Decimal("0"))
+    user_charge_usd = models.DecimalField(max_digits=14, decimal_places=6, default=Decimal("0"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-month", "user_id", "feature", "model_name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month", "feature", "model_name"],
+                name="unique_ai_usage_monthly_rollup",
+            )
+        ]
+
+    def __str__(self):
+        return f"AIUsageMonthlyRollup<{self.user_id}:{self.month:%Y-%m}:{self.feature}:{self.model_name}>"
+
+
+class AIDailyUsageCounter(models.Model):
+    """Successful AI calls per user and day, kept in step with AIUsageEvent."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="ai_daily_usage_counters",
+    )
+    day = models.DateField()
+    success_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "day"],
+                name="unique_ai_daily_usage_counter",
+            )
+        ]
+
+    def __str__(self):
+        return f"AIDailyUsageCounter<{self.user_id}:{self.day}:{self.success_count}>"
+
+
 class DeletedEmailBlocklist(models.Model):
     email = models.EmailField(unique=True)
     reason = models.CharField(max_length=120, blank=True, default="deleted_account")
@@ -439,6 +520,15 @@ class BusinessDirectoryListing(models.Model):
 
     class Meta:
         ordering = ["business_name", "id"]
+        indexes = [
+            models.Index(fields=["is_published", "is_removed", "country_code"], name="directory_visible_country_idx"),
+            # The public directory reads every visible listing in name order.
+            models.Index(
+                fields=["business_name", "id"],
+                name="directory_visible_name_idx",
+                condition=models.Q(is_published=True, is_removed=False),
+            ),
+        ]
 
     def __str__(self):
         return self.business_name
@@ -708,25 +798,143 @@ def resolve_ai_daily_limit_for_user(user, config=None):
     profile = getattr(user, "profile", None)
     if profile is None and user is not None:
         profile, _ = Profile.objects.get_or_create(user=user)
+        user.profile = profile
 
     override = getattr(profile, "ai_daily_limit_override", None)
+    fallback = int(getattr(config, "daily_limit_per_user", 0) or 0)
+    # Planner views resolve the limit several times per request; remember the
+    # answer on the user instance for as long as its inputs are unchanged.
+    cache_key = (override, fallback, getattr(settings, "AI_DAILY_LIMIT_PER_USER", 10))
+    cached = getattr(user, "_ai_daily_limit_cache", None)
+    if cached and cached[0] == cache_key:
+        return cached[1]
+
     if override is not None:
-        return int(override)
+        limit = int(override)
+    elif fallback <= 0:
+        limit = int(getattr(settings, "AI_DAILY_LIMIT_PER_USER", 10))
+    else:
+        limit = fallback
+    if user is not None:
+        user._ai_daily_limit_cache = (cache_key, limit)
+    return limit
+
+
+def count_ai_successes_for_day(user, day=None):
+    day = day or timezone.localdate()
+    counted = (
+        AIDailyUsageCounter.objects.filter(user=user, day=day)
+        .values_list("success_count", flat=True)
+        .first()
+    )
+    if counted is not None:
+        return counted
+    return AIUsageEvent.objects.filter(
+        user=user,
+        request_day=day,
+        status=AIUsageEvent.Status.SUCCESS,
+    ).count()
 
-    fallback = int(getattr(config, "daily_limit_per_user", 0) or 0)
-    if fallback <= 0:
-        return int(getattr(settings, "AI_DAILY_LIMIT_PER_USER", 10))
-    return fallback
+
+def _increment_ai_daily_counter(user, day):
+    bump = {"success_count": F("success_count") + 1, "updated_at": timezone.now()}
+    if AIDailyUsageCounter.objects.filter(user=user, day=day).update(**bump):
+        return
+    # First success of the day (or first since the counter existed): seed it
+    # from the event log, which already includes the event just written.
+    seeded = AIUsageEvent.objects.filter(
+        user=user,
+        request_day=day,
+        status=AIUsageEvent.Status.SUCCESS,
+    ).count()
+    counter, created = AIDailyUsageCounter.objects.get_or_create(
+        user=user,
+        day=day,
+        defaults={"success_count": seeded},
+    )
+    if not created:
+        AIDailyUsageCounter.objects.filter(pk=counter.pk).update(**bump)
+
+
+def _rollup_increments(event):
+    increments = {}
+    if event.status == AIUsageEvent.Status.SUCCESS:
+        increments = {
+            "success_count": 1,
+            "input_tokens": event.input_tokens,
+            "output_tokens": event.output_tokens,
+            "provider_cost_usd": event.provider_cost_usd,
+            "user_charge_usd": event.user_charge_usd,
+        }
+    elif event.status == AIUsageEvent.Status.CACHED:
+        increments = {"cached_count": 1}
+    elif event.status == AIUsageEvent.Status.ERROR:
+        increments = {"error_count": 1}
+    return increments
+
+
+def add_event_to_monthly_rollup(event):
+    increments = _rollup_increments(event)
+    if not increments:
+        return
+    lookup = {
+        "user_id": event.user_id,
+        "month": event.request_day.replace(day=1),
+        "feature": event.feature,
+        "model_name": event.model_name,
+    }
+    bump = {field: F(field) + value for field, value in increments.items()}
+    bump["updated_at"] = timezone.now()
+    if AIUsageMonthlyRollup.objects.filter(**lookup).update(**bump):
+        return
+    _, created = AIUsageMonthlyRollup.objects.get_or_create(**lookup, defaults=increments)
+    if not created:
+        AIUsageMonthlyRollup.objects.filter(**lookup).update(**bump)
+
+
+def aggregate_ai_usage_monthly_rollups(events, rollup_model):
+    """
+    Build unsaved rollup rows from an AIUsageEvent queryset for the rebuild
+    command. Migration 0036 keeps a frozen copy for its backfill.
+    """
+    success = Q(status="success")
+    rows = (
+        events.annotate(rollup_month=TruncMonth("request_day"))
+        .values("user_id", "rollup_month", "feature", "model_name")
+        .annotate(
+            n_success=Count("id", filter=success),
+            n_cached=Count("id", filter=Q(status="cached")),
+            n_error=Count("id", filter=Q(status="error")),
+            sum_input=Sum("input_tokens", filter=success, default=0),
+            sum_output=Sum("output_tokens", filter=success, default=0),
+            sum_provider=Sum("provider_cost_usd", filter=success, default=Decimal("0")),
+            sum_charge=Sum("user_charge_usd", filter=success, default=Decimal("0")),
+        )
+        .order_by()
+    )
+    return [
+        rollup_model(
+            user_id=row["user_id"],
+            month=row["rollup_month"],
+            feature=row["feature"],
+            model_name=row["model_name"],
+            success_count=row["n_success"],
+            cached_count=row["n_cached"],
+            error_count=row["n_error"],
+            input_tokens=row["sum_input"],
+            output_tokens=row["sum_output"],
+            provider_cost_usd=row["sum_provider"],
+            user_charge_usd=row["sum_charge"],
+        )
+        for row in rows
+        if row["n_success"] or row["n_cached"] or row["n_error"]
+    ]
 
 
 def get_ai_remaining_today_for_user(user, config=None):
     config = config or AIConfiguration.get_solo()
     limit = resolve_ai_daily_limit_for_user(user, config=config)
-    used = AIUsageEvent.objects.filter(
-        user=user,
-        request_day=timezone.localdate(),
-        status=AIUsageEvent.Status.SUCCESS,
-    ).count()
+    used = count_ai_successes_for_day(user)
     return max(0, limit - used), limit
 
 
@@ -775,15 +983,19 @@ def record_ai_usage_event(
         user_charge = (provider_cost * multiplier).quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
         user_charge = max(user_charge, Decimal(config.minimum_charge_usd or 0))
 
-    return AIUsageEvent.objects.create(
-        user=user,
-        feature=feature,
-        model_name=model_name,
-        status=status_value,
-        prompt_chars=max(0, int(prompt_chars or 0)),
-        response_chars=max(0, int(response_chars or 0)),
-        input_tokens=input_tokens,
-        output_tokens=output_tokens,
-        provider_cost_usd=provider_cost,
-        user_charge_usd=user_charge,
-    )
+    with transaction.atomic():
+        event = AIUsageEvent.objects.create(
+            user=user,
+            feature=feature,
+            model_name=model_name,
+            status=status_value,
+            prompt_chars=max(0, int(prompt_chars or 0)),
+            response_chars=max(0, int(response_chars or 0)),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            provider_cost_usd=provider_cost,
+            user_charge_usd=user_charge,
+        )
+        if status_value == AIUsageEvent.Status.SUCCESS:
+            _increment_ai_daily_counter(user, event.request_day)
+    return event
@@ -0,0 +1,211 @@
+# backend/accounts/profiling.py
+"""
+Per-request timing: wall time, database queries and external calls.
+
+``RequestProfilingMiddleware`` starts a profile for each request, counts
+every query through a connection execute wrapper and collects the time
+spent inside ``external_call(kind)`` blocks (AI provider, geocoding, email,
+object storage, ffmpeg). The totals go out as a ``Server-Timing`` header
+(REQUEST_PROFILING_SERVER_TIMING) and as a structured warning for requests
+slower than REQUEST_SLOW_MS. One request in REQUEST_PROFILE_SAMPLE_RATE is
+also run under cProfile and its stats written to REQUEST_PROFILE_DIR for
+offline analysis with ``python -m pstats``.
+
+State lives in a context variable, so calls made from worker threads or
+after the response has been returned (streamed bodies) are not attributed
+to the request.
+"""
+import contextvars
+import cProfile
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.external = {}
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def add_external(self, kind, seconds):
+        calls, total = self.external.get(kind, (0, 0.0))
+        self.external[kind] = (calls + 1, total + seconds)
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_seconds += time.perf_counter() - started
+
+
+def current_profile():
+    return _current.get()
+
+
+@contextmanager
+def external_call(kind):
+    """Attribute the time spent in the block (or decorated function) to ``kind``."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_external(kind, time.perf_counter() - started)
+
+
+def server_timing_header(profile, total_ms):
+    entries = [
+        f"total;dur={total_ms:.1f}",
+        f'db;dur={profile.db_seconds * 1000:.1f};desc="{profile.db_queries} queries"',
+    ]
+    for kind, (calls, seconds) in sorted(profile.external.items()):
+        entries.append(f'{kind};dur={seconds * 1000:.1f};desc="{calls} calls"')
+    return ", ".join(entries)
+
+
+def _profile_path(request, total_ms):
+    directory = getattr(settings, "REQUEST_PROFILE_DIR", "") or os.path.join(
+        tempfile.gettempdir(), "portfolio-profiles"
+    )
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-")[:80] or "root"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{request.method}-{slug}-{int(total_ms)}ms.prof"
+    return directory, os.path.join(directory, name)
+
+
+def _prune_profiles(directory):
+    keep = int(getattr(settings, "REQUEST_PROFILE_MAX_FILES", 200) or 0)
+    if keep <= 0:
+        return
+    try:
+        entries = sorted(
+            (entry for entry in os.scandir(directory) if entry.name.endswith(".prof")),
+            key=lambda entry: entry.stat().st_mtime_ns,
+        )
+        for entry in entries[:-keep]:
+            os.unlink(entry.path)
+    except OSError:
+        logger.warning("Could not prune request profiles dir=%s", directory, exc_info=True)
+
+
+def _should_sample():
+    rate = int(getattr(settings, "REQUEST_PROFILE_SAMPLE_RATE", 0) or 0)
+    return rate > 0 and random.randrange(rate) == 0
+
+
+class RequestProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "REQUEST_PROFILING_ENABLED", True):
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        sampler = cProfile.Profile() if _should_sample() else None
+        try:
+            with ExitStack() as stack:
+                # Wrapping doesn't open a connection; it only hooks every alias.
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.record_query))
+                if sampler:
+                    sampler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if sampler:
+                        sampler.disable()
+        finally:
+            _current.reset(token)
+
+        total_ms = profile.total_ms
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            total_ms / 1000,
+            # The route pattern, not the path, keeps label cardinality bounded.
+            route=getattr(request.resolver_match, "route", "") or "unmatched",
+            method=request.method,
+            status=f"{response.status_code // 100}xx",
+        )
+        if getattr(settings, "REQUEST_PROFILING_SERVER_TIMING", False):
+            response["Server-Timing"] = server_timing_header(profile, total_ms)
+        if sampler:
+            self._write_profile(sampler, request, total_ms)
+
+        slow_ms = int(getattr(settings, "REQUEST_SLOW_MS", 1000) or 0)
+        if slow_ms and total_ms >= slow_ms:
+            logger.warning(
+                "Slow request method=%s path=%s status=%s total_ms=%.0f db_queries=%s db_ms=%.0f external=%s",
+                request.method,
+                request.path,
+                response.status_code,
+                total_ms,
+                profile.db_queries,
+                profile.db_seconds * 1000,
+                {kind: round(seconds * 1000) for kind, (_calls, seconds) in sorted(profile.external.items())},
+            )
+        return response
+
+    def _write_profile(self, sampler, request, total_ms):
+        try:
+            directory, path = _profile_path(request, total_ms)
+            sampler.dump_stats(path)
+            _prune_profiles(directory)
+        except OSError:
+            logger.warning("Could not write request profile path=%s", request.path, exc_info=True)
+
+
+class TimedEmailBackend(BaseEmailBackend):
+    """Delegates to EMAIL_DELIVERY_BACKEND and times the SMTP/API round trips."""
+
+    def __init__(self, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently)
+        backend = getattr(settings, "EMAIL_DELIVERY_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+        self.delivery = import_string(backend)(fail_silently=fail_silently, **kwargs)
+
+    def open(self):
+        with external_call("email"):
+            return self.delivery.open()
+
+    def close(self):
+        with external_call("email"):
+            return self.delivery.close()
+
+    def send_messages(self, email_messages):
+        messages = list(email_messages or [])
+        try:
+            with external_call("email"):
+                sent = self.delivery.send_messages(messages) or 0
+        except Exception:
+            metrics.EMAIL_MESSAGES.inc(len(messages), outcome="failed")
+            raise
+        metrics.EMAIL_MESSAGES.inc(sent, outcome="sent")
+        if len(messages) > sent:
+            metrics.EMAIL_MESSAGES.inc(len(messages) - sent, outcome="failed")
+        return sent
@@ -0,0 +1,192 @@
+# backend/accounts/response_cache.py
+"""
+Shared cache for public GET responses served to anonymous visitors.
+
+Entries are keyed by view, host and the query parameters the view actually
+reads (normalised: unknown keys dropped, blanks dropped, keys sorted). Each
+entry records dependency tags such as ``project:12`` or ``listing:7`` with
+the tag versions current when it was built; ``purge_tags`` bumps those
+versions so only entries that depended on the changed rows stop matching.
+Collection tags (``job-postings``, ``directory`` ...) cover rows that are new
+to a list and therefore not yet tagged in any entry.
+"""
+import hashlib
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from .caching import shared_cache
+
+logger = logging.getLogger(__name__)
+
+TAG_KEY_PREFIX = "rc-tag:"
+ENTRY_KEY_PREFIX = "rc-entry:"
+# Validators set by the view (see accounts/conditional.py) are stored with the
+# body so a hit can still answer If-None-Match with a 304.
+REPLAYED_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Vary")
+
+
+def project_tag(project_id):
+    return f"project:{project_id}"
+
+
+def profile_tag(user_id):
+    return f"profile:{user_id}"
+
+
+def listing_tag(listing_id):
+    return f"listing:{listing_id}"
+
+
+def helper_tag(helper_id):
+    return f"helper:{helper_id}"
+
+
+JOB_POSTINGS_TAG = "job-postings"
+DIRECTORY_TAG = "directory"
+HELPERS_TAG = "helpers"
+REFERENCE_GALLERY_TAG = "reference-gallery"
+
+
+def response_cache_enabled():
+    return bool(getattr(settings, "RESPONSE_CACHE_ENABLED", True))
+
+
+def normalized_params(request, params):
+    query = request.query_params
+    normalized = {}
+    for name in params:
+        values = sorted(value.strip() for value in query.getlist(name) if value and value.strip())
+        if values:
+            normalized[name] = values
+    return normalized
+
+
+def response_cache_key(request, view_name, params=(), vary=()):
+    payload = {
+        "view": view_name,
+        "host": request.get_host(),
+        "path": request.path,
+        "params": normalized_params(request, params),
+        "vary": list(vary),
+    }
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{ENTRY_KEY_PREFIX}{view_name}:{digest}"
+
+
+def _tag_versions(tags):
+    keys = {f"{TAG_KEY_PREFIX}{tag}": tag for tag in tags}
+    found = shared_cache().get_many(list(keys))
+    return {tag: found.get(key, 0) for key, tag in keys.items()}
+
+
+def purge_tags(*tags):
+    """Invalidate every cached response that depends on any of ``tags``."""
+    tags = [tag for tag in tags if tag]
+    if not tags:
+        return
+    version = time.time_ns()
+    try:
+        shared_cache().set_many({f"{TAG_KEY_PREFIX}{tag}": version for tag in tags}, timeout=None)
+    except Exception:
+        logger.warning("Response cache purge failed tags=%s", tags, exc_info=True)
+
+
+def purge_tags_on_commit(*tags):
+    transaction.on_commit(lambda: purge_tags(*tags))
+
+
+def cached_anonymous_response(request, view_name, build, *, params=(), vary=(), timeout=None):
+    """
+    Serve ``build()`` through the response cache for anonymous GETs.
+
+    ``build`` returns ``(response, tags)``; only 200 responses are stored.
+    Authenticated requests and other methods always call ``build`` directly.
+    """
+    if _bypasses_cache(request):
+        return build()[0]
+
+    key = response_cache_key(request, view_name, params, vary)
+    response = _cached_response(request, key)
+    if response is not None:
+        return response
+
+    started = time.time_ns()
+    response, tags = build()
+    return _store_response(key, response, tags, started, timeout)
+
+
+async def acached_anonymous_response(request, view_name, abuild, *, params=(), vary=(), timeout=None):
+    """cached_anonymous_response() for async views; ``abuild`` is awaited on a miss."""
+    if _bypasses_cache(request):
+        return (await abuild())[0]
+
+    key = response_cache_key(request, view_name, params, vary)
+    # The shared tier may be the database cache backend.
+    response = await sync_to_async(_cached_response)(request, key)
+    if response is not None:
+        return response
+
+    started = time.time_ns()
+    response, tags = await abuild()
+    return await sync_to_async(_store_response)(key, response, tags, started, timeout)
+
+
+def _bypasses_cache(request):
+    return (
+        request.method != "GET"
+        or getattr(request.user, "is_authenticated", False)
+        or not response_cache_enabled()
+    )
+
+
+def _cached_response(request, key):
+    try:
+        entry = shared_cache().get(key)
+        if entry is not None and _tag_versions(entry["tags"]) == entry["tags"]:
+            headers = entry.get("headers") or {}
+            response = None
+            if "ETag" in headers:
+                response = get_conditional_response(
+                    request,
+                    etag=headers["ETag"],
+                    last_modified=parse_http_date_safe(headers.get("Last-Modified")),
+                )
+            if response is None:
+                response = Response(entry["data"], status=entry["status"])
+            for name, value in headers.items():
+                response[name] = value
+            response["X-Cache"] = "HIT"
+            return response
+    except Exception:
+        logger.warning("Response cache read failed key=%s", key, exc_info=True)
+    return None
+
+
+def _store_response(key, response, tags, started, timeout):
+    if response.status_code != 200:
+        return response
+    response["X-Cache"] = "MISS"
+    try:
+        versions = _tag_versions(set(tags))
+        # Tag versions are purge timestamps: a purge that landed while we were
+        # building means the data may already be stale, so don't store it.
+        if any(version > started for version in versions.values()):
+            return response
+        timeout = int(getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60)) if timeout is None else timeout
+        headers = {name: response[name] for name in REPLAYED_HEADERS if name in response}
+        shared_cache().set(
+            key,
+            {"data": response.data, "status": response.status_code, "tags": versions, "headers": headers},
+            timeout=timeout,
+        )
+    except Exception:
+        logger.warning("Response cache write failed key=%s", key, exc_info=True)
+    return response
@@ -3,6 +3,7 @@ import re
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 from djoser.serializers import UserCreateSerializer
 from .models import (
     BusinessDirectoryListing,
@@ -18,6 +19,33 @@ from .models import (
 User = get_user_model()
 
 
+def profile_social_stats(user_ids, viewer):
+    """Like counts and the viewer's like/save flags for many profiles, in three queries."""
+    user_ids = set(user_ids)
+    like_counts = dict(
+        ProfileLike.objects.filter(liked_user_id__in=user_ids)
+        .values("liked_user_id")
+        .annotate(total=Count("id"))
+        .values_list("liked_user_id", "total")
+    )
+    liked = saved = set()
+    if getattr(viewer, "is_authenticated", False):
+        liked = set(
+            ProfileLike.objects.filter(liker=viewer, liked_user_id__in=user_ids).values_list("liked_user_id", flat=True)
+        )
+        saved = set(
+            ProfileSave.objects.filter(saver=viewer, saved_user_id__in=user_ids).values_list("saved_user_id", flat=True)
+        )
+    return {
+        user_id: {
+            "like_count": like_counts.get(user_id, 0),
+            "liked_by_me": user_id in liked,
+            "saved_by_me": user_id in saved,
+        }
+        for user_id in user_ids
+    }
+
+
 class ProfileBaseMixin:
     def _build_abs_url(self, request, url: str):
         if not url:
@@ -38,13 +66,23 @@ class ProfileBaseMixin:
             return self._build_abs_url(request, image.url)
         return None
 
+    def _social_stats(self, obj):
+        # Preloaded by list serializers that render many profiles; see profile_social_stats().
+        return self.context.get("profile_stats", {}).get(obj.user_id)
+
     def get_like_count(self, obj):
+        stats = self._social_stats(obj)
+        if stats is not None:
+            return stats["like_count"]
         return ProfileLike.objects.filter(liked_user=obj.user).count()
 
     def get_liked_by_me(self, obj):
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return False
+        stats = self._social_stats(obj)
+        if stats is not None:
+            return stats["liked_by_me"]
         return ProfileLike.objects.filter(
             liker=request.user,
             liked_user=obj.user,
@@ -54,6 +92,9 @@ class ProfileBaseMixin:
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return False
+        stats = self._social_stats(obj)
+        if stats is not None:
+            return stats["saved_by_me"]
         return ProfileSave.objects.filter(
             saver=request.user,
             saved_user=obj.user,
@@ -155,13 +196,19 @@ class BusinessDirectoryListingSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "like_count", "liked_by_me", "distance_miles", "created_at"]
 
+    # like_count and liked_by_me are annotated by with_listing_like_data() in
+    # list views; the queries are the fallback.
     def get_like_count(self, obj):
+        if hasattr(obj, "like_count"):
+            return obj.like_count
         return BusinessDirectoryListingLike.objects.filter(listing=obj).count()
 
     def get_liked_by_me(self, obj):
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return False
+        if hasattr(obj, "liked_by_me"):
+            return obj.liked_by_me
         return BusinessDirectoryListingLike.objects.filter(
             liker=request.user,
             listing=obj,
@@ -1012,6 +1059,10 @@ class PublicUserProfileSerializer(serializers.ModelSerializer):
         return None
 
 
+def public_reference_images(queryset):
+    return queryset.filter(is_public=True).order_by("order", "-created_at", "-id")
+
+
 class PublicHomeownerReferenceGallerySerializer(serializers.ModelSerializer):
     username = serializers.CharField(source="user.username", read_only=True)
     cover_image_url = serializers.SerializerMethodField()
@@ -1039,10 +1090,15 @@ class PublicHomeownerReferenceGallerySerializer(serializers.ModelSerializer):
         return request.build_absolute_uri(url) if request else url
 
     def _public_reference_items(self, obj):
-        return obj.user.homeowner_reference_images.filter(is_public=True).order_by("order", "-created_at", "-id")
+        # The list view prefetches these into ``public_reference_images``.
+        items = getattr(obj.user, "public_reference_images", None)
+        if items is None:
+            items = list(public_reference_images(obj.user.homeowner_reference_images.all()))
+        return items
 
     def get_cover_image_url(self, obj):
-        item = self._public_reference_items(obj).first()
+        items = self._public_reference_items(obj)
+        item = items[0] if items else None
         if item and item.image and hasattr(item.image, "url"):
             return self._build_abs_url(item.image.url)
         return None
@@ -1056,7 +1112,7 @@ class PublicHomeownerReferenceGallerySerializer(serializers.ModelSerializer):
         ).data
 
     def get_reference_count(self, obj):
-        return self._public_reference_items(obj).count()
+        return len(self._public_reference_items(obj))
 
 
 class LikedProfileCardSerializer(serializers.ModelSerializer):
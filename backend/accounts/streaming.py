@@ -0,0 +1,50 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+
+def wants_event_stream(request):
+    value = request.data.get("stream") if hasattr(request, "data") else None
+    if value is None:
+        value = request.query_params.get("stream") if hasattr(request, "query_params") else None
+    return str(value or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+def _iterate_in_thread(events):
+    # Under ASGI, Django buffers synchronous iterators in full before sending,
+    # so step the generator one item at a time on the request's sync thread.
+    iterator = iter(events)
+    sentinel = object()
+
+    async def stream():
+        try:
+            while True:
+                item = await sync_to_async(next)(iterator, sentinel)
+                if item is sentinel:
+                    break
+                yield item
+        finally:
+            # On client disconnect the generator is abandoned mid-stream; close
+            # it so the provider's HTTP stream is released, not left open.
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                await sync_to_async(close)()
+
+    return stream()
+
+
+def event_stream_response(request, events):
+    django_request = getattr(request, "_request", request)
+    if isinstance(django_request, ASGIRequest):
+        events = _iterate_in_thread(events)
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
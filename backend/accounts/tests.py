@@ -1,33 +1,63 @@
 from django.contrib.auth import get_user_model
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.core import mail
+from django.core.mail import get_connection, send_mail
+from django.http import HttpResponse
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connections
+from django.urls import resolve
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
-from io import BytesIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
 import json
 from pathlib import Path
+import pstats
+import shutil
 import tempfile
+import threading
+import time
+from unittest import skipUnless
 from unittest.mock import patch
 from PIL import Image
+from asgiref.sync import async_to_sync
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 
 from portfolio.models import MessageThread, PrivateMessage, Project, ProjectImage
+from .ai import (
+    AIServiceError,
+    agenerate_text,
+    clear_ai_response_cache,
+    close_ai_http_client,
+    generate_text,
+    get_cached_ai_response,
+    store_ai_response,
+    stream_text,
+)
+from . import db_routing, metrics
+from .caching import cached, invalidate_namespace, local_cache, shared_cache
 from .geocoding import GeocodeResult, GeocodingError
+from .profiling import RequestProfilingMiddleware, current_profile, external_call
+from .streaming import _iterate_in_thread, event_stream_response
 from .models import (
     AIConfiguration,
+    AIDailyUsageCounter,
     AIUsageEvent,
+    AIUsageMonthlyRollup,
     AdminAuditLog,
     BusinessDirectoryListing,
     BusinessDirectoryListingLike,
     Profile,
+    ProfileLike,
     StaffAccess,
     UserReport,
     get_ai_remaining_today_for_user,
+    record_ai_usage_event,
     user_can_access_admin,
 )
 
@@ -35,6 +65,66 @@ from .models import (
 User = get_user_model()
 
 
+class StubAIProviderServer:
+    """
+    Local stand-in for the AI provider. Queue (status, payload, headers) replies
+    with `respond`; every request body and client port is recorded so tests can
+    check retries and connection reuse without network access.
+    """
+
+    def __init__(self):
+        self.replies = []
+        self.requests = []
+        self.client_ports = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length)
+                stub.requests.append({"path": self.path, "body": body, "headers": dict(self.headers)})
+                stub.client_ports.add(self.client_address[1])
+                status_code, payload, headers = (
+                    stub.replies.pop(0) if stub.replies else (500, {"error": {"message": "No stub reply queued."}}, {})
+                )
+                if isinstance(payload, bytes):
+                    data, content_type = payload, "text/event-stream"
+                else:
+                    data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+                self.send_response(status_code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def respond(self, status_code, payload, headers=None):
+        self.replies.append((status_code, payload, headers or {}))
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        close_ai_http_client()
+        self.server.shutdown()
+        self.server.server_close()
+
+
 @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
 class RegistrationFlowTests(APITestCase):
     def test_registration_creates_profile_with_selected_role_and_sends_activation_email(self):
@@ -89,8 +179,99 @@ class AIAssistViewTests(APITestCase):
         )
 
         AIConfiguration.get_solo()
+        clear_ai_response_cache()
+        self.addCleanup(clear_ai_response_cache)
+
+    @patch("accounts.ai._apost_to_provider")
+    def test_repeated_identical_prompt_is_served_from_cache(self, mock_post):
+        mock_post.return_value = {
+            "model": "gpt-5.4-mini",
+            "output_text": "Drafted summary",
+            "usage": {"input_tokens": 10000, "output_tokens": 10000},
+        }
+        self.client.force_authenticate(self.homeowner)
+        payload = {"feature": "project_summary", "title": "Bathroom remodel", "current_text": ""}
+
+        first = self.client.post("/api/ai/assist/", payload, format="json")
+        second = self.client.post("/api/ai/assist/", payload, format="json")
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data["text"], "Drafted summary")
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(second.data["remaining_today"], first.data["remaining_today"])
+        cached_event = AIUsageEvent.objects.get(user=self.homeowner, status=AIUsageEvent.Status.CACHED)
+        self.assertEqual(cached_event.input_tokens, 0)
+        self.assertEqual(cached_event.user_charge_usd, Decimal("0"))
+
+    @patch("accounts.views.stream_text")
+    def test_streaming_mode_sends_deltas_and_records_usage(self, mock_stream_text):
+        mock_stream_text.return_value = iter(
+            [
+                {"type": "delta", "text": "Drafted "},
+                {"type": "delta", "text": "summary"},
+                {
+                    "type": "completed",
+                    "text": "Drafted summary",
+                    "model": "gpt-5.4-mini",
+                    "usage": {"input_tokens": 100, "output_tokens": 20},
+                    "cached": False,
+                    "cache_key": "",
+                },
+            ]
+        )
+        self.client.force_authenticate(self.homeowner)
 
-    @patch("accounts.views.generate_text")
+        response = self.client.post(
+            "/api/ai/assist/",
+            {"feature": "project_summary", "title": "Bathroom remodel", "stream": True},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        frames = b"".join(response.streaming_content).decode("utf-8").strip().split("\n\n")
+        parsed = [
+            (frame.split("\n")[0].removeprefix("event: "), json.loads(frame.split("\n")[1].removeprefix("data: ")))
+            for frame in frames
+        ]
+        self.assertEqual([name for name, _ in parsed], ["delta", "delta", "done"])
+        self.assertEqual(parsed[-1][1]["text"], "Drafted summary")
+        event = AIUsageEvent.objects.get(user=self.homeowner)
+        self.assertEqual(event.status, AIUsageEvent.Status.SUCCESS)
+        self.assertEqual(event.output_tokens, 20)
+        self.assertEqual(parsed[-1][1]["remaining_today"], 9)
+
+    def test_event_stream_response_is_async_under_asgi(self):
+        request = AsyncRequestFactory().post("/api/ai/assist/")
+        response = event_stream_response(request, iter(["event: done\ndata: {}\n\n"]))
+
+        self.assertTrue(response.is_async)
+
+    def test_event_stream_closes_provider_generator_on_disconnect(self):
+        closed = []
+
+        def events():
+            try:
+                yield "event: delta\ndata: {}\n\n"
+                yield "event: done\ndata: {}\n\n"
+            finally:
+                closed.append(True)
+
+        # Keep a reference, as the provider client does, so only an explicit
+        # close() releases it.
+        provider = events()
+
+        async def disconnect_after_first_event():
+            stream = _iterate_in_thread(provider)
+            await stream.__anext__()
+            await stream.aclose()
+
+        async_to_sync(disconnect_after_first_event)()
+
+        self.assertEqual(closed, [True])
+
+    @patch("accounts.views.agenerate_text")
     def test_homeowner_can_use_project_summary_helper(self, mock_generate_text):
         mock_generate_text.return_value = {
             "text": "Drafted summary",
@@ -117,6 +298,76 @@ class AIAssistViewTests(APITestCase):
         self.assertEqual(event.provider_cost_usd, Decimal("0.052500"))
         self.assertEqual(event.user_charge_usd, Decimal("0.105000"))
 
+    def test_successful_usage_increments_daily_counter(self):
+        AIUsageEvent.objects.create(
+            user=self.homeowner,
+            feature=AIUsageEvent.Feature.PROJECT_SUMMARY,
+            status=AIUsageEvent.Status.SUCCESS,
+        )
+        config = AIConfiguration.get_solo()
+        self.assertEqual(get_ai_remaining_today_for_user(self.homeowner, config=config), (9, 10))
+
+        for status_value in (AIUsageEvent.Status.SUCCESS, AIUsageEvent.Status.ERROR, AIUsageEvent.Status.SUCCESS):
+            record_ai_usage_event(
+                user=self.homeowner,
+                feature=AIUsageEvent.Feature.PROJECT_SUMMARY,
+                status_value=status_value,
+            )
+
+        counter = AIDailyUsageCounter.objects.get(user=self.homeowner, day=timezone.localdate())
+        self.assertEqual(counter.success_count, 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_ai_remaining_today_for_user(self.homeowner, config=config), (7, 10))
+
+    def test_monthly_rollup_tracks_events_and_can_be_rebuilt(self):
+        for status_value, usage in (
+            (AIUsageEvent.Status.SUCCESS, {"input_tokens": 1000, "output_tokens": 500}),
+            (AIUsageEvent.Status.SUCCESS, {"input_tokens": 2000, "output_tokens": 100}),
+            (AIUsageEvent.Status.CACHED, None),
+            (AIUsageEvent.Status.ERROR, None),
+        ):
+            record_ai_usage_event(
+                user=self.homeowner,
+                feature=AIUsageEvent.Feature.PROJECT_SUMMARY,
+                model_name="gpt-5.4-mini",
+                status_value=status_value,
+                usage=usage,
+            )
+
+        rollup = AIUsageMonthlyRollup.objects.get(user=self.homeowner)
+        self.assertEqual(rollup.month, timezone.localdate().replace(day=1))
+        self.assertEqual((rollup.success_count, rollup.cached_count, rollup.error_count), (2, 1, 1))
+        self.assertEqual((rollup.input_tokens, rollup.output_tokens), (3000, 600))
+        expected_charge = sum(
+            AIUsageEvent.objects.filter(user=self.homeowner).values_list("user_charge_usd", flat=True),
+            Decimal("0"),
+        )
+        self.assertEqual(rollup.user_charge_usd, expected_charge)
+
+        AIUsageMonthlyRollup.objects.all().delete()
+        from accounts.management.commands import rebuild_ai_usage_rollups
+
+        outer_depth = len(connections["default"].atomic_blocks)
+        aggregate = rebuild_ai_usage_rollups.aggregate_ai_usage_monthly_rollups
+
+        def aggregate_inside_rebuild_transaction(*args, **kwargs):
+            # Events recorded between aggregating and replacing the rows must not be lost.
+            self.assertGreater(len(connections["default"].atomic_blocks), outer_depth)
+            return aggregate(*args, **kwargs)
+
+        with patch.object(
+            rebuild_ai_usage_rollups,
+            "aggregate_ai_usage_monthly_rollups",
+            side_effect=aggregate_inside_rebuild_transaction,
+        ) as aggregated:
+            call_command("rebuild_ai_usage_rollups", stdout=StringIO())
+        self.assertEqual(aggregated.call_count, 1)
+
+        rebuilt = AIUsageMonthlyRollup.objects.get(user=self.homeowner)
+        self.assertEqual((rebuilt.success_count, rebuilt.cached_count, rebuilt.error_count), (2, 1, 1))
+        self.assertEqual(rebuilt.input_tokens, 3000)
+        self.assertEqual(rebuilt.user_charge_usd, expected_charge)
+
     def test_usage_summary_returns_balance_pricing_and_recent_activity(self):
         config = AIConfiguration.get_solo()
         config.daily_limit_per_user = 5
@@ -145,7 +396,7 @@ class AIAssistViewTests(APITestCase):
         self.assertEqual(response.data["pricing"]["price_multiplier"], "2.00")
         self.assertEqual(response.data["recent"][0]["feature_label"], "Project summary")
 
-    @patch("accounts.views.generate_text")
+    @patch("accounts.views.agenerate_text")
     def test_homeowner_cannot_use_bid_helper(self, mock_generate_text):
         self.client.force_authenticate(self.homeowner)
 
@@ -162,7 +413,7 @@ class AIAssistViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         mock_generate_text.assert_not_called()
 
-    @patch("accounts.views.generate_text")
+    @patch("accounts.views.agenerate_text")
     def test_daily_limit_is_enforced(self, mock_generate_text):
         mock_generate_text.return_value = {"text": "Drafted bio", "model": "gpt-5.4-mini"}
         self.client.force_authenticate(self.contractor)
@@ -192,7 +443,7 @@ class AIAssistViewTests(APITestCase):
         self.assertEqual(first.status_code, status.HTTP_200_OK)
         self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
 
-    @patch("accounts.views.generate_text")
+    @patch("accounts.views.agenerate_text")
     def test_profile_override_daily_limit_is_enforced(self, mock_generate_text):
         mock_generate_text.return_value = {"text": "Drafted bio", "model": "gpt-5.4-mini"}
         self.client.force_authenticate(self.contractor)
@@ -244,11 +495,740 @@ class AIAssistViewTests(APITestCase):
         self.assertEqual(remaining, 2)
 
 
+@override_settings(OPENAI_API_KEY="test-key", OPENAI_RETRY_BACKOFF_SECONDS=0, OPENAI_MAX_RETRIES=2)
+class AIHttpClientTests(TestCase):
+    def _responses_payload(self, text):
+        return {
+            "model": "gpt-5.4-mini",
+            "output_text": text,
+            "usage": {"input_tokens": 12, "output_tokens": 4},
+        }
+
+    def test_generate_text_reuses_pooled_connection(self):
+        with StubAIProviderServer() as stub, self.settings(OPENAI_API_BASE_URL=stub.base_url):
+            stub.respond(200, self._responses_payload("First"))
+            stub.respond(200, self._responses_payload("Second"))
+
+            first = generate_text(feature="project_summary", system_prompt="sys", user_prompt="one")
+            second = generate_text(feature="project_summary", system_prompt="sys", user_prompt="two")
+
+        self.assertEqual(first["text"], "First")
+        self.assertEqual(second["text"], "Second")
+        self.assertEqual(first["usage"], {"input_tokens": 12, "output_tokens": 4})
+        self.assertEqual([item["path"] for item in stub.requests], ["/v1/responses", "/v1/responses"])
+        self.assertEqual(stub.requests[0]["headers"]["Authorization"], "Bearer test-key")
+        self.assertEqual(len(stub.client_ports), 1)
+
+    def test_generate_text_retries_rate_limit_and_server_errors(self):
+        with StubAIProviderServer() as stub, self.settings(OPENAI_API_BASE_URL=stub.base_url):
+            stub.respond(429, {"error": {"message": "Slow down"}}, {"Retry-After": "0"})
+            stub.respond(503, {"error": {"message": "Overloaded"}})
+            stub.respond(200, self._responses_payload("Recovered"))
+
+            result = generate_text(feature="project_summary", system_prompt="sys", user_prompt="retry")
+
+        self.assertEqual(result["text"], "Recovered")
+        self.assertEqual(len(stub.requests), 3)
+
+    def test_generate_text_gives_up_after_max_retries(self):
+        with StubAIProviderServer() as stub, self.settings(OPENAI_API_BASE_URL=stub.base_url, OPENAI_MAX_RETRIES=1):
+            stub.respond(500, {"error": {"message": "Provider down"}})
+            stub.respond(500, {"error": {"message": "Provider down"}})
+
+            with self.assertRaisesMessage(AIServiceError, "Provider down"):
+                generate_text(feature="project_summary", system_prompt="sys", user_prompt="fail")
+
+        self.assertEqual(len(stub.requests), 2)
+
+    @override_settings(AI_RESPONSE_CACHE_MAX_ENTRIES=2)
+    def test_response_cache_evicts_least_recently_used_entries(self):
+        clear_ai_response_cache()
+        self.addCleanup(clear_ai_response_cache)
+        with patch("accounts.ai._post_to_provider") as mock_post:
+            mock_post.side_effect = lambda *args, **kwargs: self._responses_payload(
+                kwargs["json_body"]["input"][1]["content"][0]["text"]
+            )
+            for prompt in ("one", "two", "one", "three", "one", "two"):
+                generate_text(feature="project_summary", system_prompt="sys", user_prompt=prompt, use_cache=True)
+
+        # "one" stays hot; "two" is evicted by "three" and has to be fetched again.
+        self.assertEqual(mock_post.call_count, 4)
+
+    def test_response_cache_entries_expire(self):
+        clear_ai_response_cache()
+        self.addCleanup(clear_ai_response_cache)
+        store_ai_response("gpt-5.4-mini:project_summary:abc", {"text": "Old", "model": "gpt-5.4-mini"})
+        with patch("accounts.ai.time.monotonic", return_value=10**9):
+            self.assertIsNone(get_cached_ai_response("gpt-5.4-mini:project_summary:abc"))
+
+    def test_stream_text_yields_deltas_then_completed_result(self):
+        events = [
+            {"type": "response.created", "response": {"model": "gpt-5.4-mini"}},
+            {"type": "response.output_text.delta", "delta": "Hello "},
+            {"type": "response.output_text.delta", "delta": "there"},
+            {
+                "type": "response.completed",
+                "response": {"model": "gpt-5.4-mini", "usage": {"input_tokens": 7, "output_tokens": 2}},
+            },
+        ]
+        body = "".join(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n" for event in events).encode("utf-8")
+        with StubAIProviderServer() as stub, self.settings(OPENAI_API_BASE_URL=stub.base_url):
+            stub.respond(200, body)
+            chunks = list(stream_text(feature="project_summary", system_prompt="sys", user_prompt="hi"))
+
+        self.assertEqual([chunk["text"] for chunk in chunks if chunk["type"] == "delta"], ["Hello ", "there"])
+        self.assertEqual(chunks[-1]["type"], "completed")
+        self.assertEqual(chunks[-1]["text"], "Hello there")
+        self.assertEqual(chunks[-1]["usage"], {"input_tokens": 7, "output_tokens": 2})
+        self.assertTrue(json.loads(stub.requests[0]["body"])["stream"])
+
+    def test_stream_text_raises_on_provider_stream_error(self):
+        body = b'data: {"type": "error", "error": {"message": "Stream broke"}}\n\n'
+        with StubAIProviderServer() as stub, self.settings(OPENAI_API_BASE_URL=stub.base_url):
+            stub.respond(200, body)
+            with self.assertRaisesMessage(AIServiceError, "Stream broke"):
+                list(stream_text(feature="project_summary", system_prompt="sys", user_prompt="hi"))
+
+    def test_agenerate_text_retries_on_the_async_client(self):
+        with StubAIProviderServer() as stub, self.settings(OPENAI_API_BASE_URL=stub.base_url), patch(
+            "accounts.ai._async_http_client_enabled", True
+        ):
+            stub.respond(503, {"error": {"message": "Overloaded"}})
+            stub.respond(200, self._responses_payload("Async"))
+
+            result = async_to_sync(agenerate_text)(feature="project_summary", system_prompt="sys", user_prompt="hi")
+
+        self.assertEqual(result["text"], "Async")
+        self.assertEqual(result["usage"], {"input_tokens": 12, "output_tokens": 4})
+        self.assertEqual([item["path"] for item in stub.requests], ["/v1/responses", "/v1/responses"])
+
+    def test_async_calls_without_an_asgi_lifespan_reuse_the_pooled_client(self):
+        # Under WSGI each async view runs on a throwaway loop from async_to_sync.
+        with StubAIProviderServer() as stub, self.settings(OPENAI_API_BASE_URL=stub.base_url):
+            stub.respond(200, self._responses_payload("One"))
+            stub.respond(200, self._responses_payload("Two"))
+            for prompt in ("one", "two"):
+                async_to_sync(agenerate_text)(feature="project_summary", system_prompt="sys", user_prompt=prompt)
+
+        self.assertEqual(len(stub.requests), 2)
+        self.assertEqual(len(stub.client_ports), 1)
+
+    def test_asgi_lifespan_owns_the_async_client(self):
+        from backend.asgi import application
+
+        from . import ai
+
+        async def run_lifespan():
+            messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+            sent = []
+
+            async def receive():
+                message = messages.pop(0)
+                if message["type"] == "lifespan.shutdown":
+                    state["client"] = ai.get_ai_async_http_client()
+                return message
+
+            async def send(message):
+                sent.append(message["type"])
+
+            await application({"type": "lifespan"}, receive, send)
+            return sent
+
+        state = {}
+        sent = async_to_sync(run_lifespan)()
+
+        self.assertEqual(sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+        self.assertIsNotNone(state["client"])
+        self.assertTrue(state["client"].is_closed)
+        self.assertFalse(ai._async_http_client_enabled)
+
+    def test_client_errors_are_not_retried(self):
+        with StubAIProviderServer() as stub, self.settings(OPENAI_API_BASE_URL=stub.base_url):
+            stub.respond(400, {"error": {"message": "Bad prompt"}})
+
+            with self.assertRaisesMessage(AIServiceError, "Bad prompt"):
+                generate_text(feature="project_summary", system_prompt="sys", user_prompt="bad")
+
+        self.assertEqual(len(stub.requests), 1)
+
+
+TWO_TIER_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test-local"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test-shared"},
+}
+
+
+@override_settings(CACHES=TWO_TIER_CACHES)
+class ReferenceDataCacheTests(TestCase):
+    def test_solo_configuration_is_read_through_cache_and_invalidated_on_save(self):
+        AIConfiguration.get_solo()
+        with self.assertNumQueries(0):
+            self.assertFalse(AIConfiguration.get_solo().enabled)
+
+        config = AIConfiguration.get_solo()
+        config.enabled = True
+        with self.captureOnCommitCallbacks() as callbacks:
+            config.save()
+        # Until the save commits, other requests must not re-cache the old row.
+        self.assertFalse(AIConfiguration.get_solo().enabled)
+
+        for callback in callbacks:
+            callback()
+        self.assertTrue(AIConfiguration.get_solo().enabled)
+
+    def test_shared_tier_serves_other_processes_and_versions_orphan_old_keys(self):
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return {"value": len(loads)}
+
+        self.assertEqual(cached("reference", "item", loader), {"value": 1})
+        local_cache().clear()  # what a freshly started worker sees
+        self.assertEqual(cached("reference", "item", loader), {"value": 1})
+        self.assertEqual(len(loads), 1)
+
+        invalidate_namespace("reference")
+        self.assertEqual(cached("reference", "item", loader), {"value": 2})
+
+    def test_project_intake_templates_are_loaded_once(self):
+        from portfolio import project_intake
+
+        with patch.object(
+            project_intake, "_read_project_intake_templates", wraps=project_intake._read_project_intake_templates
+        ) as read:
+            project_intake._templates = (None, None)
+            first = project_intake.load_project_intake_templates()
+            project_intake.get_project_type_choices()
+            project_intake.get_project_intake_template("roofing")
+
+        self.assertEqual(read.call_count, 1)
+        # Served from the in-process memo, not a fresh copy from a cache backend.
+        self.assertIs(project_intake.load_project_intake_templates(), first)
+
+
+@override_settings(CACHES=TWO_TIER_CACHES)
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        shared_cache().clear()
+        self.listing = BusinessDirectoryListing.objects.create(
+            business_name="Cached Contractor",
+            location="Media, PA",
+            phone_number="555-333-4444",
+            country_code="US",
+            is_published=True,
+        )
+
+    def test_anonymous_directory_list_is_served_from_cache(self):
+        first = self.client.get("/api/business-directory/?country_code=US")
+        self.assertEqual(first["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/business-directory/?utm_source=mail&country_code=US&lat=")
+
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.data, first.data)
+
+    def test_authenticated_requests_bypass_cache(self):
+        user = User.objects.create_user(username="member", password="pw123456")
+        self.client.get("/api/business-directory/?country_code=US")
+        self.client.force_authenticate(user=user)
+
+        response = self.client.get("/api/business-directory/?country_code=US")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Cache", response)
+
+    def test_saving_a_listing_purges_only_responses_that_depend_on_it(self):
+        self.client.get("/api/business-directory/?country_code=US")
+        user = User.objects.create_user(username="homeowner", password="pw123456")
+        Profile.objects.filter(user=user).update(public_profile_enabled=True)
+        self.client.get(f"/api/profiles/{user.username}/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BusinessDirectoryListing.objects.create(
+                business_name="Pending Contractor",
+                location="Media, PA",
+                phone_number="555-333-5555",
+                is_published=False,
+            )
+        self.assertEqual(self.client.get("/api/business-directory/?country_code=US")["X-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.listing.business_name = "Renamed Contractor"
+            self.listing.save()
+
+        response = self.client.get("/api/business-directory/?country_code=US")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data[0]["business_name"], "Renamed Contractor")
+        self.assertEqual(self.client.get(f"/api/profiles/{user.username}/")["X-Cache"], "HIT")
+
+    def test_public_profile_is_purged_by_likes_and_not_found_is_not_cached(self):
+        owner = User.objects.create_user(username="pro", password="pw123456")
+        Profile.objects.filter(user=owner).update(profile_type=Profile.ProfileType.CONTRACTOR)
+        fan = User.objects.create_user(username="fan", password="pw123456")
+
+        self.assertEqual(self.client.get(f"/api/profiles/{owner.username}/").data["like_count"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProfileLike.objects.create(liker=fan, liked_user=owner)
+
+        response = self.client.get(f"/api/profiles/{owner.username}/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["like_count"], 1)
+
+        missing = self.client.get("/api/profiles/nobody/")
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("X-Cache", missing)
+
+    def test_cached_profile_answers_if_none_match_without_queries(self):
+        owner = User.objects.create_user(username="etagpro", password="pw123456")
+        Profile.objects.filter(user=owner).update(profile_type=Profile.ProfileType.CONTRACTOR)
+        first = self.client.get(f"/api/profiles/{owner.username}/")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(f"/api/profiles/{owner.username}/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_profile_etag_changes_on_partial_profile_saves(self):
+        owner = User.objects.create_user(username="etaghome", password="pw123456")
+        viewer = User.objects.create_user(username="etagviewer", password="pw123456")
+        profile = Profile.objects.get(user=owner)
+        profile.profile_type = Profile.ProfileType.CONTRACTOR
+        profile.save()
+        self.client.force_authenticate(user=viewer)
+        url = f"/api/profiles/{owner.username}/"
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        profile.display_name = "Renamed Pro"
+        profile.save(update_fields=["display_name"])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_cache_can_be_disabled(self):
+        self.client.get("/api/business-directory/?country_code=US")
+        self.assertNotIn("X-Cache", self.client.get("/api/business-directory/?country_code=US"))
+
+
+@override_settings(REQUEST_PROFILING_SERVER_TIMING=True, REQUEST_SLOW_MS=0, REQUEST_PROFILE_SAMPLE_RATE=0)
+class RequestProfilingTests(TestCase):
+    def test_server_timing_reports_queries_and_external_calls(self):
+        def view(request):
+            list(User.objects.all())
+            list(Profile.objects.all())
+            with external_call("geocoding"):
+                time.sleep(0.01)
+            return HttpResponse("ok")
+
+        response = RequestProfilingMiddleware(view)(RequestFactory().get("/api/example/"))
+
+        timing = response["Server-Timing"]
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="2 queries"', timing)
+        geocoding = next(entry for entry in timing.split(", ") if entry.startswith("geocoding;"))
+        self.assertGreaterEqual(float(geocoding.split("dur=")[1].split(";")[0]), 10)
+
+    def test_external_calls_outside_a_request_are_ignored(self):
+        with external_call("ai"):
+            pass
+        self.assertIsNone(current_profile())
+
+    @override_settings(REQUEST_SLOW_MS=1)
+    def test_slow_requests_are_logged_with_their_breakdown(self):
+        def view(request):
+            time.sleep(0.005)
+            return HttpResponse("ok")
+
+        with self.assertLogs("accounts.profiling", level="WARNING") as logs:
+            RequestProfilingMiddleware(view)(RequestFactory().get("/api/slow/"))
+
+        self.assertIn("Slow request method=GET path=/api/slow/ status=200", logs.output[0])
+        self.assertIn("db_queries=0", logs.output[0])
+
+    def test_sampled_requests_write_a_cprofile_dump(self):
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir, ignore_errors=True)
+
+        with self.settings(REQUEST_PROFILE_SAMPLE_RATE=1, REQUEST_PROFILE_DIR=profile_dir, REQUEST_PROFILE_MAX_FILES=1):
+            middleware = RequestProfilingMiddleware(lambda request: HttpResponse("ok"))
+            middleware(RequestFactory().get("/api/first/"))
+            middleware(RequestFactory().get("/api/profiles/example/"))
+
+        dumps = list(Path(profile_dir).glob("*.prof"))
+        self.assertEqual(len(dumps), 1)
+        self.assertIn("-GET-api-profiles-example-", dumps[0].name)
+        self.assertGreater(pstats.Stats(str(dumps[0])).total_calls, 0)
+
+    @override_settings(EMAIL_DELIVERY_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+    def test_email_sent_through_timed_backend_is_delivered_and_timed(self):
+        def view(request):
+            connection = get_connection("accounts.profiling.TimedEmailBackend")
+            send_mail("Hi", "Body", "from@example.com", ["to@example.com"], connection=connection)
+            return HttpResponse("ok")
+
+        response = RequestProfilingMiddleware(view)(RequestFactory().get("/api/mail/"))
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('email;dur=', response["Server-Timing"])
+
+
+class MetricsTests(APITestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir, ignore_errors=True)
+        override = self.settings(METRICS_DIR=self.metrics_dir, METRICS_FLUSH_SECONDS=0, METRICS_TOKEN="scrape-secret")
+        override.enable()
+        self.addCleanup(override.disable)
+        metrics.registry.reset()
+
+    def test_histogram_renders_cumulative_buckets_sum_and_count(self):
+        registry = metrics.Registry()
+        latency = registry.histogram("job_seconds", "Job time.", ("kind",), buckets=(0.1, 1))
+        jobs = registry.counter("jobs_total", "Jobs.", ("kind",))
+        latency.observe(0.05, kind="a")
+        latency.observe(0.5, kind="a")
+        latency.observe(3, kind="a")
+        jobs.inc(kind="a")
+        jobs.inc(2, kind="a")
+
+        text = registry.render()
+
+        self.assertIn("# TYPE job_seconds histogram", text)
+        self.assertIn('job_seconds_bucket{kind="a",le="0.1"} 1', text)
+        self.assertIn('job_seconds_bucket{kind="a",le="1.0"} 2', text)
+        self.assertIn('job_seconds_bucket{kind="a",le="+Inf"} 3', text)
+        self.assertIn('job_seconds_sum{kind="a"} 3.55', text)
+        self.assertIn('job_seconds_count{kind="a"} 3', text)
+        self.assertIn('jobs_total{kind="a"} 3', text)
+
+    def test_snapshots_from_other_workers_are_merged(self):
+        registry = metrics.Registry()
+        jobs = registry.counter("jobs_total", "Jobs.", ("kind",))
+        busy = registry.gauge("jobs_busy", "Busy jobs.")
+        jobs.inc(kind="a")
+        busy.set(1)
+        exited_pid = 999999
+        snapshot = {
+            "pid": exited_pid,
+            "metrics": {
+                "jobs_total": {"type": "counter", "help": "Jobs.", "labelnames": ["kind"], "samples": [[["a"], 4]]},
+                "jobs_busy": {"type": "gauge", "help": "Busy jobs.", "labelnames": [], "samples": [[[], 7]]},
+            },
+        }
+        Path(self.metrics_dir, f"metrics-{exited_pid}.json").write_text(json.dumps(snapshot))
+
+        with patch("accounts.metrics._pid_alive", return_value=False):
+            text = registry.render()
+
+        # Counters from a worker that exited still count; its gauges don't.
+        self.assertIn('jobs_total{kind="a"} 5', text)
+        self.assertIn("jobs_busy 1", text)
+
+    def test_endpoint_requires_admin_or_scrape_token(self):
+        user = User.objects.create_user(username="metricsuser", password="pw12345678")
+        admin = User.objects.create_user(
+            username="metricsadmin", password="pw12345678", is_staff=True, is_superuser=True
+        )
+
+        self.assertIn(self.client.get("/metrics").status_code, (401, 403))
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(None)
+        self.assertIn(
+            self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, (401, 403)
+        )
+
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.client.force_authenticate(admin)
+        self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_200_OK)
+
+    def test_endpoint_reports_request_latency_and_media_backlog(self):
+        owner = User.objects.create_user(username="metricsowner", password="pw12345678")
+        project = Project.objects.create(owner=owner, title="Metrics", summary="")
+        ProjectImage.objects.bulk_create(
+            [ProjectImage(project=project, image="project_images/stuck.mp4", processing_status=ProjectImage.STATUS_FAILED)]
+        )
+        self.client.get("/api/business-directory/")
+
+        text = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-secret").content.decode()
+
+        self.assertIn('http_request_duration_seconds_count{route="api/business-directory/",method="GET",status="2xx"} 1', text)
+        self.assertIn('project_media_processing{status="failed"} 1', text)
+        self.assertIn("pending_file_deletions 0", text)
+
+
 @override_settings(
     EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
     AI_ENABLED=True,
     OPENAI_API_KEY="test-key",
 )
+class ReplicaRoutingTests(APITransactionTestCase):
+    # The test "replica" mirrors the default database, so rows are visible on both.
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="replica-user", email="replica@example.com", password="pass12345")
+        self.listing = BusinessDirectoryListing.objects.create(
+            business_name="Replica Roofing",
+            location="Media, PA",
+            country_code="US",
+            is_published=True,
+        )
+
+    def get_counting(self, path, **extra):
+        with CaptureQueriesContext(connections["default"]) as primary:
+            with CaptureQueriesContext(connections["replica"]) as replica:
+                response = self.client.get(path, **extra)
+        return response, len(primary), len(replica)
+
+    def test_opted_in_get_reads_from_replica(self):
+        response, primary, replica = self.get_counting("/api/business-directory/?country_code=US")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["business_name"] for row in response.data], ["Replica Roofing"])
+        self.assertGreater(replica, 0)
+        self.assertEqual(primary, 0)
+        self.assertNotIn(db_routing.pin_cookie_name(), response.cookies)
+
+    def test_viewset_reads_from_replica_only_for_listed_actions(self):
+        _, _, replica = self.get_counting("/api/projects/job-postings/")
+        self.assertGreater(replica, 0)
+
+        self.client.force_authenticate(self.user)
+        _, primary, replica = self.get_counting("/api/projects/mine/")
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+
+    def test_write_pins_client_to_primary_for_sticky_window(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(f"/api/business-directory/{self.listing.pk}/like/")
+        self.assertLess(response.status_code, 400)
+        cookie = response.cookies[db_routing.pin_cookie_name()]
+        self.assertGreater(float(cookie.value), time.time())
+
+        response, primary, replica = self.get_counting("/api/business-directory/?country_code=US")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica, 0)
+        self.assertTrue(response.data[0]["liked_by_me"])
+
+        self.client.cookies[db_routing.pin_cookie_name()] = f"{time.time() - 1:.3f}"
+        _, _, replica = self.get_counting("/api/business-directory/?country_code=US")
+        self.assertGreater(replica, 0)
+
+    def test_reads_outside_requests_and_writes_use_primary(self):
+        router = db_routing.PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(BusinessDirectoryListing), "default")
+        self.assertEqual(router.db_for_write(BusinessDirectoryListing), "default")
+        self.assertIs(router.allow_migrate("replica", "accounts"), False)
+
+
+class FakePooledConnection:
+    def __init__(self):
+        self.closed = 0
+        self.rolled_back = 0
+        self.info = type("Info", (), {"transaction_status": 0})()
+        self.broken = False
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        self.rolled_back += 1
+        self.info.transaction_status = 0
+
+
+class ConnectionPoolTests(TestCase):
+    def make_pool(self, **kwargs):
+        from backend.pooled_postgresql.pool import ConnectionPool
+
+        def check(conn):
+            if conn.broken:
+                raise RuntimeError("server closed the connection")
+
+        return ConnectionPool(FakePooledConnection, health_check=check, **kwargs)
+
+    def test_released_connections_are_reused(self):
+        pool = self.make_pool(max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        self.assertEqual(pool.stats()["opened"], 1)
+        self.assertEqual(pool.stats()["reused"], 1)
+
+    def test_open_transactions_are_rolled_back_and_lost_connections_discarded(self):
+        pool = self.make_pool(max_size=2)
+        in_transaction, lost = pool.acquire(), pool.acquire()
+        in_transaction.info.transaction_status = 2
+        lost.info.transaction_status = 4
+        pool.release(in_transaction)
+        pool.release(lost)
+
+        self.assertEqual(in_transaction.rolled_back, 1)
+        self.assertEqual(lost.closed, 1)
+        self.assertEqual(pool.stats()["idle"], 1)
+        self.assertEqual(pool.stats()["size"], 1)
+
+    def test_unhealthy_idle_connection_is_replaced(self):
+        pool = self.make_pool(max_size=1)
+        conn = pool.acquire()
+        pool.release(conn)
+        conn.broken = True
+
+        with self.assertLogs("backend.pooled_postgresql.pool", level="INFO"):
+            replacement = pool.acquire()
+        self.assertIsNot(replacement, conn)
+        self.assertEqual(conn.closed, 1)
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+    def test_acquire_waits_for_a_free_slot_then_times_out(self):
+        from backend.pooled_postgresql.pool import PoolTimeout
+
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        conn = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+        threading.Timer(0.02, pool.release, args=(conn,)).start()
+        pool.timeout = 2
+        self.assertIs(pool.acquire(), conn)
+
+    def test_expired_connections_are_closed_on_release(self):
+        pool = self.make_pool(max_size=1, max_lifetime=0.01)
+        conn = pool.acquire()
+        time.sleep(0.02)
+        pool.release(conn)
+        self.assertEqual(conn.closed, 1)
+        self.assertEqual(pool.stats()["size"], 0)
+
+
+class DatabaseSelfCheckTests(TestCase):
+    def test_logs_effective_settings_and_warns_over_connection_budget(self):
+        from backend import db_self_check
+
+        with patch.dict("os.environ", {"WEB_CONCURRENCY": "8"}), override_settings(DATABASE_MAX_CONNECTIONS=4):
+            with self.assertLogs("backend.db_self_check", level="INFO") as logs:
+                (default,) = db_self_check.run(["default"])
+
+        self.assertTrue(default["ok"])
+        self.assertEqual(default["workers"], 8)
+        self.assertIn("Database settings alias=default", logs.output[0])
+        self.assertTrue(any("budget=8 limit=4" in line for line in logs.output))
+
+    @override_settings(DATABASE_SELF_CHECK=False)
+    def test_can_be_disabled(self):
+        from backend import db_self_check
+
+        self.assertEqual(db_self_check.run(), [])
+
+
+@skipUnless(connections["default"].vendor == "sqlite", "SQLite tuning only applies to USE_SQLITE deployments.")
+class SQLiteTuningTests(TestCase):
+    def test_new_connections_apply_configured_pragmas(self):
+        with connections["default"].cursor() as cursor:
+            pragmas = {
+                name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in ("synchronous", "busy_timeout", "cache_size", "temp_store")
+            }
+        self.assertEqual(pragmas, {"synchronous": 1, "busy_timeout": 5000, "cache_size": -20000, "temp_store": 2})
+
+    def test_pragma_values_are_validated(self):
+        from django.core.exceptions import ImproperlyConfigured
+
+        from backend.tuned_sqlite.base import begin_statement, pragma_statements
+
+        self.assertEqual(
+            pragma_statements({"temp_store": "memory", "journal_mode": "wal", "cache_size": -2000}),
+            ["PRAGMA journal_mode = wal", "PRAGMA cache_size = -2000", "PRAGMA temp_store = memory"],
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            pragma_statements({"journal_mode": "wal; DROP TABLE auth_user"})
+        self.assertEqual(begin_statement("immediate"), "BEGIN IMMEDIATE")
+        self.assertEqual(begin_statement(""), "BEGIN")
+        with self.assertRaises(ImproperlyConfigured):
+            begin_statement("eventually")
+
+    def test_write_benchmark_reports_serialized_writers_without_lock_errors(self):
+        out = StringIO()
+        call_command(
+            "benchmark_sqlite_writes", "--writers", "3", "--transactions", "20", "--mode", "tuned_serialized", stdout=out
+        )
+        (mode,) = json.loads(out.getvalue())["modes"]
+        self.assertEqual(mode["committed"], 60)
+        self.assertEqual(mode["locked_errors"], 0)
+        self.assertEqual(mode["pragmas"]["journal_mode"], "wal")
+
+
+@override_settings(OPENAI_API_KEY="test-key", OPENAI_MAX_RETRIES=0)
+class AsyncViewTests(TestCase):
+    def test_provider_bound_routes_are_async_and_the_rest_stay_sync(self):
+        from asgiref.sync import iscoroutinefunction
+
+        for path in ("/api/ai/assist/", "/api/business-directory/", "/api/project-plans/1/ai/"):
+            self.assertTrue(iscoroutinefunction(resolve(path).func), path)
+        for path in ("/api/project-plans/", "/api/users/me/"):
+            self.assertFalse(iscoroutinefunction(resolve(path).func), path)
+
+    def test_route_mixing_sync_and_async_handlers_is_rejected(self):
+        from django.core.exceptions import ImproperlyConfigured
+        from rest_framework import viewsets
+
+        from .async_views import AsyncAPIViewMixin
+
+        class MixedViewSet(AsyncAPIViewMixin, viewsets.ViewSet):
+            def list(self, request):
+                pass
+
+            async def create(self, request):
+                pass
+
+        with self.assertRaises(ImproperlyConfigured):
+            MixedViewSet.as_view({"get": "list", "post": "create"})
+
+    def test_release_connections_keeps_connections_inside_transactions(self):
+        from .async_views import release_connections
+
+        connection = connections["default"]
+        connection.ensure_connection()
+        release_connections()
+        # TestCase wraps each test in a transaction; closing it would lose the test's data.
+        self.assertIsNotNone(connection.connection)
+
+    def test_slow_provider_calls_overlap_on_one_event_loop(self):
+        import asyncio
+
+        from .management.commands.benchmark_slow_provider import SlowProvider
+
+        async def burst():
+            return await asyncio.gather(
+                *(
+                    agenerate_text(feature="project_summary", system_prompt="sys", user_prompt=f"prompt {index}")
+                    for index in range(5)
+                )
+            )
+
+        with SlowProvider(0.3) as provider, self.settings(OPENAI_API_BASE_URL=f"{provider.url}/v1"), patch(
+            "accounts.ai._async_http_client_enabled", True
+        ):
+            started = time.perf_counter()
+            results = async_to_sync(burst)()
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual({result["text"] for result in results}, {"Benchmark reply."})
+        # Serially this would take 1.5 s.
+        self.assertLess(elapsed, 1.2)
+
+    def test_slow_provider_benchmark_needs_a_shared_database(self):
+        with self.assertRaisesMessage(CommandError, "shared database"):
+            call_command("benchmark_slow_provider", stdout=StringIO())
+
+
 class AccountSecurityTests(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -1159,7 +2139,7 @@ class BusinessDirectoryListingTests(APITestCase):
         self.assertEqual(canada_response.status_code, status.HTTP_200_OK)
         self.assertEqual([item["id"] for item in canada_response.data], [canada_listing.id])
 
-    @patch("accounts.views.geocode_with_google_maps")
+    @patch("accounts.views.ageocode_with_google_maps")
     def test_public_listing_endpoint_uses_typed_origin_location(self, geocode_mock):
         geocode_mock.return_value = GeocodeResult(
             lat=43.8828,
@@ -1192,7 +2172,7 @@ class BusinessDirectoryListingTests(APITestCase):
         self.assertIsNotNone(response.data[0]["distance_miles"])
         geocode_mock.assert_called_once_with("Richmond Hill, ON")
 
-    @patch("accounts.views.geocode_with_google_maps")
+    @patch("accounts.views.ageocode_with_google_maps")
     def test_public_listing_endpoint_falls_back_to_text_location_when_origin_geocode_fails(self, geocode_mock):
         geocode_mock.side_effect = GeocodingError("No result")
         BusinessDirectoryListing.objects.create(
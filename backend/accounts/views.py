@@ -1,16 +1,19 @@
 # backend/accounts/views.py
+import hmac
 import logging
 import re
 from decimal import Decimal
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Q, Sum
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, Sum
 from django.db import transaction
 from django.db.utils import DatabaseError, OperationalError
 from django.core.mail import get_connection, send_mail
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
@@ -19,18 +22,40 @@ from django.utils import timezone
 from djoser import signals
 from djoser.views import UserViewSet as DjoserUserViewSet
 from rest_framework import status
+from rest_framework.authentication import BaseAuthentication, SessionAuthentication
 from rest_framework.exceptions import APIException, PermissionDenied, ValidationError
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-
-from .ai import AIServiceError, generate_text
-from .geocoding import GeocodingError, geocode_with_google_maps
-from .geo_distance import filter_by_country, get_request_country_code, get_request_origin, localized_distance_sort, sort_by_distance
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import metrics
+from .ai import AIServiceError, agenerate_text, stream_text
+from .async_views import AsyncAPIViewMixin, database_sync_to_async
+from .geocoding import GeocodingError, ageocode_with_google_maps
+from .conditional import latest_timestamp, not_modified, set_validators, viewer_marker, weak_etag
+from .geo_distance import (
+    filter_by_country,
+    get_request_country_code,
+    get_request_origin,
+    infer_country_code_from_request_headers,
+    localized_distance_sort,
+    sort_by_distance,
+)
+from .response_cache import (
+    DIRECTORY_TAG,
+    REFERENCE_GALLERY_TAG,
+    acached_anonymous_response,
+    cached_anonymous_response,
+    listing_tag,
+    profile_tag,
+)
+from .streaming import event_stream_response, sse_event, wants_event_stream
 from .models import (
     AIConfiguration,
     AIUsageEvent,
+    AIUsageMonthlyRollup,
     BusinessDirectoryListing,
     BusinessDirectoryListingLike,
     HomeownerReferenceImage,
@@ -40,6 +65,7 @@ from .models import (
     DeletedEmailBlocklist,
     get_ai_remaining_today_for_user,
     record_ai_usage_event,
+    user_can_access_admin,
 )
 from .serializers import (
     AIAssistSerializer,
@@ -56,11 +82,14 @@ from .serializers import (
     SavedProfileCardSerializer,
     ContractorSearchResultSerializer,
     ReportCreateSerializer,
+    public_reference_images,
 )
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+METRICS_TOKEN_AUTH = "metrics-token"
+
 
 def format_ai_usd(value):
     return str(Decimal(value or 0).quantize(Decimal("0.000001")))
@@ -203,7 +232,7 @@ class SafeUserCreateViewSet(DjoserUserViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
-class AIAssistView(APIView):
+class AIAssistView(AsyncAPIViewMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def _get_profile(self, request):
@@ -321,12 +350,7 @@ class AIAssistView(APIView):
         )
         return system, user
 
-    def post(self, request, *args, **kwargs):
-        serializer = AIAssistSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        data = serializer.validated_data
-        feature = data["feature"]
-
+    def _check_access(self, request, feature):
         profile = self._get_profile(request)
         config = self._get_config()
 
@@ -336,8 +360,15 @@ class AIAssistView(APIView):
             raise PermissionDenied("This AI helper is currently turned off.")
 
         self._feature_allowed(profile, feature)
+        return profile, config, self._remaining_today(request, config)
+
+    async def post(self, request, *args, **kwargs):
+        serializer = AIAssistSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        feature = data["feature"]
 
-        remaining_before = self._remaining_today(request, config)
+        profile, config, remaining_before = await database_sync_to_async(self._check_access)(request, feature)
         if remaining_before <= 0:
             return Response(
                 {"detail": "You have reached your AI helper limit for today.", "remaining_today": 0},
@@ -345,19 +376,70 @@ class AIAssistView(APIView):
             )
 
         system_prompt, user_prompt = self._build_prompts(feature, data, profile)
-        model_name = ""
+        if wants_event_stream(request):
+            return event_stream_response(
+                request,
+                self._stream_events(request, config, feature, system_prompt, user_prompt),
+            )
+
         try:
-            result = generate_text(
+            result = await agenerate_text(
                 feature=feature,
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
+                use_cache=True,
+            )
+        except AIServiceError as exc:
+            await database_sync_to_async(record_ai_usage_event)(
+                user=request.user,
+                feature=feature,
+                model_name="",
+                status_value=AIUsageEvent.Status.ERROR,
+                prompt_chars=len(system_prompt) + len(user_prompt),
+                response_chars=0,
             )
+            return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
+
+        model_name = result["model"]
+        await database_sync_to_async(record_ai_usage_event)(
+            user=request.user,
+            feature=feature,
+            model_name=model_name,
+            status_value=AIUsageEvent.Status.CACHED if result.get("cached") else AIUsageEvent.Status.SUCCESS,
+            prompt_chars=len(system_prompt) + len(user_prompt),
+            response_chars=len(result["text"]),
+            usage=result.get("usage"),
+        )
+        remaining_after = await database_sync_to_async(self._remaining_today)(request, config)
+        return Response(
+            {
+                "text": result["text"],
+                "model": model_name,
+                "remaining_today": remaining_after,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def _stream_events(self, request, config, feature, system_prompt, user_prompt):
+        model_name = ""
+        result = None
+        try:
+            for chunk in stream_text(
+                feature=feature,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                use_cache=True,
+            ):
+                if chunk["type"] == "delta":
+                    yield sse_event("delta", {"text": chunk["text"]})
+                else:
+                    result = chunk
             model_name = result["model"]
             record_ai_usage_event(
                 user=request.user,
                 feature=feature,
                 model_name=model_name,
-                status_value=AIUsageEvent.Status.SUCCESS,
+                status_value=AIUsageEvent.Status.CACHED if result.get("cached") else AIUsageEvent.Status.SUCCESS,
                 prompt_chars=len(system_prompt) + len(user_prompt),
                 response_chars=len(result["text"]),
                 usage=result.get("usage"),
@@ -371,16 +453,16 @@ class AIAssistView(APIView):
                 prompt_chars=len(system_prompt) + len(user_prompt),
                 response_chars=0,
             )
-            return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
+            yield sse_event("error", {"detail": str(exc)})
+            return
 
-        remaining_after = self._remaining_today(request, config)
-        return Response(
+        yield sse_event(
+            "done",
             {
                 "text": result["text"],
                 "model": model_name,
-                "remaining_today": remaining_after,
+                "remaining_today": self._remaining_today(request, config),
             },
-            status=status.HTTP_200_OK,
         )
 
 
@@ -392,12 +474,11 @@ class AIUsageSummaryView(APIView):
         remaining_today, daily_limit = get_ai_remaining_today_for_user(request.user, config=config)
         today = timezone.localdate()
         period_start = today.replace(day=1)
-        successful_events = AIUsageEvent.objects.filter(
+        totals = AIUsageMonthlyRollup.objects.filter(
             user=request.user,
-            status=AIUsageEvent.Status.SUCCESS,
-            request_day__gte=period_start,
-        )
-        totals = successful_events.aggregate(
+            month=period_start,
+        ).aggregate(
+            successful_actions=Sum("success_count"),
             input_tokens=Sum("input_tokens"),
             output_tokens=Sum("output_tokens"),
             provider_cost_usd=Sum("provider_cost_usd"),
@@ -413,7 +494,7 @@ class AIUsageSummaryView(APIView):
                 "daily_limit": daily_limit,
                 "period_start": period_start.isoformat(),
                 "month": {
-                    "successful_actions": successful_events.count(),
+                    "successful_actions": totals["successful_actions"] or 0,
                     "input_tokens": totals["input_tokens"] or 0,
                     "output_tokens": totals["output_tokens"] or 0,
                     "provider_cost_usd": format_ai_usd(totals["provider_cost_usd"]),
@@ -749,6 +830,7 @@ class PublicProfileView(APIView):
     GET /api/profiles/<username>/
     """
     permission_classes = [AllowAny]
+    read_from_replica = True
 
     def _homeowner_publicly_visible(self, profile):
         return profile.public_profile_enabled or profile.user.projects.filter(
@@ -757,6 +839,13 @@ class PublicProfileView(APIView):
         ).exists()
 
     def get(self, request, username, *args, **kwargs):
+        return cached_anonymous_response(
+            request,
+            "public-profile",
+            lambda: self._build(request, username),
+        )
+
+    def _build(self, request, username):
         user = get_object_or_404(User, username=username)
         profile, _ = Profile.objects.get_or_create(user=user)
 
@@ -765,16 +854,45 @@ class PublicProfileView(APIView):
             and (request.user.is_staff or request.user.id == user.id)
         )
         if (profile.is_frozen or profile.is_deactivated) and not can_view_frozen:
-            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND), ()
         if (
             profile.profile_type == Profile.ProfileType.HOMEOWNER
             and not can_view_frozen
             and not self._homeowner_publicly_visible(profile)
         ):
-            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
-
-        serializer = PublicUserProfileSerializer(profile, context={"request": request})
-        return Response(serializer.data)
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND), ()
+
+        etag, last_modified = self._validators(request, profile)
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            serializer = PublicUserProfileSerializer(profile, context={"request": request})
+            response = set_validators(Response(serializer.data), etag, last_modified)
+        return response, [profile_tag(user.id)]
+
+    def _validators(self, request, profile):
+        viewer = viewer_marker(request)
+        likes = ProfileLike.objects.filter(liked_user_id=profile.user_id).aggregate(
+            total=Count("id"),
+            mine=Count("id", filter=Q(liker_id=viewer)),
+        )
+        saved = viewer is not None and ProfileSave.objects.filter(saver_id=viewer, saved_user_id=profile.user_id).exists()
+        gallery = list(
+            HomeownerReferenceImage.objects.filter(user_id=profile.user_id, is_public=True)
+            .order_by("id")
+            .values_list("id", "order", "caption", "image", "created_at")
+        )
+        etag = weak_etag(
+            "profile",
+            profile.pk,
+            profile.updated_at,
+            profile.user.username,
+            viewer,
+            likes["total"],
+            likes["mine"],
+            saved,
+            [row[:4] for row in gallery],
+        )
+        return etag, latest_timestamp(profile.updated_at, *(row[4] for row in gallery))
 
 
 class HomeownerReferenceGalleryView(APIView):
@@ -806,8 +924,16 @@ class HomeownerReferenceGalleryView(APIView):
 
 class PublicHomeownerReferenceGalleryListView(APIView):
     permission_classes = [AllowAny]
+    read_from_replica = True
 
     def get(self, request, *args, **kwargs):
+        return cached_anonymous_response(
+            request,
+            "reference-gallery",
+            lambda: self._build(request),
+        )
+
+    def _build(self, request):
         qs = (
             Profile.objects
             .filter(
@@ -819,15 +945,24 @@ class PublicHomeownerReferenceGalleryListView(APIView):
                 user__homeowner_reference_images__is_public=True,
             )
             .select_related("user")
+            .prefetch_related(
+                Prefetch(
+                    "user__homeowner_reference_images",
+                    queryset=public_reference_images(HomeownerReferenceImage.objects.all()),
+                    to_attr="public_reference_images",
+                )
+            )
             .distinct()
             .order_by("display_name", "user__username")
         )
+        profiles = list(qs)
         serializer = PublicHomeownerReferenceGallerySerializer(
-            qs,
+            profiles,
             many=True,
             context={"request": request},
         )
-        return Response(serializer.data)
+        tags = [REFERENCE_GALLERY_TAG, *(profile_tag(profile.user_id) for profile in profiles)]
+        return Response(serializer.data), tags
 
 
 class HomeownerReferenceGalleryItemView(APIView):
@@ -961,31 +1096,69 @@ class ContractorSearchView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class BusinessDirectoryListingView(APIView):
+def with_listing_like_data(queryset, user):
+    """Annotate what BusinessDirectoryListingSerializer reads per row."""
+    queryset = queryset.annotate(like_count=Count("likes", distinct=True))
+    if getattr(user, "is_authenticated", False):
+        queryset = queryset.annotate(
+            liked_by_me=Exists(BusinessDirectoryListingLike.objects.filter(listing=OuterRef("pk"), liker=user))
+        )
+    return queryset
+
+
+class BusinessDirectoryListingView(AsyncAPIViewMixin, APIView):
     permission_classes = [AllowAny]
+    read_from_replica = True
+
+    async def get(self, request):
+        return await acached_anonymous_response(
+            request,
+            "directory",
+            lambda: self._abuild(request),
+            params=(
+                "origin_location",
+                "location_query",
+                "lat",
+                "lng",
+                "location_lat",
+                "location_lng",
+                "country_code",
+                "country",
+            ),
+            # Without explicit params the country falls back to CDN headers.
+            vary=(infer_country_code_from_request_headers(request),),
+        )
 
-    def get(self, request):
+    async def _abuild(self, request):
         origin_location = str(
             request.query_params.get("origin_location")
             or request.query_params.get("location_query")
             or ""
         ).strip()
-        listings = BusinessDirectoryListing.objects.filter(
-            is_published=True,
-            is_removed=False,
-        ).order_by("business_name", "id")
-        origin = get_request_origin(request)
-        origin_country_code = ""
-        origin_location_geocode_failed = False
+        geocoded = None
         if origin_location:
             try:
-                result = geocode_with_google_maps(origin_location)
-                origin = (result.lat, result.lng)
-                origin_country_code = result.country_code
+                geocoded = await ageocode_with_google_maps(origin_location)
             except GeocodingError:
-                origin_location_geocode_failed = True
                 logger.info("Could not geocode directory origin_location=%s", origin_location)
-                listings = listings.filter(location__icontains=origin_location)
+        return await database_sync_to_async(self._build)(request, origin_location, geocoded)
+
+    def _build(self, request, origin_location, geocoded):
+        listings = with_listing_like_data(
+            BusinessDirectoryListing.objects.filter(
+                is_published=True,
+                is_removed=False,
+            ),
+            request.user,
+        ).order_by("business_name", "id")
+        origin = get_request_origin(request)
+        origin_country_code = ""
+        origin_location_geocode_failed = bool(origin_location) and geocoded is None
+        if geocoded is not None:
+            origin = (geocoded.lat, geocoded.lng)
+            origin_country_code = geocoded.country_code
+        elif origin_location_geocode_failed:
+            listings = listings.filter(location__icontains=origin_location)
         origin_country_code = origin_country_code or get_request_country_code(request, origin)
         if not origin_country_code and not origin_location_geocode_failed:
             origin_country_code = "US"
@@ -1009,14 +1182,19 @@ class BusinessDirectoryListingView(APIView):
                 country_getter,
                 fallback_key,
             )
+        listings = list(listings)
         serializer = BusinessDirectoryListingSerializer(
             listings,
             many=True,
             context={"request": request, "distance_lookup": distance_lookup},
         )
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        tags = [DIRECTORY_TAG, *(listing_tag(listing.pk) for listing in listings)]
+        return Response(serializer.data, status=status.HTTP_200_OK), tags
 
-    def post(self, request):
+    async def post(self, request):
+        return await database_sync_to_async(self._submit)(request)
+
+    def _submit(self, request):
         serializer = BusinessDirectoryListingSerializer(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
         listing = serializer.save(is_published=False, is_removed=False)
@@ -1135,10 +1313,13 @@ class LikedProfilesView(APIView):
             .filter(liker=request.user)
             .values_list("listing_id", flat=True)
         )
-        directory_qs = BusinessDirectoryListing.objects.filter(
-            id__in=list(directory_listing_ids),
-            is_published=True,
-            is_removed=False,
+        directory_qs = with_listing_like_data(
+            BusinessDirectoryListing.objects.filter(
+                id__in=list(directory_listing_ids),
+                is_published=True,
+                is_removed=False,
+            ),
+            request.user,
         )
         directory_cards = [
             {
@@ -1221,3 +1402,29 @@ class ReportCreateView(APIView):
             },
             status=status.HTTP_201_CREATED,
         )
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """Lets a scraper authenticate with ``Authorization: Bearer <METRICS_TOKEN>``."""
+
+    def authenticate(self, request):
+        expected = str(getattr(settings, "METRICS_TOKEN", "") or "")
+        header = request.META.get("HTTP_AUTHORIZATION", "")
+        scheme, _, token = header.partition(" ")
+        if expected and scheme.lower() == "bearer" and hmac.compare_digest(token.strip(), expected):
+            return AnonymousUser(), METRICS_TOKEN_AUTH
+        return None
+
+
+class MetricsView(APIView):
+    """
+    Prometheus text exposition for all workers (see accounts/metrics.py).
+    GET /metrics — admin users (session or JWT) or the METRICS_TOKEN bearer.
+    """
+    authentication_classes = [MetricsTokenAuthentication, JWTAuthentication, SessionAuthentication]
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        if request.auth != METRICS_TOKEN_AUTH and not user_can_access_admin(request.user):
+            raise PermissionDenied("Metrics are restricted to admins.")
+        return HttpResponse(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 
 class BidsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "apps.bids"
\ No newline at end of file
+    name = "apps.bids"
+
+    def ready(self):
+        from . import signals  # noqa
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bids', '0004_backfill_bid_metadata'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['project', 'status'], name='bid_project_status_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bids', '0005_bid_project_status_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bid',
+            name='attachment',
+            field=models.FileField(blank=True, db_index=True, null=True, upload_to='bid_attachments/'),
+        ),
+    ]
@@ -52,7 +52,7 @@ class Bid(models.Model):
     excluded_text = models.TextField(blank=True, default="")
     payment_terms = models.TextField(blank=True, default="")
     valid_until = models.DateField(null=True, blank=True)
-    attachment = models.FileField(upload_to="bid_attachments/", blank=True, null=True)
+    attachment = models.FileField(upload_to="bid_attachments/", blank=True, null=True, db_index=True)
     message = models.TextField(blank=True, default="")
 
     status = models.CharField(
@@ -81,6 +81,7 @@ class Bid(models.Model):
                 name="unique_bid_per_project_per_contractor",
             )
         ]
+        indexes = [models.Index(fields=["project", "status"], name="bid_project_status_idx")]
 
     def __str__(self):
         return f"Bid {self.id} for project {self.project_id}"
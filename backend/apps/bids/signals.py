@@ -0,0 +1,20 @@
+# apps/bids/signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from accounts import metrics
+
+from .models import Bid
+
+
+@receiver(post_save, sender=Bid)
+def count_bid_event(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        metrics.BID_EVENTS.inc(event="submitted")
+    elif update_fields is None:
+        # Full saves come from the contractor editing or resubmitting the bid.
+        metrics.BID_EVENTS.inc(event="revised")
+    elif "status" in update_fields:
+        metrics.BID_EVENTS.inc(event=instance.status)
@@ -8,6 +8,7 @@ from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 
+from accounts import metrics
 from portfolio.models import MessageThread, PrivateMessage, Project
 from portfolio.access import can_access_job_interactions, can_view_project
 
@@ -187,9 +188,12 @@ class BidViewSet(viewsets.ModelViewSet):
             thread.updated_at = timezone.now()
             thread.save(update_fields=["updated_at"])
 
-            Bid.objects.filter(project=bid.project).exclude(pk=bid.pk).exclude(
-                status=Bid.STATUS_WITHDRAWN
+            declined = Bid.objects.filter(project=bid.project).exclude(pk=bid.pk).exclude(
+                status__in=(Bid.STATUS_WITHDRAWN, Bid.STATUS_DECLINED)
             ).update(status=Bid.STATUS_DECLINED)
+            if declined:
+                # Bulk update: post_save doesn't see these.
+                metrics.BID_EVENTS.inc(declined, event=Bid.STATUS_DECLINED)
 
         serializer = self.get_serializer(bid)
         return Response(serializer.data)
@@ -1,4 +1,31 @@
 import os
 from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    """
+    Django's ASGI app plus the lifespan protocol, which Django ignores.
+
+    Each uvicorn worker runs one event loop for its whole life, so startup
+    turns on the pooled async AI client and shutdown closes it on that loop.
+    """
+    if scope["type"] != "lifespan":
+        return await django_application(scope, receive, send)
+
+    from accounts.ai import aclose_ai_http_client, enable_async_http_client
+
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            enable_async_http_client()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await aclose_ai_http_client()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+from backend import db_self_check  # noqa: E402  (needs the configured app registry)
+
+db_self_check.run()
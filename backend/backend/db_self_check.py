@@ -0,0 +1,94 @@
+# backend/backend/db_self_check.py
+"""
+Startup self-check for database connections, run once per worker process
+from wsgi.py/asgi.py (DATABASE_SELF_CHECK).
+
+Logs the effective settings per alias (engine, pool size and timeout,
+CONN_MAX_AGE, CONN_HEALTH_CHECKS), times one connect-and-ping, and warns
+when workers x pool size could exceed DATABASE_MAX_CONNECTIONS. It never
+raises: a database that is briefly unreachable during a deploy must not
+stop the worker from booting.
+"""
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def worker_count():
+    for name in ("GUNICORN_WORKERS", "WEB_CONCURRENCY"):
+        try:
+            return max(int(os.environ[name]), 1)
+        except (KeyError, ValueError):
+            continue
+    return 1
+
+
+def effective_settings(alias):
+    settings_dict = connections[alias].settings_dict
+    pool = settings_dict.get("POOL") or {}
+    return {
+        "engine": settings_dict["ENGINE"],
+        "pooled": bool(pool),
+        "pool_max_size": pool.get("MAX_SIZE"),
+        "pool_timeout": pool.get("TIMEOUT"),
+        "pool_max_lifetime": pool.get("MAX_LIFETIME"),
+        "conn_max_age": settings_dict.get("CONN_MAX_AGE"),
+        "conn_health_checks": settings_dict.get("CONN_HEALTH_CHECKS"),
+    }
+
+
+def run(aliases=None):
+    if not getattr(settings, "DATABASE_SELF_CHECK", True):
+        return []
+    workers = worker_count()
+    limit = int(getattr(settings, "DATABASE_MAX_CONNECTIONS", 0) or 0)
+    reports = []
+    for alias in aliases or connections:
+        report = {"alias": alias, "workers": workers, **effective_settings(alias)}
+        # Without a pool, a sync worker holds one persistent connection per alias.
+        report["max_connections_per_worker"] = report["pool_max_size"] or 1
+        started = time.perf_counter()
+        try:
+            connection = connections[alias]
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            report["connect_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            if not connection.in_atomic_block:
+                # Hands a pooled connection back; the next request reuses it.
+                connection.close()
+            report["ok"] = True
+        except Exception as exc:
+            report["ok"] = False
+            logger.warning("Database self-check failed alias=%s error=%s", alias, exc)
+        logger.info(
+            "Database settings alias=%s engine=%s pooled=%s pool_max_size=%s pool_timeout=%s "
+            "conn_max_age=%s conn_health_checks=%s workers=%s connect_ms=%s ok=%s",
+            alias,
+            report["engine"],
+            report["pooled"],
+            report["pool_max_size"],
+            report["pool_timeout"],
+            report["conn_max_age"],
+            report["conn_health_checks"],
+            workers,
+            report.get("connect_ms"),
+            report["ok"],
+        )
+        budget = workers * report["max_connections_per_worker"]
+        if limit and budget > limit:
+            logger.warning(
+                "Database connection budget exceeds the server limit alias=%s workers=%s per_worker=%s "
+                "budget=%s limit=%s",
+                alias,
+                workers,
+                report["max_connections_per_worker"],
+                budget,
+                limit,
+            )
+        reports.append(report)
+    return reports
@@ -0,0 +1,9 @@
+"""
+PostgreSQL engine with a per-process connection pool.
+
+Django 5.0 has no native pool (OPTIONS["pool"] arrived in 5.1 with
+psycopg 3), so settings.py swaps ENGINE to ``backend.pooled_postgresql``
+when DATABASE_POOL_ENABLED is on. Django still closes the connection at
+the end of every request (CONN_MAX_AGE=0); closing hands it back to the
+pool instead of tearing down the socket.
+"""
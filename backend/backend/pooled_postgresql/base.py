@@ -0,0 +1,78 @@
+# backend/backend/pooled_postgresql/base.py
+import os
+import threading
+
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.db.utils import OperationalError
+
+from .pool import ConnectionPool, PoolTimeout
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_settings(settings_dict):
+    pool = settings_dict.get("POOL") or {}
+    return {
+        "max_size": int(pool.get("MAX_SIZE", 4)),
+        "timeout": float(pool.get("TIMEOUT", 10)),
+        "max_lifetime": float(pool.get("MAX_LIFETIME", 1800)),
+        "health_checks": bool(settings_dict.get("CONN_HEALTH_CHECKS", True)),
+    }
+
+
+def _ping(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    # The ping opened a transaction unless the connection is in autocommit.
+    if not conn.autocommit:
+        conn.rollback()
+
+
+def get_pool(alias, settings_dict, connect):
+    """The pool for ``alias`` in this process (pools never cross a fork)."""
+    key = (os.getpid(), alias)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            options = pool_settings(settings_dict)
+            pool = ConnectionPool(
+                connect,
+                max_size=options["max_size"],
+                timeout=options["timeout"],
+                max_lifetime=options["max_lifetime"],
+                health_check=_ping if options["health_checks"] else None,
+                name=alias,
+            )
+            _pools[key] = pool
+        return pool
+
+
+def pool_stats():
+    pid = os.getpid()
+    with _pools_lock:
+        return {alias: pool.stats() for (owner, alias), pool in _pools.items() if owner == pid}
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    def _pool(self, conn_params=None):
+        connect = lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)  # noqa: E731
+        return get_pool(self.alias, self.settings_dict, connect)
+
+    def get_new_connection(self, conn_params):
+        pool = self._pool(conn_params)
+        # A fresh connection goes through the parent's get_new_connection,
+        # which also sets isolation_level; a reused one needs it set here.
+        self.isolation_level = IsolationLevel(
+            self.settings_dict["OPTIONS"].get("isolation_level", IsolationLevel.READ_COMMITTED)
+        )
+        try:
+            return pool.acquire()
+        except PoolTimeout as exc:
+            raise OperationalError(str(exc)) from exc
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._pool().release(self.connection)
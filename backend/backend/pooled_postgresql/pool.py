@@ -0,0 +1,149 @@
+# backend/backend/pooled_postgresql/pool.py
+"""
+A small thread-safe pool of DB-API connections.
+
+Idle connections are reused newest first, so a quiet worker keeps only a
+few sockets warm. A connection is closed instead of returned when it was
+lost, when it is older than ``max_lifetime`` or when the caller discards
+it. ``acquire`` waits up to ``timeout`` seconds for a free slot when
+``max_size`` connections are out, rather than opening more and exhausting
+the server's connection limit during deploys.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# psycopg2.extensions.TRANSACTION_STATUS_*; kept here so the pool has no
+# driver import and can be exercised with stand-in connections.
+TRANSACTION_STATUS_IDLE = 0
+TRANSACTION_STATUS_UNKNOWN = 4
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, connect, *, max_size=4, timeout=10.0, max_lifetime=1800.0, health_check=None, name=""):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check = health_check
+        self.name = name
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+        self._idle = deque()
+        self._created = {}
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "opened": self.opened,
+                "reused": self.reused,
+                "discarded": self.discarded,
+            }
+
+    def _expired(self, conn):
+        return self.max_lifetime and time.monotonic() - self._created.get(id(conn), 0) > self.max_lifetime
+
+    def _close_quietly(self, conn):
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f"No database connection available in pool {self.name!r} after {self.timeout}s "
+                            f"({self.max_size} in use)."
+                        )
+                    self._cond.wait(remaining)
+                    continue
+            if self._expired(conn) or not self._healthy(conn):
+                self._discard(conn)
+                continue
+            with self._cond:
+                self.reused += 1
+            return conn
+
+        try:
+            conn = self.connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created[id(conn)] = time.monotonic()
+            self.opened += 1
+        return conn
+
+    def _healthy(self, conn):
+        if self.health_check is None:
+            return True
+        try:
+            self.health_check(conn)
+        except Exception:
+            logger.info("Discarding unusable pooled connection pool=%s", self.name)
+            return False
+        return True
+
+    def _discard(self, conn):
+        self._close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self.discarded += 1
+            self._cond.notify()
+
+    def release(self, conn, discard=False):
+        if id(conn) not in self._created:
+            # Not ours (e.g. opened by the parent before a fork); just close it.
+            self._close_quietly(conn)
+            return
+        if not discard and not getattr(conn, "closed", False):
+            status = getattr(getattr(conn, "info", None), "transaction_status", TRANSACTION_STATUS_IDLE)
+            if status == TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+        if discard or getattr(conn, "closed", False) or self._closed or self._expired(conn):
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+        for conn in idle:
+            self._close_quietly(conn)
@@ -1,6 +1,8 @@
 # backend/backend/settings.py
 
 import os
+import sys
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 from urllib.parse import urlparse
@@ -56,9 +58,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "accounts.profiling.RequestProfilingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "accounts.db_routing.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -70,6 +74,51 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "backend.urls"
 
+# Two cache tiers (see accounts/caching.py): "default" is per-process memory,
+# "shared" is seen by every worker. CACHE_SHARED_BACKEND=db needs
+# `python manage.py createcachetable` once. Tests run without caching so
+# rolled-back fixtures never leak between test cases.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+CACHE_DEFAULT_TIMEOUT = int(os.environ.get("CACHE_DEFAULT_TIMEOUT", "300"))
+CACHE_LOCAL_TIMEOUT = int(os.environ.get("CACHE_LOCAL_TIMEOUT", "30"))
+CACHE_SHARED_BACKEND = os.environ.get("CACHE_SHARED_BACKEND", "file").strip().lower()
+_SHARED_CACHE_BACKENDS = {
+    "file": (
+        "django.core.cache.backends.filebased.FileBasedCache",
+        os.environ.get("CACHE_SHARED_LOCATION") or os.path.join(tempfile.gettempdir(), "portfolio-cache"),
+    ),
+    "db": ("django.core.cache.backends.db.DatabaseCache", os.environ.get("CACHE_SHARED_LOCATION") or "cache_table"),
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "portfolio-shared"),
+}
+_shared_backend, _shared_location = _SHARED_CACHE_BACKENDS.get(CACHE_SHARED_BACKEND, _SHARED_CACHE_BACKENDS["file"])
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "portfolio-local",
+        "TIMEOUT": CACHE_DEFAULT_TIMEOUT,
+        "KEY_PREFIX": "portfolio",
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("CACHE_LOCAL_MAX_ENTRIES", "1000"))},
+    },
+    "shared": {
+        "BACKEND": _shared_backend,
+        "LOCATION": _shared_location,
+        "TIMEOUT": CACHE_DEFAULT_TIMEOUT,
+        "KEY_PREFIX": "portfolio",
+        # Room for cached public responses and their purge tags (see
+        # accounts/response_cache.py) before the backend starts culling.
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("CACHE_SHARED_MAX_ENTRIES", "5000"))},
+    },
+}
+if TESTING:
+    CACHES = {
+        alias: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"} for alias in ("default", "shared")
+    }
+
+# Anonymous GETs of public lists and profiles are served from the shared cache
+# until a save purges one of the rows they render.
+RESPONSE_CACHE_ENABLED = parse_bool_env("RESPONSE_CACHE_ENABLED", True)
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", "60"))
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -92,14 +141,61 @@ USE_SQLITE = os.getenv("USE_SQLITE", "").lower() in ("1", "true", "yes", "on")
 SQLITE_PATH = os.getenv("SQLITE_PATH", str(BASE_DIR / "db.sqlite3"))
 DATABASE_URL = os.getenv("DATABASE_URL", "").strip()
 
+# Postgres connections. With DATABASE_POOL_ENABLED each worker process keeps
+# up to DATABASE_POOL_MAX_SIZE connections in a pool (backend/pooled_postgresql)
+# and Django hands its connection back after every request; size the pool so
+# workers x DATABASE_POOL_MAX_SIZE stays under the server's connection limit.
+# Without the pool, connections persist per thread for DATABASE_CONN_MAX_AGE.
+# CONN_HEALTH_CHECKS pings a reused connection before its first query.
+DATABASE_CONN_MAX_AGE = int(os.environ.get("DATABASE_CONN_MAX_AGE", "600"))
+DATABASE_CONN_HEALTH_CHECKS = parse_bool_env("DATABASE_CONN_HEALTH_CHECKS", True)
+DATABASE_POOL_ENABLED = parse_bool_env("DATABASE_POOL_ENABLED", True)
+DATABASE_POOL_MAX_SIZE = int(os.environ.get("DATABASE_POOL_MAX_SIZE", "4"))
+DATABASE_POOL_TIMEOUT = float(os.environ.get("DATABASE_POOL_TIMEOUT", "10"))
+DATABASE_POOL_MAX_LIFETIME = float(os.environ.get("DATABASE_POOL_MAX_LIFETIME", "1800"))
+DATABASE_MAX_CONNECTIONS = int(os.environ.get("DATABASE_MAX_CONNECTIONS", "0"))
+DATABASE_SELF_CHECK = parse_bool_env("DATABASE_SELF_CHECK", True)
+
+# SQLite tuning (backend/tuned_sqlite), applied to every new connection. WAL
+# lets readers run alongside the single writer; synchronous=NORMAL is safe
+# under WAL. SQLITE_SERIALIZE_WRITES starts atomic blocks with BEGIN
+# IMMEDIATE so concurrent gunicorn workers wait for the write lock instead of
+# failing with "database is locked" when a read transaction upgrades (under
+# WAL that upgrade fails at once, busy timeout or not; compare with
+# `manage.py benchmark_sqlite_writes`).
+SQLITE_TUNING_ENABLED = parse_bool_env("SQLITE_TUNING_ENABLED", True)
+SQLITE_PRAGMAS = {
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "wal"),
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "normal"),
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024))),
+    # Negative means KiB rather than pages.
+    "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", "-20000")),
+    "temp_store": os.environ.get("SQLITE_TEMP_STORE", "memory"),
+}
+SQLITE_SERIALIZE_WRITES = parse_bool_env("SQLITE_SERIALIZE_WRITES", True)
+
+
+def database_from_url(url):
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=DATABASE_CONN_MAX_AGE,
+        conn_health_checks=DATABASE_CONN_HEALTH_CHECKS,
+        ssl_require=False,
+    )
+    if DATABASE_POOL_ENABLED and config["ENGINE"] == "django.db.backends.postgresql":
+        config["ENGINE"] = "backend.pooled_postgresql"
+        config["CONN_MAX_AGE"] = 0
+        config["POOL"] = {
+            "MAX_SIZE": DATABASE_POOL_MAX_SIZE,
+            "TIMEOUT": DATABASE_POOL_TIMEOUT,
+            "MAX_LIFETIME": DATABASE_POOL_MAX_LIFETIME,
+        }
+    return config
+
+
 if DATABASE_URL and not USE_SQLITE:
-    DATABASES = {
-        "default": dj_database_url.config(
-            default=DATABASE_URL,
-            conn_max_age=600,
-            ssl_require=False,
-        )
-    }
+    DATABASES = {"default": database_from_url(DATABASE_URL)}
 else:
     if RUNNING_ON_RAILWAY and not USE_SQLITE:
         raise RuntimeError(
@@ -112,6 +208,29 @@ else:
             "NAME": sqlite_name,
         }
     }
+    if SQLITE_TUNING_ENABLED:
+        DATABASES["default"].update(
+            {
+                "ENGINE": "backend.tuned_sqlite",
+                "PRAGMAS": SQLITE_PRAGMAS,
+                "TRANSACTION_MODE": "IMMEDIATE" if SQLITE_SERIALIZE_WRITES else "DEFERRED",
+            }
+        )
+
+# Optional read replica (see accounts/db_routing.py): public GET views that
+# opt in read from it, except for clients that wrote within the sticky
+# window. Locally, point it at a copy of the SQLite file (cp db.sqlite3
+# replica.sqlite3) to stand in for replication; migrate never touches it.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "").strip()
+DATABASE_REPLICA_STICKY_SECONDS = float(os.environ.get("DATABASE_REPLICA_STICKY_SECONDS", "10"))
+DATABASE_REPLICA_PIN_COOKIE = os.environ.get("DATABASE_REPLICA_PIN_COOKIE", "db_primary_until")
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = database_from_url(DATABASE_REPLICA_URL)
+if TESTING:
+    # Tests see one database; the mirror keeps routing exercised without replication.
+    DATABASES.setdefault("replica", dict(DATABASES["default"]))
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["accounts.db_routing.PrimaryReplicaRouter"]
 
 FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:5173")
 FRONTEND_ORIGIN = urlparse(FRONTEND_URL)
@@ -159,12 +278,44 @@ EMAIL_BACKEND = os.environ.get(
     ),
 )
 
+# Request profiling (accounts/profiling.py). Server-Timing exposes database and
+# provider timings, so it is only sent in DEBUG unless switched on explicitly.
+REQUEST_PROFILING_ENABLED = parse_bool_env("REQUEST_PROFILING_ENABLED", True)
+REQUEST_PROFILING_SERVER_TIMING = parse_bool_env("REQUEST_PROFILING_SERVER_TIMING", DEBUG)
+REQUEST_SLOW_MS = int(os.environ.get("REQUEST_SLOW_MS", "1000"))
+REQUEST_PROFILE_SAMPLE_RATE = int(os.environ.get("REQUEST_PROFILE_SAMPLE_RATE", "0"))
+REQUEST_PROFILE_DIR = os.environ.get("REQUEST_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "portfolio-profiles"))
+REQUEST_PROFILE_MAX_FILES = int(os.environ.get("REQUEST_PROFILE_MAX_FILES", "200"))
+if REQUEST_PROFILING_ENABLED:
+    # Time outgoing mail as an external call without touching every send site.
+    EMAIL_DELIVERY_BACKEND = EMAIL_BACKEND
+    EMAIL_BACKEND = "accounts.profiling.TimedEmailBackend"
+
+# Application metrics (accounts/metrics.py), served at /metrics to admins or
+# to scrapers presenting "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_ENABLED = parse_bool_env("METRICS_ENABLED", True)
+METRICS_DIR = os.environ.get("METRICS_DIR", os.path.join(tempfile.gettempdir(), "portfolio-metrics"))
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "").strip()
+
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "").strip()
 OPENAI_MODEL_PRIMARY = os.environ.get("OPENAI_MODEL_PRIMARY", "gpt-5.4-mini").strip()
 OPENAI_MODEL_LIGHT = os.environ.get("OPENAI_MODEL_LIGHT", "gpt-5.4-nano").strip()
 OPENAI_IMAGE_MODEL = os.environ.get("OPENAI_IMAGE_MODEL", "gpt-image-2").strip()
+OPENAI_API_BASE_URL = os.environ.get("OPENAI_API_BASE_URL", "https://api.openai.com/v1").strip().rstrip("/")
+OPENAI_CONNECT_TIMEOUT = float(os.environ.get("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_READ_TIMEOUT = float(os.environ.get("OPENAI_READ_TIMEOUT", "30"))
+OPENAI_VISION_READ_TIMEOUT = float(os.environ.get("OPENAI_VISION_READ_TIMEOUT", "45"))
+OPENAI_IMAGE_READ_TIMEOUT = float(os.environ.get("OPENAI_IMAGE_READ_TIMEOUT", "90"))
+OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", "2"))
+OPENAI_RETRY_BACKOFF_SECONDS = float(os.environ.get("OPENAI_RETRY_BACKOFF_SECONDS", "0.5"))
+OPENAI_POOL_MAX_CONNECTIONS = int(os.environ.get("OPENAI_POOL_MAX_CONNECTIONS", "10"))
+OPENAI_POOL_MAX_KEEPALIVE = int(os.environ.get("OPENAI_POOL_MAX_KEEPALIVE", "5"))
+OPENAI_POOL_KEEPALIVE_EXPIRY = float(os.environ.get("OPENAI_POOL_KEEPALIVE_EXPIRY", "60"))
 AI_ENABLED = parse_bool_env("AI_ENABLED", default=False)
 AI_DAILY_LIMIT_PER_USER = int(os.environ.get("AI_DAILY_LIMIT_PER_USER", "10"))
+AI_RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get("AI_RESPONSE_CACHE_TTL_SECONDS", "3600"))
+AI_RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("AI_RESPONSE_CACHE_MAX_ENTRIES", "256"))
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -183,6 +334,47 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.environ.get("MEDIA_ROOT", os.path.join(BASE_DIR, "media"))
+# Image conversion limits (portfolio/image_conversion.py).
+IMAGE_MAX_PIXELS = int(os.environ.get("IMAGE_MAX_PIXELS", "50000000"))
+IMAGE_MAX_DIMENSION = int(os.environ.get("IMAGE_MAX_DIMENSION", "2560"))
+IMAGE_WEBP_QUALITY = int(os.environ.get("IMAGE_WEBP_QUALITY", "80"))
+MEDIA_DEDUPLICATION_ENABLED = parse_bool_env("MEDIA_DEDUPLICATION_ENABLED", default=True)
+MEDIA_BLOB_PREFIX = os.environ.get("MEDIA_BLOB_PREFIX", "blobs").strip().strip("/") or "blobs"
+MEDIA_DELETION_ASYNC = parse_bool_env("MEDIA_DELETION_ASYNC", default=True)
+MEDIA_DELETION_BATCH_SIZE = int(os.environ.get("MEDIA_DELETION_BATCH_SIZE", "100"))
+MEDIA_DELETION_MAX_ATTEMPTS = int(os.environ.get("MEDIA_DELETION_MAX_ATTEMPTS", "5"))
+
+# Presigned direct-to-storage uploads (any S3-compatible bucket).
+DIRECT_UPLOADS_ENABLED = parse_bool_env("DIRECT_UPLOADS_ENABLED", default=False)
+DIRECT_UPLOAD_S3_ENDPOINT_URL = os.environ.get("DIRECT_UPLOAD_S3_ENDPOINT_URL", "").strip()
+DIRECT_UPLOAD_S3_BUCKET = os.environ.get("DIRECT_UPLOAD_S3_BUCKET", "").strip()
+DIRECT_UPLOAD_S3_REGION = os.environ.get("DIRECT_UPLOAD_S3_REGION", "us-east-1").strip() or "us-east-1"
+DIRECT_UPLOAD_S3_ACCESS_KEY_ID = os.environ.get("DIRECT_UPLOAD_S3_ACCESS_KEY_ID", "")
+DIRECT_UPLOAD_S3_SECRET_ACCESS_KEY = os.environ.get("DIRECT_UPLOAD_S3_SECRET_ACCESS_KEY", "")
+DIRECT_UPLOAD_S3_PREFIX = os.environ.get("DIRECT_UPLOAD_S3_PREFIX", "uploads").strip().strip("/") or "uploads"
+DIRECT_UPLOAD_S3_TIMEOUT = float(os.environ.get("DIRECT_UPLOAD_S3_TIMEOUT", "30"))
+DIRECT_UPLOAD_URL_EXPIRY_SECONDS = int(os.environ.get("DIRECT_UPLOAD_URL_EXPIRY_SECONDS", "900"))
+DIRECT_UPLOAD_MAX_BYTES = int(os.environ.get("DIRECT_UPLOAD_MAX_BYTES", str(500 * 1024 * 1024)))
+DIRECT_UPLOAD_PROCESS_ASYNC = parse_bool_env("DIRECT_UPLOAD_PROCESS_ASYNC", default=True)
+
+# Background video transcoding (portfolio/video_processing.py). VIDEO_WORKERS is
+# the machine-wide number of concurrent ffmpeg jobs (slots are lock files in
+# VIDEO_LOCK_DIR, shared by every process); 0 means half the CPU cores.
+# VIDEO_JOB_CPU_SECONDS=0 derives the per-job CPU budget from the timeout and
+# thread count.
+VIDEO_PROCESSING_ASYNC = parse_bool_env("VIDEO_PROCESSING_ASYNC", default=True)
+VIDEO_WORKERS = int(os.environ.get("VIDEO_WORKERS", "0"))
+VIDEO_FFMPEG_THREADS = int(os.environ.get("VIDEO_FFMPEG_THREADS", "2"))
+VIDEO_JOB_TIMEOUT_SECONDS = int(os.environ.get("VIDEO_JOB_TIMEOUT_SECONDS", "900"))
+VIDEO_JOB_CPU_SECONDS = int(os.environ.get("VIDEO_JOB_CPU_SECONDS", "0"))
+VIDEO_LOCK_DIR = os.environ.get("VIDEO_LOCK_DIR", "").strip()
+
+# Resumable chunked uploads; chunks are assembled under CHUNKED_UPLOAD_TEMP_DIR.
+CHUNKED_UPLOAD_TEMP_DIR = os.environ.get("CHUNKED_UPLOAD_TEMP_DIR", "").strip()
+CHUNKED_UPLOAD_MAX_BYTES = int(os.environ.get("CHUNKED_UPLOAD_MAX_BYTES", str(500 * 1024 * 1024)))
+CHUNKED_UPLOAD_MAX_CHUNK_BYTES = int(os.environ.get("CHUNKED_UPLOAD_MAX_CHUNK_BYTES", str(16 * 1024 * 1024)))
+CHUNKED_UPLOAD_MIN_CHUNK_BYTES = int(os.environ.get("CHUNKED_UPLOAD_MIN_CHUNK_BYTES", str(1024 * 1024)))
+CHUNKED_UPLOAD_EXPIRY_HOURS = int(os.environ.get("CHUNKED_UPLOAD_EXPIRY_HOURS", "24"))
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -0,0 +1,11 @@
+"""
+SQLite engine tuned for small production deployments (USE_SQLITE).
+
+settings.py swaps ENGINE to ``backend.tuned_sqlite`` unless
+SQLITE_TUNING_ENABLED is off. Every new connection applies the PRAGMAS from
+the database settings (WAL journal, synchronous=NORMAL, busy timeout, mmap,
+page cache, in-memory temp store). With TRANSACTION_MODE "IMMEDIATE",
+``atomic`` blocks take the write lock up front, so concurrent writers queue
+on the busy timeout instead of failing with "database is locked" when a
+deferred read transaction tries to upgrade.
+"""
@@ -0,0 +1,45 @@
+# backend/backend/tuned_sqlite/base.py
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+# Applied in this order; journal_mode first so the rest run against the final mode.
+PRAGMA_ORDER = ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size", "temp_store")
+_KEYWORD = re.compile(r"^[A-Za-z_]+$")
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+def pragma_statements(pragmas):
+    """``PRAGMA name = value`` statements; values come from env vars, so only words and integers pass."""
+    statements = []
+    for name in sorted(pragmas, key=lambda key: (PRAGMA_ORDER.index(key) if key in PRAGMA_ORDER else 99, key)):
+        value = pragmas[name]
+        if value is None or value == "":
+            continue
+        if not _KEYWORD.match(name):
+            raise ImproperlyConfigured(f"Invalid SQLite pragma name {name!r}.")
+        if isinstance(value, bool) or not isinstance(value, int):
+            value = str(value).strip()
+            if not (_KEYWORD.match(value) or re.match(r"^-?\d+$", value)):
+                raise ImproperlyConfigured(f"Invalid value {value!r} for SQLite pragma {name}.")
+        statements.append(f"PRAGMA {name} = {value}")
+    return statements
+
+
+def begin_statement(transaction_mode):
+    mode = (transaction_mode or "DEFERRED").upper()
+    if mode not in TRANSACTION_MODES:
+        raise ImproperlyConfigured(f"TRANSACTION_MODE must be one of {', '.join(TRANSACTION_MODES)}.")
+    return "BEGIN" if mode == "DEFERRED" else f"BEGIN {mode}"
+
+
+class DatabaseWrapper(SQLiteDatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for statement in pragma_statements(self.settings_dict.get("PRAGMAS") or {}):
+            conn.execute(statement)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(begin_statement(self.settings_dict.get("TRANSACTION_MODE")))
@@ -9,7 +9,7 @@ from django.conf import settings
 from django.views.static import serve
 import os
 
-from accounts.views import ActivationRedirectView, SafeUserCreateViewSet
+from accounts.views import ActivationRedirectView, MetricsView, SafeUserCreateViewSet
 
 admin.site.site_header = "FlatOrigin Admin"
 admin.site.site_title = "FlatOrigin Admin"
@@ -29,6 +29,7 @@ class ReactAppView(View):
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", MetricsView.as_view(), name="metrics"),
     path(
         "activate/<str:uid>/<str:token>",
         ActivationRedirectView.as_view(),
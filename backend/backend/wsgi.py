@@ -2,3 +2,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 application = get_wsgi_application()
+
+from backend import db_self_check  # noqa: E402  (needs the configured app registry)
+
+db_self_check.run()
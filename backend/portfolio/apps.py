@@ -5,4 +5,4 @@ class PortfolioConfig(AppConfig):
     name = "portfolio"
 
     def ready(self):
-        from . import signals  # noqa
+        from . import metrics_collectors, signals  # noqa
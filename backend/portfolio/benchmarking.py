@@ -0,0 +1,521 @@
+# backend/portfolio/benchmarking.py
+"""
+Synthetic datasets and a latency/query-count runner for the main endpoints.
+
+``seed_dataset`` bulk-inserts a scaled marketplace (see the
+``seed_benchmark_data`` command): every row belongs to a user whose username
+starts with the dataset prefix, or (directory listings) carries the prefix in
+its name, so ``delete_dataset`` can remove it again. bulk_create skips model
+signals, so image conversion, response-cache purges and the AI usage rollups
+are not triggered; the rollups and daily counters are rebuilt at the end.
+
+``run_benchmarks`` (see the ``run_benchmarks`` command) drives ``ENDPOINTS``
+either in-process through DRF's test client, where each request's queries
+are counted, or against a running server over HTTP. Authenticated endpoints
+use a JWT minted for the dataset's viewer, so both modes go through the same
+authentication path as the frontend.
+"""
+import math
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from accounts.models import (
+    AIDailyUsageCounter,
+    AIUsageEvent,
+    AIUsageMonthlyRollup,
+    BusinessDirectoryListing,
+    BusinessDirectoryListingLike,
+    Profile,
+    ProfileLike,
+    ProfileSave,
+    aggregate_ai_usage_monthly_rollups,
+)
+from apps.bids.models import Bid
+
+from .models import (
+    HelperListing,
+    MessageThread,
+    PrivateMessage,
+    Project,
+    ProjectFavorite,
+    ProjectImage,
+    ProjectInvite,
+    ProjectLike,
+)
+
+User = get_user_model()
+
+DEFAULT_PREFIX = "bench"
+
+# Service areas the synthetic profiles are scattered around: (label, lat, lng).
+METROS = (
+    ("Philadelphia, PA", 39.9526, -75.1652),
+    ("Media, PA", 39.9168, -75.3877),
+    ("New York, NY", 40.7128, -74.0060),
+    ("Baltimore, MD", 39.2904, -76.6122),
+    ("Austin, TX", 30.2672, -97.7431),
+    ("Denver, CO", 39.7392, -104.9903),
+    ("Seattle, WA", 47.6062, -122.3321),
+    ("Atlanta, GA", 33.7490, -84.3880),
+)
+CATEGORIES = (
+    "Carpentry",
+    "Roofing",
+    "Plumbing",
+    "Electrical",
+    "Painting",
+    "Landscaping",
+    "Flooring",
+    "Kitchen remodeling",
+)
+HELPER_SKILLS = ("cleanup", "demolition", "painting", "moving", "yard_work")
+
+
+def _jitter(rng, lat, lng, miles=25):
+    # ~69 miles per degree of latitude; good enough for scattering points.
+    spread = miles / 69.0
+    return (
+        round(lat + rng.uniform(-spread, spread), 6),
+        round(lng + rng.uniform(-spread, spread) / max(math.cos(math.radians(lat)), 0.1), 6),
+    )
+
+
+def _create_users(prefix, role, count, batch_size):
+    password = make_password(None)
+    User.objects.bulk_create(
+        (
+            User(username=f"{prefix}-{role}-{i}", email=f"{prefix}-{role}-{i}@example.com", password=password)
+            for i in range(count)
+        ),
+        batch_size=batch_size,
+    )
+    return list(User.objects.filter(username__startswith=f"{prefix}-{role}-").order_by("id"))
+
+
+def _create_profiles(rng, users, profile_type, batch_size):
+    profiles = []
+    for user in users:
+        label, lat, lng = rng.choice(METROS)
+        service_lat, service_lng = _jitter(rng, lat, lng)
+        category = rng.choice(CATEGORIES)
+        profiles.append(
+            Profile(
+                user=user,
+                display_name=user.username.replace("-", " ").title(),
+                profile_type=profile_type,
+                service_location=label,
+                service_lat=service_lat,
+                service_lng=service_lng,
+                coverage_radius_miles=rng.choice((10, 25, 50)),
+                public_profile_enabled=True,
+                contractor_primary_category=category if profile_type == Profile.ProfileType.CONTRACTOR else "",
+                contractor_categories=[category] if profile_type == Profile.ProfileType.CONTRACTOR else [],
+                bio="Synthetic benchmark profile.",
+            )
+        )
+    Profile.objects.bulk_create(profiles, batch_size=batch_size)
+
+
+def _created_ids(model, **filters):
+    return list(model.objects.filter(**filters).order_by("id").values_list("id", flat=True))
+
+
+def seed_dataset(
+    *,
+    contractors=1000,
+    homeowners=1000,
+    projects_per_contractor=3,
+    images_per_project=3,
+    job_postings_per_homeowner=1,
+    bids_per_job=5,
+    invites_per_job=2,
+    threads_per_homeowner=3,
+    messages_per_thread=6,
+    listings=1000,
+    helper_ratio=0.2,
+    ai_events_per_user=5,
+    prefix=DEFAULT_PREFIX,
+    seed=1,
+    batch_size=1000,
+    stdout=None,
+):
+    """Bulk-insert a synthetic dataset and return the number of rows per model."""
+    rng = random.Random(seed)
+    now = timezone.now()
+    counts = {}
+
+    def log(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    def bulk(model, rows):
+        rows = list(rows)
+        model.objects.bulk_create(rows, batch_size=batch_size)
+        counts[model.__name__] = counts.get(model.__name__, 0) + len(rows)
+        log(f"  {model.__name__}: {len(rows)}")
+        return rows
+
+    with transaction.atomic():
+        contractor_users = _create_users(prefix, "pro", contractors, batch_size)
+        homeowner_users = _create_users(prefix, "home", homeowners, batch_size)
+        counts["User"] = len(contractor_users) + len(homeowner_users)
+        # The ensure_profile signal doesn't fire for bulk-created users.
+        _create_profiles(rng, contractor_users, Profile.ProfileType.CONTRACTOR, batch_size)
+        _create_profiles(rng, homeowner_users, Profile.ProfileType.HOMEOWNER, batch_size)
+        counts["Profile"] = counts["User"]
+        log(f"  User/Profile: {counts['User']}")
+        contractor_ids = [user.id for user in contractor_users]
+
+        bulk(
+            Project,
+            (
+                Project(
+                    owner=user,
+                    title=f"{rng.choice(CATEGORIES)} project {i + 1}",
+                    summary="Synthetic portfolio project.",
+                    category=rng.choice(CATEGORIES),
+                    location=rng.choice(METROS)[0],
+                    is_public=True,
+                )
+                for user in contractor_users
+                for i in range(projects_per_contractor)
+            ),
+        )
+        bulk(
+            Project,
+            (
+                Project(
+                    owner=user,
+                    title=f"{rng.choice(CATEGORIES)} job {i + 1}",
+                    summary="Synthetic job posting.",
+                    job_summary="Looking for bids.",
+                    location=rng.choice(METROS)[0],
+                    budget=Decimal(rng.randrange(500, 50000, 250)),
+                    is_job_posting=True,
+                    job_is_published=True,
+                    service_categories=[rng.choice(CATEGORIES)],
+                )
+                for user in homeowner_users
+                for i in range(job_postings_per_homeowner)
+            ),
+        )
+        portfolio_ids = _created_ids(Project, owner__username__startswith=f"{prefix}-pro-")
+        job_ids = _created_ids(Project, owner__username__startswith=f"{prefix}-home-", is_job_posting=True)
+
+        # bulk_create bypasses ProjectImage.save(), which would convert the (missing) files.
+        bulk(
+            ProjectImage,
+            (
+                ProjectImage(
+                    project_id=project_id,
+                    image=f"project_images/{prefix}-{project_id}-{order}.webp",
+                    order=order,
+                    processing_status=ProjectImage.STATUS_READY,
+                )
+                for project_id in portfolio_ids
+                for order in range(images_per_project)
+            ),
+        )
+
+        invites, bids = [], []
+        for job_id in job_ids:
+            picked = rng.sample(contractor_ids, min(len(contractor_ids), invites_per_job + bids_per_job))
+            invites += [ProjectInvite(project_id=job_id, contractor_id=uid) for uid in picked[:invites_per_job]]
+            bids += [
+                Bid(
+                    project_id=job_id,
+                    contractor_id=uid,
+                    amount=Decimal(rng.randrange(500, 50000, 50)),
+                    timeline_text="2-3 weeks",
+                    proposal_text="Synthetic bid.",
+                    created_at=now - timedelta(days=rng.randrange(60)),
+                )
+                for uid in picked[invites_per_job:]
+            ]
+        bulk(ProjectInvite, invites)
+        bulk(Bid, bids)
+
+        threads = {}
+        for homeowner in homeowner_users:
+            for uid in rng.sample(contractor_ids, min(len(contractor_ids), threads_per_homeowner)):
+                owner_id, client_id = sorted((homeowner.id, uid))
+                threads[(owner_id, client_id)] = MessageThread(
+                    owner_id=owner_id,
+                    client_id=client_id,
+                    owner_has_accepted=True,
+                    client_has_accepted=True,
+                )
+        bulk(MessageThread, threads.values())
+        thread_rows = MessageThread.objects.filter(
+            owner__username__startswith=f"{prefix}-"
+        ).values_list("id", "owner_id", "client_id")
+        bulk(
+            PrivateMessage,
+            (
+                PrivateMessage(
+                    thread_id=thread_id,
+                    sender_id=(owner_id, client_id)[i % 2],
+                    text=f"Synthetic message {i + 1}.",
+                )
+                for thread_id, owner_id, client_id in thread_rows
+                for i in range(messages_per_thread)
+            ),
+        )
+
+        likes, favorites, profile_likes, profile_saves = [], [], [], []
+        for homeowner in homeowner_users:
+            for project_id in rng.sample(portfolio_ids, min(len(portfolio_ids), 5)):
+                likes.append(ProjectLike(user=homeowner, project_id=project_id))
+            for project_id in rng.sample(portfolio_ids, min(len(portfolio_ids), 2)):
+                favorites.append(ProjectFavorite(user=homeowner, project_id=project_id))
+            for uid in rng.sample(contractor_ids, min(len(contractor_ids), 3)):
+                profile_likes.append(ProfileLike(liker=homeowner, liked_user_id=uid))
+                profile_saves.append(ProfileSave(saver=homeowner, saved_user_id=uid))
+        bulk(ProjectLike, likes)
+        bulk(ProjectFavorite, favorites)
+        bulk(ProfileLike, profile_likes)
+        bulk(ProfileSave, profile_saves)
+
+        listing_rows = []
+        for i in range(listings):
+            label, lat, lng = rng.choice(METROS)
+            location_lat, location_lng = _jitter(rng, lat, lng)
+            listing_rows.append(
+                BusinessDirectoryListing(
+                    business_name=f"{prefix.title()} {rng.choice(CATEGORIES)} {i + 1}",
+                    location=label,
+                    country_code="US",
+                    location_lat=location_lat,
+                    location_lng=location_lng,
+                    service_radius_miles=rng.choice((10, 25, 50)),
+                    specialties=rng.sample(CATEGORIES, 2),
+                    phone_number=f"555-{i // 10000 % 1000:03d}-{i % 10000:04d}",
+                    is_published=rng.random() > 0.05,
+                )
+            )
+        bulk(BusinessDirectoryListing, listing_rows)
+        listing_ids = _created_ids(BusinessDirectoryListing, business_name__startswith=f"{prefix.title()} ")
+        bulk(
+            BusinessDirectoryListingLike,
+            (
+                BusinessDirectoryListingLike(liker=homeowner, listing_id=listing_id)
+                for homeowner in homeowner_users
+                for listing_id in rng.sample(listing_ids, min(len(listing_ids), 2))
+            ),
+        )
+
+        helpers = []
+        for homeowner in homeowner_users[: int(len(homeowner_users) * helper_ratio)]:
+            label = rng.choice(METROS)[0]
+            city, state = label.split(", ")
+            helpers.append(
+                HelperListing(
+                    owner=homeowner,
+                    full_name=homeowner.username.replace("-", " ").title(),
+                    city=city,
+                    state=state,
+                    email=homeowner.email,
+                    preferred_contact_method="email",
+                    skills=rng.sample(HELPER_SKILLS, 2),
+                    availability=["weekends"],
+                    experience_level="1_3_years",
+                    admin_approved=True,
+                    contact_verified=True,
+                )
+            )
+        bulk(HelperListing, helpers)
+
+        features = list(AIUsageEvent.Feature.values)
+        statuses = [AIUsageEvent.Status.SUCCESS] * 8 + [AIUsageEvent.Status.REJECTED, AIUsageEvent.Status.ERROR]
+        events = []
+        for user in contractor_users + homeowner_users:
+            for _ in range(ai_events_per_user):
+                created_at = now - timedelta(days=rng.randrange(90), seconds=rng.randrange(86400))
+                events.append(
+                    AIUsageEvent(
+                        user=user,
+                        feature=rng.choice(features),
+                        model_name="synthetic",
+                        status=rng.choice(statuses),
+                        input_tokens=rng.randrange(200, 4000),
+                        output_tokens=rng.randrange(100, 1500),
+                        provider_cost_usd=Decimal("0.002000"),
+                        user_charge_usd=Decimal("0.003000"),
+                        request_day=timezone.localdate(created_at),
+                        created_at=created_at,
+                    )
+                )
+        bulk(AIUsageEvent, events)
+        rebuild_ai_usage_aggregates(prefix, batch_size)
+
+    return counts
+
+
+def rebuild_ai_usage_aggregates(prefix, batch_size=1000):
+    """Recompute rollups and daily counters that bulk-inserted AI events skipped."""
+    AIUsageMonthlyRollup.objects.all().delete()
+    AIUsageMonthlyRollup.objects.bulk_create(
+        aggregate_ai_usage_monthly_rollups(AIUsageEvent.objects.all(), AIUsageMonthlyRollup),
+        batch_size=batch_size,
+    )
+    daily = (
+        AIUsageEvent.objects.filter(user__username__startswith=f"{prefix}-", status=AIUsageEvent.Status.SUCCESS)
+        .values("user_id", "request_day")
+        .annotate(success_count=Count("id"))
+    )
+    AIDailyUsageCounter.objects.filter(user__username__startswith=f"{prefix}-").delete()
+    AIDailyUsageCounter.objects.bulk_create(
+        (
+            AIDailyUsageCounter(user_id=row["user_id"], day=row["request_day"], success_count=row["success_count"])
+            for row in daily
+        ),
+        batch_size=batch_size,
+    )
+
+
+def delete_dataset(prefix=DEFAULT_PREFIX):
+    """Remove a previously seeded dataset; cascades take the users' rows with them."""
+    with transaction.atomic():
+        listings, _ = BusinessDirectoryListing.objects.filter(business_name__startswith=f"{prefix.title()} ").delete()
+        users, _ = User.objects.filter(username__startswith=f"{prefix}-").delete()
+        if users:
+            rebuild_ai_usage_aggregates(prefix)
+    return users + listings
+
+
+# name, path, who is authenticated ("homeowner", "contractor" or None).
+# Paths may use {job_id}, {thread_id} and {contractor} from the dataset context.
+ENDPOINTS = (
+    ("projects", "/api/projects/", None),
+    ("job_postings", "/api/projects/job-postings/", None),
+    ("job_postings_near", "/api/projects/job-postings/?lat=39.9526&lng=-75.1652", "contractor"),
+    ("project_bids", "/api/projects/{job_id}/bids/", "homeowner"),
+    ("my_bids", "/api/bids/", "contractor"),
+    ("inbox_threads", "/api/inbox/threads/", "homeowner"),
+    ("thread_messages", "/api/messages/threads/{thread_id}/messages/", "homeowner"),
+    ("contractor_search", "/api/profiles/contractors/search/?q=roof", "homeowner"),
+    ("public_profile", "/api/profiles/{contractor}/", None),
+    ("liked_profiles", "/api/profiles/liked/", "homeowner"),
+    ("business_directory", "/api/business-directory/?country_code=US", None),
+    ("business_directory_near", "/api/business-directory/?lat=39.9526&lng=-75.1652", None),
+    ("project_helpers", "/api/project-helpers/", None),
+    ("favorite_projects", "/api/favorites/projects/", "homeowner"),
+)
+
+
+def dataset_context(prefix=DEFAULT_PREFIX):
+    """The users and ids the benchmark paths are filled in with; None if nothing is seeded."""
+    homeowner = User.objects.filter(username=f"{prefix}-home-0").first()
+    contractor = User.objects.filter(username=f"{prefix}-pro-0").first()
+    if homeowner is None or contractor is None:
+        return None
+    job = Project.objects.filter(owner=homeowner, is_job_posting=True).order_by("id").first()
+    thread = (
+        MessageThread.objects.filter(Q(owner=homeowner) | Q(client=homeowner)).order_by("id").first()
+    )
+    return {
+        "users": {"homeowner": homeowner, "contractor": contractor},
+        "job_id": getattr(job, "pk", 0),
+        "thread_id": getattr(thread, "pk", 0),
+        "contractor": contractor.username,
+    }
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of ``values`` (0-100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies_ms):
+    return {
+        "p50": round(percentile(latencies_ms, 50), 2),
+        "p90": round(percentile(latencies_ms, 90), 2),
+        "p95": round(percentile(latencies_ms, 95), 2),
+        "p99": round(percentile(latencies_ms, 99), 2),
+        "mean": round(statistics.fmean(latencies_ms), 2),
+        "max": round(max(latencies_ms), 2),
+    }
+
+
+def _access_token(user):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    return str(RefreshToken.for_user(user).access_token)
+
+
+def run_benchmarks(context, *, iterations=20, warmup=2, base_url="", only=(), response_cache=False):
+    """
+    Request every endpoint ``warmup + iterations`` times and return one result per endpoint.
+
+    In-process runs disable the response cache unless ``response_cache`` is
+    set, so the numbers measure the views rather than cache hits.
+    """
+    tokens = {role: _access_token(user) for role, user in context["users"].items()}
+    endpoints = [endpoint for endpoint in ENDPOINTS if not only or endpoint[0] in only]
+
+    if base_url:
+        import httpx
+
+        client = httpx.Client(base_url=base_url.rstrip("/"), timeout=60)
+
+        def send(path, role):
+            headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+            return client.get(path, headers=headers).status_code
+
+    else:
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+
+        def send(path, role):
+            extra = {"HTTP_AUTHORIZATION": f"Bearer {tokens[role]}"} if role else {}
+            return client.get(path, **extra).status_code
+
+    overrides = {"ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"]}
+    if not response_cache:
+        overrides["RESPONSE_CACHE_ENABLED"] = False
+
+    results = []
+    with override_settings(**overrides):
+        for name, template, role in endpoints:
+            path = template.format(**context)
+            for _ in range(warmup):
+                send(path, role)
+            latencies, query_counts, statuses = [], [], set()
+            for _ in range(iterations):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    statuses.add(send(path, role))
+                    latencies.append((time.perf_counter() - started) * 1000)
+                query_counts.append(len(queries))
+            results.append(
+                {
+                    "name": name,
+                    "path": path,
+                    "auth": role or "anonymous",
+                    "status": sorted(statuses),
+                    "latency_ms": summarize(latencies),
+                    # Queries run in another process when driving a server.
+                    "queries": None if base_url else max(query_counts),
+                }
+            )
+    if base_url:
+        client.close()
+    return results
@@ -0,0 +1,253 @@
+# backend/portfolio/chunked_uploads.py
+"""
+Resumable chunked uploads for large project media.
+
+A client opens a session, PUTs consecutive byte ranges with a per-chunk
+SHA-256, and completes the session once every byte has arrived. Chunks are
+appended to a temp file on disk; after an interruption the client asks the
+session for its offset and carries on from there. On completion the
+assembled file is handed to ProjectImage as an on-disk upload, so neither
+the web worker nor the conversion pipeline ever holds it in memory.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .image_conversion import ImageTooLargeError
+
+logger = logging.getLogger(__name__)
+
+STREAM_READ_SIZE = 64 * 1024
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class ChunkedUploadError(Exception):
+    pass
+
+
+class ChunkOffsetError(ChunkedUploadError):
+    """The chunk does not start where the session left off."""
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+class AssembledUpload(File):
+    """An assembled upload on disk, shaped like Django's TemporaryUploadedFile."""
+
+    def __init__(self, path, name, content_type=""):
+        super().__init__(open(path, "rb"), name=name)
+        self.content_type = content_type
+        self._path = path
+
+    def temporary_file_path(self):
+        return self._path
+
+
+def upload_temp_dir():
+    path = getattr(settings, "CHUNKED_UPLOAD_TEMP_DIR", "") or os.path.join(
+        tempfile.gettempdir(), "portfolio-chunked-uploads"
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def session_temp_path(session):
+    return os.path.join(upload_temp_dir(), f"{session.pk}.part")
+
+
+def discard_session_file(session):
+    try:
+        os.remove(session_temp_path(session))
+    except FileNotFoundError:
+        pass
+    except OSError:
+        logger.warning("Could not remove chunked upload temp file session_id=%s", session.pk, exc_info=True)
+
+
+def parse_content_range(value):
+    """Parse ``bytes start-end/total`` into (start, end_exclusive, total)."""
+    match = CONTENT_RANGE_RE.match(str(value or "").strip())
+    if not match:
+        raise ChunkedUploadError("Send a Content-Range header like 'bytes 0-1048575/5242880'.")
+    start, end, total = (int(part) for part in match.groups())
+    if end < start or end >= total:
+        raise ChunkedUploadError("Content-Range is out of bounds.")
+    return start, end + 1, total
+
+
+def _lock_part_file(handle):
+    """Hold an exclusive lock on the part file so one chunk is written at a time."""
+    if fcntl is None:
+        return
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise ChunkedUploadError("Another chunk for this upload is still being written; retry shortly.")
+
+
+def _check_chunk_offset(session, *, start, end, total, checksum):
+    """
+    Validate a chunk against the session; returns True when it was already stored.
+    """
+    from .models import ChunkedUpload
+
+    if session.status != ChunkedUpload.STATUS_OPEN:
+        raise ChunkedUploadError("This upload session is no longer accepting chunks.")
+    if total != session.total_size:
+        raise ChunkedUploadError("Content-Range total does not match the session size.")
+    if start < session.received_bytes:
+        recorded = next((chunk for chunk in session.chunks if chunk["start"] == start), None)
+        if recorded and recorded["end"] == end and recorded["sha256"] == checksum:
+            return True
+    if start != session.received_bytes:
+        raise ChunkOffsetError("Chunk does not start at the current upload offset.", session.received_bytes)
+    return False
+
+
+def write_chunk(session, *, start, end, total, stream, checksum):
+    """
+    Append bytes [start, end) from ``stream`` to the session's temp file.
+
+    Returns the refreshed session. Re-sending a chunk that was already stored
+    with the same checksum is a no-op, so clients can retry blindly.
+
+    The bytes are streamed under a lock on the part file only; the session row
+    is locked just long enough to record the new offset, so a slow client never
+    holds a database transaction (or SQLite's write lock) open.
+    """
+    from .models import ChunkedUpload
+
+    checksum = str(checksum or "").strip().lower()
+    if not checksum:
+        raise ChunkedUploadError("Send the chunk's SHA-256 in the X-Chunk-SHA256 header.")
+    max_chunk = int(getattr(settings, "CHUNKED_UPLOAD_MAX_CHUNK_BYTES", 16 * 1024 * 1024))
+    if end - start > max_chunk:
+        raise ChunkedUploadError(f"Chunks must be {max_chunk} bytes or smaller.")
+    # Every chunk adds an entry to session.chunks; keep that list short.
+    min_chunk = int(getattr(settings, "CHUNKED_UPLOAD_MIN_CHUNK_BYTES", 1024 * 1024))
+    if end - start < min_chunk and end != total:
+        raise ChunkedUploadError(f"Chunks other than the last must be at least {min_chunk} bytes.")
+
+    path = session_temp_path(session)
+    # O_CREAT without O_TRUNC: a concurrent request must not wipe bytes before it holds the lock.
+    with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), "r+b") as handle:
+        _lock_part_file(handle)
+        # Read after taking the file lock: a chunk that finished meanwhile has been recorded.
+        session = ChunkedUpload.objects.get(pk=session.pk)
+        if _check_chunk_offset(session, start=start, end=end, total=total, checksum=checksum):
+            return session
+
+        digest = hashlib.sha256()
+        written = 0
+        # Drop any torn tail left by a write that never got recorded.
+        handle.truncate(start)
+        handle.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            data = stream.read(min(STREAM_READ_SIZE, remaining))
+            if not data:
+                break
+            handle.write(data)
+            digest.update(data)
+            written += len(data)
+            remaining -= len(data)
+        if written != end - start or digest.hexdigest() != checksum:
+            handle.truncate(start)
+            raise ChunkedUploadError("Chunk was incomplete or did not match its checksum; resend it.")
+        handle.flush()
+
+        with transaction.atomic():
+            session = ChunkedUpload.objects.select_for_update().get(pk=session.pk)
+            if _check_chunk_offset(session, start=start, end=end, total=total, checksum=checksum):
+                return session
+            session.received_bytes = end
+            session.chunks = [*session.chunks, {"start": start, "end": end, "sha256": checksum}]
+            session.save(update_fields=["received_bytes", "chunks", "updated_at"])
+    return session
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for data in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def _set_status(session, status):
+    from .models import ChunkedUpload
+
+    ChunkedUpload.objects.filter(pk=session.pk).update(status=status, updated_at=timezone.now())
+
+
+def complete_upload(session, *, checksum=""):
+    """
+    Hand a fully received session to ProjectImage and close it.
+
+    The session is claimed (moved to ``assembling``) in a short transaction;
+    the checksum and the ProjectImage save, which converts images to WEBP, run
+    after that commits so no row lock is held while they work.
+    """
+    from .models import VIDEO_UPLOAD_EXTENSIONS, ChunkedUpload, ProjectImage
+
+    with transaction.atomic():
+        session = ChunkedUpload.objects.select_for_update().get(pk=session.pk)
+        if session.status != ChunkedUpload.STATUS_OPEN:
+            raise ChunkedUploadError("This upload session is already closed.")
+        if session.received_bytes != session.total_size:
+            raise ChunkOffsetError("The upload is not finished yet.", session.received_bytes)
+        session.status = ChunkedUpload.STATUS_ASSEMBLING
+        session.save(update_fields=["status", "updated_at"])
+
+    path = session_temp_path(session)
+    checksum = str(checksum or "").strip().lower()
+    if checksum and file_sha256(path) != checksum:
+        _set_status(session, ChunkedUpload.STATUS_OPEN)
+        raise ChunkedUploadError("The assembled file does not match the supplied SHA-256.")
+
+    ext = os.path.splitext(session.filename.lower())[1]
+    media_type = (
+        ProjectImage.MEDIA_TYPE_VIDEO
+        if session.content_type.startswith("video/") or ext in VIDEO_UPLOAD_EXTENSIONS
+        else ProjectImage.MEDIA_TYPE_IMAGE
+    )
+    upload = AssembledUpload(path, session.filename or f"{session.pk}{ext}", session.content_type)
+    try:
+        image = ProjectImage.objects.create(
+            project=session.project,
+            image=upload,
+            media_type=media_type,
+            caption=session.caption,
+            order=session.project.images.count(),
+        )
+    except ImageTooLargeError as exc:
+        # Re-sending the same bytes can't succeed; drop them.
+        _set_status(session, ChunkedUpload.STATUS_CANCELLED)
+        discard_session_file(session)
+        raise ChunkedUploadError(str(exc)) from exc
+    except Exception:
+        # Leave the bytes in place so the client can retry completion.
+        _set_status(session, ChunkedUpload.STATUS_OPEN)
+        raise
+    finally:
+        upload.close()
+    session.status = ChunkedUpload.STATUS_COMPLETE
+    session.project_image = image
+    session.save(update_fields=["status", "project_image", "updated_at"])
+
+    discard_session_file(session)
+    return session
@@ -0,0 +1,207 @@
+# backend/portfolio/direct_uploads.py
+"""
+Presigned direct-to-object-storage uploads.
+
+The API hands the browser a short-lived presigned PUT URL for an
+S3-compatible bucket, the browser uploads the bytes there, and a finalize call
+verifies the object and queues it for processing. Processing runs on the
+media worker pool shared with video transcoding: it streams the object into a
+temp file and runs the normal ProjectImage save path inside one of the
+machine-wide job slots, so no request thread ever holds the upload body and
+conversions are bounded like encodes.
+
+Only project gallery media (images and videos, via ProjectViewSet) can be
+uploaded this way. Plan sketches (ProjectPlanImage), message attachments and
+feedback attachments still go through their multipart endpoints.
+"""
+import datetime
+import hashlib
+import hmac
+import logging
+import os
+import tempfile
+import uuid
+from urllib.parse import quote, urlsplit
+
+import httpx
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+
+from accounts import metrics
+from accounts.profiling import external_call
+
+from .video_processing import get_video_executor, machine_job_slot
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class DirectUploadError(Exception):
+    pass
+
+
+def direct_uploads_enabled():
+    return bool(
+        getattr(settings, "DIRECT_UPLOADS_ENABLED", False)
+        and getattr(settings, "DIRECT_UPLOAD_S3_ENDPOINT_URL", "")
+        and getattr(settings, "DIRECT_UPLOAD_S3_BUCKET", "")
+    )
+
+
+def _sign(key, message):
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def presign_url(method, object_key, *, expires_in=None, content_type="", now=None):
+    """AWS Signature V4 query-string presign for a path-style bucket URL."""
+    endpoint = urlsplit(settings.DIRECT_UPLOAD_S3_ENDPOINT_URL.rstrip("/"))
+    region = getattr(settings, "DIRECT_UPLOAD_S3_REGION", "us-east-1") or "us-east-1"
+    access_key = settings.DIRECT_UPLOAD_S3_ACCESS_KEY_ID
+    secret_key = settings.DIRECT_UPLOAD_S3_SECRET_ACCESS_KEY
+    expires_in = int(expires_in or getattr(settings, "DIRECT_UPLOAD_URL_EXPIRY_SECONDS", 900))
+
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    datestamp = amz_date[:8]
+    scope = f"{datestamp}/{region}/s3/aws4_request"
+
+    canonical_uri = quote(f"{endpoint.path}/{settings.DIRECT_UPLOAD_S3_BUCKET}/{object_key}", safe="/~")
+    headers = {"host": endpoint.netloc}
+    if content_type:
+        headers["content-type"] = content_type
+    signed_headers = ";".join(sorted(headers))
+    params = {
+        "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+        "X-Amz-Credential": f"{access_key}/{scope}",
+        "X-Amz-Date": amz_date,
+        "X-Amz-Expires": str(expires_in),
+        "X-Amz-SignedHeaders": signed_headers,
+    }
+    canonical_query = "&".join(
+        f"{quote(key, safe='-_.~')}={quote(value, safe='-_.~')}" for key, value in sorted(params.items())
+    )
+    canonical_headers = "".join(f"{name}:{headers[name].strip()}\n" for name in sorted(headers))
+    canonical_request = "\n".join(
+        [method.upper(), canonical_uri, canonical_query, canonical_headers, signed_headers, "UNSIGNED-PAYLOAD"]
+    )
+    string_to_sign = "\n".join(
+        ["AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()]
+    )
+    signing_key = _sign(
+        _sign(_sign(_sign(f"AWS4{secret_key}".encode("utf-8"), datestamp), region), "s3"),
+        "aws4_request",
+    )
+    signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    return f"{endpoint.scheme}://{endpoint.netloc}{canonical_uri}?{canonical_query}&X-Amz-Signature={signature}"
+
+
+def new_object_key(owner_id, filename):
+    prefix = str(getattr(settings, "DIRECT_UPLOAD_S3_PREFIX", "uploads") or "uploads").strip("/")
+    ext = os.path.splitext(filename or "")[1].lower()[:10]
+    return f"{prefix}/{owner_id}/{uuid.uuid4().hex}{ext}"
+
+
+def _timeout():
+    return httpx.Timeout(float(getattr(settings, "DIRECT_UPLOAD_S3_TIMEOUT", 30)), connect=5.0)
+
+
+@external_call("storage")
+def head_object(object_key):
+    """Return (size, content_type) for an uploaded object, or None when it is missing."""
+    try:
+        response = httpx.head(presign_url("HEAD", object_key, expires_in=60), timeout=_timeout())
+    except httpx.HTTPError as exc:
+        raise DirectUploadError(f"Could not reach upload storage: {exc}")
+    if response.status_code == 404:
+        return None
+    if response.status_code >= 400:
+        raise DirectUploadError(f"Upload storage returned HTTP {response.status_code}.")
+    return int(response.headers.get("content-length") or 0), response.headers.get("content-type", "")
+
+
+@external_call("storage")
+def download_object(object_key, destination):
+    try:
+        with httpx.stream("GET", presign_url("GET", object_key, expires_in=300), timeout=_timeout()) as response:
+            if response.status_code >= 400:
+                raise DirectUploadError(f"Upload storage returned HTTP {response.status_code}.")
+            for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                destination.write(chunk)
+    except httpx.HTTPError as exc:
+        raise DirectUploadError(f"Could not download upload: {exc}")
+    destination.flush()
+    destination.seek(0)
+
+
+@external_call("storage")
+def delete_object(object_key):
+    try:
+        httpx.delete(presign_url("DELETE", object_key, expires_in=60), timeout=_timeout())
+    except httpx.HTTPError:
+        logger.warning("Could not delete staged upload key=%s", object_key, exc_info=True)
+
+
+def process_direct_upload(upload_id):
+    """Turn a finalized upload into a ProjectImage through the normal save path."""
+    from .models import VIDEO_UPLOAD_EXTENSIONS, DirectUpload, ProjectImage
+
+    upload = DirectUpload.objects.select_related("project").filter(pk=upload_id).first()
+    if upload is None or upload.status != DirectUpload.STATUS_UPLOADED:
+        return None
+    DirectUpload.objects.filter(pk=upload.pk).update(status=DirectUpload.STATUS_PROCESSING)
+
+    try:
+        with tempfile.TemporaryFile() as handle:
+            download_object(upload.object_key, handle)
+            staged = File(handle, name=upload.filename or os.path.basename(upload.object_key))
+            staged.content_type = upload.content_type
+            media_type = (
+                ProjectImage.MEDIA_TYPE_VIDEO
+                if upload.content_type.startswith("video/")
+                or os.path.splitext(upload.filename.lower())[1] in VIDEO_UPLOAD_EXTENSIONS
+                else ProjectImage.MEDIA_TYPE_IMAGE
+            )
+            with machine_job_slot(), transaction.atomic():
+                image = ProjectImage.objects.create(
+                    project=upload.project,
+                    image=staged,
+                    media_type=media_type,
+                    caption=upload.caption,
+                    order=upload.project.images.count(),
+                )
+                DirectUpload.objects.filter(pk=upload.pk).update(
+                    status=DirectUpload.STATUS_READY,
+                    project_image=image,
+                    error="",
+                )
+    except Exception as exc:
+        logger.exception("Direct upload processing failed upload_id=%s", upload.pk)
+        DirectUpload.objects.filter(pk=upload.pk).update(status=DirectUpload.STATUS_FAILED, error=str(exc)[:500])
+        metrics.UPLOADS.inc(path="direct", outcome="failed")
+        return None
+
+    metrics.UPLOADS.inc(path="direct", outcome="ok")
+    metrics.UPLOAD_BYTES.inc(upload.expected_size, path="direct")
+    delete_object(upload.object_key)
+    return image
+
+
+def _run_in_background(upload_id):
+    try:
+        process_direct_upload(upload_id)
+    except Exception:
+        logger.exception("Direct upload worker crashed upload_id=%s", upload_id)
+    finally:
+        connection.close()
+
+
+def queue_direct_upload_processing(upload_id):
+    def start():
+        if not getattr(settings, "DIRECT_UPLOAD_PROCESS_ASYNC", True):
+            process_direct_upload(upload_id)
+            return
+        get_video_executor().submit(_run_in_background, upload_id)
+
+    transaction.on_commit(start)
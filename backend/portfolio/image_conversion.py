@@ -0,0 +1,162 @@
+# backend/portfolio/image_conversion.py
+"""
+Memory-bounded WEBP conversion shared by every image upload path.
+
+Decoding a 48 MP photo at native size costs ~150 MB of RGB pixels before the
+encoder allocates anything, so conversion here:
+
+- rejects images above IMAGE_MAX_PIXELS from the header alone, before decoding;
+- asks the JPEG decoder for a reduced-scale decode (``Image.draft``) close to
+  the output size, so only 1/2, 1/4 or 1/8 of the pixels are materialised;
+- caps the stored long edge at IMAGE_MAX_DIMENSION;
+- logs the decoded size and, per conversion, how much the resident set grew
+  while the decoded image and its encoding were held (sampled from
+  /proc/self/statm around the call), alongside the process's lifetime peak.
+"""
+import logging
+import os
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from accounts import metrics
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PIXELS = 50_000_000
+DEFAULT_MAX_DIMENSION = 2560
+DEFAULT_WEBP_QUALITY = 80
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class ImageConversionError(Exception):
+    pass
+
+
+class ImageTooLargeError(ImageConversionError):
+    """The image is over the pixel limit (or a decompression bomb); reject the upload."""
+
+
+def _process_peak_rss_kb():
+    if resource is None:
+        return 0
+    # ru_maxrss is the process-lifetime high-water mark: kilobytes on Linux
+    # (bytes on macOS; only used for logging).
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _current_rss_kb():
+    """Resident set size right now, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as handle:
+            resident_pages = int(handle.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * PAGE_SIZE // 1024
+
+
+def _max_pixels(max_pixels=None):
+    return int(max_pixels or getattr(settings, "IMAGE_MAX_PIXELS", DEFAULT_MAX_PIXELS))
+
+
+def _check_pixels(size, max_pixels):
+    if size[0] * size[1] > max_pixels:
+        raise ImageTooLargeError(f"Image is {size[0]}x{size[1]} pixels; the limit is {max_pixels} pixels.")
+
+
+def image_dimensions(source, *, max_pixels=None):
+    """
+    Read (width, height) from the header of ``source`` without decoding it.
+
+    Raises ImageTooLargeError above ``max_pixels`` and ImageConversionError
+    for unreadable files. File objects are rewound afterwards.
+    """
+    try:
+        with Image.open(source) as img:
+            size = img.size
+    except Image.DecompressionBombError as exc:
+        raise ImageTooLargeError(str(exc)) from exc
+    except (OSError, ValueError, SyntaxError) as exc:
+        raise ImageConversionError(str(exc) or exc.__class__.__name__) from exc
+    finally:
+        if hasattr(source, "seek"):
+            source.seek(0)
+    _check_pixels(size, _max_pixels(max_pixels))
+    return size
+
+
+def fits_stored_limits(source, *, max_dimension=None, max_pixels=None):
+    """True when ``source`` can be stored as-is (already within the pixel and edge limits)."""
+    max_dimension = int(max_dimension or getattr(settings, "IMAGE_MAX_DIMENSION", DEFAULT_MAX_DIMENSION))
+    return max(image_dimensions(source, max_pixels=max_pixels)) <= max_dimension
+
+
+def convert_to_webp(source, *, max_dimension=None, max_pixels=None, quality=None, label=""):
+    """
+    Decode ``source`` (a path or file object) within the configured limits and
+    return a ContentFile holding the WEBP encoding.
+
+    Raises ImageTooLargeError for images whose header declares more than
+    ``max_pixels`` pixels (and for decompression bombs), ImageConversionError
+    for unreadable files.
+    """
+    max_dimension = int(max_dimension or getattr(settings, "IMAGE_MAX_DIMENSION", DEFAULT_MAX_DIMENSION))
+    max_pixels = _max_pixels(max_pixels)
+    quality = int(quality or getattr(settings, "IMAGE_WEBP_QUALITY", DEFAULT_WEBP_QUALITY))
+
+    started = time.monotonic()
+    rss_before = _current_rss_kb()
+    try:
+        with Image.open(source) as original:
+            source_size = original.size
+            _check_pixels(source_size, max_pixels)
+            if original.format == "JPEG":
+                # Picks the smallest DCT scale that is still >= the requested box.
+                original.draft("RGB", (max_dimension, max_dimension))
+            original.load()
+            decoded_size = original.size
+            img = ImageOps.exif_transpose(original)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGB")
+            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+            buffer = BytesIO()
+            img.save(buffer, format="WEBP", quality=quality)
+            # Sampled while the decoded pixels and the encoding are still held.
+            rss_after = _current_rss_kb()
+    except ImageConversionError:
+        metrics.IMAGE_CONVERSION_SECONDS.observe(time.monotonic() - started, outcome="rejected")
+        raise
+    except Image.DecompressionBombError as exc:
+        metrics.IMAGE_CONVERSION_SECONDS.observe(time.monotonic() - started, outcome="rejected")
+        raise ImageTooLargeError(str(exc)) from exc
+    except (OSError, ValueError, SyntaxError) as exc:
+        metrics.IMAGE_CONVERSION_SECONDS.observe(time.monotonic() - started, outcome="failed")
+        raise ImageConversionError(str(exc) or exc.__class__.__name__) from exc
+
+    metrics.IMAGE_CONVERSION_SECONDS.observe(time.monotonic() - started, outcome="ok")
+    rss_growth = None if rss_before is None or rss_after is None else max(0, rss_after - rss_before)
+    logger.info(
+        "Converted image to webp label=%s source=%sx%s decoded=%sx%s output=%sx%s bytes=%s "
+        "rss_growth_kb=%s process_peak_rss_kb=%s elapsed_ms=%s",
+        label,
+        source_size[0],
+        source_size[1],
+        decoded_size[0],
+        decoded_size[1],
+        img.size[0],
+        img.size[1],
+        buffer.tell(),
+        rss_growth,
+        _process_peak_rss_kb(),
+        int((time.monotonic() - started) * 1000),
+    )
+    return ContentFile(buffer.getvalue())
@@ -1,111 +1,260 @@
 # backend/portfolio/management/commands/cleanup_media.py
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Iterable, Set
+from typing import Iterator, List, Sequence, Set, Tuple
 
+from django.apps import apps
 from django.conf import settings
-from django.core.management.base import BaseCommand
-from django.db.models import QuerySet
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from django.utils import timezone
 
-# Adjust these imports to your actual models
-from portfolio.models import ProjectImage  # <-- confirm model name
-# If you have profile avatars/logos:
-# from accounts.models import Profile
+from portfolio.models import MediaBlob, MediaManifestEntry, PendingFileDeletion
 
+_SCAN_DONE = object()
 
-@dataclass(frozen=True)
+
+@dataclass
 class CleanupStats:
-    total_files: int
-    referenced_files: int
-    deleted_files: int
-    skipped_dirs: int
+    scanned_files: int = 0
+    skipped_recent: int = 0
+    referenced_files: int = 0
+    orphaned_files: int = 0
+    deleted_files: int = 0
+    failed_deletes: int = 0
+    orphaned_bytes: int = 0
+    scan_errors: int = 0
+    fields: List[str] = field(default_factory=list)
 
 
 def _normalize_rel_path(p: str) -> str:
     p = (p or "").strip()
     if not p:
         return ""
-    # Django ImageField usually stores "project_images/file.webp"
+    # Django FileFields store paths relative to MEDIA_ROOT, e.g. "project_images/file.webp"
     return p.lstrip("/")
 
 
-def _get_referenced_paths() -> Set[str]:
-    referenced: Set[str] = set()
+def discover_file_fields() -> List[Tuple[type, str]]:
+    """Every concrete FileField/ImageField on every installed model."""
+    found = []
+    for model in apps.get_models():
+        opts = model._meta
+        if opts.abstract or opts.proxy or not opts.managed:
+            continue
+        for model_field in opts.concrete_fields:
+            if isinstance(model_field, models.FileField):
+                found.append((model, model_field.attname))
+    return found
 
-    qs: QuerySet = ProjectImage.objects.all().only("image")
-    for obj in qs.iterator():
-        rel = _normalize_rel_path(getattr(obj, "image", ""))
-        if rel:
-            referenced.add(rel)
 
-    # Add other references here if you have them:
-    # for prof in Profile.objects.all().only("logo"):
-    #     rel = _normalize_rel_path(getattr(prof, "logo", ""))
-    #     if rel:
-    #         referenced.add(rel)
+def referenced_names(names: Sequence[str], file_fields: Sequence[Tuple[type, str]]) -> Set[str]:
+    """
+    Which of ``names`` are still in use; one indexed IN query per field.
 
+    Only the chunk's names are ever loaded, so memory is bounded by
+    --chunk-size rather than by the size of the tables.
+    """
+    referenced: Set[str] = set()
+    for model, attname in file_fields:
+        referenced.update(
+            model._base_manager.filter(**{f"{attname}__in": names}).values_list(attname, flat=True)
+        )
+    # Already queued for removal by portfolio.media_cleanup; leave them to it.
+    referenced.update(PendingFileDeletion.objects.filter(name__in=names).values_list("name", flat=True))
     return referenced
 
 
-def _iter_files(root: Path) -> Iterable[Path]:
-    for p in root.rglob("*"):
-        if p.is_file():
-            yield p
+def scan_files(roots: Sequence[Path], workers: int, buffer_size: int) -> Iterator[Tuple[str, int, float] | Tuple[None, str, None]]:
+    """
+    Walk ``roots`` with a pool of os.scandir workers.
+
+    Yields (path, size, mtime) per file, or (None, message, None) per unreadable
+    directory. Directories are shared through a work queue and files through a
+    bounded queue, so memory stays flat no matter how large the tree is.
+    """
+    dirs: "queue.Queue[str | None]" = queue.Queue()
+    files: "queue.Queue[object]" = queue.Queue(maxsize=buffer_size)
+
+    def work():
+        while True:
+            path = dirs.get()
+            if path is None:
+                dirs.task_done()
+                return
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                dirs.put(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                stat = entry.stat(follow_symlinks=False)
+                                files.put((entry.path, stat.st_size, stat.st_mtime))
+                        except OSError as exc:
+                            files.put((None, f"{entry.path}: {exc}", None))
+            except OSError as exc:
+                files.put((None, f"{path}: {exc}", None))
+            finally:
+                dirs.task_done()
+
+    def close_when_idle(pool):
+        dirs.join()
+        for _ in pool:
+            dirs.put(None)
+        files.put(_SCAN_DONE)
+
+    for root in roots:
+        dirs.put(str(root))
+    pool = [threading.Thread(target=work, daemon=True) for _ in range(max(1, workers))]
+    for thread in pool:
+        thread.start()
+    threading.Thread(target=close_when_idle, args=(pool,), daemon=True).start()
+
+    while True:
+        item = files.get()
+        if item is _SCAN_DONE:
+            return
+        yield item
 
 
 class Command(BaseCommand):
-    help = "Delete unreferenced media files from MEDIA_ROOT safely (dry-run supported)."
+    help = (
+        "Delete media files under MEDIA_ROOT that no FileField/ImageField references. "
+        "Fields are discovered from every installed model; dry-run and JSON output supported."
+    )
 
     def add_arguments(self, parser):
-        parser.add_argument("--dry-run", action="store_true", help="Only print what would be deleted.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted.")
         parser.add_argument(
             "--subdir",
-            default="project_images",
-            help="Subdirectory under MEDIA_ROOT to clean (default: project_images).",
+            dest="subdirs",
+            action="append",
+            default=[],
+            help="Only sweep this subdirectory of MEDIA_ROOT. Can be passed multiple times (default: all of MEDIA_ROOT).",
+        )
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=24.0,
+            help="Skip files modified more recently than this, so in-flight uploads are never removed (default: 24).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=min(8, (os.cpu_count() or 1) * 2),
+            help="Parallel directory scanners.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Files checked against the database per batch of queries.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+        parser.add_argument(
+            "--report",
+            default="",
+            help="Write one JSON line per orphaned file to this path.",
         )
 
     def handle(self, *args, **opts):
         dry_run: bool = opts["dry_run"]
-        subdir: str = opts["subdir"]
-
+        as_json: bool = opts["json"]
+        chunk_size = max(1, opts["chunk_size"])
         media_root = Path(settings.MEDIA_ROOT).resolve()
-        target_root = (media_root / subdir).resolve()
 
-        self.stdout.write(f"MEDIA_ROOT={media_root}")
-        self.stdout.write(f"Target={target_root}")
-        if not target_root.exists():
-            self.stdout.write(self.style.WARNING("Target directory does not exist; nothing to do."))
-            return
+        roots = []
+        for subdir in opts["subdirs"] or [""]:
+            target = (media_root / subdir).resolve()
+            if target != media_root and media_root not in target.parents:
+                raise CommandError(f"--subdir {subdir!r} is outside MEDIA_ROOT.")
+            if target.is_dir():
+                roots.append(target)
 
-        referenced = _get_referenced_paths()
-        referenced_in_target = {p for p in referenced if p.startswith(f"{subdir}/")}
+        file_fields = discover_file_fields()
+        stats = CleanupStats(fields=[f"{model._meta.label}.{attname}" for model, attname in file_fields])
+        cutoff = time.time() - max(0.0, opts["min_age_hours"]) * 3600
+        started = time.monotonic()
 
-        total_files = 0
-        deleted_files = 0
-        skipped_dirs = 0
+        if not as_json:
+            self.stdout.write(f"MEDIA_ROOT={media_root}")
+            self.stdout.write(f"Checking references in {len(file_fields)} file fields.")
+        if not roots:
+            self._finish(stats, started, dry_run, as_json)
+            return
 
-        for f in _iter_files(target_root):
-            total_files += 1
-            rel = f.relative_to(media_root).as_posix()  # e.g. "project_images/deck_2.webp"
+        report = open(opts["report"], "w", encoding="utf-8") if opts["report"] else None
+        try:
+            chunk: List[Tuple[str, str, int]] = []
+            for path, size, mtime in scan_files(roots, opts["workers"], buffer_size=chunk_size * 4):
+                if path is None:
+                    stats.scan_errors += 1
+                    self.stderr.write(f"Could not scan {size}")
+                    continue
+                stats.scanned_files += 1
+                if mtime > cutoff:
+                    stats.skipped_recent += 1
+                    continue
+                rel = _normalize_rel_path(Path(path).relative_to(media_root).as_posix())
+                chunk.append((rel, path, size))
+                if len(chunk) >= chunk_size:
+                    self._sweep_chunk(chunk, file_fields, stats, dry_run, as_json, report)
+                    chunk = []
+            if chunk:
+                self._sweep_chunk(chunk, file_fields, stats, dry_run, as_json, report)
+        finally:
+            if report:
+                report.close()
 
-            if rel in referenced:
-                continue
+        self._finish(stats, started, dry_run, as_json)
 
+    def _sweep_chunk(self, chunk, file_fields, stats, dry_run, as_json, report):
+        in_use = referenced_names([rel for rel, _, _ in chunk], file_fields)
+        removed = []
+        for rel, path, size in chunk:
+            if rel in in_use:
+                stats.referenced_files += 1
+                continue
+            stats.orphaned_files += 1
+            stats.orphaned_bytes += size
+            if report:
+                report.write(json.dumps({"path": rel, "size": size}) + "\n")
             if dry_run:
-                self.stdout.write(f"DRY-RUN delete: {rel}")
-            else:
-                try:
-                    f.unlink()
-                    deleted_files += 1
-                    self.stdout.write(self.style.SUCCESS(f"Deleted: {rel}"))
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f"Failed to delete {rel}: {e}"))
+                if not as_json:
+                    self.stdout.write(f"DRY-RUN delete: {rel}")
+                continue
+            try:
+                os.remove(path)
+            except OSError as e:
+                stats.failed_deletes += 1
+                self.stderr.write(self.style.ERROR(f"Failed to delete {rel}: {e}"))
+                continue
+            stats.deleted_files += 1
+            removed.append(rel)
+            if not as_json:
+                self.stdout.write(self.style.SUCCESS(f"Deleted: {rel}"))
+        if removed:
+            MediaBlob.objects.filter(name__in=removed).delete()
+            MediaManifestEntry.objects.filter(name__in=removed).update(present=False, size=0, updated_at=timezone.now())
 
+    def _finish(self, stats, started, dry_run, as_json):
+        if as_json:
+            payload = {**asdict(stats), "dry_run": dry_run, "elapsed_seconds": round(time.monotonic() - started, 3)}
+            self.stdout.write(json.dumps(payload))
+            return
         self.stdout.write("")
         self.stdout.write(
             self.style.SUCCESS(
-                f"Done. total_files={total_files}, referenced={len(referenced_in_target)}, deleted={deleted_files}"
+                f"Done. scanned={stats.scanned_files}, referenced={stats.referenced_files}, "
+                f"orphaned={stats.orphaned_files}, deleted={stats.deleted_files}, "
+                f"skipped_recent={stats.skipped_recent}, failed={stats.failed_deletes}"
             )
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from portfolio.chunked_uploads import discard_session_file
+from portfolio.models import ChunkedUpload
+
+
+class Command(BaseCommand):
+    help = "Cancel chunked upload sessions that have been idle too long and remove their temp files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=float,
+            default=0,
+            help="Idle time before a session expires (default: CHUNKED_UPLOAD_EXPIRY_HOURS).",
+        )
+
+    def handle(self, *args, **options):
+        hours = options["hours"] or float(getattr(settings, "CHUNKED_UPLOAD_EXPIRY_HOURS", 24))
+        cutoff = timezone.now() - timedelta(hours=hours)
+        stale = list(
+            # A session stuck in "assembling" this long lost its worker mid-completion.
+            ChunkedUpload.objects.filter(
+                status__in=(ChunkedUpload.STATUS_OPEN, ChunkedUpload.STATUS_ASSEMBLING),
+                updated_at__lt=cutoff,
+            ).only("id")
+        )
+        for session in stale:
+            discard_session_file(session)
+        ChunkedUpload.objects.filter(pk__in=[session.pk for session in stale]).update(
+            status=ChunkedUpload.STATUS_CANCELLED
+        )
+        self.stdout.write(self.style.SUCCESS(f"Expired {len(stale)} upload session(s)."))
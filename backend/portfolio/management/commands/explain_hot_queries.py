@@ -0,0 +1,150 @@
+import json
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import AIUsageEvent, BusinessDirectoryListing
+from apps.bids.models import Bid
+from portfolio.models import MessageThread, PrivateMessage, Project, ProjectImage, ProjectLike
+
+# Postgres: "Seq Scan on portfolio_project"; SQLite: "SCAN portfolio_project" (a full
+# table scan, as opposed to "SCAN ... USING INDEX" or "SEARCH ... USING INDEX").
+SEQ_SCAN_PATTERNS = (
+    re.compile(r"Seq Scan on (?P<table>\w+)"),
+    re.compile(r"\bSCAN (?P<table>\w+)(?! USING)(?:\s|$)"),
+)
+
+
+def canonical_queries():
+    """The filters behind the hot endpoints, with ids taken from existing rows."""
+    User = get_user_model()
+    thread = MessageThread.objects.order_by("id").first()
+    user_id = thread.owner_id if thread else (User.objects.order_by("id").values_list("id", flat=True).first() or 0)
+    thread_id = thread.pk if thread else 0
+    project_id = Project.objects.order_by("id").values_list("id", flat=True).first() or 0
+    job_id = Bid.objects.order_by("id").values_list("project_id", flat=True).first() or project_id
+
+    return [
+        (
+            "job_postings",
+            Project.objects.filter(
+                is_job_posting=True, is_public=True, is_private=False, post_privacy="public"
+            ).order_by("-updated_at"),
+        ),
+        (
+            "public_projects",
+            Project.objects.filter(
+                is_job_posting=False, is_public=True, is_private=False, post_privacy="public"
+            ).order_by("-updated_at"),
+        ),
+        (
+            "inbox_threads",
+            MessageThread.objects.filter(Q(owner_id=user_id) | Q(client_id=user_id)).order_by("-updated_at"),
+        ),
+        ("thread_messages", PrivateMessage.objects.filter(thread_id=thread_id).order_by("created_at")),
+        (
+            "thread_latest_message",
+            PrivateMessage.objects.filter(thread_id=thread_id).order_by("-created_at", "-id")[:1],
+        ),
+        (
+            "ai_usage_today",
+            AIUsageEvent.objects.filter(
+                user_id=user_id, request_day=timezone.localdate(), status=AIUsageEvent.Status.SUCCESS
+            ),
+        ),
+        ("project_bids_by_status", Bid.objects.filter(project_id=job_id, status=Bid.STATUS_ACCEPTED)),
+        (
+            "project_gallery",
+            ProjectImage.objects.filter(project_id=project_id, media_type=ProjectImage.MEDIA_TYPE_IMAGE).order_by(
+                "order"
+            ),
+        ),
+        ("project_like_count", ProjectLike.objects.filter(project_id=project_id)),
+        ("project_liked_by_me", ProjectLike.objects.filter(project_id=project_id, user_id=user_id)[:1]),
+        (
+            "business_directory",
+            BusinessDirectoryListing.objects.filter(is_published=True, is_removed=False).order_by("business_name", "id"),
+        ),
+        (
+            "business_directory_country",
+            BusinessDirectoryListing.objects.filter(is_published=True, is_removed=False, country_code="US"),
+        ),
+    ]
+
+
+def sequential_scans(plan):
+    tables = []
+    for line in plan.splitlines():
+        for pattern in SEQ_SCAN_PATTERNS:
+            match = pattern.search(line)
+            if match and match.group("table") not in tables:
+                tables.append(match.group("table"))
+    return tables
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the queries behind the hot endpoints and flag sequential scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only",
+            action="append",
+            default=[],
+            help="Query name to explain; repeatable.",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run the queries (EXPLAIN ANALYZE) on Postgres for actual row counts and timings.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the plans as JSON.")
+        parser.add_argument(
+            "--fail-on-seq-scan",
+            action="store_true",
+            help="Exit with an error when any plan contains a sequential scan.",
+        )
+
+    def handle(self, *args, **options):
+        queries = canonical_queries()
+        names = {name for name, _ in queries}
+        unknown = set(options["only"]) - names
+        if unknown:
+            raise CommandError(f"Unknown query name(s): {', '.join(sorted(unknown))}. Known: {', '.join(sorted(names))}.")
+
+        explain_options = {}
+        if options["analyze"]:
+            if connection.vendor != "postgresql":
+                raise CommandError("--analyze is only supported on PostgreSQL.")
+            explain_options["analyze"] = True
+
+        results = []
+        for name, queryset in queries:
+            if options["only"] and name not in options["only"]:
+                continue
+            plan = queryset.explain(**explain_options)
+            results.append({"name": name, "seq_scans": sequential_scans(plan), "plan": plan})
+
+        flagged = [result for result in results if result["seq_scans"]]
+        if options["json"]:
+            self.stdout.write(json.dumps({"database": connection.vendor, "queries": results}, indent=2))
+        else:
+            for result in results:
+                label = (
+                    self.style.WARNING(f"SEQ SCAN on {', '.join(result['seq_scans'])}")
+                    if result["seq_scans"]
+                    else self.style.SUCCESS("ok")
+                )
+                self.stdout.write(f"{result['name']}: {label}")
+                for line in result["plan"].splitlines():
+                    self.stdout.write(f"    {line}")
+            self.stdout.write(
+                f"{len(flagged)} of {len(results)} queries use a sequential scan "
+                "(small tables are often scanned on purpose; re-check against production-sized data)."
+            )
+
+        if flagged and options["fail_on_seq_scan"]:
+            raise CommandError(f"Sequential scans in: {', '.join(result['name'] for result in flagged)}.")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.media_cleanup import process_pending_file_deletions
+
+
+class Command(BaseCommand):
+    help = "Remove media files queued for deletion (retries anything a background worker missed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=0,
+            help="Files to delete per batch (default: MEDIA_DELETION_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=0,
+            help="Stop after this many batches (default: drain the queue).",
+        )
+
+    def handle(self, *args, **options):
+        deleted, failed = process_pending_file_deletions(
+            batch_size=options["batch_size"] or None,
+            max_batches=options["max_batches"] or None,
+        )
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(f"Processed queued media deletions: {deleted} deleted, {failed} failed."))
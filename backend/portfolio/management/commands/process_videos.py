@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.models import ProjectImage
+from portfolio.video_processing import process_video
+
+
+class Command(BaseCommand):
+    help = "Transcode project videos still waiting for processing (e.g. after a worker restart)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Also retry videos whose previous transcode failed.",
+        )
+
+    def handle(self, *args, **options):
+        statuses = [ProjectImage.STATUS_PENDING, ProjectImage.STATUS_PROCESSING]
+        if options["retry_failed"]:
+            statuses.append(ProjectImage.STATUS_FAILED)
+        qs = ProjectImage.objects.filter(media_type=ProjectImage.MEDIA_TYPE_VIDEO, processing_status__in=statuses)
+        if options["retry_failed"]:
+            qs.filter(processing_status=ProjectImage.STATUS_FAILED).update(processing_status=ProjectImage.STATUS_PENDING)
+
+        ready = failed = 0
+        for image_id in list(qs.order_by("id").values_list("id", flat=True)):
+            if process_video(image_id):
+                ready += 1
+            else:
+                failed += 1
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(f"Processed videos: {ready} ready, {failed} failed."))
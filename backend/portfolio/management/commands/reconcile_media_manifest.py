@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from portfolio.models import MediaManifestEntry, ProjectImage, ProjectPlanImage
+from portfolio.storage import media_storage, present_media_names
+
+
+class Command(BaseCommand):
+    help = "Re-check media manifest entries against storage and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without updating the manifest.",
+        )
+        parser.add_argument(
+            "--add-missing",
+            action="store_true",
+            help="Also record project and planner images the manifest has never seen.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Manifest rows checked per batch.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        chunk_size = max(1, options["chunk_size"])
+        checked = 0
+        drifted = 0
+
+        last_id = 0
+        while True:
+            entries = list(MediaManifestEntry.objects.filter(id__gt=last_id).order_by("id")[:chunk_size])
+            if not entries:
+                break
+            last_id = entries[-1].id
+            changed = []
+            for entry in entries:
+                checked += 1
+                present = media_storage.exists(entry.name)
+                size = media_storage.size(entry.name) if present else 0
+                if present == entry.present and size == entry.size:
+                    continue
+                drifted += 1
+                self.stdout.write(
+                    f"Drift: {entry.name} manifest={'present' if entry.present else 'missing'}/{entry.size} "
+                    f"storage={'present' if present else 'missing'}/{size}"
+                )
+                entry.present = present
+                entry.size = size
+                entry.updated_at = timezone.now()
+                changed.append(entry)
+            if changed and not dry_run:
+                MediaManifestEntry.objects.bulk_update(changed, ["present", "size", "updated_at"])
+
+        added = 0
+        if options["add_missing"]:
+            for model in (ProjectImage, ProjectPlanImage):
+                names = model.objects.exclude(image="").values_list("image", flat=True).distinct()
+                chunk = []
+                for name in names.iterator(chunk_size=chunk_size):
+                    chunk.append(name)
+                    if len(chunk) >= chunk_size:
+                        added += self._add_unknown(chunk, dry_run)
+                        chunk = []
+                if chunk:
+                    added += self._add_unknown(chunk, dry_run)
+
+        prefix = "Would reconcile" if dry_run else "Reconciled"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix} media manifest: {checked} checked, {drifted} drifted, {added} added."
+            )
+        )
+
+    def _add_unknown(self, names, dry_run):
+        known = set(MediaManifestEntry.objects.filter(name__in=names).values_list("name", flat=True))
+        unknown = [name for name in names if name not in known]
+        if unknown and not dry_run:
+            present_media_names(unknown, storage=media_storage)
+        return len(unknown)
@@ -0,0 +1,78 @@
+import json
+import platform
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from portfolio.benchmarking import DEFAULT_PREFIX, ENDPOINTS, dataset_context, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = "Time the main API endpoints against a seeded dataset and print latency percentiles as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="Dataset created by seed_benchmark_data.")
+        parser.add_argument("--iterations", type=int, default=20, help="Timed requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per endpoint.")
+        parser.add_argument(
+            "--base-url",
+            default="",
+            help="Drive a running server (e.g. http://127.0.0.1:8000) instead of the in-process test client. "
+            "Query counts are only reported in-process.",
+        )
+        parser.add_argument(
+            "--only",
+            action="append",
+            default=[],
+            help=f"Endpoint name to run; repeatable. One of: {', '.join(name for name, _, _ in ENDPOINTS)}.",
+        )
+        parser.add_argument(
+            "--with-response-cache",
+            action="store_true",
+            help="Leave the anonymous response cache enabled for in-process runs.",
+        )
+        parser.add_argument("--label", default="", help="Free-form label stored with the run.")
+        parser.add_argument("--output", default="", help="Also write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        unknown = set(options["only"]) - {name for name, _, _ in ENDPOINTS}
+        if unknown:
+            raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}.")
+
+        context = dataset_context(options["prefix"])
+        if context is None:
+            raise CommandError(
+                f"No {options['prefix']!r} dataset found; run seed_benchmark_data --prefix {options['prefix']} first."
+            )
+
+        results = run_benchmarks(
+            context,
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            base_url=options["base_url"],
+            only=options["only"],
+            response_cache=options["with_response_cache"],
+        )
+        report = {
+            "label": options["label"],
+            "generated_at": timezone.now().isoformat(),
+            "mode": "http" if options["base_url"] else "in-process",
+            "base_url": options["base_url"] or None,
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "dataset": options["prefix"],
+            "iterations": options["iterations"],
+            "endpoints": results,
+        }
+        text = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(text + "\n")
+        self.stdout.write(text)
+
+        failed = [result["name"] for result in results if any(status >= 400 for status in result["status"])]
+        if failed:
+            self.stderr.write(f"Endpoints returned errors: {', '.join(failed)}")
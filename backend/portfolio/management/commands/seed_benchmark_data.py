@@ -0,0 +1,77 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.benchmarking import DEFAULT_PREFIX, delete_dataset, seed_dataset
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert a synthetic, scaled dataset for load benchmarks (see run_benchmarks)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=1000,
+            help="Number of contractors, homeowners and directory listings (default: 1000).",
+        )
+        parser.add_argument("--projects-per-contractor", type=int, default=3)
+        parser.add_argument("--images-per-project", type=int, default=3)
+        parser.add_argument("--bids-per-job", type=int, default=5)
+        parser.add_argument("--threads-per-homeowner", type=int, default=3)
+        parser.add_argument("--messages-per-thread", type=int, default=6)
+        parser.add_argument("--ai-events-per-user", type=int, default=5)
+        parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="Username prefix of the seeded rows.")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed, for repeatable datasets.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Delete an existing dataset with the same prefix first.",
+        )
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Only delete the dataset with this prefix.",
+        )
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"].strip().lower()
+        if not prefix or "-" in prefix:
+            raise CommandError("--prefix must be a non-empty word without dashes.")
+        if options["scale"] < 1:
+            raise CommandError("--scale must be at least 1.")
+
+        if options["delete"] or options["replace"]:
+            deleted = delete_dataset(prefix)
+            self.stdout.write(f"Deleted {deleted} row(s) of the {prefix!r} dataset.")
+            if options["delete"]:
+                return
+
+        from django.contrib.auth import get_user_model
+
+        if get_user_model().objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(f"A {prefix!r} dataset already exists; pass --replace to rebuild it.")
+
+        started = time.monotonic()
+        counts = seed_dataset(
+            contractors=options["scale"],
+            homeowners=options["scale"],
+            listings=options["scale"],
+            projects_per_contractor=options["projects_per_contractor"],
+            images_per_project=options["images_per_project"],
+            bids_per_job=options["bids_per_job"],
+            threads_per_homeowner=options["threads_per_homeowner"],
+            messages_per_thread=options["messages_per_thread"],
+            ai_events_per_user=options["ai_events_per_user"],
+            prefix=prefix,
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            stdout=self.stdout,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {sum(counts.values())} rows for dataset {prefix!r} "
+                f"in {time.monotonic() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,127 @@
+# backend/portfolio/media_cleanup.py
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .storage import media_storage
+
+logger = logging.getLogger(__name__)
+
+_deferred = threading.local()
+_worker_lock = threading.Lock()
+
+
+@contextmanager
+def defer_file_deletion():
+    """
+    Queue file removals triggered inside the block instead of hitting storage.
+
+    Meant to wrap bulk row deletes inside ``transaction.atomic()``: post_delete
+    handlers call ``delete_field_file`` which only records the name, the names
+    are written to PendingFileDeletion in one insert, and the queue is drained
+    in batches after the transaction commits.
+    """
+    outer = getattr(_deferred, "names", None)
+    _deferred.names = [] if outer is None else outer
+    try:
+        yield
+        if outer is None:
+            queue_file_deletions(_deferred.names)
+    finally:
+        if outer is None:
+            _deferred.names = None
+
+
+def delete_field_file(field_file):
+    name = getattr(field_file, "name", "") or ""
+    if not name:
+        return
+    names = getattr(_deferred, "names", None)
+    if names is not None:
+        names.append(name)
+        return
+    try:
+        field_file.delete(save=False)
+    except Exception:
+        # don't crash deletes if storage is temporarily unavailable
+        logger.warning("Could not delete media file name=%s", name, exc_info=True)
+
+
+def queue_file_deletions(names):
+    from .models import PendingFileDeletion
+
+    names = [name for name in names if name]
+    if not names:
+        return 0
+    PendingFileDeletion.objects.bulk_create([PendingFileDeletion(name=name) for name in names], batch_size=500)
+    transaction.on_commit(schedule_file_deletion_worker)
+    return len(names)
+
+
+def process_pending_file_deletions(batch_size=None, max_batches=None):
+    """
+    Drain the deletion queue; returns (deleted, failed).
+
+    Several drains can run at once (one thread per commit in every gunicorn
+    worker, plus the cron command), so each row is claimed by deleting it in
+    the same transaction as the storage delete. Only the drain whose DELETE
+    removed the row touches storage, which keeps MediaBlob.ref_count from
+    being decremented twice for one queued name; a storage failure rolls the
+    claim back and the row is retried later.
+    """
+    from .models import PendingFileDeletion
+
+    batch_size = max(1, int(batch_size or getattr(settings, "MEDIA_DELETION_BATCH_SIZE", 100)))
+    max_attempts = max(1, int(getattr(settings, "MEDIA_DELETION_MAX_ATTEMPTS", 5)))
+    deleted = 0
+    failed = 0
+    last_id = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batch = list(
+            PendingFileDeletion.objects.filter(id__gt=last_id, attempts__lt=max_attempts).order_by("id")[:batch_size]
+        )
+        if not batch:
+            break
+        batches += 1
+        last_id = batch[-1].id
+        for item in batch:
+            try:
+                with transaction.atomic():
+                    claimed, _ = PendingFileDeletion.objects.filter(pk=item.pk).delete()
+                    if not claimed:
+                        # Another drain got here first.
+                        continue
+                    media_storage.delete(item.name)
+            except Exception as exc:
+                failed += 1
+                PendingFileDeletion.objects.filter(pk=item.pk).update(
+                    attempts=item.attempts + 1,
+                    last_error=str(exc)[:500],
+                )
+                logger.warning("Queued media deletion failed name=%s error=%s", item.name, exc)
+                continue
+            deleted += 1
+    return deleted, failed
+
+
+def _run_worker():
+    try:
+        with _worker_lock:
+            deleted, failed = process_pending_file_deletions()
+        if deleted or failed:
+            logger.info("Processed queued media deletions deleted=%s failed=%s", deleted, failed)
+    except Exception:
+        logger.exception("Queued media deletion worker crashed")
+    finally:
+        connection.close()
+
+
+def schedule_file_deletion_worker():
+    if not getattr(settings, "MEDIA_DELETION_ASYNC", True):
+        process_pending_file_deletions()
+        return
+    threading.Thread(target=_run_worker, name="media-deletion", daemon=True).start()
@@ -0,0 +1,50 @@
+# backend/portfolio/metrics_collectors.py
+"""
+Scrape-time gauges for media work waiting in the database.
+
+These read grouped counts at ``/metrics`` time rather than tracking every
+state change, so they stay correct across restarts and bulk updates.
+"""
+from django.db.models import Count
+
+from accounts.metrics import register_collector
+
+from .models import ChunkedUpload, DirectUpload, PendingFileDeletion, ProjectImage
+
+
+def _grouped(queryset, field):
+    return {row[field]: row["total"] for row in queryset.values(field).annotate(total=Count("id")).order_by()}
+
+
+@register_collector
+def media_backlog():
+    unfinished = (ProjectImage.STATUS_PENDING, ProjectImage.STATUS_PROCESSING, ProjectImage.STATUS_FAILED)
+    images = _grouped(ProjectImage.objects.filter(processing_status__in=unfinished), "processing_status")
+    in_flight = (DirectUpload.STATUS_PENDING, DirectUpload.STATUS_UPLOADED, DirectUpload.STATUS_PROCESSING)
+    direct = _grouped(DirectUpload.objects.filter(status__in=in_flight), "status")
+    return [
+        (
+            "project_media_processing",
+            "gauge",
+            "Project media rows not yet ready, by processing status.",
+            [({"status": value}, images.get(value, 0)) for value in unfinished],
+        ),
+        (
+            "direct_uploads_unfinished",
+            "gauge",
+            "Direct-to-storage uploads not yet turned into project media, by status.",
+            [({"status": value}, direct.get(value, 0)) for value in in_flight],
+        ),
+        (
+            "chunked_upload_sessions_open",
+            "gauge",
+            "Resumable upload sessions still accepting chunks.",
+            [({}, ChunkedUpload.objects.filter(status=ChunkedUpload.STATUS_OPEN).count())],
+        ),
+        (
+            "pending_file_deletions",
+            "gauge",
+            "Media files queued for removal from storage.",
+            [({}, PendingFileDeletion.objects.count())],
+        ),
+    ]
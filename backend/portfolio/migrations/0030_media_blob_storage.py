@@ -0,0 +1,36 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:47
+
+import portfolio.models
+import portfolio.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0029_alter_helperlisting_owner'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='projectimage',
+            name='image',
+            field=models.ImageField(storage=portfolio.storage.get_media_storage, upload_to='project_images/'),
+        ),
+        migrations.AlterField(
+            model_name='projectplanimage',
+            name='image',
+            field=models.ImageField(storage=portfolio.storage.get_media_storage, upload_to=portfolio.models.project_plan_image_upload_path),
+        ),
+    ]
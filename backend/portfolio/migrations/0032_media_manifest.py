@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0031_pending_file_deletion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaManifestEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('present', models.BooleanField(default=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.0.7 on 2026-10-19 12:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0034_chunked_upload'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='messagethread',
+            index=models.Index(fields=['owner', '-updated_at'], name='thread_owner_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messagethread',
+            index=models.Index(fields=['client', '-updated_at'], name='thread_client_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='privatemessage',
+            index=models.Index(fields=['thread', 'created_at'], name='private_message_thread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['is_job_posting', 'is_public', 'is_private', 'post_privacy', '-updated_at'], name='project_visibility_upd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_job_posting', True), ('is_private', False), ('is_public', True), ('post_privacy', 'public')), fields=['-updated_at'], name='project_open_jobs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectfavorite',
+            index=models.Index(fields=['project', 'user'], name='project_favorite_proj_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectimage',
+            index=models.Index(fields=['project', 'media_type', 'order'], name='project_image_gallery_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectlike',
+            index=models.Index(fields=['project', 'user'], name='project_like_proj_user_idx'),
+        ),
+    ]
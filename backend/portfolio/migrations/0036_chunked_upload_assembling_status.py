@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0035_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chunkedupload',
+            name='status',
+            field=models.CharField(choices=[('open', 'Open'), ('assembling', 'Assembling'), ('complete', 'Complete'), ('cancelled', 'Cancelled')], default='open', max_length=20),
+        ),
+    ]
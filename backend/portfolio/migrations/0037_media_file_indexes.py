@@ -0,0 +1,60 @@
+# Generated by Django 5.0.7 on 2026-10-19 13:34
+
+import portfolio.models
+import portfolio.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0036_chunked_upload_assembling_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='feedbackattachment',
+            name='file',
+            field=models.FileField(db_index=True, upload_to=portfolio.models.feedback_attachment_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='messageattachment',
+            name='file',
+            field=models.FileField(blank=True, db_index=True, null=True, upload_to=portfolio.models.message_attachment_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='pendingfiledeletion',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='privatemessage',
+            name='attachment',
+            field=models.FileField(blank=True, db_index=True, null=True, upload_to=portfolio.models.direct_message_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='cover_image_file',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='projects/covers/'),
+        ),
+        migrations.AlterField(
+            model_name='projectbidversion',
+            name='attachment',
+            field=models.FileField(blank=True, db_index=True, null=True, upload_to=portfolio.models.project_bid_attachment_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='projectimage',
+            name='image',
+            field=models.ImageField(db_index=True, storage=portfolio.storage.get_media_storage, upload_to='project_images/'),
+        ),
+        migrations.AlterField(
+            model_name='projectimage',
+            name='thumbnail',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='project_images/thumbnails/'),
+        ),
+        migrations.AlterField(
+            model_name='projectplanimage',
+            name='image',
+            field=models.ImageField(db_index=True, storage=portfolio.storage.get_media_storage, upload_to=portfolio.models.project_plan_image_upload_path),
+        ),
+    ]
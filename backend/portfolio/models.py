@@ -1,23 +1,19 @@
 # backend/portfolio/models.py
-from io import BytesIO
 import os
-import subprocess
-import tempfile
 import uuid
 from datetime import timedelta
-from pathlib import Path
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
 from django.core.mail import send_mail
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 from django.utils import timezone
-from PIL import Image, ImageOps, UnidentifiedImageError
 
+from .image_conversion import ImageConversionError, ImageTooLargeError, convert_to_webp, fits_stored_limits
+from .storage import get_media_storage
 from .utils import convert_field_file_to_webp
+from .video_processing import queue_video_processing
 
 try:
     from pillow_heif import register_heif_opener
@@ -144,6 +140,7 @@ class Project(models.Model):
         upload_to="projects/covers/",
         blank=True,
         null=True,
+        db_index=True,
     )
 
     is_public = models.BooleanField(default=True)
@@ -167,6 +164,20 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Visibility filters shared by the project list and the job board, newest first.
+            models.Index(
+                fields=["is_job_posting", "is_public", "is_private", "post_privacy", "-updated_at"],
+                name="project_visibility_upd_idx",
+            ),
+            models.Index(
+                fields=["-updated_at"],
+                name="project_open_jobs_idx",
+                condition=models.Q(is_job_posting=True, is_public=True, is_private=False, post_privacy="public"),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.owner})"
 
@@ -285,13 +296,53 @@ class ProjectPlan(models.Model):
         return f"ProjectPlan<{self.owner_id}:{self.title or 'Untitled issue'}>"
 
 
+class MediaBlob(models.Model):
+    """One stored file shared by every media row that references its bytes."""
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+class MediaManifestEntry(models.Model):
+    """Last known presence and size of a stored media file, kept by portfolio.storage."""
+
+    name = models.CharField(max_length=255, unique=True)
+    present = models.BooleanField(default=True)
+    size = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({'present' if self.present else 'missing'})"
+
+
+class PendingFileDeletion(models.Model):
+    """Media file whose owning row is gone, waiting to be removed from storage."""
+
+    name = models.CharField(max_length=255, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.CharField(max_length=500, blank=True, default="")
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return self.name
+
+
 class ProjectPlanImage(models.Model):
     project_plan = models.ForeignKey(
         ProjectPlan,
         related_name="images",
         on_delete=models.CASCADE,
     )
-    image = models.ImageField(upload_to=project_plan_image_upload_path)
+    image = models.ImageField(upload_to=project_plan_image_upload_path, storage=get_media_storage, db_index=True)
     caption = models.CharField(max_length=255, blank=True, default="")
     order = models.PositiveIntegerField(default=0)
     is_cover = models.BooleanField(default=False)
@@ -306,19 +357,14 @@ class ProjectPlanImage(models.Model):
 
         current_name = self.image.name
         root, ext = os.path.splitext((current_name or "").lower())
-        if ext == ".webp":
-            return
-
         try:
-            img = Image.open(self.image)
-            img = ImageOps.exif_transpose(img)
-            if img.mode not in ("RGB", "RGBA"):
-                img = img.convert("RGB")
-
-            buffer = BytesIO()
-            img.save(buffer, format="WEBP", quality=80)
-            buffer.seek(0)
-        except (UnidentifiedImageError, OSError, ValueError):
+            # WEBP uploads skip the re-encode only when they are already within limits.
+            if ext == ".webp" and fits_stored_limits(self.image):
+                return
+            converted = convert_to_webp(self.image, label=f"project_plan_image:{current_name}")
+        except ImageTooLargeError:
+            raise
+        except ImageConversionError:
             try:
                 self.image.seek(0)
             except Exception:
@@ -327,11 +373,11 @@ class ProjectPlanImage(models.Model):
 
         new_name = f"{root}.webp"
         old_name = current_name
-        self.image.save(new_name, ContentFile(buffer.read()), save=False)
+        self.image.save(new_name, converted, save=False)
 
-        if old_name and old_name != self.image.name and default_storage.exists(old_name):
+        if old_name and old_name != self.image.name and self.image.storage.exists(old_name):
             try:
-                default_storage.delete(old_name)
+                self.image.storage.delete(old_name)
             except Exception:
                 pass
 
@@ -356,6 +402,7 @@ class ProjectFavorite(models.Model):
 
     class Meta:
         unique_together = ("user", "project")
+        indexes = [models.Index(fields=["project", "user"], name="project_favorite_proj_user_idx")]
 
     def __str__(self):
         return f"{self.user} → {self.project}"
@@ -376,6 +423,8 @@ class ProjectLike(models.Model):
 
     class Meta:
         unique_together = ("user", "project")
+        # unique_together leads with user; like counts and "liked by me" lead with project.
+        indexes = [models.Index(fields=["project", "user"], name="project_like_proj_user_idx")]
 
     def __str__(self):
         return f"{self.user} ♥ {self.project}"
@@ -477,9 +526,9 @@ class ProjectImage(models.Model):
         related_name="images",
         on_delete=models.CASCADE,
     )
-    image = models.ImageField(upload_to="project_images/")
+    image = models.ImageField(upload_to="project_images/", storage=get_media_storage, db_index=True)
     media_type = models.CharField(max_length=10, choices=MEDIA_TYPE_CHOICES, default=MEDIA_TYPE_IMAGE)
-    thumbnail = models.ImageField(upload_to="project_images/thumbnails/", blank=True, null=True)
+    thumbnail = models.ImageField(upload_to="project_images/thumbnails/", blank=True, null=True, db_index=True)
     processing_status = models.CharField(
         max_length=20,
         choices=PROCESSING_STATUS_CHOICES,
@@ -491,6 +540,9 @@ class ProjectImage(models.Model):
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["project", "media_type", "order"], name="project_image_gallery_idx")]
+
     def _convert_image_to_webp(self):
         if not self.image:
             return
@@ -498,21 +550,16 @@ class ProjectImage(models.Model):
         current_name = self.image.name
         root, ext = os.path.splitext((current_name or "").lower())
 
-        if ext == ".webp":
-            self.media_type = self.MEDIA_TYPE_IMAGE
-            self.processing_status = self.STATUS_READY
-            return
-
         try:
-            img = Image.open(self.image)
-            img = ImageOps.exif_transpose(img)
-            if img.mode not in ("RGB", "RGBA"):
-                img = img.convert("RGB")
-
-            buffer = BytesIO()
-            img.save(buffer, format="WEBP", quality=80)
-            buffer.seek(0)
-        except (UnidentifiedImageError, OSError, ValueError):
+            # WEBP uploads skip the re-encode only when they are already within limits.
+            if ext == ".webp" and fits_stored_limits(self.image):
+                self.media_type = self.MEDIA_TYPE_IMAGE
+                self.processing_status = self.STATUS_READY
+                return
+            converted = convert_to_webp(self.image, label=f"project_image:{current_name}")
+        except ImageTooLargeError:
+            raise
+        except ImageConversionError:
             try:
                 self.image.seek(0)
             except Exception:
@@ -523,98 +570,18 @@ class ProjectImage(models.Model):
         new_name = f"{root}.webp"
         old_name = current_name
 
-        self.image.save(new_name, ContentFile(buffer.read()), save=False)
+        self.image.save(new_name, converted, save=False)
         self.media_type = self.MEDIA_TYPE_IMAGE
         self.processing_status = self.STATUS_READY
 
-        if old_name and old_name != self.image.name and default_storage.exists(old_name):
+        if old_name and old_name != self.image.name and self.image.storage.exists(old_name):
             try:
-                default_storage.delete(old_name)
+                self.image.storage.delete(old_name)
             except Exception:
                 pass
 
-    def _convert_video_to_webm(self):
-        if not self.image:
-            return
-
-        current_name = self.image.name
-        root, ext = os.path.splitext((current_name or "").lower())
-
-        self.media_type = self.MEDIA_TYPE_VIDEO
-        self.processing_status = self.STATUS_PROCESSING
-
-        suffix = ext if ext in VIDEO_UPLOAD_EXTENSIONS else ".video"
-        with tempfile.TemporaryDirectory() as tmpdir:
-            input_path = Path(tmpdir) / f"input{suffix}"
-            output_path = Path(tmpdir) / "output.webm"
-            thumb_path = Path(tmpdir) / "thumbnail.png"
-
-            try:
-                with open(input_path, "wb") as handle:
-                    for chunk in self.image.chunks():
-                        handle.write(chunk)
-
-                subprocess.run(
-                    [
-                        "ffmpeg",
-                        "-y",
-                        "-i",
-                        str(input_path),
-                        "-vf",
-                        "scale=min(1280\\,iw):-2",
-                        "-c:v",
-                        "libvpx-vp9",
-                        "-b:v",
-                        "0",
-                        "-crf",
-                        "34",
-                        "-c:a",
-                        "libopus",
-                        "-b:a",
-                        "96k",
-                        str(output_path),
-                    ],
-                    check=True,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.PIPE,
-                )
-
-                subprocess.run(
-                    [
-                        "ffmpeg",
-                        "-y",
-                        "-i",
-                        str(output_path),
-                        "-frames:v",
-                        "1",
-                        "-update",
-                        "1",
-                        str(thumb_path),
-                    ],
-                    check=True,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.PIPE,
-                )
-
-                old_name = current_name
-                new_name = f"{root}.webm"
-                self.image.save(new_name, ContentFile(output_path.read_bytes()), save=False)
-                self.thumbnail.save(f"{root}_thumb.png", ContentFile(thumb_path.read_bytes()), save=False)
-                self.processing_status = self.STATUS_READY
-
-                if old_name and old_name != self.image.name and default_storage.exists(old_name):
-                    try:
-                        default_storage.delete(old_name)
-                    except Exception:
-                        pass
-            except Exception:
-                try:
-                    self.image.seek(0)
-                except Exception:
-                    pass
-                self.processing_status = self.STATUS_FAILED
-
     def save(self, *args, **kwargs):
+        transcode = False
         if self.image and not getattr(self.image, "_committed", True):
             ext = os.path.splitext((self.image.name or "").lower())[1]
             content_type = str(getattr(self.image, "content_type", "") or "").lower()
@@ -623,10 +590,100 @@ class ProjectImage(models.Model):
                 or ext in VIDEO_UPLOAD_EXTENSIONS
                 or content_type.startswith("video/")
             ):
-                self._convert_video_to_webm()
+                # Stored as uploaded; the video worker pool transcodes it after commit.
+                self.media_type = self.MEDIA_TYPE_VIDEO
+                self.processing_status = self.STATUS_PENDING
+                transcode = True
             else:
                 self._convert_image_to_webp()
         super().save(*args, **kwargs)
+        if transcode:
+            queue_video_processing(self.pk)
+
+
+class DirectUpload(models.Model):
+    """Project media uploaded straight to object storage, waiting to become a ProjectImage."""
+
+    STATUS_PENDING = "pending"
+    STATUS_UPLOADED = "uploaded"
+    STATUS_PROCESSING = "processing"
+    STATUS_READY = "ready"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_PENDING, "Pending"),
+        (STATUS_UPLOADED, "Uploaded"),
+        (STATUS_PROCESSING, "Processing"),
+        (STATUS_READY, "Ready"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, related_name="direct_uploads", on_delete=models.CASCADE)
+    project = models.ForeignKey(Project, related_name="direct_uploads", on_delete=models.CASCADE)
+    object_key = models.CharField(max_length=255, unique=True)
+    filename = models.CharField(max_length=255, blank=True, default="")
+    content_type = models.CharField(max_length=100, blank=True, default="")
+    expected_size = models.PositiveBigIntegerField(default=0)
+    caption = models.CharField(max_length=255, blank=True, default="")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    error = models.CharField(max_length=500, blank=True, default="")
+    project_image = models.ForeignKey(
+        ProjectImage,
+        related_name="+",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.project_id}:{self.object_key}"
+
+
+class ChunkedUpload(models.Model):
+    """Resumable upload session whose chunks are assembled in a temp file on disk."""
+
+    STATUS_OPEN = "open"
+    STATUS_ASSEMBLING = "assembling"
+    STATUS_COMPLETE = "complete"
+    STATUS_CANCELLED = "cancelled"
+    STATUS_CHOICES = (
+        (STATUS_OPEN, "Open"),
+        (STATUS_ASSEMBLING, "Assembling"),
+        (STATUS_COMPLETE, "Complete"),
+        (STATUS_CANCELLED, "Cancelled"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, related_name="chunked_uploads", on_delete=models.CASCADE)
+    project = models.ForeignKey(Project, related_name="chunked_uploads", on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255, blank=True, default="")
+    content_type = models.CharField(max_length=100, blank=True, default="")
+    total_size = models.PositiveBigIntegerField()
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    chunks = models.JSONField(default=list, blank=True)
+    caption = models.CharField(max_length=255, blank=True, default="")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_OPEN)
+    project_image = models.ForeignKey(
+        ProjectImage,
+        related_name="+",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.project_id}:{self.filename or self.pk}"
+
 
 class ProjectBid(models.Model):
     STATUS_DRAFT = "draft"
@@ -748,6 +805,7 @@ class ProjectBidVersion(models.Model):
         upload_to=project_bid_attachment_upload_path,
         null=True,
         blank=True,
+        db_index=True,
     )
 
     created_by = models.ForeignKey(
@@ -850,6 +908,10 @@ class MessageThread(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["owner", "client"], name="unique_dm_pair")
         ]
+        indexes = [
+            models.Index(fields=["owner", "-updated_at"], name="thread_owner_updated_idx"),
+            models.Index(fields=["client", "-updated_at"], name="thread_client_updated_idx"),
+        ]
 
     def __str__(self):
         return f"DM<{self.id}> users={self.owner_id},{self.client_id}"
@@ -994,6 +1056,7 @@ class PrivateMessage(models.Model):
         upload_to=direct_message_upload_path,
         blank=True,
         null=True,
+        db_index=True,
     )
     attachment_name = models.CharField(max_length=255, blank=True, default="")
     attachment_type = models.CharField(max_length=50, blank=True, default="")
@@ -1018,6 +1081,7 @@ class PrivateMessage(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [models.Index(fields=["thread", "created_at"], name="private_message_thread_idx")]
 
     def __str__(self):
         return f"Message<{self.id}> in thread {self.thread_id}"
@@ -1037,7 +1101,7 @@ class MessageAttachment(models.Model):
         related_name="attachments",
     )
     kind = models.CharField(max_length=20, choices=KIND_CHOICES)
-    file = models.FileField(upload_to=message_attachment_upload_path, blank=True, null=True)
+    file = models.FileField(upload_to=message_attachment_upload_path, blank=True, null=True, db_index=True)
     original_name = models.CharField(max_length=255, blank=True, default="")
     url = models.URLField(blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -1400,7 +1464,7 @@ class FeedbackAttachment(models.Model):
         null=True,
         blank=True,
     )
-    file = models.FileField(upload_to=feedback_attachment_upload_path)
+    file = models.FileField(upload_to=feedback_attachment_upload_path, db_index=True)
     original_name = models.CharField(max_length=255)
     content_type = models.CharField(max_length=120, blank=True)
     size = models.PositiveBigIntegerField(default=0)
@@ -1,14 +1,15 @@
 import json
-from functools import lru_cache
 from pathlib import Path
 
 
 TEMPLATE_PATH = Path(__file__).with_name("project_intake_templates.json")
 READINESS_MAX_SCORE = 100
 
+# ((mtime_ns, size), payload) for the last parse in this process.
+_templates = (None, None)
 
-@lru_cache(maxsize=1)
-def load_project_intake_templates():
+
+def _read_project_intake_templates():
     with TEMPLATE_PATH.open("r", encoding="utf-8") as handle:
         payload = json.load(handle)
 
@@ -18,6 +19,20 @@ def load_project_intake_templates():
     return payload
 
 
+def load_project_intake_templates():
+    # Memoised per process and keyed on the file's mtime/size, so an edited
+    # template file is picked up by every worker without a restart. The file
+    # ships with the code; a shared cache would only add an unpickle per call.
+    global _templates
+    stat = TEMPLATE_PATH.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    memo_key, payload = _templates
+    if memo_key != key:
+        payload = _read_project_intake_templates()
+        _templates = (key, payload)
+    return payload
+
+
 def get_project_intake_template(project_type):
     if not project_type:
         return None
@@ -0,0 +1,278 @@
+# backend/portfolio/query_budget.py
+"""
+Query-budget harness for list endpoints (test support; not imported by the app).
+
+``seed_marketplace(n)`` builds a self-contained world around one homeowner
+(the viewer): n contractors with public profiles and portfolio projects the
+viewer has liked, favorited, saved and messaged, n homeowners with public
+reference galleries and helper listings, n directory listings, and the
+viewer's own job postings (the first with a bid from every contractor) and
+project plans. ``QueryBudgetMixin.assertConstantQueries`` requests an endpoint
+against worlds of different sizes, each inside a rolled-back savepoint, and
+fails when the query count grows with n. The failure message lists the SQL
+of the largest run grouped by the first application frame that issued it,
+which is usually the serializer method responsible for the N+1.
+"""
+import os
+import sys
+import traceback
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from accounts.models import (
+    BusinessDirectoryListing,
+    BusinessDirectoryListingLike,
+    HomeownerReferenceImage,
+    Profile,
+    ProfileLike,
+    ProfileSave,
+)
+from apps.bids.models import Bid
+
+from .models import (
+    HelperFeedback,
+    HelperListing,
+    MessageThread,
+    PrivateMessage,
+    Project,
+    ProjectComment,
+    ProjectFavorite,
+    ProjectImage,
+    ProjectLike,
+    ProjectPlan,
+    ProjectPlanImage,
+)
+
+User = get_user_model()
+
+DEFAULT_SIZES = (5, 50)
+IMAGES_PER_PROJECT = 2
+REFERENCES_PER_HOMEOWNER = 2
+
+
+@dataclass
+class Marketplace:
+    viewer: object
+    contractors: list = field(default_factory=list)
+    homeowners: list = field(default_factory=list)
+    projects: list = field(default_factory=list)
+    job_postings: list = field(default_factory=list)
+    threads: list = field(default_factory=list)
+
+
+def _make_user(username, profile_type, **profile_fields):
+    # No password: hashing dominates seeding time and the client authenticates directly.
+    user = User.objects.create_user(username=username, email=f"{username}@example.com")
+    profile = user.profile
+    for name, value in {"profile_type": profile_type, "display_name": username, **profile_fields}.items():
+        setattr(profile, name, value)
+    profile.save()
+    return user
+
+
+def seed_marketplace(n, prefix="qb"):
+    """
+    Create a Marketplace whose list endpoints each return at least ``n`` rows.
+
+    Collections hanging off a single parent (comments, bids and messages) are
+    seeded on the first project, job posting and thread.
+    """
+    viewer = _make_user(f"{prefix}-viewer", Profile.ProfileType.HOMEOWNER, public_profile_enabled=True)
+    world = Marketplace(viewer=viewer)
+
+    for i in range(n):
+        contractor = _make_user(
+            f"{prefix}-pro-{i}",
+            Profile.ProfileType.CONTRACTOR,
+            public_profile_enabled=True,
+            service_location="Media, PA",
+        )
+        homeowner = _make_user(f"{prefix}-home-{i}", Profile.ProfileType.HOMEOWNER, public_profile_enabled=True)
+        world.contractors.append(contractor)
+        world.homeowners.append(homeowner)
+
+        project = Project.objects.create(owner=contractor, title=f"Deck {i}", summary="Cedar deck", is_public=True)
+        world.projects.append(project)
+        # bulk_create skips the models' save(), which would try to convert the files.
+        ProjectImage.objects.bulk_create(
+            ProjectImage(project=project, image=f"project_images/{prefix}-{i}-{order}.webp", order=order)
+            for order in range(IMAGES_PER_PROJECT)
+        )
+        HomeownerReferenceImage.objects.bulk_create(
+            HomeownerReferenceImage(user=homeowner, image=f"reference_gallery/{prefix}-{i}-{order}.webp", order=order)
+            for order in range(REFERENCES_PER_HOMEOWNER)
+        )
+        job_posting = Project.objects.create(
+            owner=viewer,
+            title=f"Kitchen remodel {i}",
+            summary="Open for bids",
+            is_job_posting=True,
+            job_is_published=True,
+        )
+        world.job_postings.append(job_posting)
+        plan = ProjectPlan.objects.create(owner=viewer, title=f"Leaky faucet {i}")
+        ProjectPlanImage.objects.bulk_create(
+            [ProjectPlanImage(project_plan=plan, image=f"project_plan_images/{prefix}-{i}.webp")]
+        )
+
+        ProjectLike.objects.create(user=viewer, project=project)
+        ProjectFavorite.objects.create(user=viewer, project=project)
+        ProfileLike.objects.create(liker=viewer, liked_user=contractor)
+        ProfileSave.objects.create(saver=viewer, saved_user=contractor)
+        ProjectComment.objects.create(project=world.projects[0], author=contractor, text=f"Comment {i}")
+        Bid.objects.create(project=world.job_postings[0], contractor=contractor, amount=1000 + i)
+
+        listing = BusinessDirectoryListing.objects.create(
+            business_name=f"Directory {i}",
+            location="Media, PA",
+            country_code="US",
+            phone_number="555-123-4567",
+            is_published=True,
+        )
+        BusinessDirectoryListingLike.objects.create(liker=viewer, listing=listing)
+
+        helper = HelperListing.objects.create(
+            owner=homeowner,
+            full_name=f"Helper {i}",
+            city="Media",
+            state="PA",
+            email=f"helper-{i}@example.com",
+            preferred_contact_method="email",
+            skills=["cleanup"],
+            availability=["weekends"],
+            experience_level="1_3_years",
+            admin_approved=True,
+            contact_verified=True,
+        )
+        HelperFeedback.objects.create(
+            helper=helper,
+            reviewer=viewer,
+            project_type="Cleanup",
+            reliability_rating=5,
+            communication_rating=5,
+            work_quality_rating=5,
+            is_approved=True,
+        )
+
+        thread, _ = MessageThread.get_or_create_dm(viewer, contractor, origin_project=project, initiated_by=viewer)
+        MessageThread.objects.filter(pk=thread.pk).update(owner_has_accepted=True, client_has_accepted=True)
+        world.threads.append(thread)
+        PrivateMessage.objects.bulk_create(
+            PrivateMessage(thread=world.threads[0], sender=sender, text=f"Message {i}")
+            for sender in (viewer, contractor)
+        )
+
+    return world
+
+
+def _call_site(skip_files):
+    """
+    The innermost application frame that issued a query, e.g. a serializer
+    method. When a library (DRF) evaluated the queryset on the app's behalf,
+    the library frame is shown with the application frame that called it.
+    """
+    base_dir = str(settings.BASE_DIR) + os.sep
+    django_dir = os.path.dirname(django.__file__) + os.sep
+    library = None
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if filename in skip_files or filename.startswith(django_dir):
+            continue
+        if not filename.startswith(base_dir) or "site-packages" in filename:
+            library = library or frame
+            continue
+        site = f"{os.path.relpath(filename, base_dir)}:{frame.lineno} in {frame.name}"
+        if library is None:
+            return site
+        if filename.endswith("tests.py"):
+            # Only the test client is above the library; the view itself is inherited code.
+            break
+        return f"{_frame_label(library)} (from {site})"
+    return _frame_label(library) if library else "<unknown>"
+
+
+def _frame_label(frame):
+    marker = "site-packages" + os.sep
+    filename = frame.filename.split(marker, 1)[-1] if marker in frame.filename else frame.filename
+    return f"{filename}:{frame.lineno} in {frame.name}"
+
+
+class QueryLog:
+    """Record every query on the default connection with the call site that issued it."""
+
+    def __init__(self):
+        self.queries = []
+        # Middleware wraps every request; it is never the interesting frame.
+        self._skip = {__file__} | {
+            sys.modules[path.rsplit(".", 1)[0]].__file__
+            for path in settings.MIDDLEWARE
+            if path.rsplit(".", 1)[0] in sys.modules
+        }
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((_call_site(self._skip), sql))
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def by_call_site(self):
+        grouped = OrderedDict()
+        for site, sql in self.queries:
+            grouped.setdefault(site, []).append(sql)
+        return grouped
+
+    def report(self, distinct_per_site=2):
+        lines = []
+        for site, statements in sorted(self.by_call_site().items(), key=lambda item: -len(item[1])):
+            lines.append(f"{len(statements):4d}x {site}")
+            for sql in list(OrderedDict.fromkeys(statements))[:distinct_per_site]:
+                lines.append(f"        {sql[:300]}")
+        return "\n".join(lines)
+
+
+class QueryBudgetMixin:
+    """TestCase mixin; ``self.client`` must be an APIClient."""
+
+    sizes = DEFAULT_SIZES
+
+    def measure(self, n, request, *, viewer=True):
+        """Seed a world of size ``n``, run ``request(client, world)`` and roll everything back."""
+        log = QueryLog()
+        with transaction.atomic():
+            world = seed_marketplace(n)
+            self.client.force_authenticate(world.viewer if viewer else None)
+            with connection.execute_wrapper(log):
+                response = request(self.client, world)
+            self.client.force_authenticate(None)
+            transaction.set_rollback(True)
+        self.assertLess(response.status_code, 400, getattr(response, "data", response))
+        return log, response
+
+    def assertConstantQueries(self, request, *, viewer=True, rows=None, max_rows=None):
+        """
+        Fail if ``request`` issues more queries against a larger world.
+
+        ``rows(response)`` optionally returns the number of rendered rows, to
+        guard against an endpoint that stays flat only because it renders
+        nothing; ``max_rows`` is the endpoint's own result cap, if any.
+        """
+        logs = []
+        for n in self.sizes:
+            log, response = self.measure(n, request, viewer=viewer)
+            if rows is not None:
+                expected = min(n, max_rows) if max_rows else n
+                self.assertGreaterEqual(rows(response), expected, f"expected at least {expected} rows")
+            logs.append((n, log))
+        (small_n, small), (large_n, large) = logs[0], logs[-1]
+        if len(large) > len(small):
+            self.fail(
+                f"Query count grows with n: {len(small)} queries at n={small_n}, "
+                f"{len(large)} at n={large_n}. Queries at n={large_n} by call site:\n{large.report()}"
+            )
+        return len(large)
@@ -10,11 +10,13 @@ from urllib.parse import urlparse
 from rest_framework import serializers
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import models, transaction
 from django.db.models import F
-from accounts.serializers import ProfileSerializer
+from accounts.serializers import ProfileSerializer, profile_social_stats
 
 from .models import (
+    ChunkedUpload,
+    DirectUpload,
     ProjectComment,
     Project,
     ProjectImage,
@@ -528,6 +530,7 @@ class FeedbackReplySerializer(serializers.ModelSerializer):
 class ProjectImageSerializer(serializers.ModelSerializer):
     url = serializers.SerializerMethodField()
     thumbnail = serializers.SerializerMethodField()
+    processing_progress = serializers.SerializerMethodField()
 
     class Meta:
         model = ProjectImage
@@ -539,6 +542,7 @@ class ProjectImageSerializer(serializers.ModelSerializer):
             "media_type",
             "thumbnail",
             "processing_status",
+            "processing_progress",
             "caption",
             "alt_text",
             "extra_data",
@@ -563,6 +567,65 @@ class ProjectImageSerializer(serializers.ModelSerializer):
     def get_thumbnail(self, obj):
         return self._absolute_url(obj.thumbnail) or self.get_url(obj)
 
+    def get_processing_progress(self, obj):
+        if obj.media_type != ProjectImage.MEDIA_TYPE_VIDEO:
+            return None
+        if obj.processing_status == ProjectImage.STATUS_READY:
+            return 100
+        return ((obj.extra_data or {}).get("video_processing") or {}).get("percent", 0)
+
+
+class DirectUploadSerializer(serializers.ModelSerializer):
+    image = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DirectUpload
+        fields = (
+            "id",
+            "project",
+            "filename",
+            "content_type",
+            "expected_size",
+            "caption",
+            "status",
+            "error",
+            "image",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+    def get_image(self, obj):
+        if not obj.project_image_id:
+            return None
+        return ProjectImageSerializer(obj.project_image, context=self.context).data
+
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    image = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChunkedUpload
+        fields = (
+            "id",
+            "project",
+            "filename",
+            "content_type",
+            "total_size",
+            "received_bytes",
+            "caption",
+            "status",
+            "image",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+    def get_image(self, obj):
+        if not obj.project_image_id:
+            return None
+        return ProjectImageSerializer(obj.project_image, context=self.context).data
+
 
 class ProjectPlanImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
@@ -867,7 +930,12 @@ class ProjectPlanSerializer(serializers.ModelSerializer):
 
     def get_cover_image_url(self, obj):
         request = self.context.get("request")
-        cover = obj.images.filter(is_cover=True).first() or obj.images.order_by("order", "id").first()
+        images = _prefetched(obj, "images")
+        if images is not None:
+            ordered = sorted(images, key=lambda image: (image.order, image.id))
+            cover = next((image for image in ordered if image.is_cover), None) or next(iter(ordered), None)
+        else:
+            cover = obj.images.filter(is_cover=True).first() or obj.images.order_by("order", "id").first()
         if cover and cover.image and hasattr(cover.image, "url"):
             return request.build_absolute_uri(cover.image.url) if request else cover.image.url
         return None
@@ -933,6 +1001,35 @@ class ProjectCommentSerializer(serializers.ModelSerializer):
         return text
 
 
+def _prefetched(obj, name):
+    """Rows of a prefetched relation, or None when ``name`` wasn't prefetched."""
+    cache = getattr(obj, "_prefetched_objects_cache", {})
+    return list(cache[name]) if name in cache else None
+
+
+def project_cover_image_url(project, request):
+    """First image by order (prefetched ``images`` when available), else the cover file."""
+    images = _prefetched(project, "images")
+    if images is not None:
+        candidates = sorted(
+            (image for image in images if image.media_type == ProjectImage.MEDIA_TYPE_IMAGE),
+            key=lambda image: (image.order, image.id),
+        )
+        cover = candidates[0] if candidates else None
+    else:
+        cover = project.images.filter(media_type=ProjectImage.MEDIA_TYPE_IMAGE).order_by("order", "id").first()
+    if cover and cover.image and hasattr(cover.image, "url"):
+        url = cover.image.url
+        return request.build_absolute_uri(url) if request else url
+
+    file_field = getattr(project, "cover_image_file", None)
+    if file_field and hasattr(file_field, "url"):
+        url = file_field.url
+        return request.build_absolute_uri(url) if request else url
+
+    return None
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     owner_username = serializers.CharField(source="owner.username", read_only=True)
     images = ProjectImageSerializer(many=True, read_only=True)
@@ -1166,19 +1263,7 @@ class ProjectSerializer(serializers.ModelSerializer):
         return attrs
 
     def get_cover_image_url(self, obj):
-        request = self.context.get("request")
-
-        cover = obj.images.filter(media_type=ProjectImage.MEDIA_TYPE_IMAGE).order_by("order", "id").first()
-        if cover and cover.image and hasattr(cover.image, "url"):
-            url = cover.image.url
-            return request.build_absolute_uri(url) if request else url
-
-        file_field = getattr(obj, "cover_image_file", None)
-        if file_field and hasattr(file_field, "url"):
-            url = file_field.url
-            return request.build_absolute_uri(url) if request else url
-
-        return None
+        return project_cover_image_url(obj, self.context.get("request"))
 
     def get_is_owner(self, obj):
         request = self.context.get("request")
@@ -1191,10 +1276,11 @@ class ProjectSerializer(serializers.ModelSerializer):
         user = getattr(request, "user", None)
         if not user or not user.is_authenticated:
             return False
-        return obj.invites.filter(
-            contractor=user,
-            status__in=[ProjectInvite.STATUS_INVITED, ProjectInvite.STATUS_ACCEPTED],
-        ).exists()
+        active = (ProjectInvite.STATUS_INVITED, ProjectInvite.STATUS_ACCEPTED)
+        invites = _prefetched(obj, "invites")
+        if invites is not None:
+            return any(invite.contractor_id == user.id and invite.status in active for invite in invites)
+        return obj.invites.filter(contractor=user, status__in=active).exists()
 
     def get_invited_contractors(self, obj):
         request = self.context.get("request")
@@ -1203,6 +1289,9 @@ class ProjectSerializer(serializers.ModelSerializer):
             return []
         if obj.owner_id != user.id and not getattr(user, "is_staff", False):
             return []
+        invites = _prefetched(obj, "invites")
+        if invites is None:
+            invites = obj.invites.select_related("contractor", "contractor__profile")
         return [
             {
                 "username": invite.contractor.username,
@@ -1210,10 +1299,14 @@ class ProjectSerializer(serializers.ModelSerializer):
                 "status": invite.status,
                 "created_at": invite.created_at,
             }
-            for invite in obj.invites.select_related("contractor", "contractor__profile").order_by("contractor__username")
+            for invite in sorted(invites, key=lambda invite: invite.contractor.username)
         ]
 
+    # like_count, liked_by_me and saved_by_me are annotated by
+    # with_project_card_data() for list views; the queries are the fallback.
     def get_like_count(self, obj):
+        if hasattr(obj, "like_count"):
+            return obj.like_count
         return ProjectLike.objects.filter(project=obj).count()
 
     def get_liked_by_me(self, obj):
@@ -1221,6 +1314,8 @@ class ProjectSerializer(serializers.ModelSerializer):
         user = getattr(request, "user", None)
         if not user or not user.is_authenticated:
             return False
+        if hasattr(obj, "liked_by_me"):
+            return obj.liked_by_me
         return ProjectLike.objects.filter(project=obj, user=user).exists()
 
     def get_saved_by_me(self, obj):
@@ -1228,6 +1323,8 @@ class ProjectSerializer(serializers.ModelSerializer):
         user = getattr(request, "user", None)
         if not user or not user.is_authenticated:
             return False
+        if hasattr(obj, "saved_by_me"):
+            return obj.saved_by_me
         return ProjectFavorite.objects.filter(project=obj, user=user).exists()
 
     def get_distance_miles(self, obj):
@@ -1327,19 +1424,7 @@ class ProjectFavoriteSerializer(serializers.ModelSerializer):
         )
 
     def get_project_cover_image(self, obj):
-        request = self.context.get("request")
-
-        cover = obj.project.images.filter(media_type=ProjectImage.MEDIA_TYPE_IMAGE).order_by("order", "id").first()
-        if cover and cover.image and hasattr(cover.image, "url"):
-            url = cover.image.url
-            return request.build_absolute_uri(url) if request else url
-
-        file_field = getattr(obj.project, "cover_image_file", None)
-        if file_field and hasattr(file_field, "url"):
-            url = file_field.url
-            return request.build_absolute_uri(url) if request else url
-
-        return None
+        return project_cover_image_url(obj.project, self.context.get("request"))
 
 
 class ProjectLikeSerializer(ProjectFavoriteSerializer):
@@ -1479,6 +1564,20 @@ class PrivateMessageSerializer(serializers.ModelSerializer):
         return timezone.now() <= obj.created_at + timedelta(minutes=1)
 
 
+class MessageThreadListSerializer(serializers.ListSerializer):
+    """Loads like/save stats for both participants' profiles of every thread at once."""
+
+    def to_representation(self, data):
+        threads = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        request = self.context.get("request")
+        user_ids = {user_id for thread in threads for user_id in (thread.owner_id, thread.client_id)}
+        self.context["profile_stats"] = {
+            **self.context.get("profile_stats", {}),
+            **profile_social_stats(user_ids, getattr(request, "user", None)),
+        }
+        return super().to_representation(threads)
+
+
 class MessageThreadSerializer(serializers.ModelSerializer):
     project_title = serializers.ReadOnlyField(source="project.title")
     owner_username = serializers.ReadOnlyField(source="owner.username")
@@ -1520,8 +1619,12 @@ class MessageThreadSerializer(serializers.ModelSerializer):
             "latest_message",
         ]
         read_only_fields = fields
+        list_serializer_class = MessageThreadListSerializer
 
     def get_latest_message(self, obj):
+        if hasattr(obj, "latest_message_id") and obj.latest_message_id is None:
+            # Annotated by the inbox query: neither participant has written yet.
+            return None
         latest_id = getattr(obj, "latest_message_id", None)
         if latest_id is None:
             msg = obj.messages.order_by("-created_at").first()
@@ -1538,8 +1641,12 @@ class MessageThreadSerializer(serializers.ModelSerializer):
                 "created_at": msg.created_at,
             }
 
-        attachment_name = getattr(obj, "latest_message_attachment_name", "") or ""
-        if not attachment_name:
+        attachment_name = (
+            getattr(obj, "latest_message_attachment_name", "")
+            or getattr(obj, "latest_message_first_attachment_name", "")
+            or ""
+        )
+        if not attachment_name and not hasattr(obj, "latest_message_first_attachment_name"):
             attachment_name = (
                 MessageAttachment.objects
                 .filter(message_id=latest_id)
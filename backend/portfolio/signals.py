@@ -1,20 +1,80 @@
 # backend/portfolio/signals.py
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import ProjectImage
+from accounts.response_cache import (
+    HELPERS_TAG,
+    JOB_POSTINGS_TAG,
+    helper_tag,
+    profile_tag,
+    project_tag,
+    purge_tags_on_commit,
+)
+
+from .media_cleanup import delete_field_file
+from .models import (
+    HelperFeedback,
+    HelperListing,
+    Project,
+    ProjectImage,
+    ProjectInvite,
+    ProjectLike,
+    ProjectPlanImage,
+)
 
 
 @receiver(post_delete, sender=ProjectImage)
 def delete_project_image_file(sender, instance, **kwargs):
+    # Deduplicated storage only removes the file once no other row references it;
+    # inside defer_file_deletion() the names are queued rather than deleted here.
     if instance.image:
-        try:
-            instance.image.delete(save=False)
-        except Exception:
-            # don't crash deletes if storage is temporarily unavailable
-            pass
+        delete_field_file(instance.image)
     if instance.thumbnail:
-        try:
-            instance.thumbnail.delete(save=False)
-        except Exception:
-            pass
+        delete_field_file(instance.thumbnail)
+
+
+@receiver(post_delete, sender=ProjectPlanImage)
+def delete_project_plan_image_file(sender, instance, **kwargs):
+    if instance.image:
+        delete_field_file(instance.image)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def purge_project_responses(sender, instance, **kwargs):
+    # Public profiles of homeowners are only visible while they have a public
+    # job posting, so the owner's profile depends on their projects too.
+    tags = [project_tag(instance.pk), profile_tag(instance.owner_id)]
+    if (
+        instance.is_job_posting
+        and instance.is_public
+        and not instance.is_private
+        and instance.post_privacy == "public"
+    ):
+        tags.append(JOB_POSTINGS_TAG)
+    purge_tags_on_commit(*tags)
+
+
+@receiver(post_save, sender=ProjectImage)
+@receiver(post_delete, sender=ProjectImage)
+@receiver(post_save, sender=ProjectInvite)
+@receiver(post_delete, sender=ProjectInvite)
+@receiver(post_save, sender=ProjectLike)
+@receiver(post_delete, sender=ProjectLike)
+def purge_project_child_responses(sender, instance, **kwargs):
+    purge_tags_on_commit(project_tag(instance.project_id))
+
+
+@receiver(post_save, sender=HelperListing)
+@receiver(post_delete, sender=HelperListing)
+def purge_helper_responses(sender, instance, **kwargs):
+    tags = [helper_tag(instance.pk)]
+    if instance.is_active and instance.admin_approved and instance.contact_verified:
+        tags.append(HELPERS_TAG)
+    purge_tags_on_commit(*tags)
+
+
+@receiver(post_save, sender=HelperFeedback)
+@receiver(post_delete, sender=HelperFeedback)
+def purge_helper_feedback_responses(sender, instance, **kwargs):
+    purge_tags_on_commit(helper_tag(instance.helper_id))
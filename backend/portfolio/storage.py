@@ -0,0 +1,182 @@
+# backend/portfolio/storage.py
+import hashlib
+import logging
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file_content(content):
+    """Return (sha256 hex digest, size) for a Django File, leaving it rewound."""
+    digest = hashlib.sha256()
+    size = 0
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return digest.hexdigest(), size
+
+
+def record_media_presence(name, *, present, size=0):
+    if not name:
+        return
+    MediaManifestEntry = apps.get_model("portfolio", "MediaManifestEntry")
+    MediaManifestEntry.objects.update_or_create(
+        name=name,
+        defaults={"present": present, "size": size if present else 0},
+    )
+
+
+def present_media_names(names, storage=None):
+    """
+    Which of ``names`` exist, answered from the media manifest in one query.
+
+    Names the manifest has never seen (files written before it existed) are
+    checked against storage once and recorded, so later lookups stay batched.
+    """
+    names = {name for name in names if name}
+    if not names:
+        return set()
+    MediaManifestEntry = apps.get_model("portfolio", "MediaManifestEntry")
+    known = dict(MediaManifestEntry.objects.filter(name__in=names).values_list("name", "present"))
+    storage = storage or media_storage
+    for name in names - known.keys():
+        try:
+            exists = storage.exists(name)
+            size = storage.size(name) if exists else 0
+        except Exception:
+            logger.warning("Media presence check failed name=%s", name, exc_info=True)
+            continue
+        record_media_presence(name, present=exists, size=size)
+        known[name] = exists
+    return {name for name, present in known.items() if present}
+
+
+class DeduplicatedMediaStorage(FileSystemStorage):
+    """
+    Filesystem storage that keeps one copy of each distinct file.
+
+    New files are written once under ``<prefix>/ab/cd/<sha256><ext>`` and
+    tracked by a MediaBlob row. Saving identical bytes again, or calling
+    ``retain`` for a metadata-only copy, only bumps the row's ref_count, and
+    ``delete`` removes the file when the last reference is released. Files
+    written before deduplication was enabled keep their old paths and are
+    deleted directly unless they have been adopted by ``retain``.
+    """
+
+    def _blob_model(self):
+        return apps.get_model("portfolio", "MediaBlob")
+
+    def _blob_name(self, digest, name):
+        prefix = str(getattr(settings, "MEDIA_BLOB_PREFIX", "blobs") or "blobs").strip("/")
+        ext = os.path.splitext(name or "")[1].lower()
+        return f"{prefix}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+    def _save(self, name, content):
+        if not getattr(settings, "MEDIA_DEDUPLICATION_ENABLED", True):
+            name = super()._save(name, content)
+            record_media_presence(name, present=True, size=content.size)
+            return name
+
+        MediaBlob = self._blob_model()
+        digest, size = hash_file_content(content)
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(sha256=digest).first()
+            if blob is not None and super().exists(blob.name):
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+                return blob.name
+
+            blob_name = self._blob_name(digest, name)
+            if not super().exists(blob_name):
+                blob_name = super()._save(blob_name, content)
+            record_media_presence(blob_name, present=True, size=size)
+            if blob is None:
+                shared_name = self._create_blob(digest, blob_name, size, ref_count=1)
+                if shared_name != blob_name:
+                    # A concurrent save stored the same bytes first; keep its copy.
+                    super().delete(blob_name)
+                    record_media_presence(blob_name, present=False)
+                return shared_name
+            else:
+                # The row outlived its file (e.g. a manual cleanup); start over.
+                MediaBlob.objects.filter(pk=blob.pk).update(name=blob_name, size=size, ref_count=1)
+        return blob_name
+
+    def _create_blob(self, digest, name, size, *, ref_count):
+        """
+        Track ``name`` as the blob for ``digest`` and return the name to use.
+
+        The row is created in a savepoint: when a concurrent save of the same
+        bytes got there first, the unique constraint fails and the new
+        reference is added to that row instead.
+        """
+        MediaBlob = self._blob_model()
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(sha256=digest, name=name, size=size, ref_count=ref_count)
+            return name
+        except IntegrityError:
+            existing = MediaBlob.objects.select_for_update().filter(sha256=digest).first()
+            if existing is None:
+                raise
+        MediaBlob.objects.filter(pk=existing.pk).update(ref_count=F("ref_count") + 1)
+        return existing.name
+
+    def retain(self, name):
+        """
+        Add a reference to an already stored file without copying its bytes.
+
+        Returns the name the new reference should point at, or None when the
+        file is missing from storage.
+        """
+        if not name:
+            return None
+        MediaBlob = self._blob_model()
+        with transaction.atomic():
+            if MediaBlob.objects.filter(name=name).update(ref_count=F("ref_count") + 1):
+                return name
+            if not super().exists(name):
+                return None
+
+            # Pre-deduplication file: adopt it so both owners share one count.
+            with self.open(name, "rb") as handle:
+                digest, size = hash_file_content(handle)
+            existing = MediaBlob.objects.select_for_update().filter(sha256=digest).first()
+            if existing is not None and super().exists(existing.name):
+                MediaBlob.objects.filter(pk=existing.pk).update(ref_count=F("ref_count") + 1)
+                return existing.name
+            if existing is not None:
+                existing.delete()
+            return self._create_blob(digest, name, size, ref_count=2)
+
+    def delete(self, name):
+        if not name:
+            return
+        MediaBlob = self._blob_model()
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is not None:
+                if blob.ref_count > 1:
+                    MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") - 1)
+                    return
+                blob.delete()
+            record_media_presence(name, present=False)
+        super().delete(name)
+
+
+def get_media_storage():
+    return media_storage
+
+
+media_storage = DeduplicatedMediaStorage()
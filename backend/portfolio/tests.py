@@ -1,17 +1,61 @@
 from django.contrib.auth import get_user_model
-from io import BytesIO
+from io import BytesIO, StringIO
 import base64
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import json
+import os
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from unittest import skipUnless
 from unittest.mock import patch
+from urllib.parse import parse_qs, unquote, urlsplit
 
+import httpx
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.core.management import call_command
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework import status
-from rest_framework.test import APITestCase
-
-from accounts.models import AIConfiguration, AIUsageEvent, Profile
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APITestCase
+
+from accounts.ai import clear_ai_response_cache
+from accounts.caching import shared_cache
+from accounts.models import AIConfiguration, AIUsageEvent, HomeownerReferenceImage, Profile
+from . import direct_uploads
+from .direct_uploads import presign_url
+from . import storage as storage_module
+from .chunked_uploads import write_chunk
+from .media_cleanup import process_pending_file_deletions, schedule_file_deletion_worker
+from .query_budget import QueryBudgetMixin
+from .image_conversion import ImageConversionError, ImageTooLargeError, convert_to_webp
+from .serializers import ProjectImageSerializer
+from .video_processing import (
+    VideoProcessingError,
+    build_ffmpeg_command,
+    limited_command,
+    machine_job_slot,
+    process_video,
+    run_ffmpeg,
+)
 from .models import (
+    ChunkedUpload,
+    DirectUpload,
+    MediaBlob,
+    MediaManifestEntry,
+    PendingFileDeletion,
     Project,
+    ProjectImage,
     ProjectInvite,
+    ProjectLike,
     MessageThread,
     PrivateMessage,
     ProjectPlan,
@@ -682,6 +726,187 @@ class PrivateProjectAccessTests(APITestCase):
         self.assertIn("compliance_confirmed", response.data)
 
 
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "portfolio-test-local"},
+        "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "portfolio-test-shared"},
+    }
+)
+class PublicListResponseCacheTests(APITestCase):
+    def setUp(self):
+        shared_cache().clear()
+        self.owner = User.objects.create_user(username="cachedowner", password="pw123456")
+
+    def create_job(self, title):
+        return Project.objects.create(
+            owner=self.owner,
+            title=title,
+            is_job_posting=True,
+            is_public=True,
+            is_private=False,
+            post_privacy="public",
+        )
+
+    def test_job_feed_picks_up_new_and_edited_postings(self):
+        job = self.create_job("Deck rebuild")
+        self.client.get("/api/projects/job-postings/?lng=-75.1652&lat=39.9526")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/projects/job-postings/?lat=39.9526&lng=-75.1652")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.title = "Deck and railing rebuild"
+            job.save()
+            newer = self.create_job("Fence repair")
+
+        response = self.client.get("/api/projects/job-postings/?lat=39.9526&lng=-75.1652")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(
+            {item["id"]: item["title"] for item in response.data},
+            {job.id: "Deck and railing rebuild", newer.id: "Fence repair"},
+        )
+
+    def test_helper_list_keys_on_filters_and_ignores_hidden_listings(self):
+        self.client.get("/api/project-helpers/?skill=cleanup")
+        self.assertEqual(self.client.get("/api/project-helpers/?skill=cleanup")["X-Cache"], "HIT")
+        self.assertEqual(self.client.get("/api/project-helpers/?skill=painting")["X-Cache"], "MISS")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            HelperListing.objects.create(
+                owner=self.owner,
+                full_name="Unapproved Helper",
+                city="Media",
+                state="PA",
+                email="pending@example.com",
+                preferred_contact_method="email",
+                skills=["cleanup"],
+                availability=["weekends"],
+                experience_level="1_3_years",
+                admin_approved=False,
+            )
+
+        self.assertEqual(self.client.get("/api/project-helpers/?skill=cleanup")["X-Cache"], "HIT")
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username="etagowner", password="pw123456")
+        self.viewer = User.objects.create_user(username="etagviewer", password="pw123456")
+        set_profile_type(self.owner, Profile.ProfileType.HOMEOWNER)
+        set_profile_type(self.viewer, Profile.ProfileType.CONTRACTOR)
+        self.project = Project.objects.create(
+            owner=self.owner,
+            title="Porch repair",
+            is_job_posting=True,
+            is_public=True,
+            is_private=False,
+            post_privacy="public",
+        )
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_project_detail_returns_304_until_a_marker_changes(self):
+        self.client.force_authenticate(user=self.viewer)
+        url = f"/api/projects/{self.project.id}/"
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertTrue(first["ETag"].startswith('W/"'))
+        self.assertIn("Last-Modified", first)
+
+        with patch("portfolio.views.ProjectViewSet.get_serializer", side_effect=AssertionError("serialized")):
+            cached = self.revalidate(url, first)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached["ETag"], first["ETag"])
+
+        ProjectLike.objects.create(project=self.project, user=self.viewer)
+        changed = self.revalidate(url, first)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertTrue(changed.data["liked_by_me"])
+
+        # The ETag is per viewer: someone else's copy never validates.
+        self.client.force_authenticate(user=self.owner)
+        self.assertEqual(self.revalidate(url, changed).status_code, status.HTTP_200_OK)
+
+    def test_project_detail_revalidates_against_non_cover_image_changes(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        ProjectImage.objects.create(
+            project=self.project,
+            image=SimpleUploadedFile("cover.png", TINY_PNG_BYTES, content_type="image/png"),
+        )
+        self.client.force_authenticate(user=self.viewer)
+        url = f"/api/projects/{self.project.id}/"
+        first = self.client.get(url)
+
+        second_image = ProjectImage.objects.create(
+            project=self.project,
+            image=SimpleUploadedFile("porch.png", TINY_PNG_BYTES, content_type="image/png"),
+            order=1,
+        )
+        added = self.revalidate(url, first)
+        self.assertEqual(added.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(added.data["images"]), 2)
+
+        ProjectImage.objects.filter(pk=second_image.pk).update(caption="Loose railing")
+        captioned = self.revalidate(url, added)
+        self.assertEqual(captioned.status_code, status.HTTP_200_OK)
+
+        ProjectImage.objects.filter(pk=second_image.pk).update(
+            media_type=ProjectImage.MEDIA_TYPE_VIDEO,
+            processing_status=ProjectImage.STATUS_PROCESSING,
+            extra_data={"video_processing": {"percent": 40}},
+        )
+        self.assertEqual(self.revalidate(url, captioned).status_code, status.HTTP_200_OK)
+
+    def test_project_detail_honours_if_modified_since(self):
+        url = f"/api/projects/{self.project.id}/"
+        first = self.client.get(url)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_thread_messages_revalidate_against_new_messages(self):
+        thread, _ = MessageThread.get_or_create_dm(self.owner, self.viewer, initiated_by=self.owner)
+        message = PrivateMessage.objects.create(thread=thread, sender=self.viewer, text="Hello")
+        PrivateMessage.objects.filter(pk=message.pk).update(created_at=message.created_at - timedelta(minutes=5))
+        self.client.force_authenticate(user=self.owner)
+        url = f"/api/messages/threads/{thread.id}/messages/"
+        first = self.client.get(url)
+
+        self.assertEqual(self.revalidate(url, first).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        PrivateMessage.objects.create(thread=thread, sender=self.viewer, text="Any update?")
+        response = self.revalidate(url, first)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+    def test_plan_detail_revalidates_against_image_edits(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        plan = ProjectPlan.objects.create(owner=self.owner, title="Window trim")
+        image = ProjectPlanImage.objects.create(
+            project_plan=plan,
+            image=SimpleUploadedFile("trim.png", TINY_PNG_BYTES, content_type="image/png"),
+        )
+        self.client.force_authenticate(user=self.owner)
+        url = f"/api/project-plans/{plan.id}/"
+        first = self.client.get(url)
+
+        self.assertEqual(self.revalidate(url, first).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        image.caption = "Rot on the sill"
+        image.save(update_fields=["caption"])
+        self.assertEqual(self.revalidate(url, first).status_code, status.HTTP_200_OK)
+
+
 class MessagingPrivacyTests(APITestCase):
     def setUp(self):
         self.alice = User.objects.create_user(username="alice", password="pw123456")
@@ -959,6 +1184,836 @@ class MessagePrefillTests(APITestCase):
         self.assertEqual(delete_response.status_code, status.HTTP_204_NO_CONTENT)
 
 
+class DeduplicatedMediaStorageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        owner = User.objects.create_user(username="mediaowner", password="pw123456")
+        self.first_project = Project.objects.create(owner=owner, title="Deck")
+        self.second_project = Project.objects.create(owner=owner, title="Porch")
+
+    def _upload(self, project, name):
+        return ProjectImage.objects.create(
+            project=project,
+            image=SimpleUploadedFile(name, TINY_PNG_BYTES, content_type="image/png"),
+        )
+
+    def test_identical_uploads_share_one_blob_until_last_reference_is_deleted(self):
+        first = self._upload(self.first_project, "deck.png")
+        second = self._upload(self.second_project, "porch.png")
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(first.image.name.startswith("blobs/"))
+        blob = MediaBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        storage = first.image.storage
+
+        first.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(storage.exists(second.image.name))
+
+        self.second_project.delete()
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertFalse(storage.exists(second.image.name))
+
+    def test_racing_uploads_of_new_content_share_the_first_blob(self):
+        storage = ProjectImage._meta.get_field("image").storage
+        content = b"racing-bytes"
+        digest = hashlib.sha256(content).hexdigest()
+        racer_name = "blobs/racer.bin"
+        record = storage_module.record_media_presence
+
+        def concurrent_save_wins(name, **kwargs):
+            # Another request stores the same bytes between our lookup and insert.
+            record(name, **kwargs)
+            if kwargs.get("present") and not MediaBlob.objects.exists():
+                Path(storage.path(racer_name)).write_bytes(content)
+                MediaBlob.objects.create(sha256=digest, name=racer_name, size=len(content), ref_count=1)
+
+        with patch("portfolio.storage.record_media_presence", side_effect=concurrent_save_wins):
+            name = storage.save("project_images/deck.bin", ContentFile(content))
+
+        self.assertEqual(name, racer_name)
+        self.assertEqual(MediaBlob.objects.get().ref_count, 2)
+        self.assertFalse(storage.exists(storage._blob_name(digest, "deck.bin")))
+
+    def test_retain_adopts_files_stored_before_deduplication(self):
+        storage = ProjectImage._meta.get_field("image").storage
+        with override_settings(MEDIA_DEDUPLICATION_ENABLED=False):
+            legacy_name = storage.save("project_images/legacy.webp", ContentFile(b"legacy-bytes"))
+        legacy = ProjectImage.objects.create(project=self.first_project, image=legacy_name)
+
+        shared_name = storage.retain(legacy_name)
+        copy = ProjectImage.objects.create(project=self.second_project, image=shared_name)
+
+        self.assertEqual(shared_name, legacy_name)
+        self.assertEqual(MediaBlob.objects.get(name=legacy_name).ref_count, 2)
+        legacy.delete()
+        self.assertTrue(storage.exists(legacy_name))
+        copy.delete()
+        self.assertFalse(storage.exists(legacy_name))
+
+
+
+class ImageConversionTests(TestCase):
+    def _encoded(self, size, image_format):
+        buffer = BytesIO()
+        Image.new("RGB", size, (120, 90, 60)).save(buffer, format=image_format)
+        buffer.seek(0)
+        return buffer
+
+    def test_jpeg_is_decoded_at_reduced_scale_and_capped(self):
+        with self.assertLogs("portfolio.image_conversion", level="INFO") as logs:
+            converted = convert_to_webp(self._encoded((4000, 3000), "JPEG"), max_dimension=500)
+
+        self.assertIn("decoded=1000x750", logs.output[0])
+        self.assertIn("rss_growth_kb=", logs.output[0])
+        self.assertEqual(Image.open(converted).size, (500, 375))
+
+    def test_source_file_is_closed_when_conversion_is_rejected(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = Path(directory) / "huge.png"
+        path.write_bytes(self._encoded((200, 200), "PNG").getvalue())
+        opened = []
+        real_open = Image.open
+
+        def tracking_open(*args, **kwargs):
+            opened.append(real_open(*args, **kwargs))
+            return opened[-1]
+
+        # Rejected from the header, before load() would have closed the file.
+        with patch("portfolio.image_conversion.Image.open", side_effect=tracking_open), self.assertRaises(
+            ImageTooLargeError
+        ):
+            convert_to_webp(str(path), max_pixels=10_000)
+
+        self.assertEqual(len(opened), 1)
+        self.assertIsNone(opened[0].fp)
+
+    def test_pixel_limit_rejects_before_decoding(self):
+        with self.assertRaises(ImageConversionError):
+            convert_to_webp(self._encoded((200, 200), "PNG"), max_pixels=10_000)
+
+    @override_settings(IMAGE_MAX_PIXELS=10_000)
+    def test_uploads_over_the_pixel_limit_are_rejected_not_stored(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        owner = User.objects.create_user(username="limitowner", password="pw123456")
+        set_profile_type(owner, Profile.ProfileType.HOMEOWNER)
+        project = Project.objects.create(owner=owner, title="Porch")
+        plan = ProjectPlan.objects.create(owner=owner, title="Porch plan")
+        client = APIClient()
+        client.force_authenticate(user=owner)
+
+        with self.settings(MEDIA_ROOT=media_root):
+            for name, image_format in (("huge.png", "PNG"), ("huge.webp", "WEBP")):
+                upload = SimpleUploadedFile(name, self._encoded((200, 200), image_format).read())
+                response = client.post(f"/api/projects/{project.id}/images/", {"images": [upload]}, format="multipart")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, name)
+                self.assertIn("limit", response.data["detail"])
+
+                upload = SimpleUploadedFile(name, self._encoded((200, 200), image_format).read())
+                response = client.post(f"/api/project-plans/{plan.id}/images/", {"images": [upload]}, format="multipart")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, name)
+
+            self.assertFalse(ProjectImage.objects.exists())
+            self.assertFalse(ProjectPlanImage.objects.exists())
+            self.assertFalse(any(Path(media_root).rglob("*.*")))
+
+    @override_settings(IMAGE_MAX_DIMENSION=64)
+    def test_webp_uploads_over_the_edge_cap_are_reencoded(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        owner = User.objects.create_user(username="webpowner", password="pw123456")
+        project = Project.objects.create(owner=owner, title="Porch")
+        with self.settings(MEDIA_ROOT=media_root):
+            image = ProjectImage.objects.create(
+                project=project,
+                image=SimpleUploadedFile("wide.webp", self._encoded((200, 100), "WEBP").read()),
+            )
+            with image.image.open("rb") as handle:
+                self.assertEqual(Image.open(handle).size, (64, 32))
+            with self.settings(IMAGE_MAX_PIXELS=10_000), self.assertRaises(ImageTooLargeError):
+                ProjectImage.objects.create(
+                    project=project,
+                    image=SimpleUploadedFile("huge.webp", self._encoded((200, 200), "WEBP").read()),
+                )
+
+    @override_settings(IMAGE_MAX_DIMENSION=64)
+    def test_project_image_uses_capped_conversion(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        owner = User.objects.create_user(username="convertowner", password="pw123456")
+        project = Project.objects.create(owner=owner, title="Porch")
+        with self.settings(MEDIA_ROOT=media_root):
+            image = ProjectImage.objects.create(
+                project=project,
+                image=SimpleUploadedFile("porch.png", self._encoded((200, 100), "PNG").read(), content_type="image/png"),
+            )
+            with image.image.open("rb") as handle:
+                self.assertEqual(Image.open(handle).size, (64, 32))
+
+        self.assertEqual(image.processing_status, ProjectImage.STATUS_READY)
+        self.assertTrue(image.image.name.endswith(".webp"))
+
+
+
+FAKE_FFMPEG = """
+import sys, time
+sys.stderr.write("  Duration: 00:00:10.00, start: 0.000000, bitrate: 1000 kb/s\\n")
+sys.stderr.flush()
+for step in (2, 5, 10):
+    print(f"out_time_us={step * 1000000}")
+    print("progress=continue" if step < 10 else "progress=end", flush=True)
+mode = sys.argv[1] if len(sys.argv) > 1 else ""
+if mode == "sleep":
+    time.sleep(30)
+elif mode == "spin":
+    while True:
+        pass
+"""
+
+
+class VideoProcessingTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, VIDEO_PROCESSING_ASYNC=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        owner = User.objects.create_user(username="videoowner", password="pw123456")
+        self.project = Project.objects.create(owner=owner, title="Basement")
+
+    def test_single_ffmpeg_invocation_writes_webm_and_poster(self):
+        command = build_ffmpeg_command("in.mov", "out.webm", "poster.png", threads=2)
+
+        self.assertEqual(command[0], "ffmpeg")
+        self.assertEqual(command.count("-i"), 1)
+        self.assertIn("out.webm", command)
+        self.assertEqual(command[-1], "poster.png")
+        self.assertEqual(command[command.index("-progress") + 1], "pipe:1")
+
+    def test_run_ffmpeg_reports_progress_from_progress_stream(self):
+        seen = []
+        run_ffmpeg([sys.executable, "-c", FAKE_FFMPEG], on_progress=seen.append)
+        self.assertEqual(seen, [20, 50, 99, 100])
+
+    def test_run_ffmpeg_enforces_time_and_cpu_limits(self):
+        with self.assertRaisesMessage(VideoProcessingError, "time limit"):
+            run_ffmpeg([sys.executable, "-c", FAKE_FFMPEG, "sleep"], timeout=1)
+        with self.assertRaisesMessage(VideoProcessingError, "CPU time limit"):
+            run_ffmpeg([sys.executable, "-c", FAKE_FFMPEG, "spin"], timeout=30, cpu_seconds=1)
+
+    def test_limits_are_applied_on_the_command_line_not_in_preexec_fn(self):
+        with patch("portfolio.video_processing.shutil.which", side_effect=lambda name: f"/usr/bin/{name}"):
+            command = limited_command(["ffmpeg", "-i", "in.mov"], cpu_seconds=60)
+        self.assertEqual(command, ["nice", "-n", "10", "prlimit", "--cpu=60:65", "--", "ffmpeg", "-i", "in.mov"])
+
+        with patch("portfolio.video_processing.subprocess.Popen", side_effect=OSError("stop")) as popen:
+            with self.assertRaises(OSError):
+                run_ffmpeg(["ffmpeg"], cpu_seconds=60)
+        self.assertNotIn("preexec_fn", popen.call_args.kwargs)
+
+    def test_job_slots_bound_encoders_across_processes(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir, ignore_errors=True)
+        entered = threading.Event()
+        release = threading.Event()
+        order = []
+
+        def hold_slot():
+            with machine_job_slot():
+                order.append("first")
+                entered.set()
+                release.wait(5)
+                order.append("first done")
+
+        with self.settings(VIDEO_WORKERS=1, VIDEO_LOCK_DIR=lock_dir), patch(
+            "portfolio.video_processing.SLOT_POLL_INTERVAL", 0.05
+        ):
+            holder = threading.Thread(target=hold_slot)
+            holder.start()
+            entered.wait(5)
+            # Slots are flock()ed files, so a second open file description
+            # waits exactly as another gunicorn worker would.
+            threading.Timer(0.3, release.set).start()
+            with machine_job_slot():
+                order.append("second")
+            holder.join(5)
+
+        self.assertEqual(order, ["first", "first done", "second"])
+
+    def test_job_slots_are_reentrant_within_a_thread(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir, ignore_errors=True)
+
+        def nested():
+            with machine_job_slot(), machine_job_slot():
+                pass
+
+        with self.settings(VIDEO_WORKERS=1, VIDEO_LOCK_DIR=lock_dir):
+            worker = threading.Thread(target=nested, daemon=True)
+            worker.start()
+            worker.join(5)
+        self.assertFalse(worker.is_alive())
+
+    def test_upload_is_queued_then_transcoded_with_progress(self):
+        def fake_ffmpeg(command, *, on_progress, **kwargs):
+            on_progress(40)
+            self.assertEqual(
+                ProjectImage.objects.get(pk=image.pk).extra_data["video_processing"]["percent"], 40
+            )
+            Path(command[command.index("96k") + 1]).write_bytes(b"converted")
+            Path(command[-1]).write_bytes(b"poster")
+            on_progress(100)
+
+        with patch("portfolio.video_processing.run_ffmpeg", side_effect=fake_ffmpeg):
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                image = ProjectImage.objects.create(
+                    project=self.project,
+                    image=SimpleUploadedFile("tour.mov", b"raw-video", content_type="video/quicktime"),
+                )
+            self.assertEqual(image.processing_status, ProjectImage.STATUS_PENDING)
+            self.assertEqual(ProjectImageSerializer(image).data["processing_progress"], 0)
+            original = image.image.name
+            for callback in callbacks:
+                callback()
+
+        image.refresh_from_db()
+        self.assertEqual(image.processing_status, ProjectImage.STATUS_READY)
+        self.assertTrue(image.image.name.endswith(".webm"))
+        self.assertTrue(image.thumbnail.name.endswith("_thumb.png"), image.thumbnail.name)
+        self.assertFalse(image.image.storage.exists(original))
+        self.assertEqual(ProjectImageSerializer(image).data["processing_progress"], 100)
+
+    def test_failed_transcode_keeps_original_and_records_error(self):
+        with patch(
+            "portfolio.video_processing.run_ffmpeg", side_effect=VideoProcessingError("ffmpeg exited with 1")
+        ), self.captureOnCommitCallbacks(execute=True):
+            image = ProjectImage.objects.create(
+                project=self.project,
+                image=SimpleUploadedFile("tour.mov", b"raw-video", content_type="video/quicktime"),
+            )
+
+        image.refresh_from_db()
+        self.assertEqual(image.processing_status, ProjectImage.STATUS_FAILED)
+        self.assertTrue(image.image.name.endswith(".mov"))
+        self.assertEqual(image.extra_data["video_processing"]["error"], "ffmpeg exited with 1")
+        self.assertFalse(process_video(image.pk))
+
+
+class CleanupMediaCommandTests(TestCase):
+    def setUp(self):
+        self.media_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=str(self.media_root))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.owner = User.objects.create_user(username="sweepowner", password="pw123456")
+
+    def _write(self, rel, data=b"x", age_hours=48):
+        path = self.media_root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        stamp = time.time() - age_hours * 3600
+        os.utime(path, (stamp, stamp))
+        return path
+
+    def test_sweeps_orphans_across_all_file_fields(self):
+        project = Project.objects.create(owner=self.owner, title="Deck")
+        image = ProjectImage.objects.create(
+            project=project,
+            image=SimpleUploadedFile("deck.webp", b"deck-bytes", content_type="image/webp"),
+        )
+        os.utime(self.media_root / image.image.name, (time.time() - 172800, time.time() - 172800))
+        reference = self._write("homeowner_refs/kitchen.webp")
+        HomeownerReferenceImage.objects.create(user=self.owner, image="homeowner_refs/kitchen.webp")
+        orphan = self._write("project_images/thumbnails/stale.png", b"stale")
+        recent_orphan = self._write("messages/new-upload.pdf", age_hours=0)
+
+        out = StringIO()
+        call_command("cleanup_media", "--dry-run", "--json", "--workers", "3", "--chunk-size", "2", stdout=out)
+        dry_run = json.loads(out.getvalue())
+        self.assertEqual(dry_run["scanned_files"], 4)
+        self.assertEqual(dry_run["referenced_files"], 2)
+        self.assertEqual(dry_run["orphaned_files"], 1)
+        self.assertEqual(dry_run["skipped_recent"], 1)
+        self.assertIn("accounts.HomeownerReferenceImage.image", dry_run["fields"])
+        self.assertTrue(orphan.exists())
+
+        report_path = self.media_root.parent / f"{self.media_root.name}-report.jsonl"
+        self.addCleanup(lambda: report_path.unlink(missing_ok=True))
+        call_command("cleanup_media", "--json", "--report", str(report_path), stdout=StringIO())
+
+        self.assertFalse(orphan.exists())
+        self.assertTrue(recent_orphan.exists())
+        self.assertTrue(reference.exists())
+        self.assertTrue((self.media_root / image.image.name).exists())
+        self.assertEqual(
+            [json.loads(line)["path"] for line in report_path.read_text().splitlines()],
+            ["project_images/thumbnails/stale.png"],
+        )
+
+    def test_references_are_checked_per_chunk_and_swept_files_marked_missing(self):
+        orphans = [self._write(f"project_images/orphan-{index}.webp") for index in range(3)]
+        for orphan in orphans:
+            MediaManifestEntry.objects.create(name=orphan.relative_to(self.media_root).as_posix(), size=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command("cleanup_media", "--json", "--chunk-size", "2", stdout=StringIO())
+
+        lookups = [query["sql"] for query in queries if "FROM \"portfolio_pendingfiledeletion\"" in query["sql"]]
+        self.assertEqual(len(lookups), 2)
+        self.assertFalse(any(orphan.exists() for orphan in orphans))
+        self.assertFalse(MediaManifestEntry.objects.filter(present=True).exists())
+
+
+@override_settings(MEDIA_DELETION_ASYNC=False)
+class ProjectDestroyTests(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.owner = User.objects.create_user(username="destroyowner", password="pw123456")
+        self.project = Project.objects.create(owner=self.owner, title="Deck")
+        self.images = [
+            ProjectImage.objects.create(
+                project=self.project,
+                image=SimpleUploadedFile(f"deck-{index}.webp", f"image-{index}".encode(), content_type="image/webp"),
+            )
+            for index in range(3)
+        ]
+        self.storage = self.images[0].image.storage
+
+    def test_destroy_queues_files_until_commit(self):
+        self.client.force_authenticate(user=self.owner)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.delete(f"/api/projects/{self.project.id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(ProjectImage.objects.filter(project_id=self.project.id).exists())
+        self.assertEqual(PendingFileDeletion.objects.count(), 3)
+        self.assertTrue(all(self.storage.exists(image.image.name) for image in self.images))
+        # One batched file deletion; the other callbacks purge cached public responses.
+        self.assertEqual(callbacks.count(schedule_file_deletion_worker), 1)
+
+        for callback in callbacks:
+            callback()
+
+        self.assertFalse(PendingFileDeletion.objects.exists())
+        self.assertFalse(any(self.storage.exists(image.image.name) for image in self.images))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_image_list_uses_manifest_instead_of_storage_checks(self):
+        self.client.force_authenticate(user=self.owner)
+        self.assertEqual(MediaManifestEntry.objects.filter(present=True).count(), 3)
+        missing_path = Path(self.storage.path(self.images[1].image.name))
+        missing_path.unlink()
+
+        with patch.object(type(self.storage), "exists", side_effect=AssertionError("storage was checked")):
+            response = self.client.get(f"/api/projects/{self.project.id}/images/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+
+        out = StringIO()
+        call_command("reconcile_media_manifest", stdout=out)
+        self.assertIn("1 drifted", out.getvalue())
+
+        response = self.client.get(f"/api/projects/{self.project.id}/images/")
+        self.assertEqual([item["id"] for item in response.data], [self.images[0].id, self.images[2].id])
+
+    def test_failed_deletions_stay_queued_for_retry(self):
+        PendingFileDeletion.objects.create(name=self.images[0].image.name)
+        with patch.object(type(self.storage), "delete", side_effect=OSError("disk busy")):
+            call_command("process_media_deletions", stdout=StringIO())
+
+        item = PendingFileDeletion.objects.get()
+        self.assertEqual(item.attempts, 1)
+        self.assertEqual(item.last_error, "disk busy")
+
+        call_command("process_media_deletions", stdout=StringIO())
+        self.assertFalse(PendingFileDeletion.objects.exists())
+
+    def test_overlapping_drains_release_each_queued_reference_once(self):
+        # Three rows share one blob; two of them were deleted and queued.
+        name = self.images[0].image.name
+        self.storage.retain(name)
+        self.storage.retain(name)
+        PendingFileDeletion.objects.create(name=name)
+        PendingFileDeletion.objects.create(name=name)
+        real_delete = type(self.storage).delete
+        calls = []
+
+        def delete_while_another_drain_runs(storage, file_name):
+            calls.append(file_name)
+            if len(calls) == 1:
+                # A second drain reads the same batch before the first one finishes.
+                process_pending_file_deletions()
+            real_delete(storage, file_name)
+
+        with patch.object(type(self.storage), "delete", delete_while_another_drain_runs):
+            process_pending_file_deletions()
+
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(PendingFileDeletion.objects.exists())
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+        self.assertTrue(self.storage.exists(name))
+
+
+
+class StubObjectStorageServer:
+    """
+    Local S3-compatible stand-in for presigned URLs. Objects live in a dict
+    keyed by bucket path; requests whose signature does not match are refused.
+    """
+
+    def __init__(self, bucket="test-bucket"):
+        self.bucket = bucket
+        self.objects = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _key(self):
+                parts = urlsplit(self.path)
+                prefix = f"/{stub.bucket}/"
+                if not parts.path.startswith(prefix):
+                    return None
+                query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+                signed = query.get("X-Amz-SignedHeaders", "").split(";")
+                key = unquote(parts.path[len(prefix):])
+                expected = presign_url(
+                    self.command,
+                    key,
+                    expires_in=int(query.get("X-Amz-Expires") or 0),
+                    content_type=self.headers.get("Content-Type", "") if "content-type" in signed else "",
+                    now=datetime.strptime(query.get("X-Amz-Date", ""), "%Y%m%dT%H%M%SZ").replace(tzinfo=dt_timezone.utc),
+                )
+                if parse_qs(urlsplit(expected).query)["X-Amz-Signature"][0] != query.get("X-Amz-Signature"):
+                    return None
+                return key
+
+            def _reply(self, status_code, body=b"", headers=None, send_body=True):
+                self.send_response(status_code)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def do_PUT(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                stub.requests.append(("PUT", self.path))
+                key = self._key()
+                if key is None:
+                    return self._reply(403)
+                stub.objects[key] = (body, self.headers.get("Content-Type", "application/octet-stream"))
+                self._reply(200)
+
+            def do_HEAD(self):
+                stub.requests.append(("HEAD", self.path))
+                key = self._key()
+                if key is None or key not in stub.objects:
+                    return self._reply(404 if key else 403, send_body=False)
+                body, content_type = stub.objects[key]
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Content-Type", content_type)
+                self.end_headers()
+
+            def do_GET(self):
+                stub.requests.append(("GET", self.path))
+                key = self._key()
+                if key is None or key not in stub.objects:
+                    return self._reply(404 if key else 403)
+                body, content_type = stub.objects[key]
+                self._reply(200, body, {"Content-Type": content_type})
+
+            def do_DELETE(self):
+                stub.requests.append(("DELETE", self.path))
+                key = self._key()
+                if key is None:
+                    return self._reply(403)
+                stub.objects.pop(key, None)
+                self._reply(204)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def endpoint_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class DirectUploadTests(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.stub = StubObjectStorageServer()
+        self.stub.__enter__()
+        self.addCleanup(self.stub.__exit__)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            DIRECT_UPLOADS_ENABLED=True,
+            DIRECT_UPLOAD_S3_ENDPOINT_URL=self.stub.endpoint_url,
+            DIRECT_UPLOAD_S3_BUCKET=self.stub.bucket,
+            DIRECT_UPLOAD_S3_ACCESS_KEY_ID="test-access",
+            DIRECT_UPLOAD_S3_SECRET_ACCESS_KEY="test-secret",
+            DIRECT_UPLOAD_MAX_BYTES=1024 * 1024,
+            DIRECT_UPLOAD_PROCESS_ASYNC=False,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.owner = User.objects.create_user(username="directowner", password="pw123456")
+        self.other = User.objects.create_user(username="directother", password="pw123456")
+        self.project = Project.objects.create(owner=self.owner, title="Bathroom")
+        self.client.force_authenticate(user=self.owner)
+
+    def _start_upload(self, **overrides):
+        payload = {"filename": "tile.png", "content_type": "image/png", "size": len(TINY_PNG_BYTES), "caption": "Tile"}
+        payload.update(overrides)
+        return self.client.post(f"/api/projects/{self.project.id}/direct-uploads/", payload, format="json")
+
+    def _put(self, started, body, headers=None):
+        return httpx.put(started.data["url"], content=body, headers=headers or started.data["headers"])
+
+    def test_presigned_put_finalize_creates_project_image(self):
+        started = self._start_upload()
+        self.assertEqual(started.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(started.data["method"], "PUT")
+        self.assertIn("X-Amz-Signature=", started.data["url"])
+        self.assertEqual(self._put(started, TINY_PNG_BYTES).status_code, 200)
+
+        upload_id = started.data["upload"]["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            finalized = self.client.post(f"/api/projects/{self.project.id}/direct-uploads/{upload_id}/finalize/")
+
+        self.assertEqual(finalized.status_code, status.HTTP_202_ACCEPTED)
+        upload = DirectUpload.objects.get(pk=upload_id)
+        self.assertEqual(upload.status, DirectUpload.STATUS_READY)
+        image = ProjectImage.objects.get(project=self.project)
+        self.assertEqual(upload.project_image_id, image.id)
+        self.assertEqual(image.caption, "Tile")
+        self.assertTrue(image.image.name.endswith(".webp"))
+        self.assertEqual(self.stub.objects, {})
+
+        detail = self.client.get(f"/api/projects/{self.project.id}/direct-uploads/{upload_id}/")
+        self.assertEqual(detail.data["status"], DirectUpload.STATUS_READY)
+        self.assertEqual(detail.data["image"]["id"], image.id)
+
+    def test_async_processing_runs_on_the_bounded_media_pool(self):
+        started = self._start_upload()
+        self._put(started, TINY_PNG_BYTES)
+        upload_id = started.data["upload"]["id"]
+
+        with self.settings(DIRECT_UPLOAD_PROCESS_ASYNC=True), patch(
+            "portfolio.direct_uploads.get_video_executor"
+        ) as executor, self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/api/projects/{self.project.id}/direct-uploads/{upload_id}/finalize/")
+
+        executor.return_value.submit.assert_called_once()
+        job, job_upload_id = executor.return_value.submit.call_args.args
+        self.assertIs(job, direct_uploads._run_in_background)
+        # Run the job body here; the wrapper closes the connection when it's done.
+        with patch("portfolio.direct_uploads.machine_job_slot", wraps=machine_job_slot) as slot:
+            direct_uploads.process_direct_upload(job_upload_id)
+        slot.assert_called_once()
+        self.assertEqual(DirectUpload.objects.get(pk=upload_id).status, DirectUpload.STATUS_READY)
+
+    def test_finalize_rejects_missing_or_wrong_size_objects(self):
+        started = self._start_upload()
+        upload_id = started.data["upload"]["id"]
+        url = f"/api/projects/{self.project.id}/direct-uploads/{upload_id}/finalize/"
+
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_409_CONFLICT)
+        self._put(started, TINY_PNG_BYTES + b"extra")
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(DirectUpload.objects.get(pk=upload_id).status, DirectUpload.STATUS_PENDING)
+        self.assertFalse(ProjectImage.objects.exists())
+
+    def test_presigned_url_rejects_tampered_content_type(self):
+        started = self._start_upload()
+        response = self._put(started, b"<html>", headers={"Content-Type": "text/html"})
+        self.assertEqual(response.status_code, 403)
+
+    def test_start_validates_owner_type_and_size(self):
+        self.assertEqual(self._start_upload(content_type="text/html", filename="x.html").status_code, 400)
+        self.assertEqual(self._start_upload(size=2 * 1024 * 1024).status_code, 400)
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self._start_upload().status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_disabled_direct_uploads_return_not_found(self):
+        with self.settings(DIRECT_UPLOADS_ENABLED=False):
+            self.assertEqual(self._start_upload().status_code, status.HTTP_404_NOT_FOUND)
+
+
+
+class ChunkedUploadTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        # Payloads here are a few bytes; the minimum chunk size has its own test.
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, CHUNKED_UPLOAD_TEMP_DIR=self.temp_dir, CHUNKED_UPLOAD_MIN_CHUNK_BYTES=1
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.owner = User.objects.create_user(username="chunkowner", password="pw123456")
+        self.project = Project.objects.create(owner=self.owner, title="Kitchen")
+        self.client.force_authenticate(user=self.owner)
+
+    def _open_session(self, payload, filename="tile.png", content_type="image/png"):
+        response = self.client.post(
+            f"/api/projects/{self.project.id}/upload-sessions/",
+            {"filename": filename, "content_type": content_type, "size": len(payload), "caption": "Tile"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return f"/api/projects/{self.project.id}/upload-sessions/{response.data['id']}/"
+
+    def _put_chunk(self, url, payload, start, end, checksum=None):
+        chunk = payload[start:end]
+        return self.client.put(
+            url,
+            chunk,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end - 1}/{len(payload)}",
+            HTTP_X_CHUNK_SHA256=checksum or hashlib.sha256(chunk).hexdigest(),
+        )
+
+    def test_chunks_resume_after_interruption_and_complete_into_project_image(self):
+        payload = TINY_PNG_BYTES
+        url = self._open_session(payload)
+        third = len(payload) // 3
+
+        self.assertEqual(self._put_chunk(url, payload, 0, third).data["received_bytes"], third)
+        corrupted = self._put_chunk(url, payload, third, 2 * third, checksum="0" * 64)
+        self.assertEqual(corrupted.status_code, status.HTTP_400_BAD_REQUEST)
+        skipped = self._put_chunk(url, payload, 2 * third, len(payload))
+        self.assertEqual(skipped.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(skipped.data["offset"], third)
+
+        self.assertEqual(self.client.get(url).data["received_bytes"], third)
+        self.assertEqual(self._put_chunk(url, payload, 0, third).status_code, status.HTTP_200_OK)
+        self._put_chunk(url, payload, third, 2 * third)
+        self._put_chunk(url, payload, 2 * third, len(payload))
+
+        response = self.client.post(f"{url}complete/", {"sha256": hashlib.sha256(payload).hexdigest()}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["status"], ChunkedUpload.STATUS_COMPLETE)
+        image = ProjectImage.objects.get(project=self.project)
+        self.assertEqual(response.data["image"]["id"], image.id)
+        self.assertEqual(image.caption, "Tile")
+        self.assertTrue(image.image.name.endswith(".webp"))
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_complete_requires_every_byte(self):
+        payload = TINY_PNG_BYTES
+        url = self._open_session(payload)
+        self._put_chunk(url, payload, 0, 10)
+
+        response = self.client.post(f"{url}complete/")
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["offset"], 10)
+        self.assertFalse(ProjectImage.objects.exists())
+
+    def test_small_chunks_are_rejected_except_the_last(self):
+        payload = TINY_PNG_BYTES
+        url = self._open_session(payload)
+
+        with self.settings(CHUNKED_UPLOAD_MIN_CHUNK_BYTES=32):
+            self.assertEqual(self._put_chunk(url, payload, 0, 16).status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(self._put_chunk(url, payload, 0, 32).status_code, status.HTTP_200_OK)
+            self.assertEqual(self._put_chunk(url, payload, 32, len(payload)).status_code, status.HTTP_200_OK)
+
+    def test_bytes_are_streamed_and_converted_outside_database_transactions(self):
+        payload = TINY_PNG_BYTES
+        url = self._open_session(payload)
+        session = ChunkedUpload.objects.get(project=self.project)
+        outer_depth = len(connection.atomic_blocks)
+        depths = []
+
+        class RecordingStream(BytesIO):
+            def read(self, size=-1):
+                depths.append(len(connection.atomic_blocks))
+                return super().read(size)
+
+        write_chunk(
+            session,
+            start=0,
+            end=len(payload),
+            total=len(payload),
+            stream=RecordingStream(payload),
+            checksum=hashlib.sha256(payload).hexdigest(),
+        )
+
+        def recording_convert(*args, **kwargs):
+            depths.append(len(connection.atomic_blocks))
+            self.assertEqual(
+                ChunkedUpload.objects.get(pk=session.pk).status, ChunkedUpload.STATUS_ASSEMBLING
+            )
+            return convert_to_webp(*args, **kwargs)
+
+        with patch("portfolio.models.convert_to_webp", side_effect=recording_convert):
+            response = self.client.post(f"{url}complete/")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(depths)
+        self.assertEqual(set(depths), {outer_depth})
+
+    def test_video_is_moved_from_the_temp_file_and_transcoded_from_storage(self):
+        payload = b"\x00\x00\x00\x18ftypqt  " + b"m" * 4096
+        url = self._open_session(payload, filename="walkthrough.mov", content_type="video/quicktime")
+        self._put_chunk(url, payload, 0, 2048)
+        self._put_chunk(url, payload, 2048, len(payload))
+        inputs = []
+
+        def fake_ffmpeg(command, **kwargs):
+            inputs.append(command[command.index("-i") + 1])
+            Path(command[command.index("96k") + 1]).write_bytes(b"converted")
+            Path(command[-1]).write_bytes(b"poster")
+
+        with self.settings(VIDEO_PROCESSING_ASYNC=False), patch(
+            "portfolio.video_processing.run_ffmpeg", side_effect=fake_ffmpeg
+        ), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"{url}complete/")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["image"]["processing_status"], ProjectImage.STATUS_PENDING)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+        self.assertTrue(inputs[0].startswith(self.media_root))
+        image = ProjectImage.objects.get(project=self.project)
+        self.assertEqual(image.media_type, ProjectImage.MEDIA_TYPE_VIDEO)
+        self.assertEqual(image.processing_status, ProjectImage.STATUS_READY)
+        self.assertTrue(image.image.name.endswith(".webm"))
+        self.assertFalse(os.path.exists(inputs[0]))
+
 class ProjectPlannerTests(APITestCase):
     def setUp(self):
         self.homeowner = User.objects.create_user(username="plannerhome", password="pw123456")
@@ -1084,12 +2139,14 @@ class ProjectPlannerTests(APITestCase):
         self.assertEqual(draft.service_categories, ["carpenter"])
         copied_image = draft.images.get()
         self.assertEqual(copied_image.caption, "Close up")
+        self.assertEqual(copied_image.image.name, plan_image.image.name)
+        self.assertEqual(MediaBlob.objects.get(name=plan_image.image.name).ref_count, 2)
         self.assertEqual(copied_image.extra_data["source"], "project_planner")
         self.assertEqual(copied_image.extra_data["source_plan_id"], plan.id)
         self.assertEqual(copied_image.extra_data["markup_version"]["id"], "version-test")
         self.assertEqual(copied_image.extra_data["markup_version"]["annotation_count"], 2)
 
-    @patch("portfolio.views.generate_text")
+    @patch("portfolio.views.agenerate_text")
     def test_planner_ai_action_uses_shared_quota(self, mock_generate_text):
         mock_generate_text.return_value = {
             "text": json.dumps(
@@ -1121,7 +2178,74 @@ class ProjectPlannerTests(APITestCase):
             1,
         )
 
-    @patch("portfolio.views.generate_text_with_image")
+    @patch("portfolio.views.stream_text")
+    def test_planner_ai_streams_text_then_parsed_result(self, mock_stream_text):
+        analysis = {
+            "likely_issue_label": "Rotten exterior trim",
+            "explanation": "Water damage around the frame.",
+            "contractor_types": ["carpenter"],
+            "next_steps": ["Inspect surrounding trim"],
+        }
+        text = json.dumps(analysis)
+        mock_stream_text.return_value = iter(
+            [
+                {"type": "delta", "text": text[:20]},
+                {"type": "delta", "text": text[20:]},
+                {"type": "completed", "text": text, "model": "gpt-test", "usage": {}, "cached": False, "cache_key": ""},
+            ]
+        )
+        plan = ProjectPlan.objects.create(owner=self.homeowner, title="Window trim", notes="Soft wood.")
+        self.client.force_authenticate(user=self.homeowner)
+
+        response = self.client.post(
+            f"/api/project-plans/{plan.id}/ai/",
+            {"action": "analyze_issue", "stream": True},
+            format="json",
+        )
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join(response.streaming_content).decode("utf-8")
+        frames = [frame.split("\n") for frame in body.strip().split("\n\n")]
+        self.assertEqual([lines[0] for lines in frames], ["event: delta", "event: delta", "event: done"])
+        done = json.loads(frames[-1][1].removeprefix("data: "))
+        self.assertEqual(done["analysis"], analysis)
+        self.assertEqual(
+            AIUsageEvent.objects.filter(user=self.homeowner, status=AIUsageEvent.Status.SUCCESS).count(),
+            1,
+        )
+
+    @patch("accounts.ai._apost_to_provider")
+    def test_planner_ai_does_not_cache_unparseable_responses(self, mock_post):
+        clear_ai_response_cache()
+        self.addCleanup(clear_ai_response_cache)
+        analysis = {
+            "likely_issue_label": "Rotten exterior trim",
+            "explanation": "Water damage around the frame.",
+            "contractor_types": ["carpenter"],
+            "next_steps": ["Inspect surrounding trim"],
+        }
+        mock_post.side_effect = [
+            {"model": "gpt-test", "output_text": "not json"},
+            {"model": "gpt-test", "output_text": json.dumps(analysis)},
+        ]
+        plan = ProjectPlan.objects.create(owner=self.homeowner, title="Window trim", notes="Soft wood.")
+        self.client.force_authenticate(user=self.homeowner)
+
+        with self.settings(OPENAI_API_KEY="test-key"):
+            failed = self.client.post(f"/api/project-plans/{plan.id}/ai/", {"action": "analyze_issue"}, format="json")
+            fresh = self.client.post(f"/api/project-plans/{plan.id}/ai/", {"action": "analyze_issue"}, format="json")
+            cached = self.client.post(f"/api/project-plans/{plan.id}/ai/", {"action": "analyze_issue"}, format="json")
+
+        self.assertEqual(failed.status_code, status.HTTP_502_BAD_GATEWAY)
+        self.assertEqual(fresh.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.data["analysis"], analysis)
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(
+            list(AIUsageEvent.objects.filter(user=self.homeowner).order_by("id").values_list("status", flat=True)),
+            [AIUsageEvent.Status.ERROR, AIUsageEvent.Status.SUCCESS, AIUsageEvent.Status.CACHED],
+        )
+
+    @patch("portfolio.views.agenerate_text_with_image")
     def test_sketch_to_rough_plan_returns_editable_annotations(self, mock_generate_text_with_image):
         mock_generate_text_with_image.return_value = {
             "text": json.dumps(
@@ -1173,7 +2297,7 @@ class ProjectPlannerTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("JPG, PNG, or WebP", str(response.data))
 
-    @patch("portfolio.views.generate_image_from_image")
+    @patch("portfolio.views.agenerate_image_from_image")
     def test_sketch_to_clean_floor_plan_saves_generated_planner_image(self, mock_generate_image_from_image):
         mock_generate_image_from_image.return_value = {
             "image_bytes": TINY_PNG_BYTES,
@@ -1198,7 +2322,7 @@ class ProjectPlannerTests(APITestCase):
             1,
         )
 
-    @patch("portfolio.views.generate_text_with_image")
+    @patch("portfolio.views.agenerate_text_with_image")
     def test_project_image_sketch_to_rough_plan_uses_existing_image(self, mock_generate_text_with_image):
         mock_generate_text_with_image.return_value = {
             "text": json.dumps(
@@ -1235,7 +2359,7 @@ class ProjectPlannerTests(APITestCase):
         self.assertEqual(response.data["annotations"][0]["type"], "rect")
         self.assertEqual(response.data["uncertainty_notes"], ["Confirm final dimensions on site."])
 
-    @patch("portfolio.views.generate_image_from_image")
+    @patch("portfolio.views.agenerate_image_from_image")
     def test_project_image_sketch_to_clean_floor_plan_saves_generated_project_image(self, mock_generate_image_from_image):
         mock_generate_image_from_image.return_value = {
             "image_bytes": TINY_PNG_BYTES,
@@ -1263,3 +2387,143 @@ class ProjectPlannerTests(APITestCase):
         self.assertEqual(response.data["image"]["caption"], "clean-floor-plan")
         self.assertEqual(response.data["image"]["extra_data"]["source"], "ai_clean_floor_plan")
         self.assertEqual(project.images.count(), 2)
+
+
+def _rows(response):
+    data = response.data
+    if isinstance(data, dict):
+        data = data.get("results", data.get("items", []))
+    return len(data)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False, REQUEST_PROFILING_ENABLED=False)
+class ListEndpointQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Each list endpoint must issue the same number of queries at n=5 and n=50."""
+
+    def test_projects(self):
+        self.assertConstantQueries(lambda client, world: client.get("/api/projects/"), rows=_rows)
+
+    def test_my_projects(self):
+        self.assertConstantQueries(lambda client, world: client.get("/api/projects/mine/"), rows=_rows)
+
+    def test_job_postings(self):
+        self.assertConstantQueries(
+            lambda client, world: client.get("/api/projects/job-postings/"), viewer=False, rows=_rows
+        )
+
+    def test_project_comments(self):
+        self.assertConstantQueries(
+            lambda client, world: client.get(f"/api/projects/{world.projects[0].pk}/comments/"), rows=_rows
+        )
+
+    def test_favorite_and_liked_projects(self):
+        self.assertConstantQueries(lambda client, world: client.get("/api/favorites/projects/"), rows=_rows)
+        self.assertConstantQueries(lambda client, world: client.get("/api/likes/projects/"), rows=_rows)
+
+    def test_project_plans(self):
+        self.assertConstantQueries(lambda client, world: client.get("/api/project-plans/"), rows=_rows)
+
+    def test_helpers(self):
+        self.assertConstantQueries(
+            lambda client, world: client.get("/api/project-helpers/"), viewer=False, rows=_rows
+        )
+
+    def test_inbox_threads(self):
+        self.assertConstantQueries(lambda client, world: client.get("/api/inbox/threads/"), rows=_rows)
+
+    def test_thread_messages(self):
+        self.assertConstantQueries(
+            lambda client, world: client.get(f"/api/messages/threads/{world.threads[0].pk}/messages/"),
+            rows=_rows,
+        )
+
+    def test_bids(self):
+        self.assertConstantQueries(lambda client, world: client.get("/api/bids/"), rows=_rows)
+        self.assertConstantQueries(
+            lambda client, world: client.get(f"/api/projects/{world.job_postings[0].pk}/bids/"), rows=_rows
+        )
+
+    def test_liked_and_saved_profiles(self):
+        self.assertConstantQueries(lambda client, world: client.get("/api/profiles/liked/"), rows=_rows)
+        self.assertConstantQueries(lambda client, world: client.get("/api/profiles/saved/"), rows=_rows)
+
+    def test_contractor_search(self):
+        self.assertConstantQueries(
+            lambda client, world: client.get("/api/profiles/contractors/search/?q=qb-pro"), rows=_rows, max_rows=20
+        )
+
+    def test_homeowner_reference_galleries(self):
+        self.assertConstantQueries(
+            lambda client, world: client.get("/api/profiles/homeowner-references/"), viewer=False, rows=_rows
+        )
+
+    def test_business_directory(self):
+        self.assertConstantQueries(
+            lambda client, world: client.get("/api/business-directory/?country_code=US"), rows=_rows
+        )
+
+    def test_failure_report_groups_queries_by_call_site(self):
+        def per_project_queries(client, world):
+            for project in Project.objects.all():
+                project.images.count()
+            return client.get("/api/projects/job-postings/")
+
+        with self.assertRaises(AssertionError) as caught:
+            self.assertConstantQueries(per_project_queries)
+
+        message = str(caught.exception)
+        self.assertIn("Query count grows with n", message)
+        self.assertRegex(message, r"\d+x portfolio/tests\.py:\d+ in per_project_queries")
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_seed_and_run_benchmarks_report_json(self):
+        call_command("seed_benchmark_data", "--scale", "4", "--prefix", "bt", stdout=StringIO())
+        self.assertEqual(User.objects.filter(username__startswith="bt-").count(), 8)
+        self.assertEqual(Profile.objects.filter(user__username__startswith="bt-", service_lat__isnull=False).count(), 8)
+        self.assertTrue(AIUsageEvent.objects.filter(user__username__startswith="bt-").exists())
+
+        out = StringIO()
+        call_command(
+            "run_benchmarks",
+            "--prefix", "bt",
+            "--iterations", "2",
+            "--warmup", "0",
+            "--only", "job_postings",
+            "--only", "inbox_threads",
+            stdout=out,
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual([result["name"] for result in report["endpoints"]], ["job_postings", "inbox_threads"])
+        for result in report["endpoints"]:
+            self.assertEqual(result["status"], [200])
+            self.assertGreater(result["queries"], 0)
+            self.assertLessEqual(result["latency_ms"]["p50"], result["latency_ms"]["max"])
+
+        call_command("seed_benchmark_data", "--prefix", "bt", "--delete", stdout=StringIO())
+        self.assertFalse(User.objects.filter(username__startswith="bt-").exists())
+
+
+class ExplainHotQueriesCommandTests(TestCase):
+    def test_sequential_scans_are_detected_for_postgres_and_sqlite_plans(self):
+        from portfolio.management.commands.explain_hot_queries import sequential_scans
+
+        self.assertEqual(
+            sequential_scans("Sort\n  ->  Seq Scan on portfolio_project  (cost=0.00..35.50 rows=10 width=4)"),
+            ["portfolio_project"],
+        )
+        self.assertEqual(sequential_scans("4 0 0 SCAN portfolio_project"), ["portfolio_project"])
+        self.assertEqual(sequential_scans("4 0 0 SCAN portfolio_project USING INDEX project_open_jobs_idx"), [])
+        self.assertEqual(
+            sequential_scans("Index Scan using bid_project_status_idx on bids_bid  (cost=0.15..8.17 rows=1)"), []
+        )
+
+    @skipUnless(connection.vendor == "sqlite", "Postgres plans empty test tables with sequential scans.")
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command("explain_hot_queries", "--json", stdout=out)
+        report = json.loads(out.getvalue())
+        plans = {query["name"]: query for query in report["queries"]}
+        self.assertIn("job_postings", plans)
+        for name in ("job_postings", "inbox_threads", "thread_messages", "project_bids_by_status", "business_directory"):
+            self.assertEqual(plans[name]["seq_scans"], [], plans[name]["plan"])
@@ -1,10 +1,9 @@
 # backend/portfolio/utils.py
-from io import BytesIO
 import os
 
-from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
-from PIL import Image
+
+from .image_conversion import ImageTooLargeError, convert_to_webp, fits_stored_limits
 
 
 def convert_field_file_to_webp(*args, **kwargs):
@@ -48,24 +47,21 @@ def convert_field_file_to_webp(*args, **kwargs):
         return
 
     root, ext = os.path.splitext(current_name.lower())
-    if ext == ".webp":
-        # Already WEBP
-        return
-
     try:
-        img = Image.open(field_file)
-
-        if img.mode not in ("RGB", "RGBA"):
-            img = img.convert("RGB")
+        if ext == ".webp" and fits_stored_limits(field_file):
+            # Already WEBP and within the size limits
+            return
 
-        buffer = BytesIO()
-        img.save(buffer, format="WEBP", quality=80)
-        buffer.seek(0)
+        converted = convert_to_webp(
+            field_file,
+            quality=kwargs.get("quality"),
+            label=f"{type(instance).__name__}.{field_name}:{current_name}",
+        )
 
         new_name = f"{root}.webp"
         old_name = current_name
 
-        field_file.save(new_name, ContentFile(buffer.read()), save=False)
+        field_file.save(new_name, converted, save=False)
 
         if (
             old_name
@@ -78,6 +74,9 @@ def convert_field_file_to_webp(*args, **kwargs):
                 # Don't break if delete fails
                 pass
 
+    except ImageTooLargeError:
+        # Over the pixel limit: storing the original would bypass it.
+        raise
     except Exception:
         # Never let conversion break the request
         return
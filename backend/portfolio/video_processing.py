@@ -0,0 +1,370 @@
+# backend/portfolio/video_processing.py
+"""
+Background VP9 transcoding for project videos.
+
+Uploads are stored as-is and queued here after the row commits. Each web
+process has a small thread pool, shared with direct-upload processing, and
+every ffmpeg run first takes one of
+VIDEO_WORKERS (default half the CPU cores) machine-wide slots, flock()ed
+files under VIDEO_LOCK_DIR, so the number of encoders on the box stays
+bounded however many gunicorn workers or ``process_videos`` runs there are.
+One ffmpeg process per job writes both the WebM and its poster frame.
+ffmpeg's ``-progress`` stream is parsed into
+``ProjectImage.extra_data["video_processing"]`` so clients can show a
+progress bar, and every job runs under ``nice``, a ``prlimit`` CPU budget,
+a wall-clock timeout and a capped encoder thread count.
+"""
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import DatabaseError, connection, transaction
+
+from accounts import metrics
+from accounts.profiling import external_call
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_KEY = "video_processing"
+PROGRESS_WRITE_STEP = 5
+PROGRESS_WRITE_INTERVAL = 2.0
+DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+SLOT_POLL_INTERVAL = 0.5
+
+_executor = None
+_executor_lock = threading.Lock()
+_slot_state = threading.local()
+
+
+class VideoProcessingError(Exception):
+    pass
+
+
+def video_worker_count():
+    configured = int(getattr(settings, "VIDEO_WORKERS", 0) or 0)
+    return configured if configured > 0 else max(1, (os.cpu_count() or 2) // 2)
+
+
+def get_video_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=video_worker_count(), thread_name_prefix="video")
+        return _executor
+
+
+def shutdown_video_executor(wait=True):
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def build_ffmpeg_command(input_path, output_path, poster_path, *, threads):
+    """One decode feeding two outputs: the VP9/Opus WebM and a PNG poster frame."""
+    scale = "scale=min(1280\\,iw):-2"
+    return [
+        "ffmpeg",
+        "-y",
+        "-nostdin",
+        "-hide_banner",
+        "-nostats",
+        "-progress",
+        "pipe:1",
+        "-threads",
+        str(threads),
+        "-i",
+        str(input_path),
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0?",
+        "-vf",
+        scale,
+        "-c:v",
+        "libvpx-vp9",
+        "-b:v",
+        "0",
+        "-crf",
+        "34",
+        "-row-mt",
+        "1",
+        "-threads",
+        str(threads),
+        "-c:a",
+        "libopus",
+        "-b:a",
+        "96k",
+        str(output_path),
+        "-map",
+        "0:v:0",
+        "-vf",
+        scale,
+        "-frames:v",
+        "1",
+        "-update",
+        "1",
+        str(poster_path),
+    ]
+
+
+def limited_command(command, cpu_seconds=None):
+    """
+    Prefix ``command`` with ``nice`` and a ``prlimit`` CPU budget.
+
+    Limits are applied by the wrappers rather than a ``preexec_fn``, which is
+    unsafe to run in the forked child of a multithreaded process.
+    """
+    prefix = []
+    if shutil.which("nice"):
+        prefix += ["nice", "-n", "10"]
+    if cpu_seconds:
+        if shutil.which("prlimit"):
+            prefix += ["prlimit", f"--cpu={cpu_seconds}:{cpu_seconds + 5}", "--"]
+        else:
+            logger.warning("prlimit is not installed; video jobs only have a wall-clock limit")
+    return [*prefix, *command]
+
+
+def video_lock_dir():
+    path = getattr(settings, "VIDEO_LOCK_DIR", "") or os.path.join(tempfile.gettempdir(), "portfolio-video-slots")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@contextmanager
+def machine_job_slot():
+    """
+    Hold one of the machine's ``video_worker_count()`` encoder slots for the block.
+
+    Re-entrant per thread: work that already holds a slot (e.g. a direct upload
+    whose save queues a video synchronously) doesn't wait on itself.
+    """
+    if fcntl is None or getattr(_slot_state, "held", False):
+        yield
+        return
+    directory = video_lock_dir()
+    while True:
+        for index in range(video_worker_count()):
+            handle = open(os.path.join(directory, f"slot-{index}.lock"), "a")
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                continue
+            _slot_state.held = True
+            try:
+                yield
+            finally:
+                _slot_state.held = False
+                # Closing the file releases the lock, also if the process dies.
+                handle.close()
+            return
+        time.sleep(SLOT_POLL_INTERVAL)
+
+
+@external_call("ffmpeg")
+def run_ffmpeg(command, *, on_progress=None, timeout=None, cpu_seconds=None):
+    """
+    Run ``command`` and report percent complete through ``on_progress``.
+
+    Progress is read from ``-progress pipe:1`` on stdout; the input duration is
+    taken from ffmpeg's stderr banner. Raises VideoProcessingError on a
+    non-zero exit, a CPU-limit kill or a timeout.
+    """
+    process = subprocess.Popen(
+        limited_command(command, cpu_seconds) if os.name == "posix" else command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    duration = {"us": 0}
+    stderr_tail = []
+
+    def read_stderr():
+        for line in process.stderr:
+            if not duration["us"]:
+                match = DURATION_RE.search(line)
+                if match:
+                    hours, minutes, seconds = match.groups()
+                    duration["us"] = int((int(hours) * 3600 + int(minutes) * 60 + float(seconds)) * 1_000_000)
+            stderr_tail.append(line)
+            del stderr_tail[:-20]
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    stderr_thread = threading.Thread(target=read_stderr, daemon=True)
+    stderr_thread.start()
+    timer = threading.Timer(timeout, kill) if timeout else None
+    if timer:
+        timer.daemon = True
+        timer.start()
+    try:
+        for line in process.stdout:
+            key, _, value = line.strip().partition("=")
+            if key in ("out_time_us", "out_time_ms") and value.isdigit() and duration["us"] and on_progress:
+                on_progress(min(99, int(int(value) * 100 / duration["us"])))
+            elif key == "progress" and value == "end" and on_progress:
+                on_progress(100)
+        returncode = process.wait()
+    finally:
+        if timer:
+            timer.cancel()
+        stderr_thread.join(timeout=5)
+
+    if timed_out.is_set():
+        raise VideoProcessingError(f"ffmpeg exceeded the {timeout}s time limit.")
+    if returncode != 0:
+        if returncode == -9 or returncode == -24:
+            raise VideoProcessingError("ffmpeg exceeded its CPU time limit.")
+        raise VideoProcessingError(f"ffmpeg exited with {returncode}: {''.join(stderr_tail).strip()[-500:]}")
+
+
+def _write_progress(image_id, **values):
+    from .models import ProjectImage
+
+    with transaction.atomic():
+        image = ProjectImage.objects.select_for_update().filter(pk=image_id).only("id", "extra_data").first()
+        if image is None:
+            return
+        extra = dict(image.extra_data or {})
+        extra[PROGRESS_KEY] = {**(extra.get(PROGRESS_KEY) or {}), **values}
+        ProjectImage.objects.filter(pk=image_id).update(extra_data=extra)
+
+
+def _progress_writer(image_id):
+    state = {"percent": -PROGRESS_WRITE_STEP, "at": 0.0}
+
+    def on_progress(percent):
+        now = time.monotonic()
+        if percent < 100 and (
+            percent - state["percent"] < PROGRESS_WRITE_STEP and now - state["at"] < PROGRESS_WRITE_INTERVAL
+        ):
+            return
+        if percent == state["percent"]:
+            return
+        state.update(percent=percent, at=now)
+        _write_progress(image_id, percent=percent)
+
+    return on_progress
+
+
+def process_video(image_id):
+    """Transcode one ProjectImage video in place; returns True when it is ready."""
+    from .models import ProjectImage
+
+    image = ProjectImage.objects.filter(pk=image_id, media_type=ProjectImage.MEDIA_TYPE_VIDEO).first()
+    if image is None or image.processing_status not in (ProjectImage.STATUS_PENDING, ProjectImage.STATUS_PROCESSING):
+        return False
+
+    ProjectImage.objects.filter(pk=image_id).update(processing_status=ProjectImage.STATUS_PROCESSING)
+    _write_progress(image_id, percent=0, error="")
+
+    original_name = image.image.name
+    root, ext = os.path.splitext(os.path.basename(original_name.lower()))
+    # Blob names are a 64-char digest; keep the thumbnail path inside max_length.
+    root = root[:40]
+    threads = max(1, int(getattr(settings, "VIDEO_FFMPEG_THREADS", 2)))
+    timeout = int(getattr(settings, "VIDEO_JOB_TIMEOUT_SECONDS", 900)) or None
+    cpu_seconds = int(getattr(settings, "VIDEO_JOB_CPU_SECONDS", 0) or 0) or (timeout or 900) * threads
+    started = time.monotonic()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            try:
+                input_path = image.image.path
+            except NotImplementedError:
+                input_path = Path(tmpdir) / f"input{ext or '.video'}"
+                with image.image.open("rb") as source, open(input_path, "wb") as handle:
+                    shutil.copyfileobj(source, handle, 1024 * 1024)
+            output_path = Path(tmpdir) / "output.webm"
+            poster_path = Path(tmpdir) / "poster.png"
+
+            with machine_job_slot():
+                run_ffmpeg(
+                    build_ffmpeg_command(input_path, output_path, poster_path, threads=threads),
+                    on_progress=_progress_writer(image_id),
+                    timeout=timeout,
+                    cpu_seconds=cpu_seconds,
+                )
+
+            image.refresh_from_db(fields=["extra_data"])
+            with open(output_path, "rb") as output, open(poster_path, "rb") as poster:
+                image.image.save(f"{root}.webm", File(output), save=False)
+                image.thumbnail.save(f"{root}_thumb.png", File(poster), save=False)
+    except Exception as exc:
+        logger.warning("Video processing failed image_id=%s error=%s", image_id, exc)
+        ProjectImage.objects.filter(pk=image_id).update(processing_status=ProjectImage.STATUS_FAILED)
+        _write_progress(image_id, error=str(exc)[:500])
+        metrics.VIDEO_PROCESSING_SECONDS.observe(time.monotonic() - started, outcome="failed")
+        return False
+
+    extra = dict(image.extra_data or {})
+    extra[PROGRESS_KEY] = {**(extra.get(PROGRESS_KEY) or {}), "percent": 100, "error": ""}
+    image.extra_data = extra
+    image.processing_status = ProjectImage.STATUS_READY
+    try:
+        image.save(update_fields=["image", "thumbnail", "processing_status", "extra_data"])
+    except DatabaseError:
+        # The row was deleted while we were encoding; drop what we produced.
+        for field_file in (image.image, image.thumbnail):
+            field_file.storage.delete(field_file.name)
+        return False
+
+    if original_name != image.image.name:
+        try:
+            image.image.storage.delete(original_name)
+        except Exception:
+            logger.warning("Could not delete original video name=%s", original_name, exc_info=True)
+    metrics.VIDEO_PROCESSING_SECONDS.observe(time.monotonic() - started, outcome="ok")
+    logger.info(
+        "Processed video image_id=%s elapsed_ms=%s threads=%s",
+        image_id,
+        int((time.monotonic() - started) * 1000),
+        threads,
+    )
+    return True
+
+
+def _run_job(image_id):
+    try:
+        process_video(image_id)
+    except Exception:
+        logger.exception("Video worker crashed image_id=%s", image_id)
+    finally:
+        metrics.VIDEO_JOBS_IN_FLIGHT.dec()
+        connection.close()
+
+
+def queue_video_processing(image_id):
+    """Transcode ``image_id`` on the worker pool once the current transaction commits."""
+
+    def submit():
+        if not getattr(settings, "VIDEO_PROCESSING_ASYNC", True):
+            process_video(image_id)
+            return
+        metrics.VIDEO_JOBS_IN_FLIGHT.inc()
+        get_video_executor().submit(_run_job, image_id)
+
+    transaction.on_commit(submit)
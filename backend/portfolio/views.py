@@ -4,13 +4,14 @@ import logging
 import re
 
 from django.conf import settings
-from django.core.files.storage import default_storage
 from django.db import models, transaction
-from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models import Count, Exists, Max, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from datetime import timedelta
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.files.base import ContentFile
 
 from rest_framework import viewsets, permissions, status, generics
@@ -21,8 +22,27 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
-from accounts.ai import AIServiceError, generate_image_from_image, generate_text, generate_text_with_image
+from accounts import metrics
+from accounts.ai import (
+    AIServiceError,
+    agenerate_image_from_image,
+    agenerate_text,
+    agenerate_text_with_image,
+    evict_ai_response,
+    stream_text,
+)
+from accounts.async_views import AsyncAPIViewMixin, database_sync_to_async
+from accounts.conditional import latest_timestamp, not_modified, set_validators, viewer_marker, weak_etag
 from accounts.geo_distance import get_request_origin, sort_by_distance
+from accounts.response_cache import (
+    HELPERS_TAG,
+    JOB_POSTINGS_TAG,
+    cached_anonymous_response,
+    helper_tag,
+    profile_tag,
+    project_tag,
+)
+from accounts.streaming import event_stream_response, sse_event, wants_event_stream
 from accounts.models import (
     AIConfiguration,
     AIUsageEvent,
@@ -31,6 +51,8 @@ from accounts.models import (
     record_ai_usage_event,
 )
 from .models import (
+    ChunkedUpload,
+    DirectUpload,
     Project,
     ProjectImage,
     ProjectPlan,
@@ -45,11 +67,33 @@ from .models import (
     ProjectBid,
     ProjectBidVersion,
     FeedbackTicket,
+    HelperFeedback,
     HelperListing,
 )
 from apps.bids.models import Bid
+from .chunked_uploads import (
+    ChunkedUploadError,
+    ChunkOffsetError,
+    complete_upload,
+    discard_session_file,
+    parse_content_range,
+    write_chunk,
+)
+from .image_conversion import ImageTooLargeError
+from .direct_uploads import (
+    DirectUploadError,
+    direct_uploads_enabled,
+    head_object,
+    new_object_key,
+    presign_url,
+    queue_direct_upload_processing,
+)
+from .media_cleanup import defer_file_deletion
+from .storage import present_media_names
 from .access import can_access_job_interactions, can_view_project, visible_projects_q_for_user
 from .serializers import (
+    ChunkedUploadSerializer,
+    DirectUploadSerializer,
     ProjectSerializer,
     ProjectImageSerializer,
     ProjectPlanSerializer,
@@ -281,6 +325,7 @@ class HelperListingViewSet(viewsets.ModelViewSet):
     serializer_class = HelperListingSerializer
     permission_classes = [permissions.AllowAny]
     http_method_names = ["get", "post", "head", "options"]
+    read_from_replica = {"list", "retrieve"}
 
     def get_queryset(self):
         queryset = (
@@ -289,7 +334,7 @@ class HelperListingViewSet(viewsets.ModelViewSet):
                 admin_approved=True,
                 contact_verified=True,
             )
-            .prefetch_related("feedback")
+            .prefetch_related(Prefetch("feedback", queryset=HelperFeedback.objects.select_related("reviewer")))
             .order_by("-created_at")
         )
 
@@ -323,6 +368,19 @@ class HelperListingViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        def build():
+            response = super(HelperListingViewSet, self).list(request, *args, **kwargs)
+            rows = response.data.get("results", []) if isinstance(response.data, dict) else response.data
+            return response, [HELPERS_TAG, *(helper_tag(row["id"]) for row in rows if row.get("id"))]
+
+        return cached_anonymous_response(
+            request,
+            "helpers",
+            build,
+            params=("search", "skill", "city", "availability", "experience_level"),
+        )
+
     def perform_create(self, serializer):
         serializer.save()
 
@@ -485,7 +543,7 @@ class ProjectCommentListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         project = self.get_project()
-        return ProjectComment.objects.filter(project_id=project.id).order_by("-created_at")
+        return ProjectComment.objects.filter(project_id=project.id).select_related("author").order_by("-created_at")
 
     def perform_create(self, serializer):
         project = self.get_project()
@@ -559,7 +617,41 @@ class UnpublishTestimonialView(APIView):
 # ---------------------------------------------------
 # Projects + images + favorites
 # ---------------------------------------------------
-class ProjectViewSet(viewsets.ModelViewSet):
+def with_project_card_data(queryset, user):
+    """Prefetch and annotate everything ProjectSerializer reads per row."""
+    like_counts = (
+        ProjectLike.objects.filter(project=OuterRef("pk"))
+        .order_by()
+        .values("project")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    queryset = (
+        queryset.select_related("owner")
+        .prefetch_related(
+            Prefetch("images", queryset=ProjectImage.objects.order_by("order", "id")),
+            Prefetch("invites", queryset=ProjectInvite.objects.select_related("contractor", "contractor__profile")),
+        )
+        .annotate(
+            bid_count=Count("bids", distinct=True),
+            accepted_bid_count=Count(
+                "bids",
+                filter=Q(bids__status=Bid.STATUS_ACCEPTED),
+                distinct=True,
+            ),
+            # A subquery rather than a third join, which would multiply the bid rows.
+            like_count=Coalesce(Subquery(like_counts[:1]), 0),
+        )
+    )
+    if getattr(user, "is_authenticated", False):
+        queryset = queryset.annotate(
+            liked_by_me=Exists(ProjectLike.objects.filter(project=OuterRef("pk"), user=user)),
+            saved_by_me=Exists(ProjectFavorite.objects.filter(project=OuterRef("pk"), user=user)),
+        )
+    return queryset
+
+
+class ProjectViewSet(AsyncAPIViewMixin, viewsets.ModelViewSet):
     queryset = Project.objects.select_related("owner").prefetch_related("invites").annotate(
         bid_count=Count("bids", distinct=True),
         accepted_bid_count=Count(
@@ -571,38 +663,16 @@ class ProjectViewSet(viewsets.ModelViewSet):
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     parser_classes = [JSONParser, MultiPartParser, FormParser]
+    read_from_replica = {"list", "retrieve", "job_postings"}
 
     @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated], url_path="mine")
     def mine(self, request):
-        qs = (
-            Project.objects.select_related("owner").prefetch_related("invites")
-            .annotate(
-                bid_count=Count("bids", distinct=True),
-                accepted_bid_count=Count(
-                    "bids",
-                    filter=Q(bids__status=Bid.STATUS_ACCEPTED),
-                    distinct=True,
-                ),
-            )
-            .filter(owner=request.user)
-            .order_by("-updated_at")
-        )
+        qs = with_project_card_data(Project.objects.filter(owner=request.user), request.user).order_by("-updated_at")
         ser = self.get_serializer(qs, many=True, context={"request": request})
         return Response(ser.data)
 
     def get_queryset(self):
-        qs = (
-            Project.objects.select_related("owner").prefetch_related("invites")
-            .annotate(
-                bid_count=Count("bids", distinct=True),
-                accepted_bid_count=Count(
-                    "bids",
-                    filter=Q(bids__status=Bid.STATUS_ACCEPTED),
-                    distinct=True,
-                ),
-            )
-            .all()
-        )
+        qs = with_project_card_data(Project.objects.all(), self.request.user)
         request = self.request
         owner_username = (request.query_params.get("owner") or "").strip()
 
@@ -617,20 +687,70 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         serializer.save(owner=self.request.user)
 
+    def retrieve(self, request, *args, **kwargs):
+        project = self.get_object()
+        etag, last_modified = self._validators(request, project)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(project)
+        return set_validators(Response(serializer.data), etag, last_modified)
+
+    def _validators(self, request, project):
+        viewer = viewer_marker(request)
+        # The serializer renders the whole gallery and image rows have no
+        # updated_at, so every rendered field is a marker. Images are
+        # prefetched by the queryset; video progress lives in extra_data.
+        images = sorted(
+            (
+                image.id,
+                image.image.name,
+                image.media_type,
+                image.thumbnail.name if image.thumbnail else "",
+                image.processing_status,
+                image.caption,
+                image.alt_text,
+                json.dumps(image.extra_data, sort_keys=True, default=str),
+                image.order,
+                image.created_at,
+            )
+            for image in project.images.all()
+        )
+        likes = ProjectLike.objects.filter(project=project).aggregate(
+            total=Count("id"),
+            mine=Count("id", filter=Q(user_id=viewer)),
+        )
+        saved = viewer is not None and ProjectFavorite.objects.filter(project=project, user_id=viewer).exists()
+        # Invites are prefetched by the queryset; bid counts are annotated.
+        invites = sorted((invite.id, invite.contractor_id, invite.status) for invite in project.invites.all())
+        etag = weak_etag(
+            "project",
+            project.pk,
+            project.updated_at,
+            viewer,
+            getattr(project, "bid_count", None),
+            getattr(project, "accepted_bid_count", None),
+            invites,
+            [image[:-1] for image in images],
+            likes["total"],
+            likes["mine"],
+            saved,
+        )
+        return etag, latest_timestamp(
+            project.updated_at,
+            *(image[-1] for image in images),
+            *(invite.created_at for invite in project.invites.all()),
+        )
+
     def destroy(self, request, *args, **kwargs):
         project = self.get_object()
         if project.owner != request.user:
             raise PermissionDenied("You do not have permission to delete this project.")
 
-        with transaction.atomic():
-            imgs = ProjectImage.objects.filter(project=project)
-            for img in imgs:
-                try:
-                    if img.image:
-                        img.image.delete(save=False)
-                except Exception:
-                    pass
-            imgs.delete()
+        # Rows go in one short transaction; the image files are queued and
+        # removed in batches after commit (see portfolio/media_cleanup.py).
+        with transaction.atomic(), defer_file_deletion():
+            ProjectImage.objects.filter(project=project).delete()
 
             ProjectComment.objects.filter(project=project).delete()
             ProjectFavorite.objects.filter(project=project).delete()
@@ -655,11 +775,12 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
         if request.method.lower() == "get":
             qs = list(project.images.order_by("order", "id"))
+            present = present_media_names(getattr(img.image, "name", "") for img in qs)
             existing = []
             missing = []
             for img in qs:
                 name = getattr(img.image, "name", "")
-                if name and default_storage.exists(name):
+                if name and name in present:
                     existing.append(img)
                 else:
                     missing.append(img.id)
@@ -697,6 +818,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
             and not str(getattr(f, "name", "")).lower().endswith(SUPPORTED_PROJECT_IMAGE_EXTENSIONS)
         ]
         if unsupported:
+            metrics.UPLOADS.inc(len(unsupported), path="multipart", outcome="rejected")
             return Response(
                 {
                     "detail": (
@@ -729,7 +851,16 @@ class ProjectViewSet(viewsets.ModelViewSet):
                     order=base_order + idx,
                 )
                 created.append(img)
+                metrics.UPLOADS.inc(path="multipart", outcome="ok")
+                metrics.UPLOAD_BYTES.inc(getattr(f, "size", 0) or 0, path="multipart")
+        except ImageTooLargeError as exc:
+            metrics.UPLOADS.inc(len(files) - len(created), path="multipart", outcome="rejected")
+            return Response(
+                {"detail": f"{getattr(f, 'name', 'Selected file')}: {exc}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as exc:
+            metrics.UPLOADS.inc(len(files) - len(created), path="multipart", outcome="failed")
             logger.exception(
                 "Project image upload failed for project_id=%s user_id=%s file_count=%s",
                 project.id,
@@ -744,6 +875,211 @@ class ProjectViewSet(viewsets.ModelViewSet):
         ser = ProjectImageSerializer(created, many=True, context={"request": request})
         return Response(ser.data, status=status.HTTP_201_CREATED)
 
+    def _validate_upload_request(self, request, max_bytes):
+        filename = str(request.data.get("filename") or "").strip()[:255]
+        content_type = str(request.data.get("content_type") or "").strip().lower()
+        if (
+            content_type not in SUPPORTED_PROJECT_IMAGE_CONTENT_TYPES
+            and not filename.lower().endswith(SUPPORTED_PROJECT_IMAGE_EXTENSIONS)
+        ):
+            raise ValidationError(
+                {"content_type": "Unsupported image format. Please use JPG, PNG, WebP, MP4, MOV, or WebM."}
+            )
+        try:
+            size = int(request.data.get("size") or 0)
+        except (TypeError, ValueError):
+            size = 0
+        if size <= 0 or (max_bytes and size > max_bytes):
+            raise ValidationError({"size": f"File size must be between 1 byte and {max_bytes} bytes."})
+        return filename, content_type, size
+
+    @action(detail=True, methods=["post"], url_path="direct-uploads")
+    def direct_uploads(self, request, pk=None):
+        project = self.get_object()
+        if project.owner != request.user:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        if not direct_uploads_enabled():
+            return Response(
+                {"detail": "Direct uploads are not enabled. Upload through the images endpoint instead."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        filename, content_type, size = self._validate_upload_request(
+            request, int(getattr(settings, "DIRECT_UPLOAD_MAX_BYTES", 0) or 0)
+        )
+        upload = DirectUpload.objects.create(
+            owner=request.user,
+            project=project,
+            object_key=new_object_key(request.user.id, filename),
+            filename=filename,
+            content_type=content_type,
+            expected_size=size,
+            caption=str(request.data.get("caption") or "")[:255],
+        )
+        expires_in = int(getattr(settings, "DIRECT_UPLOAD_URL_EXPIRY_SECONDS", 900))
+        headers = {"Content-Type": content_type} if content_type else {}
+        return Response(
+            {
+                "upload": DirectUploadSerializer(upload, context={"request": request}).data,
+                "url": presign_url("PUT", upload.object_key, expires_in=expires_in, content_type=content_type),
+                "method": "PUT",
+                "headers": headers,
+                "expires_in": expires_in,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    def _get_direct_upload(self, request, project, upload_id):
+        if project.owner != request.user:
+            raise PermissionDenied("Only the project owner can manage uploads.")
+        try:
+            return DirectUpload.objects.select_related("project_image").get(id=upload_id, project=project)
+        except (DirectUpload.DoesNotExist, DjangoValidationError):
+            return None
+
+    @action(detail=True, methods=["get"], url_path="direct-uploads/(?P<upload_id>[^/.]+)")
+    def direct_upload_detail(self, request, pk=None, upload_id=None):
+        upload = self._get_direct_upload(request, self.get_object(), upload_id)
+        if upload is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(DirectUploadSerializer(upload, context={"request": request}).data)
+
+    @action(detail=True, methods=["post"], url_path="direct-uploads/(?P<upload_id>[^/.]+)/finalize")
+    def finalize_direct_upload(self, request, pk=None, upload_id=None):
+        upload = self._get_direct_upload(request, self.get_object(), upload_id)
+        if upload is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if upload.status != DirectUpload.STATUS_PENDING:
+            return Response(
+                DirectUploadSerializer(upload, context={"request": request}).data,
+                status=status.HTTP_200_OK,
+            )
+
+        try:
+            found = head_object(upload.object_key)
+        except DirectUploadError as exc:
+            logger.warning("Direct upload finalize failed upload_id=%s error=%s", upload.id, exc)
+            return Response(
+                {"detail": "Upload storage is unavailable. Try again shortly."},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+        if found is None:
+            return Response(
+                {"detail": "The file has not been uploaded yet."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        size, _ = found
+        if size != upload.expected_size:
+            return Response(
+                {"detail": f"Uploaded size {size} does not match the expected {upload.expected_size} bytes."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            updated = DirectUpload.objects.filter(pk=upload.pk, status=DirectUpload.STATUS_PENDING).update(
+                status=DirectUpload.STATUS_UPLOADED
+            )
+            if updated:
+                queue_direct_upload_processing(upload.pk)
+        upload.refresh_from_db()
+        return Response(
+            DirectUploadSerializer(upload, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=True, methods=["post"], url_path="upload-sessions")
+    def upload_sessions(self, request, pk=None):
+        project = self.get_object()
+        if project.owner != request.user:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        filename, content_type, size = self._validate_upload_request(
+            request, int(getattr(settings, "CHUNKED_UPLOAD_MAX_BYTES", 0) or 0)
+        )
+        session = ChunkedUpload.objects.create(
+            owner=request.user,
+            project=project,
+            filename=filename,
+            content_type=content_type,
+            total_size=size,
+            caption=str(request.data.get("caption") or "")[:255],
+        )
+        data = ChunkedUploadSerializer(session, context={"request": request}).data
+        data["max_chunk_bytes"] = int(getattr(settings, "CHUNKED_UPLOAD_MAX_CHUNK_BYTES", 16 * 1024 * 1024))
+        data["min_chunk_bytes"] = int(getattr(settings, "CHUNKED_UPLOAD_MIN_CHUNK_BYTES", 1024 * 1024))
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def _get_upload_session(self, request, project, session_id):
+        if project.owner != request.user:
+            raise PermissionDenied("Only the project owner can manage uploads.")
+        try:
+            return ChunkedUpload.objects.get(id=session_id, project=project)
+        except (ChunkedUpload.DoesNotExist, DjangoValidationError):
+            return None
+
+    def _upload_session_error(self, exc):
+        if isinstance(exc, ChunkOffsetError):
+            return Response({"detail": str(exc), "offset": exc.offset}, status=status.HTTP_409_CONFLICT)
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=True, methods=["get", "put", "delete"], url_path="upload-sessions/(?P<session_id>[^/.]+)")
+    def upload_session_detail(self, request, pk=None, session_id=None):
+        session = self._get_upload_session(request, self.get_object(), session_id)
+        if session is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        method = request.method.lower()
+        if method == "delete":
+            if session.status == ChunkedUpload.STATUS_OPEN:
+                session.status = ChunkedUpload.STATUS_CANCELLED
+                session.save(update_fields=["status", "updated_at"])
+                discard_session_file(session)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        if method == "put":
+            try:
+                start, end, total = parse_content_range(request.headers.get("Content-Range"))
+                session = write_chunk(
+                    session,
+                    start=start,
+                    end=end,
+                    total=total,
+                    stream=request.stream,
+                    checksum=request.headers.get("X-Chunk-SHA256"),
+                )
+            except ChunkedUploadError as exc:
+                return self._upload_session_error(exc)
+
+        return Response(ChunkedUploadSerializer(session, context={"request": request}).data)
+
+    @action(detail=True, methods=["post"], url_path="upload-sessions/(?P<session_id>[^/.]+)/complete")
+    def complete_upload_session(self, request, pk=None, session_id=None):
+        session = self._get_upload_session(request, self.get_object(), session_id)
+        if session is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        try:
+            session = complete_upload(session, checksum=request.data.get("sha256"))
+        except ChunkedUploadError as exc:
+            metrics.UPLOADS.inc(path="chunked", outcome="rejected")
+            return self._upload_session_error(exc)
+        except Exception as exc:
+            metrics.UPLOADS.inc(path="chunked", outcome="failed")
+            logger.exception(
+                "Chunked upload completion failed for project_id=%s session_id=%s",
+                session.project_id,
+                session.id,
+            )
+            detail = "Could not upload media. Try a JPG, PNG, WebP, MP4, MOV, or WebM file."
+            if settings.DEBUG:
+                detail = f"{detail} ({exc})"
+            return Response({"detail": detail}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        metrics.UPLOADS.inc(path="chunked", outcome="ok")
+        metrics.UPLOAD_BYTES.inc(session.total_size, path="chunked")
+        return Response(
+            ChunkedUploadSerializer(session, context={"request": request}).data,
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=True, methods=["patch", "delete"], url_path="images/(?P<img_id>[^/.]+)")
     def image_detail(self, request, pk=None, img_id=None):
         project = self.get_object()
@@ -809,7 +1145,58 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return Response(ser.data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["post"], url_path="images/(?P<img_id>[^/.]+)/sketch-to-rough-plan")
-    def image_sketch_to_rough_plan(self, request, pk=None, img_id=None):
+    async def image_sketch_to_rough_plan(self, request, pk=None, img_id=None):
+        prepared = await database_sync_to_async(self._prepare_image_sketch_to_rough_plan)(request, img_id)
+        if isinstance(prepared, Response):
+            return prepared
+        feature, daily_limit, image_bytes, content_type, system_prompt, user_prompt = prepared
+        model_name = ""
+        try:
+            result = await agenerate_text_with_image(
+                feature=feature,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                image_bytes=image_bytes,
+                image_content_type=content_type,
+            )
+            model_name = result["model"]
+            payload = parse_ai_json(result["text"])
+            rough_plan = normalize_sketch_rough_plan_payload(payload)
+            annotations = normalize_sketch_annotations_payload(payload)
+            uncertainty_notes = self._clean_string_list(payload.get("uncertainty_notes") if isinstance(payload, dict) else [])
+        except (AIServiceError, ValueError, TypeError, json.JSONDecodeError) as exc:
+            await database_sync_to_async(record_ai_usage_event)(
+                user=request.user,
+                feature=feature,
+                model_name=model_name,
+                status_value=AIUsageEvent.Status.ERROR,
+                prompt_chars=len(system_prompt) + len(user_prompt),
+                response_chars=0,
+            )
+            return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
+
+        await database_sync_to_async(record_ai_usage_event)(
+            user=request.user,
+            feature=feature,
+            model_name=model_name,
+            status_value=AIUsageEvent.Status.SUCCESS,
+            prompt_chars=len(system_prompt) + len(user_prompt),
+            response_chars=len(result["text"]),
+            usage=result.get("usage"),
+        )
+        remaining_after, _ = await database_sync_to_async(get_ai_remaining_today)(request.user)
+        return Response(
+            {
+                "rough_plan": rough_plan,
+                "annotations": annotations,
+                "uncertainty_notes": uncertainty_notes,
+                "remaining_today": remaining_after,
+                "daily_limit": daily_limit,
+                "model": model_name,
+            }
+        )
+
+    def _prepare_image_sketch_to_rough_plan(self, request, img_id):
         project = self.get_object()
         try:
             source_image = ProjectImage.objects.get(id=img_id, project=project)
@@ -902,54 +1289,38 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 "Use strokeWidth 1 where possible so the overlay matches floor-plan line weight. "
                 "Coordinates should match the supplied image layout closely in the full canvas, preserving the plan proportions and relative positions."
             )
-        model_name = ""
+        return feature, daily_limit, image_bytes, content_type, system_prompt, user_prompt
+
+    @action(detail=True, methods=["post"], url_path="images/(?P<img_id>[^/.]+)/sketch-to-clean-floor-plan")
+    async def image_sketch_to_clean_floor_plan(self, request, pk=None, img_id=None):
+        prepared = await database_sync_to_async(self._prepare_image_sketch_to_clean_floor_plan)(request, img_id)
+        if isinstance(prepared, Response):
+            return prepared
+        project, source_image, feature, daily_limit, image_bytes, content_type, image_name, prompt = prepared
         try:
-            result = generate_text_with_image(
+            result = await agenerate_image_from_image(
                 feature=feature,
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
+                prompt=prompt,
                 image_bytes=image_bytes,
                 image_content_type=content_type,
+                image_name=image_name,
             )
-            model_name = result["model"]
-            payload = parse_ai_json(result["text"])
-            rough_plan = normalize_sketch_rough_plan_payload(payload)
-            annotations = normalize_sketch_annotations_payload(payload)
-            uncertainty_notes = self._clean_string_list(payload.get("uncertainty_notes") if isinstance(payload, dict) else [])
-            record_ai_usage_event(
-                user=request.user,
-                feature=feature,
-                model_name=model_name,
-                status_value=AIUsageEvent.Status.SUCCESS,
-                prompt_chars=len(system_prompt) + len(user_prompt),
-                response_chars=len(result["text"]),
-                usage=result.get("usage"),
-            )
-        except (AIServiceError, ValueError, TypeError, json.JSONDecodeError) as exc:
-            record_ai_usage_event(
+        except AIServiceError as exc:
+            await database_sync_to_async(record_ai_usage_event)(
                 user=request.user,
                 feature=feature,
-                model_name=model_name,
+                model_name="",
                 status_value=AIUsageEvent.Status.ERROR,
-                prompt_chars=len(system_prompt) + len(user_prompt),
+                prompt_chars=len(prompt),
                 response_chars=0,
             )
             return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
 
-        remaining_after, _ = get_ai_remaining_today(request.user)
-        return Response(
-            {
-                "rough_plan": rough_plan,
-                "annotations": annotations,
-                "uncertainty_notes": uncertainty_notes,
-                "remaining_today": remaining_after,
-                "daily_limit": daily_limit,
-                "model": model_name,
-            }
+        return await database_sync_to_async(self._save_image_clean_floor_plan)(
+            request, project, source_image, image_name, feature, daily_limit, prompt, result
         )
 
-    @action(detail=True, methods=["post"], url_path="images/(?P<img_id>[^/.]+)/sketch-to-clean-floor-plan")
-    def image_sketch_to_clean_floor_plan(self, request, pk=None, img_id=None):
+    def _prepare_image_sketch_to_clean_floor_plan(self, request, img_id):
         project = self.get_object()
         try:
             source_image = ProjectImage.objects.get(id=img_id, project=project)
@@ -1002,49 +1373,32 @@ class ProjectViewSet(viewsets.ModelViewSet):
             length=request.data.get("length") or "",
             unit=request.data.get("unit") or "ft",
         )
-        model_name = ""
-        try:
-            result = generate_image_from_image(
-                feature=feature,
-                prompt=prompt,
-                image_bytes=image_bytes,
-                image_content_type=content_type,
-                image_name=image_name,
-            )
-            model_name = result["model"]
-            generated = ProjectImage.objects.create(
-                project=project,
-                image=ContentFile(result["image_bytes"], name=f"clean-floor-plan-{timezone.now().strftime('%Y%m%d%H%M%S')}.png"),
-                media_type=ProjectImage.MEDIA_TYPE_IMAGE,
-                caption="clean-floor-plan",
-                order=project.images.count(),
-                extra_data={
-                    "source": "ai_clean_floor_plan",
-                    "source_project_image_id": source_image.id,
-                    "source_image_name": image_name,
-                    "ai_model": model_name,
-                },
-            )
-            record_ai_usage_event(
-                user=request.user,
-                feature=feature,
-                model_name=model_name,
-                status_value=AIUsageEvent.Status.SUCCESS,
-                prompt_chars=len(prompt),
-                response_chars=0,
-                usage=result.get("usage"),
-            )
-        except AIServiceError as exc:
-            record_ai_usage_event(
-                user=request.user,
-                feature=feature,
-                model_name=model_name,
-                status_value=AIUsageEvent.Status.ERROR,
-                prompt_chars=len(prompt),
-                response_chars=0,
-            )
-            return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
+        return project, source_image, feature, daily_limit, image_bytes, content_type, image_name, prompt
 
+    def _save_image_clean_floor_plan(self, request, project, source_image, image_name, feature, daily_limit, prompt, result):
+        model_name = result["model"]
+        generated = ProjectImage.objects.create(
+            project=project,
+            image=ContentFile(result["image_bytes"], name=f"clean-floor-plan-{timezone.now().strftime('%Y%m%d%H%M%S')}.png"),
+            media_type=ProjectImage.MEDIA_TYPE_IMAGE,
+            caption="clean-floor-plan",
+            order=project.images.count(),
+            extra_data={
+                "source": "ai_clean_floor_plan",
+                "source_project_image_id": source_image.id,
+                "source_image_name": image_name,
+                "ai_model": model_name,
+            },
+        )
+        record_ai_usage_event(
+            user=request.user,
+            feature=feature,
+            model_name=model_name,
+            status_value=AIUsageEvent.Status.SUCCESS,
+            prompt_chars=len(prompt),
+            response_chars=0,
+            usage=result.get("usage"),
+        )
         remaining_after, _ = get_ai_remaining_today(request.user)
         return Response(
             {
@@ -1142,20 +1496,27 @@ class ProjectViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.AllowAny],
     )
     def job_postings(self, request):
-        qs = (
-            Project.objects.select_related("owner")
-            .filter(
+        return cached_anonymous_response(
+            request,
+            "job-postings",
+            lambda: self._build_job_postings(request),
+            params=("lat", "lng", "location_lat", "location_lng"),
+        )
+
+    def _build_job_postings(self, request):
+        qs = with_project_card_data(
+            Project.objects.filter(
                 is_job_posting=True,
                 is_public=True,
                 is_private=False,
                 post_privacy="public",
-            )
-            .order_by("-updated_at")
-        )
+            ),
+            request.user,
+        ).order_by("-updated_at")
         origin = get_request_origin(request)
         distance_lookup = {}
+        projects = list(qs.select_related("owner__profile")) if origin else list(qs)
         if origin:
-            projects = list(qs.select_related("owner__profile"))
             fallback_order = {project.pk: index for index, project in enumerate(projects)}
             projects, distance_lookup = sort_by_distance(
                 projects,
@@ -1164,23 +1525,25 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 lambda project: getattr(getattr(project.owner, "profile", None), "service_lng", None),
                 lambda project: fallback_order.get(project.pk, 0),
             )
-            qs = projects
         ser = self.get_serializer(
-            qs,
+            projects,
             many=True,
             context={"request": request, "distance_lookup": distance_lookup},
         )
-        return Response(ser.data)
+        tags = [JOB_POSTINGS_TAG]
+        for project in projects:
+            tags += [project_tag(project.pk), profile_tag(project.owner_id)]
+        return Response(ser.data), tags
 
 
-class ProjectPlanViewSet(viewsets.ModelViewSet):
+class ProjectPlanViewSet(AsyncAPIViewMixin, viewsets.ModelViewSet):
     serializer_class = ProjectPlanSerializer
     permission_classes = [IsAuthenticated]
     parser_classes = [JSONParser, MultiPartParser, FormParser]
 
     def get_queryset(self):
         require_homeowner_profile(self.request.user)
-        qs = ProjectPlan.objects.filter(owner=self.request.user).prefetch_related("images")
+        qs = ProjectPlan.objects.filter(owner=self.request.user).select_related("owner").prefetch_related("images")
         scope = (self.request.query_params.get("scope") or "").strip().lower()
         if scope == "active":
             qs = qs.filter(
@@ -1218,6 +1581,32 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
         ctx.update(self._serializer_context())
         return ctx
 
+    def retrieve(self, request, *args, **kwargs):
+        plan = self.get_object()
+        extra_context = self._serializer_context()
+        # Images are prefetched by get_queryset, so the markers cost no queries.
+        images = sorted(
+            (image.id, image.image.name, image.caption, image.order, image.is_cover, image.created_at)
+            for image in plan.images.all()
+        )
+        etag = weak_etag(
+            "project-plan",
+            plan.pk,
+            plan.updated_at,
+            viewer_marker(request),
+            [image[:5] for image in images],
+            extra_context["active_plan_count"],
+            extra_context["ai_remaining_today"],
+            extra_context["ai_daily_limit"],
+        )
+        last_modified = latest_timestamp(plan.updated_at, *(image[5] for image in images))
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        context = {"request": request, "format": self.format_kwarg, "view": self, **extra_context}
+        serializer = self.get_serializer_class()(plan, context=context)
+        return set_validators(Response(serializer.data), etag, last_modified)
+
     def _sync_plan_derived_fields(self, plan, *, save=True):
         template = get_project_intake_template(plan.project_type)
         guided_answers = dict(plan.guided_answers_json or {})
@@ -1318,15 +1707,17 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
         base_order = plan.images.count()
         for idx, image_file in enumerate(files):
             caption = captions[idx] if idx < len(captions) else ""
-            created.append(
-                ProjectPlanImage.objects.create(
+            try:
+                image = ProjectPlanImage.objects.create(
                     project_plan=plan,
                     image=image_file,
                     caption=caption,
                     order=base_order + idx,
                     is_cover=(base_order + idx == 0 and not plan.images.filter(is_cover=True).exists()),
                 )
-            )
+            except ImageTooLargeError as exc:
+                raise ValidationError({"images": [f"{getattr(image_file, 'name', 'Selected file')}: {exc}"]})
+            created.append(image)
         self._sync_plan_derived_fields(plan)
         return Response(
             ProjectPlanImageSerializer(created, many=True, context={"request": request}).data,
@@ -1379,7 +1770,32 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
         return Response(ProjectPlanImageSerializer(image, context={"request": request}).data)
 
     @action(detail=True, methods=["post"], url_path="sketch-to-clean-floor-plan")
-    def sketch_to_clean_floor_plan(self, request, pk=None):
+    async def sketch_to_clean_floor_plan(self, request, pk=None):
+        plan, feature, daily_limit, image_bytes, content_type, image_name, prompt = await database_sync_to_async(
+            self._prepare_sketch_to_clean_floor_plan
+        )(request)
+        try:
+            result = await agenerate_image_from_image(
+                feature=feature,
+                prompt=prompt,
+                image_bytes=image_bytes,
+                image_content_type=content_type,
+                image_name=image_name,
+            )
+        except AIServiceError as exc:
+            await database_sync_to_async(self._record_ai_event)(
+                user=request.user,
+                feature=feature,
+                model_name="",
+                prompt_chars=len(prompt),
+                response_chars=0,
+                status_value=AIUsageEvent.Status.ERROR,
+            )
+            return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
+
+        return await database_sync_to_async(self._save_clean_floor_plan)(request, plan, feature, daily_limit, prompt, result)
+
+    def _prepare_sketch_to_clean_floor_plan(self, request):
         plan = self.get_object()
         feature = AIUsageEvent.Feature.PLANNER_DRAFT
         _, _, daily_limit, _ = ensure_planner_ai_allowed(request.user, feature)
@@ -1426,43 +1842,26 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
             length=request.data.get("length") or "",
             unit=request.data.get("unit") or "ft",
         )
-        model_name = ""
-        try:
-            result = generate_image_from_image(
-                feature=feature,
-                prompt=prompt,
-                image_bytes=image_bytes,
-                image_content_type=content_type,
-                image_name=image_name,
-            )
-            model_name = result["model"]
-            generated = ProjectPlanImage.objects.create(
-                project_plan=plan,
-                image=ContentFile(result["image_bytes"], name=f"clean-floor-plan-{timezone.now().strftime('%Y%m%d%H%M%S')}.png"),
-                caption="clean-floor-plan",
-                order=plan.images.count(),
-                is_cover=not plan.images.filter(is_cover=True).exists(),
-            )
-            record_ai_usage_event(
-                user=request.user,
-                feature=feature,
-                model_name=model_name,
-                status_value=AIUsageEvent.Status.SUCCESS,
-                prompt_chars=len(prompt),
-                response_chars=0,
-                usage=result.get("usage"),
-            )
-        except AIServiceError as exc:
-            record_ai_usage_event(
-                user=request.user,
-                feature=feature,
-                model_name=model_name,
-                status_value=AIUsageEvent.Status.ERROR,
-                prompt_chars=len(prompt),
-                response_chars=0,
-            )
-            return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
-
+        return plan, feature, daily_limit, image_bytes, content_type, image_name, prompt
+
+    def _save_clean_floor_plan(self, request, plan, feature, daily_limit, prompt, result):
+        model_name = result["model"]
+        generated = ProjectPlanImage.objects.create(
+            project_plan=plan,
+            image=ContentFile(result["image_bytes"], name=f"clean-floor-plan-{timezone.now().strftime('%Y%m%d%H%M%S')}.png"),
+            caption="clean-floor-plan",
+            order=plan.images.count(),
+            is_cover=not plan.images.filter(is_cover=True).exists(),
+        )
+        self._record_ai_event(
+            user=request.user,
+            feature=feature,
+            model_name=model_name,
+            prompt_chars=len(prompt),
+            response_chars=0,
+            status_value=AIUsageEvent.Status.SUCCESS,
+            usage=result.get("usage"),
+        )
         remaining_after, _ = get_ai_remaining_today(request.user)
         self._sync_plan_derived_fields(plan)
         return Response(
@@ -1516,7 +1915,61 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
         )
 
     @action(detail=True, methods=["post"], url_path="sketch-to-rough-plan")
-    def sketch_to_rough_plan(self, request, pk=None):
+    async def sketch_to_rough_plan(self, request, pk=None):
+        feature, daily_limit, image_bytes, content_type, system_prompt, user_prompt = await database_sync_to_async(
+            self._prepare_sketch_to_rough_plan
+        )(request)
+        model_name = ""
+        result = None
+        try:
+            result = await agenerate_text_with_image(
+                feature=feature,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                image_bytes=image_bytes,
+                image_content_type=content_type,
+                use_cache=True,
+            )
+            model_name = result["model"]
+            payload = parse_ai_json(result["text"])
+            rough_plan = normalize_sketch_rough_plan_payload(payload)
+            annotations = normalize_sketch_annotations_payload(payload)
+            uncertainty_notes = self._clean_string_list(payload.get("uncertainty_notes") if isinstance(payload, dict) else [])
+        except (AIServiceError, ValueError, TypeError, json.JSONDecodeError) as exc:
+            if result:
+                evict_ai_response(result.get("cache_key"))
+            await database_sync_to_async(self._record_ai_event)(
+                user=request.user,
+                feature=feature,
+                model_name=model_name,
+                prompt_chars=len(system_prompt) + len(user_prompt),
+                response_chars=0,
+                status_value=AIUsageEvent.Status.ERROR,
+            )
+            return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
+
+        await database_sync_to_async(self._record_ai_event)(
+            user=request.user,
+            feature=feature,
+            model_name=model_name,
+            prompt_chars=len(system_prompt) + len(user_prompt),
+            response_chars=len(result["text"]),
+            status_value=AIUsageEvent.Status.CACHED if result.get("cached") else AIUsageEvent.Status.SUCCESS,
+            usage=result.get("usage"),
+        )
+        remaining_after, _ = await database_sync_to_async(get_ai_remaining_today)(request.user)
+        return Response(
+            {
+                "rough_plan": rough_plan,
+                "annotations": annotations,
+                "uncertainty_notes": uncertainty_notes,
+                "remaining_today": remaining_after,
+                "daily_limit": daily_limit,
+                "model": model_name,
+            }
+        )
+
+    def _prepare_sketch_to_rough_plan(self, request):
         plan = self.get_object()
         feature = AIUsageEvent.Feature.PLANNER_DRAFT
         _, _, daily_limit, _ = ensure_planner_ai_allowed(request.user, feature)
@@ -1570,54 +2023,48 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
                 "Use strokeWidth 1 where possible so the overlay matches floor-plan line weight. "
                 "Coordinates should match the supplied image layout closely in the full canvas, preserving the plan proportions and relative positions."
             )
-        model_name = ""
+        return feature, daily_limit, sketch.read(), content_type, system_prompt, user_prompt
+
+    @action(detail=True, methods=["post"], url_path="ai")
+    async def ai(self, request, pk=None):
+        plan, action_name, feature, daily_limit, system_prompt, user_prompt = await database_sync_to_async(
+            self._prepare_ai_action
+        )(request)
+        if wants_event_stream(request):
+            return event_stream_response(
+                request,
+                self._stream_ai_events(request, plan, action_name, feature, daily_limit, system_prompt, user_prompt),
+            )
+
+        result = None
         try:
-            result = generate_text_with_image(
+            result = await agenerate_text(
                 feature=feature,
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
-                image_bytes=sketch.read(),
-                image_content_type=content_type,
+                use_cache=True,
             )
-            model_name = result["model"]
             payload = parse_ai_json(result["text"])
-            rough_plan = normalize_sketch_rough_plan_payload(payload)
-            annotations = normalize_sketch_annotations_payload(payload)
-            uncertainty_notes = self._clean_string_list(payload.get("uncertainty_notes") if isinstance(payload, dict) else [])
-            self._record_ai_event(
-                user=request.user,
-                feature=feature,
-                model_name=model_name,
-                prompt_chars=len(system_prompt) + len(user_prompt),
-                response_chars=len(result["text"]),
-                status_value=AIUsageEvent.Status.SUCCESS,
-                usage=result.get("usage"),
-            )
         except (AIServiceError, ValueError, TypeError, json.JSONDecodeError) as exc:
-            self._record_ai_event(
+            if result:
+                evict_ai_response(result.get("cache_key"))
+            await database_sync_to_async(self._record_ai_event)(
                 user=request.user,
                 feature=feature,
-                model_name=model_name,
+                model_name="",
                 prompt_chars=len(system_prompt) + len(user_prompt),
                 response_chars=0,
                 status_value=AIUsageEvent.Status.ERROR,
             )
             return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
 
-        remaining_after, _ = get_ai_remaining_today(request.user)
         return Response(
-            {
-                "rough_plan": rough_plan,
-                "annotations": annotations,
-                "uncertainty_notes": uncertainty_notes,
-                "remaining_today": remaining_after,
-                "daily_limit": daily_limit,
-                "model": model_name,
-            }
+            await database_sync_to_async(self._finish_ai_action)(
+                request, plan, action_name, feature, daily_limit, system_prompt, user_prompt, result, payload
+            )
         )
 
-    @action(detail=True, methods=["post"], url_path="ai")
-    def ai(self, request, pk=None):
+    def _prepare_ai_action(self, request):
         plan = self.get_object()
         action_name = str(request.data.get("action") or "").strip()
         if action_name not in ("analyze_issue", "suggest_solution_paths", "generate_contractor_ready_project"):
@@ -1652,13 +2099,34 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
                 "Do not estimate labor cost. If mentioning material cost, keep it general and say prices vary by location, quality, and availability."
             )
 
-        user_prompt = self._build_plan_text(plan)
+        return plan, action_name, feature, daily_limit, system_prompt, self._build_plan_text(plan)
+
+    def _finish_ai_action(self, request, plan, action_name, feature, daily_limit, system_prompt, user_prompt, result, payload):
+        self._record_ai_event(
+            user=request.user,
+            feature=feature,
+            model_name=result["model"],
+            prompt_chars=len(system_prompt) + len(user_prompt),
+            response_chars=len(result["text"]),
+            status_value=AIUsageEvent.Status.CACHED if result.get("cached") else AIUsageEvent.Status.SUCCESS,
+            usage=result.get("usage"),
+        )
+        remaining_after, _ = get_ai_remaining_today(request.user)
+        return self._ai_action_result(plan, action_name, payload, remaining_after, daily_limit)
+
+    def _stream_ai_events(self, request, plan, action_name, feature, daily_limit, system_prompt, user_prompt):
+        result = None
         try:
-            result = generate_text(
+            for chunk in stream_text(
                 feature=feature,
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
-            )
+                use_cache=True,
+            ):
+                if chunk["type"] == "delta":
+                    yield sse_event("delta", {"text": chunk["text"]})
+                else:
+                    result = chunk
             payload = parse_ai_json(result["text"])
             self._record_ai_event(
                 user=request.user,
@@ -1666,10 +2134,12 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
                 model_name=result["model"],
                 prompt_chars=len(system_prompt) + len(user_prompt),
                 response_chars=len(result["text"]),
-                status_value=AIUsageEvent.Status.SUCCESS,
+                status_value=AIUsageEvent.Status.CACHED if result.get("cached") else AIUsageEvent.Status.SUCCESS,
                 usage=result.get("usage"),
             )
         except (AIServiceError, ValueError, TypeError, json.JSONDecodeError) as exc:
+            if result:
+                evict_ai_response(result.get("cache_key"))
             self._record_ai_event(
                 user=request.user,
                 feature=feature,
@@ -1678,17 +2148,19 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
                 response_chars=0,
                 status_value=AIUsageEvent.Status.ERROR,
             )
-            return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
+            yield sse_event("error", {"detail": str(exc)})
+            return
 
         remaining_after, _ = get_ai_remaining_today(request.user)
+        yield sse_event("done", self._ai_action_result(plan, action_name, payload, remaining_after, daily_limit))
+
+    def _ai_action_result(self, plan, action_name, payload, remaining_after, daily_limit):
         if action_name == "analyze_issue":
-            return Response(
-                {
-                    "analysis": payload,
-                    "remaining_today": remaining_after,
-                    "daily_limit": daily_limit,
-                }
-            )
+            return {
+                "analysis": payload,
+                "remaining_today": remaining_after,
+                "daily_limit": daily_limit,
+            }
         if action_name == "generate_contractor_ready_project":
             normalized = {
                 "project_title": str(payload.get("project_title") or plan.title or "").strip(),
@@ -1734,20 +2206,16 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
                     "updated_at",
                 ]
             )
-            return Response(
-                {
-                    "contractor_ready_project": normalized,
-                    "remaining_today": remaining_after,
-                    "daily_limit": daily_limit,
-                }
-            )
-        return Response(
-            {
-                "options": payload.get("options") or [],
+            return {
+                "contractor_ready_project": normalized,
                 "remaining_today": remaining_after,
                 "daily_limit": daily_limit,
             }
-        )
+        return {
+            "options": payload.get("options") or [],
+            "remaining_today": remaining_after,
+            "daily_limit": daily_limit,
+        }
 
     def _clean_string_list(self, values):
         cleaned = []
@@ -1841,59 +2309,28 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
         }
 
     @action(detail=True, methods=["post"], url_path="convert-to-draft")
-    def convert_to_draft(self, request, pk=None):
-        plan = self.get_object()
-        title_or_summary = bool((plan.title or "").strip() or (plan.issue_summary or "").strip())
-        note_or_image = bool((plan.notes or "").strip() or plan.images.exists())
-        if not title_or_summary or not note_or_image:
-            raise ValidationError(
-                {
-                    "detail": "Add a title or issue summary and at least one note or image before generating a draft."
-                }
-            )
-
-        force_regenerate = bool(request.data.get("force_regenerate"))
-        use_ai = bool(request.data.get("use_ai"))
-        if plan.converted_job_post_id and not force_regenerate:
-            raise ValidationError(
-                {
-                    "detail": "This plan already generated a draft job post.",
-                    "draft_id": plan.converted_job_post_id,
-                }
-            )
-
+    async def convert_to_draft(self, request, pk=None):
+        plan = await database_sync_to_async(self._prepare_convert_to_draft)(request)
         ai_payload = None
-        system_prompt = ""
-        user_prompt = ""
         model_name = ""
-        if use_ai:
+        if request.data.get("use_ai"):
             feature = AIUsageEvent.Feature.PLANNER_DRAFT
-            _, _, _, _ = ensure_planner_ai_allowed(request.user, feature)
             system_prompt = (
                 "You are helping a homeowner turn planner notes into a job post draft. "
                 "Return strict JSON with keys title, summary, scope_of_work, preferred_contractor_types, "
                 "material_preference, location_context, urgency_timing. preferred_contractor_types must be an array of strings."
             )
-            user_prompt = self._build_plan_text(plan)
+            user_prompt = await database_sync_to_async(self._prepare_draft_ai_prompt)(request, plan, feature)
             try:
-                result = generate_text(
+                result = await agenerate_text(
                     feature=feature,
                     system_prompt=system_prompt,
                     user_prompt=user_prompt,
                 )
                 model_name = result["model"]
                 ai_payload = parse_ai_json(result["text"])
-                self._record_ai_event(
-                    user=request.user,
-                    feature=feature,
-                    model_name=model_name,
-                    prompt_chars=len(system_prompt) + len(user_prompt),
-                    response_chars=len(result["text"]),
-                    status_value=AIUsageEvent.Status.SUCCESS,
-                    usage=result.get("usage"),
-                )
             except (AIServiceError, ValueError, TypeError, json.JSONDecodeError) as exc:
-                self._record_ai_event(
+                await database_sync_to_async(self._record_ai_event)(
                     user=request.user,
                     feature=feature,
                     model_name=model_name,
@@ -1903,6 +2340,44 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
                 )
                 return Response({"detail": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
 
+            await database_sync_to_async(self._record_ai_event)(
+                user=request.user,
+                feature=feature,
+                model_name=model_name,
+                prompt_chars=len(system_prompt) + len(user_prompt),
+                response_chars=len(result["text"]),
+                status_value=AIUsageEvent.Status.SUCCESS,
+                usage=result.get("usage"),
+            )
+
+        return await database_sync_to_async(self._create_draft_from_plan)(request, plan, ai_payload)
+
+    def _prepare_convert_to_draft(self, request):
+        plan = self.get_object()
+        title_or_summary = bool((plan.title or "").strip() or (plan.issue_summary or "").strip())
+        note_or_image = bool((plan.notes or "").strip() or plan.images.exists())
+        if not title_or_summary or not note_or_image:
+            raise ValidationError(
+                {
+                    "detail": "Add a title or issue summary and at least one note or image before generating a draft."
+                }
+            )
+
+        force_regenerate = bool(request.data.get("force_regenerate"))
+        if plan.converted_job_post_id and not force_regenerate:
+            raise ValidationError(
+                {
+                    "detail": "This plan already generated a draft job post.",
+                    "draft_id": plan.converted_job_post_id,
+                }
+            )
+        return plan
+
+    def _prepare_draft_ai_prompt(self, request, plan, feature):
+        ensure_planner_ai_allowed(request.user, feature)
+        return self._build_plan_text(plan)
+
+    def _create_draft_from_plan(self, request, plan, ai_payload):
         posting_mode = str(request.data.get("posting_mode") or "").strip()
         invite_usernames = request.data.get("private_contractor_usernames") or []
         if isinstance(invite_usernames, str):
@@ -1972,10 +2447,14 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
                         "annotations": markup_version.get("annotations") or [],
                         "visible_layers": markup_version.get("visible_layers") or {},
                     }
-                image.image.open("rb")
+                # Metadata-only copy: the draft references the same stored blob.
+                shared_name = image.image.storage.retain(image.image.name)
+                if not shared_name:
+                    continue
                 copied_images.append(
                     ProjectImage(
                         project=draft,
+                        image=shared_name,
                         caption=image.caption,
                         order=image.order,
                         media_type=ProjectImage.MEDIA_TYPE_IMAGE,
@@ -1983,12 +2462,6 @@ class ProjectPlanViewSet(viewsets.ModelViewSet):
                         extra_data=image_extra_data,
                     )
                 )
-                copied_images[-1].image.save(
-                    image.image.name.split("/")[-1],
-                    ContentFile(image.image.read()),
-                    save=False,
-                )
-                image.image.close()
             if copied_images:
                 ProjectImage.objects.bulk_create(copied_images)
 
@@ -2018,6 +2491,7 @@ class FavoriteProjectListView(generics.ListAPIView):
             ProjectFavorite.objects
             .filter(user=self.request.user)
             .select_related("project", "project__owner")
+            .prefetch_related(Prefetch("project__images", queryset=ProjectImage.objects.order_by("order", "id")))
             .order_by("-created_at", "-id")
         )
 
@@ -2031,6 +2505,7 @@ class LikedProjectListView(generics.ListAPIView):
             ProjectLike.objects
             .filter(user=self.request.user)
             .select_related("project", "project__owner")
+            .prefetch_related(Prefetch("project__images", queryset=ProjectImage.objects.order_by("order", "id")))
             .order_by("-created_at", "-id")
         )
 
@@ -2371,7 +2846,7 @@ class InboxThreadListView(generics.ListAPIView):
         return (
             MessageThread.objects
             .filter(Q(owner=user) | Q(client=user))
-            .select_related("owner", "client", "owner__profile", "client__profile")
+            .select_related("project", "owner", "client", "owner__profile", "client__profile")
             .annotate(
                 latest_message_id=Subquery(latest_messages.values("id")[:1]),
                 latest_message_text=Subquery(latest_messages.values("text")[:1]),
@@ -2385,6 +2860,14 @@ class InboxThreadListView(generics.ListAPIView):
                     latest_messages.values("sender__username")[:1]
                 ),
             )
+            .annotate(
+                latest_message_first_attachment_name=Subquery(
+                    MessageAttachment.objects
+                    .filter(message_id=OuterRef("latest_message_id"))
+                    .order_by("id")
+                    .values("original_name")[:1]
+                ),
+            )
             .order_by("-updated_at")
         )
 
@@ -2451,16 +2934,50 @@ class ThreadMessagesView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         thread = self.get_thread()
+        return self._message_list(thread)
+
+    def _message_list(self, thread):
         return (
-            PrivateMessage.objects
-            .filter(
-                thread=thread,
-                sender_id__in=(thread.owner_id, thread.client_id),
-            )
+            self._messages(thread)
             .select_related("sender", "parent_message", "context_project")
             .prefetch_related("attachments")
         )
 
+    def _messages(self, thread):
+        return PrivateMessage.objects.filter(
+            thread=thread,
+            sender_id__in=(thread.owner_id, thread.client_id),
+        )
+
+    def list(self, request, *args, **kwargs):
+        thread = self.get_thread()
+        # Sending, deleting and attachment changes all bump thread.updated_at;
+        # can_delete flips when a message leaves its one-minute window.
+        markers = self._messages(thread).aggregate(
+            latest=Max("id"),
+            total=Count("id"),
+            newest=Max("created_at"),
+            deletable=Count(
+                "id",
+                filter=Q(sender_id=request.user.id, created_at__gte=timezone.now() - timedelta(minutes=1)),
+            ),
+        )
+        etag = weak_etag(
+            "thread-messages",
+            thread.pk,
+            thread.updated_at,
+            request.user.id,
+            markers["latest"],
+            markers["total"],
+            markers["deletable"],
+        )
+        last_modified = latest_timestamp(thread.updated_at, markers["newest"])
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(self._message_list(thread), many=True)
+        return set_validators(Response(serializer.data), etag, last_modified)
+
     def _parse_links(self, request):
         raw = request.data.get("links")
         if not raw:
@@ -2568,6 +3085,7 @@ class ThreadMessagesView(generics.ListCreateAPIView):
 
         thread.updated_at = timezone.now()
         thread.save(update_fields=["updated_at"])
+        metrics.MESSAGES_SENT.inc(with_attachments=str(bool(image_files or doc_files or camera_files or links)).lower())
         return msg
 
 
@@ -2820,7 +3338,7 @@ class BlockListView(generics.ListAPIView):
         return MessageThread.objects.filter(
             Q(owner=user, owner_blocked_client=True)
             | Q(client=user, client_blocked_owner=True)
-        ).select_related("owner", "client", "owner__profile", "client__profile")
+        ).select_related("project", "owner", "client", "owner__profile", "client__profile")
 
 
 # ---------------------------------------------------
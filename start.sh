@@ -45,6 +45,29 @@ mkdir -p "${MEDIA_ROOT}/uploads"
 python manage.py migrate --noinput
 python manage.py collectstatic --noinput
 
+# Per-worker metric snapshots from a previous boot would be merged into the
+# new totals; start from an empty directory.
+METRICS_DIR="${METRICS_DIR:-/tmp/portfolio-metrics}"
+export METRICS_DIR
+rm -rf "${METRICS_DIR}"
+mkdir -p "${METRICS_DIR}"
+
+# SERVER_MODE=asgi runs uvicorn workers under gunicorn. The async views (AI
+# assist, planner AI, sketch tools, directory geocoding) then wait on the
+# provider on the event loop instead of blocking a whole worker process.
+SERVER_MODE="${SERVER_MODE:-wsgi}"
+echo "SERVER_MODE is: ${SERVER_MODE}"
+
+if [ "${SERVER_MODE}" = "asgi" ]; then
+  exec gunicorn backend.asgi:application \
+    --worker-class uvicorn_worker.UvicornWorker \
+    --bind 0.0.0.0:${PORT:-8080} \
+    --access-logfile - \
+    --error-logfile - \
+    --capture-output \
+    --timeout 120
+fi
+
 exec gunicorn backend.wsgi:application \
   --bind 0.0.0.0:${PORT:-8080} \
   --access-logfile - \